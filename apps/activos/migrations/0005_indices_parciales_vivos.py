@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:46
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices creados con CONCURRENTLY para no bloquear escrituras en tablas grandes
+    atomic = False
+
+    dependencies = [
+        ('activos', '0004_movimientoactivo_estado_nuevo_and_more'),
+        ('bajas_inventario', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='movimientoactivo',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['activo', '-fecha_creacion'], name='mov_act_fecha_vivo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movimientoactivo',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['-fecha_creacion'], name='mov_act_creac_vivo_idx'),
+        ),
+    ]
@@ -442,6 +442,19 @@ class MovimientoActivo(BaseModel):
         verbose_name = 'Movimiento de Activo'
         verbose_name_plural = 'Movimientos de Activos'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Historial por activo y listado general (solo no eliminados)
+            models.Index(
+                fields=['activo', '-fecha_creacion'],
+                name='mov_act_fecha_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+            models.Index(
+                fields=['-fecha_creacion'],
+                name='mov_act_creac_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+        ]
         permissions = [
             ('registrar_movimiento', 'Puede registrar movimientos de activos'),
             ('ver_historial_movimientos', 'Puede ver historial de movimientos'),
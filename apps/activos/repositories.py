@@ -249,6 +249,14 @@ class TipoMovimientoActivoRepository:
         except TipoMovimientoActivo.DoesNotExist:
             return None
 
+    @staticmethod
+    def get_by_codigo(codigo: str) -> Optional[TipoMovimientoActivo]:
+        """Obtiene un tipo de movimiento por su código."""
+        try:
+            return TipoMovimientoActivo.objects.get(codigo=codigo, eliminado=False)
+        except TipoMovimientoActivo.DoesNotExist:
+            return None
+
 
 # ==================== ACTIVO REPOSITORY ====================
 
@@ -362,7 +370,7 @@ class MovimientoActivoRepository:
     @staticmethod
     def get_all() -> QuerySet[MovimientoActivo]:
         """Retorna todos los movimientos con relaciones optimizadas."""
-        return MovimientoActivo.objects.filter(eliminado=False).select_related(
+        return MovimientoActivo.objects.vivos().select_related(
             'activo', 'tipo_movimiento', 'ubicacion_destino',
             'taller', 'responsable', 'proveniencia', 'usuario_registro'
         ).order_by('-fecha_creacion')
@@ -381,8 +389,8 @@ class MovimientoActivoRepository:
     @staticmethod
     def filter_by_activo(activo: Activo, limit: int = 20) -> QuerySet[MovimientoActivo]:
         """Retorna movimientos de un activo específico."""
-        return MovimientoActivo.objects.filter(
-            activo=activo, eliminado=False
+        return MovimientoActivo.objects.vivos().filter(
+            activo=activo
         ).select_related(
             'tipo_movimiento', 'ubicacion_destino', 'taller',
             'responsable', 'proveniencia', 'usuario_registro'
@@ -416,8 +424,8 @@ class MovimientoActivoRepository:
     @staticmethod
     def get_ultimo_por_activo(activo: Activo) -> Optional[MovimientoActivo]:
         """Obtiene el último movimiento de un activo."""
-        return MovimientoActivo.objects.filter(
-            activo=activo, eliminado=False
+        return MovimientoActivo.objects.vivos().filter(
+            activo=activo
         ).select_related(
             'ubicacion_destino', 'responsable'
         ).order_by('-fecha_creacion').first()
@@ -85,6 +85,7 @@ class ActivoListView(BaseAuditedViewMixin, PaginatedListMixin, ListView):
     context_object_name = 'activos'
     permission_required = 'activos.view_activo'
     paginate_by = 25
+    query_budget = 8
 
     def get_queryset(self) -> QuerySet[Activo]:
         """Retorna activos con optimización N+1."""
@@ -10,7 +10,7 @@ from django.contrib import admin
 from django.db.models import QuerySet
 from django.http import HttpRequest
 
-from .models import MotivoBaja, BajaInventario
+from .models import MotivoBaja, BajaInventario, LoteBaja
 
 
 @admin.register(MotivoBaja)
@@ -52,13 +52,13 @@ class BajaInventarioAdmin(admin.ModelAdmin):
         'numero', 'activo__codigo', 'activo__nombre',
         'solicitante__username', 'observaciones'
     ]
-    readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
+    readonly_fields = ['lote', 'fecha_creacion', 'fecha_actualizacion']
     ordering = ['-fecha_baja', '-numero']
     list_per_page = 25
 
     fieldsets = (
         ('Información General', {
-            'fields': ('numero', 'fecha_baja', 'activo', 'motivo', 'ubicacion')
+            'fields': ('numero', 'fecha_baja', 'activo', 'motivo', 'ubicacion', 'lote')
         }),
         ('Responsable', {
             'fields': ('solicitante',)
@@ -86,3 +86,27 @@ class BajaInventarioAdmin(admin.ModelAdmin):
             'activo', 'motivo', 'ubicacion', 'solicitante',
             'activo__categoria', 'activo__estado'
         )
+
+
+@admin.register(LoteBaja)
+class LoteBajaAdmin(admin.ModelAdmin):
+    """Configuración del admin para el modelo LoteBaja."""
+
+    list_display = [
+        'id', 'estado', 'motivo', 'solicitante', 'total',
+        'procesados', 'creadas', 'fecha_creacion', 'fecha_termino'
+    ]
+    list_filter = ['estado', 'motivo']
+    search_fields = ['solicitante__username', 'observaciones']
+    readonly_fields = [
+        'total', 'procesados', 'creadas', 'error',
+        'fecha_termino', 'fecha_creacion', 'fecha_actualizacion'
+    ]
+    exclude = ['activos_ids']
+    ordering = ['-id']
+    list_per_page = 25
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[LoteBaja]:
+        """Optimiza consultas con select_related."""
+        qs = super().get_queryset(request)
+        return qs.select_related('motivo', 'ubicacion', 'solicitante')
@@ -11,7 +11,7 @@ from typing import Any
 from django import forms
 
 from .models import BajaInventario, MotivoBaja
-from apps.activos.models import Activo, Ubicacion
+from apps.activos.models import Activo, CategoriaActivo, EstadoActivo, Ubicacion
 
 
 class MotivoBajaForm(forms.ModelForm):
@@ -126,3 +126,71 @@ class FiltroBajasForm(forms.Form):
         ),
         label='Buscar'
     )
+
+
+class BajaMasivaForm(forms.Form):
+    """
+    Formulario de baja masiva: filtros que seleccionan los activos y datos
+    comunes de las bajas.
+    """
+
+    # Filtros de activos
+    categoria = forms.ModelChoiceField(
+        queryset=CategoriaActivo.objects.filter(activo=True, eliminado=False),
+        required=False,
+        empty_label='Todas las categorías',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        label='Categoría'
+    )
+    estado = forms.ModelChoiceField(
+        queryset=EstadoActivo.objects.filter(activo=True, eliminado=False),
+        required=False,
+        empty_label='Todos los estados',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        label='Estado actual'
+    )
+    ubicacion_actual = forms.ModelChoiceField(
+        queryset=Ubicacion.objects.filter(activo=True, eliminado=False),
+        required=False,
+        empty_label='Todas las ubicaciones',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        label='Ubicación actual'
+    )
+    buscar = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={'class': 'form-control', 'placeholder': 'Código, nombre o número de serie...'}
+        ),
+        label='Buscar'
+    )
+
+    # Datos de las bajas
+    motivo = forms.ModelChoiceField(
+        queryset=MotivoBaja.objects.filter(activo=True, eliminado=False),
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        label='Motivo'
+    )
+    ubicacion = forms.ModelChoiceField(
+        queryset=Ubicacion.objects.filter(activo=True, eliminado=False),
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        label='Ubicación de baja'
+    )
+    fecha_baja = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+        label='Fecha de baja'
+    )
+    observaciones = forms.CharField(
+        required=False,
+        widget=forms.Textarea(
+            attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Observaciones comunes (opcional)'}
+        ),
+        label='Observaciones'
+    )
+
+    def clean(self) -> dict[str, Any]:
+        """Exige al menos un filtro para no dar de baja todo el inventario por error."""
+        cleaned_data = super().clean()
+        filtros = ('categoria', 'estado', 'ubicacion_actual', 'buscar')
+        if not any(cleaned_data.get(campo) for campo in filtros):
+            raise forms.ValidationError('Debe indicar al menos un filtro para seleccionar los activos.')
+        return cleaned_data
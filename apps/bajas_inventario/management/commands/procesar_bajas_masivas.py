@@ -0,0 +1,64 @@
+"""
+Comando de management que procesa las bajas masivas en segundo plano.
+
+Toma el lote pendiente más antiguo y lo da de baja por tramos; cada tramo
+es una transacción, así un corte a mitad de camino se retoma donde quedó.
+
+Ejecutar:
+    python manage.py procesar_bajas_masivas
+    python manage.py procesar_bajas_masivas --continuo --intervalo 10
+    python manage.py procesar_bajas_masivas --tamano 1000
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bajas_inventario.models import LoteBaja
+from apps.bajas_inventario.services import BajaInventarioService
+
+
+class Command(BaseCommand):
+    help = 'Procesa los lotes de bajas masivas pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamano',
+            type=int,
+            default=500,
+            help='Activos por transacción (default: 500)',
+        )
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue procesando hasta ser detenido',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=10,
+            help='Segundos de espera entre pasadas con --continuo (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        if options['tamano'] < 1:
+            raise CommandError('--tamano debe ser al menos 1')
+
+        servicio = BajaInventarioService()
+        while True:
+            self._pasada(servicio, options['tamano'])
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
+
+    def _pasada(self, servicio: BajaInventarioService, tamano: int) -> None:
+        """Procesa tramos hasta que no queden lotes pendientes."""
+        while True:
+            lote = servicio.procesar_lote_pendiente(tamano)
+            if lote is None:
+                break
+            if lote.estado == LoteBaja.Estado.ERROR:
+                self.stderr.write(f'Lote {lote.id}: error - {lote.error}')
+            elif lote.estado == LoteBaja.Estado.COMPLETADO:
+                self.stdout.write(
+                    f'Lote {lote.id}: {lote.creadas} baja(s) de {lote.total} activo(s)'
+                )
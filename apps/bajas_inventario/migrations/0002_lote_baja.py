@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0001_initial'),
+        ('bajas_inventario', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoteBaja',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('fecha_baja', models.DateField(verbose_name='Fecha de Baja')),
+                ('observaciones', models.TextField(blank=True, null=True, verbose_name='Observaciones')),
+                ('activos_ids', models.JSONField(default=list, verbose_name='Activos')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('COMPLETADO', 'Completado'), ('ERROR', 'Error')], default='PENDIENTE', max_length=10, verbose_name='Estado')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+                ('procesados', models.IntegerField(default=0, verbose_name='Procesados')),
+                ('creadas', models.IntegerField(default=0, verbose_name='Bajas Creadas')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('fecha_termino', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Término')),
+                ('motivo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lotes', to='bajas_inventario.motivobaja', verbose_name='Motivo')),
+                ('solicitante', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lotes_baja', to=settings.AUTH_USER_MODEL, verbose_name='Solicitante')),
+                ('ubicacion', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lotes_baja', to='activos.ubicacion', verbose_name='Ubicación de Baja')),
+            ],
+            options={
+                'verbose_name': 'Lote de Baja Masiva',
+                'verbose_name_plural': 'Lotes de Bajas Masivas',
+                'db_table': 'tba_baja_lote',
+                'ordering': ['-id'],
+                'indexes': [models.Index(condition=models.Q(('eliminado', False), ('estado', 'PENDIENTE')), fields=['id'], name='baja_lote_pend_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='bajainventario',
+            name='lote',
+            field=models.ForeignKey(blank=True, help_text='Lote de baja masiva que generó la baja, si aplica', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bajas', to='bajas_inventario.lotebaja', verbose_name='Lote'),
+        ),
+    ]
@@ -4,6 +4,7 @@ Modelos del módulo de bajas de inventario.
 Este módulo gestiona las bajas de activos del inventario, incluyendo:
 - Catálogo de motivos de baja
 - Registro de bajas de inventario con trazabilidad completa
+- Lotes de bajas masivas procesados en segundo plano
 
 Todos los modelos heredan de BaseModel para mantener auditoría y soft delete.
 Convención de nomenclatura: todas las tablas tienen prefijo 'tba_'.
@@ -76,6 +77,15 @@ class BajaInventario(BaseModel):
         verbose_name='Solicitante'
     )
     observaciones = models.TextField(blank=True, null=True, verbose_name='Observaciones')
+    lote = models.ForeignKey(
+        'LoteBaja',
+        on_delete=models.PROTECT,
+        related_name='bajas',
+        blank=True,
+        null=True,
+        verbose_name='Lote',
+        help_text='Lote de baja masiva que generó la baja, si aplica'
+    )
 
     class Meta:
         db_table = 'tba_baja_inventario'
@@ -91,3 +101,89 @@ class BajaInventario(BaseModel):
     def __str__(self) -> str:
         """Representación en string del objeto."""
         return f"BAJA-{self.numero} - {self.motivo.nombre}"
+
+
+class LoteBaja(BaseModel):
+    """
+    Baja masiva de activos procesada en segundo plano.
+
+    Guarda los activos seleccionados y los datos comunes de las bajas; el
+    comando procesar_bajas_masivas los da de baja por tramos, cada uno en
+    su propia transacción, y actualiza el avance.
+
+    Attributes:
+        motivo: Motivo común de las bajas.
+        ubicacion: Ubicación de baja.
+        fecha_baja: Fecha de las bajas.
+        observaciones: Observaciones comunes de las bajas.
+        solicitante: Usuario que pidió la baja masiva.
+        activos_ids: IDs de los activos seleccionados.
+        estado: PENDIENTE, PROCESANDO, COMPLETADO o ERROR.
+        total: Cantidad de activos seleccionados.
+        procesados: Activos ya revisados (dados de baja u omitidos).
+        creadas: Bajas creadas.
+        error: Último error de procesamiento.
+        fecha_termino: Fecha en que terminó el procesamiento.
+    """
+
+    class Estado(models.TextChoices):
+        PENDIENTE = 'PENDIENTE', 'Pendiente'
+        PROCESANDO = 'PROCESANDO', 'Procesando'
+        COMPLETADO = 'COMPLETADO', 'Completado'
+        ERROR = 'ERROR', 'Error'
+
+    motivo = models.ForeignKey(
+        MotivoBaja,
+        on_delete=models.PROTECT,
+        related_name='lotes',
+        verbose_name='Motivo'
+    )
+    ubicacion = models.ForeignKey(
+        Ubicacion,
+        on_delete=models.PROTECT,
+        related_name='lotes_baja',
+        verbose_name='Ubicación de Baja'
+    )
+    fecha_baja = models.DateField(verbose_name='Fecha de Baja')
+    observaciones = models.TextField(blank=True, null=True, verbose_name='Observaciones')
+    solicitante = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='lotes_baja',
+        verbose_name='Solicitante'
+    )
+    activos_ids = models.JSONField(default=list, verbose_name='Activos')
+    estado = models.CharField(
+        max_length=10,
+        choices=Estado.choices,
+        default=Estado.PENDIENTE,
+        verbose_name='Estado'
+    )
+    total = models.IntegerField(default=0, verbose_name='Total')
+    procesados = models.IntegerField(default=0, verbose_name='Procesados')
+    creadas = models.IntegerField(default=0, verbose_name='Bajas Creadas')
+    error = models.TextField(blank=True, null=True, verbose_name='Error')
+    fecha_termino = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Término')
+
+    class Meta:
+        db_table = 'tba_baja_lote'
+        verbose_name = 'Lote de Baja Masiva'
+        verbose_name_plural = 'Lotes de Bajas Masivas'
+        ordering = ['-id']
+        indexes = [
+            # Cola del worker: solo lotes pendientes, en orden de llegada
+            models.Index(
+                fields=['id'],
+                name='baja_lote_pend_idx',
+                condition=models.Q(estado='PENDIENTE', eliminado=False),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en string del objeto."""
+        return f"Lote {self.id} - {self.total} activo(s) - {self.get_estado_display()}"
+
+    @property
+    def porcentaje(self) -> int:
+        """Avance del procesamiento (0-100)."""
+        return 100 if not self.total else int(self.procesados * 100 / self.total)
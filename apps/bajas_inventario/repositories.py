@@ -4,14 +4,17 @@ Repository Pattern para el módulo de bajas de inventario.
 Separa la lógica de acceso a datos de la lógica de negocio,
 siguiendo el principio de Inversión de Dependencias (SOLID).
 """
-from typing import Optional
-from django.db.models import QuerySet
+import re
+from typing import Iterable, List, Optional
+from django.db import connection
+from django.db.models import OuterRef, Q, QuerySet, Subquery
 from django.contrib.auth.models import User
-from .models import (
-    MotivoBaja, EstadoBaja, BajaInventario,
-    DetalleBaja, HistorialBaja
-)
-from apps.bodega.models import Bodega
+from django.utils import timezone
+from .models import MotivoBaja, BajaInventario, LoteBaja
+from apps.activos.models import Activo, CategoriaActivo, EstadoActivo, MovimientoActivo, Ubicacion
+
+# Clave del advisory lock que serializa la numeración de bajas
+CLAVE_BLOQUEO_NUMERACION = 7302
 
 
 # ==================== MOTIVO BAJA REPOSITORY ====================
@@ -42,70 +45,6 @@ class MotivoBajaRepository:
         except MotivoBaja.DoesNotExist:
             return None
 
-    @staticmethod
-    def get_with_autorizacion() -> QuerySet[MotivoBaja]:
-        """Retorna motivos que requieren autorización."""
-        return MotivoBaja.objects.filter(
-            requiere_autorizacion=True, activo=True, eliminado=False
-        ).order_by('codigo')
-
-    @staticmethod
-    def get_with_documento() -> QuerySet[MotivoBaja]:
-        """Retorna motivos que requieren documento."""
-        return MotivoBaja.objects.filter(
-            requiere_documento=True, activo=True, eliminado=False
-        ).order_by('codigo')
-
-
-# ==================== ESTADO BAJA REPOSITORY ====================
-
-class EstadoBajaRepository:
-    """Repository para gestionar estados de bajas de inventario."""
-
-    @staticmethod
-    def get_all() -> QuerySet[EstadoBaja]:
-        """Retorna todos los estados activos y no eliminados."""
-        return EstadoBaja.objects.filter(
-            activo=True, eliminado=False
-        ).order_by('codigo')
-
-    @staticmethod
-    def get_by_id(estado_id: int) -> Optional[EstadoBaja]:
-        """Obtiene un estado por su ID."""
-        try:
-            return EstadoBaja.objects.get(id=estado_id, eliminado=False, activo=True)
-        except EstadoBaja.DoesNotExist:
-            return None
-
-    @staticmethod
-    def get_by_codigo(codigo: str) -> Optional[EstadoBaja]:
-        """Obtiene un estado por su código."""
-        try:
-            return EstadoBaja.objects.get(codigo=codigo, eliminado=False, activo=True)
-        except EstadoBaja.DoesNotExist:
-            return None
-
-    @staticmethod
-    def get_inicial() -> Optional[EstadoBaja]:
-        """Obtiene el estado inicial del sistema."""
-        return EstadoBaja.objects.filter(
-            es_inicial=True, activo=True, eliminado=False
-        ).first()
-
-    @staticmethod
-    def get_finales() -> QuerySet[EstadoBaja]:
-        """Retorna todos los estados finales."""
-        return EstadoBaja.objects.filter(
-            es_final=True, activo=True, eliminado=False
-        ).order_by('codigo')
-
-    @staticmethod
-    def get_que_permiten_edicion() -> QuerySet[EstadoBaja]:
-        """Retorna estados que permiten edición."""
-        return EstadoBaja.objects.filter(
-            permite_edicion=True, activo=True, eliminado=False
-        ).order_by('codigo')
-
 
 # ==================== BAJA INVENTARIO REPOSITORY ====================
 
@@ -118,79 +57,19 @@ class BajaInventarioRepository:
         return BajaInventario.objects.filter(
             eliminado=False
         ).select_related(
-            'motivo', 'estado', 'bodega', 'solicitante', 'autorizador'
+            'motivo', 'ubicacion', 'solicitante', 'activo'
         ).order_by('-fecha_baja', '-numero')
 
-    @staticmethod
-    def get_by_id(baja_id: int) -> Optional[BajaInventario]:
-        """Obtiene una baja por su ID."""
-        try:
-            return BajaInventario.objects.select_related(
-                'motivo', 'estado', 'bodega', 'solicitante', 'autorizador'
-            ).get(id=baja_id, eliminado=False)
-        except BajaInventario.DoesNotExist:
-            return None
-
     @staticmethod
     def get_by_numero(numero: str) -> Optional[BajaInventario]:
         """Obtiene una baja por su número."""
         try:
             return BajaInventario.objects.select_related(
-                'motivo', 'estado', 'bodega', 'solicitante', 'autorizador'
+                'motivo', 'ubicacion', 'solicitante', 'activo'
             ).get(numero=numero, eliminado=False)
         except BajaInventario.DoesNotExist:
             return None
 
-    @staticmethod
-    def filter_by_solicitante(solicitante: User) -> QuerySet[BajaInventario]:
-        """Retorna bajas de un solicitante específico."""
-        return BajaInventario.objects.filter(
-            solicitante=solicitante,
-            eliminado=False
-        ).select_related(
-            'motivo', 'estado', 'bodega', 'autorizador'
-        ).order_by('-fecha_baja')
-
-    @staticmethod
-    def filter_by_estado(estado: EstadoBaja) -> QuerySet[BajaInventario]:
-        """Retorna bajas en un estado específico."""
-        return BajaInventario.objects.filter(
-            estado=estado,
-            eliminado=False
-        ).select_related(
-            'motivo', 'bodega', 'solicitante', 'autorizador'
-        ).order_by('-fecha_baja')
-
-    @staticmethod
-    def filter_by_motivo(motivo: MotivoBaja) -> QuerySet[BajaInventario]:
-        """Retorna bajas de un motivo específico."""
-        return BajaInventario.objects.filter(
-            motivo=motivo,
-            eliminado=False
-        ).select_related(
-            'estado', 'bodega', 'solicitante', 'autorizador'
-        ).order_by('-fecha_baja')
-
-    @staticmethod
-    def filter_by_bodega(bodega: Bodega) -> QuerySet[BajaInventario]:
-        """Retorna bajas de una bodega específica."""
-        return BajaInventario.objects.filter(
-            bodega=bodega,
-            eliminado=False
-        ).select_related(
-            'motivo', 'estado', 'solicitante', 'autorizador'
-        ).order_by('-fecha_baja')
-
-    @staticmethod
-    def filter_pendientes_autorizacion() -> QuerySet[BajaInventario]:
-        """Retorna bajas pendientes de autorización."""
-        return BajaInventario.objects.filter(
-            autorizador__isnull=True,
-            eliminado=False
-        ).select_related(
-            'motivo', 'estado', 'bodega', 'solicitante'
-        ).order_by('-fecha_baja')
-
     @staticmethod
     def exists_by_numero(numero: str, exclude_id: Optional[int] = None) -> bool:
         """Verifica si existe una baja con el número dado."""
@@ -200,82 +79,122 @@ class BajaInventarioRepository:
         return queryset.exists()
 
     @staticmethod
-    def search(query: str) -> QuerySet[BajaInventario]:
-        """Búsqueda de bajas por número o solicitante."""
-        from django.db.models import Q
-        return BajaInventario.objects.filter(
-            Q(numero__icontains=query) |
-            Q(solicitante__first_name__icontains=query) |
-            Q(solicitante__last_name__icontains=query) |
-            Q(descripcion__icontains=query),
-            eliminado=False
-        ).select_related(
-            'motivo', 'estado', 'bodega', 'solicitante', 'autorizador'
-        ).order_by('-fecha_baja')
-
+    def bloquear_numeracion() -> None:
+        """
+        Serializa la asignación de números de baja hasta el fin de la transacción.
+
+        Evita que dos bajas masivas simultáneas lean el mismo último número.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAVE_BLOQUEO_NUMERACION])
+
+    @staticmethod
+    def ultimo_numero(prefijo: str, longitud: int) -> int:
+        """
+        Último correlativo usado con el prefijo (0 si no hay).
+
+        Solo considera números con el correlativo completo de ``longitud``
+        dígitos: un número ingresado a mano sin ceros (BAJA-9) se ordenaría
+        después de los rellenados y correría la numeración.
+        """
+        numero = BajaInventario.objects.filter(
+            numero__regex=rf'^{re.escape(prefijo)}-[0-9]{{{longitud}}}$'
+        ).order_by('-numero').values_list('numero', flat=True).first()
+        return int(numero.rsplit('-', 1)[-1]) if numero else 0
+
+    @staticmethod
+    def activos_para_baja(
+        categoria: Optional[CategoriaActivo] = None,
+        estado: Optional[EstadoActivo] = None,
+        ubicacion: Optional[Ubicacion] = None,
+        buscar: str = ''
+    ) -> QuerySet[Activo]:
+        """
+        Activos vigentes que cumplen los filtros de una baja masiva.
+
+        La ubicación es la del último movimiento con destino de cada activo.
+        """
+        queryset = Activo.objects.vivos()
+        if categoria:
+            queryset = queryset.filter(categoria=categoria)
+        if estado:
+            queryset = queryset.filter(estado=estado)
+        if buscar:
+            queryset = queryset.filter(
+                Q(codigo__icontains=buscar) | Q(nombre__icontains=buscar) | Q(numero_serie__icontains=buscar)
+            )
+        if ubicacion:
+            ultima_ubicacion = MovimientoActivo.objects.filter(
+                activo=OuterRef('pk'), eliminado=False, ubicacion_destino__isnull=False
+            ).order_by('-fecha_creacion').values('ubicacion_destino')[:1]
+            queryset = queryset.annotate(ubicacion_actual=Subquery(ultima_ubicacion)).filter(
+                ubicacion_actual=ubicacion.id
+            )
+        return queryset.order_by('codigo')
+
+    @staticmethod
+    def bloquear_activos(activos_ids: Iterable[int], excluir_estado: EstadoActivo) -> List[int]:
+        """
+        Bloquea los activos que aún no están en el estado dado y retorna sus IDs.
+
+        Debe llamarse dentro de una transacción.
+        """
+        if not isinstance(activos_ids, QuerySet):
+            activos_ids = list(activos_ids)
+        return list(
+            Activo.objects.filter(id__in=activos_ids, eliminado=False)
+            .exclude(estado=excluir_estado)
+            .select_for_update()
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
 
-# ==================== DETALLE BAJA REPOSITORY ====================
 
-class DetalleBajaRepository:
-    """Repository para detalles de bajas de inventario."""
+# ==================== LOTE BAJA REPOSITORY ====================
 
-    @staticmethod
-    def filter_by_baja(baja: BajaInventario) -> QuerySet[DetalleBaja]:
-        """Retorna detalles de una baja específica."""
-        return DetalleBaja.objects.filter(
-            baja=baja,
-            eliminado=False
-        ).select_related('activo').order_by('id')
+class LoteBajaRepository:
+    """Repository para los lotes de bajas masivas en segundo plano."""
 
     @staticmethod
-    def get_by_id(detalle_id: int) -> Optional[DetalleBaja]:
-        """Obtiene un detalle por su ID."""
+    def get_by_id(lote_id: int) -> Optional[LoteBaja]:
+        """Obtiene un lote por su ID."""
         try:
-            return DetalleBaja.objects.select_related(
-                'baja', 'activo'
-            ).get(id=detalle_id, eliminado=False)
-        except DetalleBaja.DoesNotExist:
+            return LoteBaja.objects.select_related('motivo', 'ubicacion', 'solicitante').get(
+                id=lote_id, eliminado=False
+            )
+        except LoteBaja.DoesNotExist:
             return None
 
-
-# ==================== HISTORIAL BAJA REPOSITORY ====================
-
-class HistorialBajaRepository:
-    """Repository para historial de cambios de estado de bajas."""
-
     @staticmethod
-    def filter_by_baja(baja: BajaInventario) -> QuerySet[HistorialBaja]:
-        """Retorna el historial de una baja específica."""
-        return HistorialBaja.objects.filter(
-            baja=baja,
-            eliminado=False
-        ).select_related(
-            'estado_anterior', 'estado_nuevo', 'usuario'
-        ).order_by('-fecha_cambio')
+    def filter_by_solicitante(solicitante: User) -> QuerySet[LoteBaja]:
+        """Lotes de un solicitante, más recientes primero."""
+        return LoteBaja.objects.vivos().filter(solicitante=solicitante).order_by('-id')
 
     @staticmethod
-    def get_by_id(historial_id: int) -> Optional[HistorialBaja]:
-        """Obtiene un registro de historial por su ID."""
-        try:
-            return HistorialBaja.objects.select_related(
-                'baja', 'estado_anterior', 'estado_nuevo', 'usuario'
-            ).get(id=historial_id, eliminado=False)
-        except HistorialBaja.DoesNotExist:
-            return None
+    def bloquear_pendiente() -> Optional[LoteBaja]:
+        """
+        Toma y bloquea el lote pendiente más antiguo.
+
+        Usa SKIP LOCKED para que varios workers no procesen el mismo lote.
+        Debe llamarse dentro de una transacción.
+        """
+        return (
+            LoteBaja.objects.vivos()
+            .filter(estado__in=[LoteBaja.Estado.PENDIENTE, LoteBaja.Estado.PROCESANDO])
+            .select_for_update(skip_locked=True)
+            .order_by('id')
+            .first()
+        )
 
     @staticmethod
-    def create(
-        baja: BajaInventario,
-        estado_anterior: Optional[EstadoBaja],
-        estado_nuevo: EstadoBaja,
-        usuario: User,
-        observaciones: str = ''
-    ) -> HistorialBaja:
-        """Crea un nuevo registro de historial."""
-        return HistorialBaja.objects.create(
-            baja=baja,
-            estado_anterior=estado_anterior,
-            estado_nuevo=estado_nuevo,
-            usuario=usuario,
-            observaciones=observaciones
+    def registrar_avance(lote: LoteBaja, procesados: int, creadas: int) -> None:
+        """Suma el avance de un tramo con un único UPDATE."""
+        lote.procesados += procesados
+        lote.creadas += creadas
+        LoteBaja.objects.filter(id=lote.id).update(
+            procesados=lote.procesados,
+            creadas=lote.creadas,
+            estado=LoteBaja.Estado.PROCESANDO,
+            fecha_actualizacion=timezone.now(),
         )
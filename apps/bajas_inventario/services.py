@@ -5,418 +5,218 @@ Contiene la lógica de negocio siguiendo el principio de
 Single Responsibility (SOLID). Las operaciones críticas
 usan transacciones atómicas para garantizar consistencia.
 """
-from typing import Optional
-from decimal import Decimal
+import logging
+from dataclasses import dataclass
 from datetime import date
-from django.db import transaction
-from django.core.exceptions import ValidationError
+from typing import Iterable, List, Optional, Tuple, Union
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import QuerySet
 from django.utils import timezone
-from core.utils import generar_codigo_unico
-from .models import (
-    MotivoBaja, EstadoBaja, BajaInventario,
-    DetalleBaja, HistorialBaja
-)
-from .repositories import (
-    MotivoBajaRepository, EstadoBajaRepository, BajaInventarioRepository,
-    DetalleBajaRepository, HistorialBajaRepository
-)
-from apps.bodega.models import Bodega
-from apps.activos.models import Activo
 
+from .models import MotivoBaja, BajaInventario, LoteBaja
+from .repositories import BajaInventarioRepository, LoteBajaRepository
+from apps.activos.models import Activo, EstadoActivo, MovimientoActivo, TipoMovimientoActivo, Ubicacion
+from apps.activos.repositories import EstadoActivoRepository, TipoMovimientoActivoRepository
 
-# ==================== BAJA INVENTARIO SERVICE ====================
+logger = logging.getLogger(__name__)
 
-class BajaInventarioService:
-    """Service para lógica de negocio de Bajas de Inventario."""
+# Numeración de bajas: BAJA-00000001
+PREFIJO_NUMERO = 'BAJA'
+LONGITUD_NUMERO = 8
+# Código del estado de activo y del tipo de movimiento de una baja
+CODIGO_BAJA = 'BAJA'
+# Filas por INSERT en bulk_create
+FILAS_POR_INSERT = 500
 
-    def __init__(self):
-        self.baja_repo = BajaInventarioRepository()
-        self.estado_repo = EstadoBajaRepository()
-        self.motivo_repo = MotivoBajaRepository()
-        self.detalle_repo = DetalleBajaRepository()
-        self.historial_repo = HistorialBajaRepository()
 
-    @transaction.atomic
-    def crear_baja(
-        self,
-        motivo: MotivoBaja,
-        bodega: Bodega,
-        solicitante: User,
-        fecha_baja: date,
-        descripcion: str,
-        numero: Optional[str] = None,
-        **kwargs
-    ) -> BajaInventario:
-        """
-        Crea una nueva baja de inventario.
+@dataclass
+class DatosBaja:
+    """Datos comunes de las bajas de una baja masiva."""
+    motivo: MotivoBaja
+    ubicacion: Ubicacion
+    solicitante: User
+    fecha_baja: date
+    observaciones: str = ''
 
-        Args:
-            motivo: Motivo de la baja
-            bodega: Bodega
-            solicitante: Usuario solicitante
-            fecha_baja: Fecha de la baja
-            descripcion: Descripción de la baja
-            numero: Número de baja (opcional, se genera automático)
-            **kwargs: Campos opcionales
 
-        Returns:
-            BajaInventario: Baja creada
+# ==================== BAJA INVENTARIO SERVICE ====================
 
-        Raises:
-            ValidationError: Si hay errores de validación
-        """
-        # Validaciones
-        errors = {}
-
-        # Validar fecha de baja
-        if fecha_baja > date.today():
-            errors['fecha_baja'] = 'La fecha de baja no puede ser futura'
-
-        # Validar documento si se requiere
-        if motivo.requiere_documento and not kwargs.get('documento'):
-            errors['documento'] = 'Este motivo requiere un documento de respaldo'
-
-        if errors:
-            raise ValidationError(errors)
-
-        # Generar número si no se proporciona
-        if not numero:
-            numero = generar_codigo_unico('BAJA', BajaInventario, 'numero', longitud=8)
-        else:
-            if self.baja_repo.exists_by_numero(numero):
-                raise ValidationError({'numero': 'Ya existe una baja con este número'})
-
-        # Obtener estado inicial
-        estado_inicial = self.estado_repo.get_inicial()
-        if not estado_inicial:
-            raise ValidationError('No se ha configurado un estado inicial para bajas de inventario')
-
-        # Crear baja
-        baja = BajaInventario.objects.create(
-            numero=numero,
-            fecha_baja=fecha_baja,
-            motivo=motivo,
-            estado=estado_inicial,
-            bodega=bodega,
-            solicitante=solicitante,
-            descripcion=descripcion,
-            observaciones=kwargs.get('observaciones', ''),
-            documento=kwargs.get('documento'),
-            valor_total=Decimal('0')
-        )
+class BajaInventarioService:
+    """Service para lógica de negocio de Bajas de Inventario."""
 
-        # Registrar en historial
-        self.historial_repo.create(
-            baja=baja,
-            estado_anterior=None,
-            estado_nuevo=estado_inicial,
-            usuario=solicitante,
-            observaciones=f'Baja de inventario creada por {solicitante.get_full_name()}'
-        )
+    def __init__(self):
+        self.baja_repo = BajaInventarioRepository()
+        self.lote_repo = LoteBajaRepository()
+        self.estado_activo_repo = EstadoActivoRepository()
+        self.tipo_movimiento_repo = TipoMovimientoActivoRepository()
 
-        return baja
+    def en_segundo_plano(self, cantidad: int) -> bool:
+        """Indica si una baja masiva de ``cantidad`` activos debe procesarse en segundo plano."""
+        return cantidad > getattr(settings, 'BAJAS_MASIVAS_UMBRAL', 1000)
 
     @transaction.atomic
-    def cambiar_estado(
+    def crear_bajas_masivas(
         self,
-        baja: BajaInventario,
-        nuevo_estado: EstadoBaja,
-        usuario: User,
-        observaciones: str = ''
-    ) -> BajaInventario:
+        activos: Union[QuerySet[Activo], Iterable[int]],
+        datos: DatosBaja,
+        lote: Optional[LoteBaja] = None
+    ) -> int:
         """
-        Cambia el estado de una baja y registra en historial.
-
-        Args:
-            baja: Baja a actualizar
-            nuevo_estado: Nuevo estado
-            usuario: Usuario que realiza el cambio
-            observaciones: Observaciones del cambio
-
-        Returns:
-            BajaInventario: Baja actualizada
-
-        Raises:
-            ValidationError: Si el cambio no es válido
-        """
-        # Validar que no esté en estado final
-        if baja.estado.es_final:
-            raise ValidationError('No se puede cambiar el estado de una baja finalizada')
-
-        estado_anterior = baja.estado
-
-        # Actualizar estado
-        baja.estado = nuevo_estado
-        baja.save()
-
-        # Registrar en historial
-        self.historial_repo.create(
-            baja=baja,
-            estado_anterior=estado_anterior,
-            estado_nuevo=nuevo_estado,
-            usuario=usuario,
-            observaciones=observaciones
-        )
-
-        return baja
+        Da de baja un conjunto de activos en una sola transacción.
 
-    @transaction.atomic
-    def autorizar_baja(
-        self,
-        baja: BajaInventario,
-        autorizador: User,
-        notas_autorizacion: str = ''
-    ) -> BajaInventario:
-        """
-        Autoriza una baja de inventario.
+        Los números se asignan en un bloque consecutivo, las bajas y sus
+        movimientos se insertan con bulk_create y el estado de los activos
+        se actualiza con un único UPDATE. Los activos ya dados de baja se
+        omiten.
 
         Args:
-            baja: Baja a autorizar
-            autorizador: Usuario autorizador
-            notas_autorizacion: Notas de autorización
+            activos: QuerySet filtrado de activos o lista de IDs
+            datos: Motivo, ubicación, solicitante, fecha y observaciones
+            lote: Lote de baja masiva al que pertenecen las bajas (opcional)
 
         Returns:
-            BajaInventario: Baja autorizada
+            int: Cantidad de bajas creadas
 
         Raises:
-            ValidationError: Si hay errores de validación
-        """
-        # Validar que no esté ya autorizada
-        if baja.autorizador:
-            raise ValidationError('Esta baja ya fue autorizada')
-
-        # Validar que requiera autorización
-        if not baja.motivo.requiere_autorizacion:
-            raise ValidationError('Esta baja no requiere autorización')
-
-        # Validar que tenga detalles
-        detalles = self.detalle_repo.filter_by_baja(baja)
-        if not detalles.exists():
-            raise ValidationError('La baja no tiene detalles para autorizar')
-
-        # Actualizar baja
-        baja.autorizador = autorizador
-        baja.fecha_autorizacion = timezone.now()
-        baja.notas_autorizacion = notas_autorizacion
-
-        # Cambiar a estado autorizado
-        estado_autorizado = self.estado_repo.get_by_codigo('AUTORIZADO')
-        if not estado_autorizado:
-            raise ValidationError('No existe el estado AUTORIZADO en el sistema')
-
-        estado_anterior = baja.estado
-        baja.estado = estado_autorizado
-        baja.save()
-
-        # Registrar en historial
-        self.historial_repo.create(
-            baja=baja,
-            estado_anterior=estado_anterior,
-            estado_nuevo=estado_autorizado,
-            usuario=autorizador,
-            observaciones=f'Autorizada por {autorizador.get_full_name()}. {notas_autorizacion}'
+            ValidationError: Si la fecha es futura o faltan los catálogos de baja
+        """
+        self._validar_fecha(datos.fecha_baja)
+        estado_baja, tipo_baja = self._catalogos_baja()
+
+        seleccion = activos.values_list('id', flat=True) if isinstance(activos, QuerySet) else list(activos)
+        ids = self.baja_repo.bloquear_activos(seleccion, excluir_estado=estado_baja)
+        if not ids:
+            return 0
+
+        numeros = self._asignar_numeros(len(ids))
+        bajas = BajaInventario.objects.bulk_create(
+            [
+                BajaInventario(
+                    activo_id=activo_id,
+                    numero=numero,
+                    fecha_baja=datos.fecha_baja,
+                    motivo=datos.motivo,
+                    ubicacion=datos.ubicacion,
+                    solicitante=datos.solicitante,
+                    observaciones=datos.observaciones,
+                    lote=lote,
+                )
+                for activo_id, numero in zip(ids, numeros)
+            ],
+            batch_size=FILAS_POR_INSERT
         )
-
-        return baja
-
-    @transaction.atomic
-    def rechazar_baja(
-        self,
-        baja: BajaInventario,
-        rechazador: User,
-        motivo_rechazo: str
-    ) -> BajaInventario:
-        """
-        Rechaza una baja de inventario.
-
-        Args:
-            baja: Baja a rechazar
-            rechazador: Usuario que rechaza
-            motivo_rechazo: Motivo del rechazo
-
-        Returns:
-            BajaInventario: Baja rechazada
-
-        Raises:
-            ValidationError: Si hay errores de validación
-        """
-        if not motivo_rechazo:
-            raise ValidationError({'motivo_rechazo': 'Debe indicar el motivo del rechazo'})
-
-        # Cambiar a estado rechazado
-        estado_rechazado = self.estado_repo.get_by_codigo('RECHAZADO')
-        if not estado_rechazado:
-            raise ValidationError('No existe el estado RECHAZADO en el sistema')
-
-        estado_anterior = baja.estado
-        baja.estado = estado_rechazado
-        baja.notas_autorizacion = f'RECHAZADO: {motivo_rechazo}'
-        baja.save()
-
-        # Registrar en historial
-        self.historial_repo.create(
-            baja=baja,
-            estado_anterior=estado_anterior,
-            estado_nuevo=estado_rechazado,
-            usuario=rechazador,
-            observaciones=f'Rechazada por {rechazador.get_full_name()}. Motivo: {motivo_rechazo}'
+        MovimientoActivo.objects.bulk_create(
+            [
+                MovimientoActivo(
+                    activo_id=baja.activo_id,
+                    estado_nuevo=estado_baja,
+                    tipo_movimiento=tipo_baja,
+                    ubicacion_destino=datos.ubicacion,
+                    id_baja_inventario=baja,
+                    observaciones=f'Baja {baja.numero}: {datos.motivo.nombre}',
+                    usuario_registro=datos.solicitante,
+                )
+                for baja in bajas
+            ],
+            batch_size=FILAS_POR_INSERT
         )
+        Activo.objects.filter(id__in=ids).update(estado=estado_baja, fecha_actualizacion=timezone.now())
+        return len(bajas)
 
-        return baja
-
-    @transaction.atomic
-    def confirmar_baja(
-        self,
-        baja: BajaInventario,
-        usuario: User
-    ) -> BajaInventario:
+    def encolar_bajas_masivas(self, activos: QuerySet[Activo], datos: DatosBaja) -> LoteBaja:
         """
-        Confirma y finaliza una baja de inventario.
+        Registra una baja masiva para procesarla en segundo plano.
 
-        Args:
-            baja: Baja a confirmar
-            usuario: Usuario que confirma
-
-        Returns:
-            BajaInventario: Baja confirmada
+        Guarda los IDs seleccionados al momento de encolar; el comando
+        procesar_bajas_masivas los da de baja por tramos.
 
         Raises:
-            ValidationError: Si hay errores de validación
-        """
-        # Validar que esté autorizada si requiere autorización
-        if baja.motivo.requiere_autorizacion and not baja.autorizador:
-            raise ValidationError('La baja debe estar autorizada antes de confirmarla')
-
-        # Validar que tenga detalles
-        detalles = self.detalle_repo.filter_by_baja(baja)
-        if not detalles.exists():
-            raise ValidationError('La baja no tiene detalles para confirmar')
-
-        # Cambiar a estado confirmado
-        estado_confirmado = self.estado_repo.get_by_codigo('CONFIRMADO')
-        if not estado_confirmado:
-            raise ValidationError('No existe el estado CONFIRMADO en el sistema')
-
-        estado_anterior = baja.estado
-        baja.estado = estado_confirmado
-        baja.save()
-
-        # Registrar en historial
-        self.historial_repo.create(
-            baja=baja,
-            estado_anterior=estado_anterior,
-            estado_nuevo=estado_confirmado,
-            usuario=usuario,
-            observaciones=f'Baja confirmada por {usuario.get_full_name()}'
+            ValidationError: Si la fecha es futura, faltan los catálogos de baja
+                o no hay activos seleccionados
+        """
+        self._validar_fecha(datos.fecha_baja)
+        self._catalogos_baja()
+        ids = list(activos.values_list('id', flat=True))
+        if not ids:
+            raise ValidationError('No hay activos que cumplan los filtros')
+
+        return LoteBaja.objects.create(
+            motivo=datos.motivo,
+            ubicacion=datos.ubicacion,
+            solicitante=datos.solicitante,
+            fecha_baja=datos.fecha_baja,
+            observaciones=datos.observaciones,
+            activos_ids=ids,
+            total=len(ids),
         )
 
-        return baja
-
-    @transaction.atomic
-    def recalcular_total(self, baja: BajaInventario) -> BajaInventario:
+    def procesar_lote_pendiente(self, tamano: int = 500) -> Optional[LoteBaja]:
         """
-        Recalcula el valor total de la baja basándose en sus detalles.
-
-        Args:
-            baja: Baja de inventario
-
-        Returns:
-            BajaInventario: Baja actualizada
-        """
-        detalles = self.detalle_repo.filter_by_baja(baja)
-        total = sum(d.valor_total for d in detalles)
-
-        baja.valor_total = total
-        baja.save()
-
-        return baja
-
+        Procesa el siguiente tramo del lote pendiente más antiguo.
 
-# ==================== DETALLE BAJA SERVICE ====================
-
-class DetalleBajaService:
-    """Service para lógica de negocio de Detalles de Baja."""
-
-    def __init__(self):
-        self.detalle_repo = DetalleBajaRepository()
-        self.baja_repo = BajaInventarioRepository()
-
-    @transaction.atomic
-    def agregar_detalle(
-        self,
-        baja: BajaInventario,
-        activo: Activo,
-        cantidad: Decimal,
-        valor_unitario: Decimal,
-        **kwargs
-    ) -> DetalleBaja:
-        """
-        Agrega un detalle a una baja de inventario.
+        Cada tramo es una transacción: crea sus bajas y suma el avance del
+        lote juntos, así un corte a mitad de camino se retoma donde quedó.
+        Si el tramo falla, el lote queda en ERROR con el mensaje.
 
         Args:
-            baja: Baja de inventario
-            activo: Activo a dar de baja
-            cantidad: Cantidad
-            valor_unitario: Valor unitario
-            **kwargs: Campos opcionales (lote, numero_serie, observaciones)
+            tamano: Activos por tramo
 
         Returns:
-            DetalleBaja: Detalle creado
-
-        Raises:
-            ValidationError: Si hay errores de validación
-        """
-        # Validar que la baja no esté finalizada
-        if baja.estado.es_final:
-            raise ValidationError('No se pueden agregar detalles a una baja finalizada')
-
-        # Validar cantidad
-        if cantidad <= 0:
-            raise ValidationError({'cantidad': 'La cantidad debe ser mayor a cero'})
-
-        # Validar valor unitario
-        if valor_unitario < 0:
-            raise ValidationError({'valor_unitario': 'El valor unitario no puede ser negativo'})
-
-        # Crear detalle
-        detalle = DetalleBaja.objects.create(
-            baja=baja,
-            activo=activo,
-            cantidad=cantidad,
-            valor_unitario=valor_unitario,
-            valor_total=cantidad * valor_unitario,
-            lote=kwargs.get('lote', ''),
-            numero_serie=kwargs.get('numero_serie', ''),
-            observaciones=kwargs.get('observaciones', '')
-        )
-
-        # Recalcular total de la baja
-        baja_service = BajaInventarioService()
-        baja_service.recalcular_total(baja)
-
-        return detalle
-
-    @transaction.atomic
-    def eliminar_detalle(self, detalle: DetalleBaja) -> None:
-        """
-        Elimina (soft delete) un detalle.
-
-        Args:
-            detalle: Detalle a eliminar
-
-        Raises:
-            ValidationError: Si la baja está finalizada
-        """
-        # Validar que la baja no esté finalizada
-        if detalle.baja.estado.es_final:
-            raise ValidationError('No se pueden eliminar detalles de una baja finalizada')
-
-        # Soft delete
-        detalle.eliminado = True
-        detalle.activo = False
-        detalle.save()
-
-        # Recalcular total de la baja
-        baja_service = BajaInventarioService()
-        baja_service.recalcular_total(detalle.baja)
+            El lote procesado, o None si no hay lotes pendientes
+        """
+        with transaction.atomic():
+            lote = self.lote_repo.bloquear_pendiente()
+            if lote is None:
+                return None
+
+            tramo = lote.activos_ids[lote.procesados:lote.procesados + tamano]
+            datos = DatosBaja(
+                motivo=lote.motivo,
+                ubicacion=lote.ubicacion,
+                solicitante=lote.solicitante,
+                fecha_baja=lote.fecha_baja,
+                observaciones=lote.observaciones or '',
+            )
+            try:
+                with transaction.atomic():
+                    creadas = self.crear_bajas_masivas(tramo, datos, lote=lote)
+            except Exception as error:
+                logger.exception('Error procesando el lote de bajas %s', lote.id)
+                lote.estado = LoteBaja.Estado.ERROR
+                lote.error = str(error)
+                lote.save(update_fields=['estado', 'error', 'fecha_actualizacion'])
+                return lote
+
+            self.lote_repo.registrar_avance(lote, len(tramo), creadas)
+            if lote.procesados >= lote.total:
+                lote.estado = LoteBaja.Estado.COMPLETADO
+                lote.fecha_termino = timezone.now()
+                lote.save(update_fields=['estado', 'fecha_termino', 'fecha_actualizacion'])
+        return lote
+
+    # ==================== AUXILIARES ====================
+
+    @staticmethod
+    def _validar_fecha(fecha_baja: date) -> None:
+        if fecha_baja > timezone.localdate():
+            raise ValidationError({'fecha_baja': 'La fecha de baja no puede ser futura'})
+
+    def _catalogos_baja(self) -> Tuple[EstadoActivo, TipoMovimientoActivo]:
+        """Estado de activo y tipo de movimiento BAJA (ver setup_activos_data)."""
+        estado = self.estado_activo_repo.get_by_codigo(CODIGO_BAJA)
+        if not estado:
+            raise ValidationError(f'No existe el estado de activo {CODIGO_BAJA} en el sistema')
+        tipo = self.tipo_movimiento_repo.get_by_codigo(CODIGO_BAJA)
+        if not tipo:
+            raise ValidationError(f'No existe el tipo de movimiento {CODIGO_BAJA} en el sistema')
+        return estado, tipo
+
+    def _asignar_numeros(self, cantidad: int) -> List[str]:
+        """Reserva un bloque de números consecutivos hasta el fin de la transacción."""
+        self.baja_repo.bloquear_numeracion()
+        inicio = self.baja_repo.ultimo_numero(PREFIJO_NUMERO, LONGITUD_NUMERO) + 1
+        return [f'{PREFIJO_NUMERO}-{numero:0{LONGITUD_NUMERO}d}' for numero in range(inicio, inicio + cantidad)]
@@ -0,0 +1,107 @@
+"""
+Tests de las bajas masivas de inventario.
+"""
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from apps.activos.models import (
+    Activo, CategoriaActivo, EstadoActivo, MovimientoActivo, TipoMovimientoActivo, Ubicacion
+)
+from apps.bajas_inventario.models import BajaInventario, LoteBaja, MotivoBaja
+from apps.bajas_inventario.repositories import BajaInventarioRepository
+from apps.bajas_inventario.services import BajaInventarioService, DatosBaja
+
+
+class BajaMasivaTest(TestCase):
+    """Tests de la baja masiva por conjunto y por lotes en segundo plano."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('bajas', password='clave')
+        cls.categoria = CategoriaActivo.objects.create(codigo='NTB', nombre='Notebooks', sigla='NTB')
+        otra_categoria = CategoriaActivo.objects.create(codigo='LCD', nombre='Monitores', sigla='LCD')
+        cls.disponible = EstadoActivo.objects.create(codigo='DISPONIBLE', nombre='Disponible', es_inicial=True)
+        cls.estado_baja = EstadoActivo.objects.create(codigo='BAJA', nombre='Dado de baja')
+        TipoMovimientoActivo.objects.create(codigo='BAJA', nombre='Baja')
+        cls.ubicacion = Ubicacion.objects.create(codigo='BOD', nombre='Bodega de bajas')
+        cls.motivo = MotivoBaja.objects.create(codigo='OBS', nombre='Obsolescencia')
+
+        for i in range(5):
+            Activo.objects.create(
+                codigo=f'NTB-{i:03d}', nombre=f'Notebook {i}', categoria=cls.categoria, estado=cls.disponible
+            )
+        Activo.objects.create(codigo='LCD-001', nombre='Monitor', categoria=otra_categoria, estado=cls.disponible)
+
+    def setUp(self):
+        self.service = BajaInventarioService()
+        self.datos = DatosBaja(
+            motivo=self.motivo,
+            ubicacion=self.ubicacion,
+            solicitante=self.usuario,
+            fecha_baja=date(2025, 3, 1),
+        )
+
+    def test_baja_masiva_crea_bajas_movimientos_y_estado(self):
+        """Cada activo filtrado recibe su baja numerada, su movimiento y el estado BAJA."""
+        activos = BajaInventarioRepository.activos_para_baja(categoria=self.categoria)
+
+        creadas = self.service.crear_bajas_masivas(activos, self.datos)
+
+        self.assertEqual(creadas, 5)
+        numeros = sorted(BajaInventario.objects.values_list('numero', flat=True))
+        self.assertEqual(numeros, [f'BAJA-{i:08d}' for i in range(1, 6)])
+        self.assertEqual(MovimientoActivo.objects.filter(id_baja_inventario__isnull=False).count(), 5)
+        self.assertEqual(Activo.objects.filter(estado=self.estado_baja).count(), 5)
+        self.assertEqual(Activo.objects.get(codigo='LCD-001').estado, self.disponible)
+
+    def test_baja_masiva_omite_activos_ya_dados_de_baja(self):
+        """Repetir la baja no duplica bajas y la numeración continúa."""
+        self.service.crear_bajas_masivas(Activo.objects.filter(codigo='NTB-000'), self.datos)
+
+        creadas = self.service.crear_bajas_masivas(
+            BajaInventarioRepository.activos_para_baja(categoria=self.categoria), self.datos
+        )
+
+        self.assertEqual(creadas, 4)
+        self.assertEqual(BajaInventario.objects.count(), 5)
+        self.assertTrue(BajaInventario.objects.filter(numero='BAJA-00000005').exists())
+
+    def test_numero_manual_sin_ceros_no_corre_la_numeracion(self):
+        """Un número ingresado a mano sin ceros (BAJA-9) no se toma como último correlativo."""
+        self.service.crear_bajas_masivas(Activo.objects.filter(codigo='NTB-000'), self.datos)
+        BajaInventario.objects.filter(numero='BAJA-00000001').update(numero='BAJA-9')
+        self.service.crear_bajas_masivas(Activo.objects.filter(codigo='NTB-001'), self.datos)
+
+        self.assertTrue(BajaInventario.objects.filter(numero='BAJA-00000001').exists())
+
+    def test_fecha_futura_no_crea_bajas(self):
+        """Una fecha futura se rechaza sin tocar los activos."""
+        self.datos.fecha_baja = date(2999, 1, 1)
+
+        with self.assertRaises(ValidationError):
+            self.service.crear_bajas_masivas(Activo.objects.all(), self.datos)
+
+        self.assertFalse(BajaInventario.objects.exists())
+
+    def test_lote_se_procesa_por_tramos(self):
+        """El worker procesa el lote por tramos y lo completa al llegar al total."""
+        lote = self.service.encolar_bajas_masivas(
+            BajaInventarioRepository.activos_para_baja(categoria=self.categoria), self.datos
+        )
+        self.assertEqual(lote.total, 5)
+
+        self.service.procesar_lote_pendiente(tamano=2)
+        lote.refresh_from_db()
+        self.assertEqual(lote.estado, LoteBaja.Estado.PROCESANDO)
+        self.assertEqual(lote.porcentaje, 40)
+
+        while self.service.procesar_lote_pendiente(tamano=2) is not None:
+            pass
+
+        lote.refresh_from_db()
+        self.assertEqual(lote.estado, LoteBaja.Estado.COMPLETADO)
+        self.assertEqual((lote.procesados, lote.creadas), (5, 5))
+        self.assertEqual(lote.bajas.count(), 5)
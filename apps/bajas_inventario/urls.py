@@ -16,6 +16,8 @@ urlpatterns = [
     path('listado/', views.BajaInventarioListView.as_view(), name='lista_bajas'),
     path('mis-bajas/', views.MisBajasListView.as_view(), name='mis_bajas'),
     path('crear/', views.BajaInventarioCreateView.as_view(), name='crear_baja'),
+    path('masiva/', views.BajaMasivaView.as_view(), name='baja_masiva'),
+    path('lotes/<int:pk>/', views.LoteBajaDetailView.as_view(), name='progreso_lote'),
     path('<int:pk>/', views.BajaInventarioDetailView.as_view(), name='detalle_baja'),
     path('<int:pk>/editar/', views.BajaInventarioUpdateView.as_view(), name='editar_baja'),
     path('<int:pk>/eliminar/', views.BajaInventarioDeleteView.as_view(), name='eliminar_baja'),
@@ -25,4 +27,7 @@ urlpatterns = [
     path('motivos/crear/', views.MotivoBajaCreateView.as_view(), name='crear_motivo'),
     path('motivos/<int:pk>/editar/', views.MotivoBajaUpdateView.as_view(), name='editar_motivo'),
     path('motivos/<int:pk>/eliminar/', views.MotivoBajaDeleteView.as_view(), name='eliminar_motivo'),
+
+    # ==================== ENDPOINTS AJAX ====================
+    path('ajax/lotes/<int:pk>/progreso/', views.progreso_lote, name='ajax_progreso_lote'),
 ]
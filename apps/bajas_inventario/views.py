@@ -10,20 +10,27 @@ from __future__ import annotations
 
 from typing import Any
 
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, permission_required
+from django.core.exceptions import ValidationError
 from django.db.models import QuerySet, Q
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.views.decorators.http import require_http_methods
 from django.views.generic import (
-    TemplateView, ListView, DetailView, CreateView, UpdateView, DeleteView
+    TemplateView, ListView, DetailView, CreateView, UpdateView, DeleteView, FormView
 )
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 
 from core.mixins import (
     BaseAuditedViewMixin, AtomicTransactionMixin, SoftDeleteMixin,
     PaginatedListMixin
 )
-from .models import BajaInventario, MotivoBaja
-from .forms import BajaInventarioForm, MotivoBajaForm, FiltroBajasForm
+from .models import BajaInventario, LoteBaja, MotivoBaja
+from .forms import BajaInventarioForm, BajaMasivaForm, MotivoBajaForm, FiltroBajasForm
+from .repositories import BajaInventarioRepository
+from .services import BajaInventarioService, DatosBaja
 
 
 # ==================== VISTA MENÚ PRINCIPAL ====================
@@ -216,6 +223,99 @@ class BajaInventarioCreateView(BaseAuditedViewMixin, AtomicTransactionMixin, Cre
         return response
 
 
+class BajaMasivaView(BaseAuditedViewMixin, FormView):
+    """
+    Vista para dar de baja todos los activos que cumplen un filtro.
+
+    Hasta BAJAS_MASIVAS_UMBRAL activos se procesan en el mismo request;
+    sobre ese número se crea un lote que procesa el comando
+    procesar_bajas_masivas y se redirige a su página de progreso.
+
+    Permisos: bajas_inventario.add_bajainventario
+    Auditoría: Registra acción CREAR
+    """
+    form_class = BajaMasivaForm
+    template_name = 'bajas_inventario/form_baja_masiva.html'
+    permission_required = 'bajas_inventario.add_bajainventario'
+
+    # Configuración de auditoría (obj = descripción de la baja masiva)
+    audit_action = 'CREAR'
+    audit_description_template = 'Baja masiva: {obj}'
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        """Agrega datos al contexto."""
+        context = super().get_context_data(**kwargs)
+        context['titulo'] = 'Baja Masiva de Activos'
+        context['action'] = 'Baja masiva'
+        context['umbral'] = settings.BAJAS_MASIVAS_UMBRAL
+        return context
+
+    def form_valid(self, form: BajaMasivaForm) -> HttpResponse:
+        """Selecciona los activos y los da de baja o encola el lote."""
+        servicio = BajaInventarioService()
+        activos = BajaInventarioRepository.activos_para_baja(
+            categoria=form.cleaned_data['categoria'],
+            estado=form.cleaned_data['estado'],
+            ubicacion=form.cleaned_data['ubicacion_actual'],
+            buscar=form.cleaned_data['buscar'],
+        )
+        datos = DatosBaja(
+            motivo=form.cleaned_data['motivo'],
+            ubicacion=form.cleaned_data['ubicacion'],
+            solicitante=self.request.user,
+            fecha_baja=form.cleaned_data['fecha_baja'],
+            observaciones=form.cleaned_data['observaciones'],
+        )
+
+        try:
+            cantidad = activos.count()
+            if servicio.en_segundo_plano(cantidad):
+                lote = servicio.encolar_bajas_masivas(activos, datos)
+                self.log_action(f'lote {lote.id} encolado con {lote.total} activos', self.request)
+                messages.info(
+                    self.request,
+                    f'Se encolaron {lote.total} activos para baja. El avance se muestra a continuación.'
+                )
+                return redirect('bajas_inventario:progreso_lote', pk=lote.pk)
+
+            creadas = servicio.crear_bajas_masivas(activos, datos)
+        except ValidationError as error:
+            for mensaje in error.messages:
+                form.add_error(None, mensaje)
+            return self.form_invalid(form)
+
+        if not creadas:
+            messages.warning(self.request, 'Ningún activo del filtro estaba pendiente de baja.')
+            return redirect('bajas_inventario:baja_masiva')
+
+        self.log_action(f'{creadas} bajas registradas', self.request)
+        messages.success(self.request, f'Se registraron {creadas} bajas de inventario.')
+        return redirect('bajas_inventario:lista_bajas')
+
+
+class LoteBajaDetailView(BaseAuditedViewMixin, DetailView):
+    """
+    Vista del avance de una baja masiva en segundo plano.
+
+    Permisos: bajas_inventario.view_bajainventario
+    """
+    model = LoteBaja
+    template_name = 'bajas_inventario/progreso_lote.html'
+    context_object_name = 'lote'
+    permission_required = 'bajas_inventario.view_bajainventario'
+
+    def get_queryset(self) -> QuerySet[LoteBaja]:
+        """Optimiza consultas con select_related."""
+        return LoteBaja.objects.vivos().select_related('motivo', 'ubicacion', 'solicitante')
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        """Agrega datos al contexto."""
+        context = super().get_context_data(**kwargs)
+        context['titulo'] = f'Baja Masiva #{self.object.id}'
+        context['en_curso'] = self.object.estado in (LoteBaja.Estado.PENDIENTE, LoteBaja.Estado.PROCESANDO)
+        return context
+
+
 class BajaInventarioUpdateView(BaseAuditedViewMixin, AtomicTransactionMixin, UpdateView):
     """
     Vista para editar una baja de inventario existente.
@@ -390,3 +490,23 @@ class MotivoBajaDeleteView(BaseAuditedViewMixin, SoftDeleteMixin, DeleteView):
         context['titulo'] = f'Eliminar Motivo {self.object.codigo}'
         context['motivo'] = self.object
         return context
+
+
+# ==================== ENDPOINTS AJAX ====================
+
+@login_required
+@permission_required('bajas_inventario.view_bajainventario', raise_exception=True)
+@require_http_methods(["GET"])
+def progreso_lote(request, pk: int) -> JsonResponse:
+    """Avance de un lote de baja masiva para la página de progreso."""
+    lote = get_object_or_404(LoteBaja.objects.vivos(), pk=pk)
+    return JsonResponse({
+        'success': True,
+        'estado': lote.estado,
+        'estado_display': lote.get_estado_display(),
+        'total': lote.total,
+        'procesados': lote.procesados,
+        'creadas': lote.creadas,
+        'porcentaje': lote.porcentaje,
+        'error': lote.error,
+    })
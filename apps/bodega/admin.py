@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (
     Bodega, UnidadMedida, Categoria, Marca, Articulo, Operacion, TipoMovimiento, Movimiento,
     EstadoEntrega, TipoEntrega, EntregaArticulo, DetalleEntregaArticulo,
-    EntregaBien, DetalleEntregaBien
+    EntregaBien, DetalleEntregaBien, TransicionEstadoStock, CierreInventario,
+    ConciliacionStock, ReservaStock, TomaInventario, ConteoInventario
 )
 
 
@@ -55,17 +56,17 @@ class ArticuloAdmin(admin.ModelAdmin):
     """
     Administración de Artículos en el panel de Django Admin.
     """
-    list_display = ['codigo', 'nombre', 'categoria', 'marca', 'stock_actual', 'stock_minimo', 'ubicacion_fisica', 'activo']
-    list_filter = ['categoria', 'marca', 'ubicacion_fisica', 'activo', 'fecha_creacion']
+    list_display = ['codigo', 'nombre', 'categoria', 'marca', 'stock_actual', 'stock_reservado', 'stock_minimo', 'estado_stock', 'ubicacion_fisica', 'activo']
+    list_filter = ['estado_stock', 'categoria', 'marca', 'ubicacion_fisica', 'activo', 'fecha_creacion']
     search_fields = ['codigo', 'nombre', 'descripcion', 'codigo_barras']
-    readonly_fields = ['stock_actual', 'codigo_barras', 'fecha_creacion', 'fecha_actualizacion']
+    readonly_fields = ['stock_actual', 'stock_reservado', 'estado_stock', 'codigo_barras', 'fecha_creacion', 'fecha_actualizacion']
 
     fieldsets = (
         ('Información General', {
             'fields': ('codigo', 'nombre', 'descripcion', 'codigo_barras', 'categoria', 'marca', 'unidad_medida')
         }),
         ('Stock', {
-            'fields': ('stock_actual', 'stock_minimo', 'stock_maximo', 'punto_reorden')
+            'fields': ('stock_actual', 'stock_reservado', 'estado_stock', 'stock_minimo', 'stock_maximo', 'punto_reorden')
         }),
         ('Ubicación', {
             'fields': ('ubicacion_fisica',)
@@ -79,6 +80,117 @@ class ArticuloAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(TransicionEstadoStock)
+class TransicionEstadoStockAdmin(admin.ModelAdmin):
+    """
+    Administración (solo lectura) del log de cambios de estado de stock.
+    """
+    list_display = ['articulo', 'estado_anterior', 'estado_nuevo', 'stock_actual', 'fecha_creacion']
+    list_filter = ['estado_nuevo', 'estado_anterior', 'fecha_creacion']
+    search_fields = ['articulo__codigo', 'articulo__nombre']
+    list_select_related = ['articulo']
+    date_hierarchy = 'fecha_creacion'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CierreInventario)
+class CierreInventarioAdmin(admin.ModelAdmin):
+    """
+    Administración (solo lectura) de cierres mensuales de inventario.
+    """
+    list_display = ['periodo', 'fecha_corte', 'total_articulos', 'valor_total', 'usuario', 'fecha_creacion']
+    readonly_fields = ['periodo', 'fecha_corte', 'total_articulos', 'valor_total', 'usuario', 'fecha_creacion', 'fecha_actualizacion']
+    ordering = ['-periodo']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ConciliacionStock)
+class ConciliacionStockAdmin(admin.ModelAdmin):
+    """
+    Administración (solo lectura) de ejecuciones de conciliación de stock.
+    """
+    list_display = [
+        'fecha_corte', 'incremental', 'reparacion', 'articulos_revisados',
+        'articulos_con_diferencia', 'articulos_reparados', 'usuario'
+    ]
+    list_filter = ['incremental', 'reparacion']
+    readonly_fields = [
+        'fecha_corte', 'incremental', 'reparacion', 'articulos_revisados',
+        'articulos_con_diferencia', 'articulos_reparados', 'usuario',
+        'fecha_creacion', 'fecha_actualizacion'
+    ]
+    date_hierarchy = 'fecha_corte'
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ReservaStock)
+class ReservaStockAdmin(admin.ModelAdmin):
+    """
+    Administración (solo lectura) del libro de reservas de stock.
+    """
+    list_display = ['fecha_creacion', 'articulo', 'detalle_solicitud', 'tipo', 'cantidad', 'usuario']
+    list_filter = ['tipo', 'fecha_creacion']
+    search_fields = ['articulo__codigo', 'articulo__nombre', 'detalle_solicitud__solicitud__numero']
+    list_select_related = ['articulo', 'detalle_solicitud__solicitud', 'detalle_solicitud__articulo', 'usuario']
+    readonly_fields = [
+        'articulo', 'detalle_solicitud', 'tipo', 'cantidad', 'usuario',
+        'fecha_creacion', 'fecha_actualizacion'
+    ]
+    date_hierarchy = 'fecha_creacion'
+
+    def has_add_permission(self, request):
+        return False
+
+
+class ConteoInventarioInline(admin.TabularInline):
+    model = ConteoInventario
+    extra = 0
+    fields = ['articulo', 'activo', 'cantidad', 'fecha_actualizacion']
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TomaInventario)
+class TomaInventarioAdmin(admin.ModelAdmin):
+    """
+    Administración de tomas de inventario.
+
+    Al crear una toma se asignan número y responsable; las lecturas y el
+    cierre se hacen desde los endpoints de la toma.
+    """
+    list_display = ['numero', 'bodega', 'ubicacion', 'estado', 'lecturas', 'ajustes_generados', 'usuario', 'fecha_creacion']
+    list_filter = ['estado', 'bodega', 'ubicacion']
+    search_fields = ['numero']
+    list_select_related = ['bodega', 'ubicacion', 'usuario']
+    readonly_fields = ['numero', 'estado', 'usuario', 'fecha_cierre', 'lecturas', 'ajustes_generados']
+    inlines = [ConteoInventarioInline]
+    date_hierarchy = 'fecha_creacion'
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj:
+            return [*self.readonly_fields, 'bodega', 'ubicacion']
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            from .services import TomaInventarioService
+            obj.numero = TomaInventarioService().generar_numero()
+            obj.usuario = request.user
+        super().save_model(request, obj, form, change)
+
+
 @admin.register(Operacion)
 class OperacionAdmin(admin.ModelAdmin):
     """
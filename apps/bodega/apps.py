@@ -5,3 +5,7 @@ class BodegaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.bodega'
     verbose_name = 'Gestión de Bodegas'
+
+    def ready(self):
+        """Registra las señales del módulo."""
+        from . import signals  # noqa: F401
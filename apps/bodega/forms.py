@@ -389,11 +389,12 @@ class MovimientoForm(forms.ModelForm):
 
         # Validar stock disponible para salidas (usando el tipo de operación)
         if articulo and cantidad and operacion and operacion.tipo == 'SALIDA':
-            if articulo.stock_actual < cantidad:
+            # Lo reservado por solicitudes aprobadas no está disponible
+            if articulo.stock_disponible < cantidad:
                 # Obtener unidad de medida
                 unidad_str = articulo.unidad_medida.simbolo if articulo.unidad_medida else 'unidad'
                 raise ValidationError({
-                    'cantidad': f'Stock insuficiente. Disponible: {articulo.stock_actual} {unidad_str}'
+                    'cantidad': f'Stock insuficiente. Disponible: {articulo.stock_disponible} {unidad_str}'
                 })
 
         return cleaned_data
@@ -0,0 +1,70 @@
+"""
+Comando de management para registrar cierres mensuales de inventario.
+
+Cada cierre guarda el stock y el costo promedio de todos los artículos al
+corte del mes y se calcula desde el cierre anterior más los movimientos y
+compras del mes, por lo que los meses deben cerrarse en orden. Programar
+mensualmente (por ejemplo el día 1 de cada mes) con --pendientes.
+
+Ejecutar:
+    python manage.py cerrar_inventario                     # mes anterior
+    python manage.py cerrar_inventario --periodo 2025-12
+    python manage.py cerrar_inventario --pendientes        # todos los meses sin cierre
+"""
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.bodega.services import CierreInventarioService
+
+
+class Command(BaseCommand):
+    help = 'Registra cierres mensuales de inventario (snapshot de stock por artículo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--periodo',
+            type=str,
+            default='',
+            help='Mes a cerrar en formato AAAA-MM (default: mes anterior)',
+        )
+        parser.add_argument(
+            '--pendientes',
+            action='store_true',
+            help='Cierra en orden todos los meses terminados que no tienen cierre',
+        )
+        parser.add_argument(
+            '--reemplazar',
+            action='store_true',
+            help='Reemplaza el cierre si el periodo ya estaba cerrado',
+        )
+
+    def handle(self, *args, **options):
+        service = CierreInventarioService()
+
+        if options['pendientes']:
+            periodos = service.periodos_pendientes()
+            if not periodos:
+                self.stdout.write('[+] No hay periodos pendientes de cierre')
+                return
+        elif options['periodo']:
+            try:
+                periodos = [datetime.strptime(options['periodo'], '%Y-%m').date()]
+            except ValueError:
+                raise CommandError('--periodo debe tener formato AAAA-MM')
+        else:
+            mes_actual = timezone.localdate().replace(day=1)
+            periodos = [(mes_actual - timedelta(days=1)).replace(day=1)]
+
+        for periodo in periodos:
+            try:
+                cierre = service.cerrar_periodo(periodo, reemplazar=options['reemplazar'])
+            except ValidationError as e:
+                raise CommandError(' '.join(e.messages))
+            self.stdout.write(
+                f'[+] Cierre {cierre.periodo:%m/%Y}: {cierre.total_articulos} artículos, valor {cierre.valor_total:,.2f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'\n[+] {len(periodos)} cierre(s) registrados'))
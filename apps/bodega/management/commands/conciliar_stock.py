@@ -0,0 +1,103 @@
+"""
+Comando de management para conciliar stock_actual con el historial de movimientos.
+
+Calcula el stock esperado de cada artículo desde sus movimientos y reporta
+los que no cuadran. Opcionalmente los repara:
+    --reparar ajuste  registra movimientos de ajuste por la diferencia
+                      (el stock_actual se considera correcto)
+    --reparar stock   reescribe stock_actual con el valor del historial
+
+Ejecutar:
+    python manage.py conciliar_stock
+    python manage.py conciliar_stock --incremental          # solo artículos modificados
+    python manage.py conciliar_stock --reparar ajuste --usuario admin
+    python manage.py conciliar_stock --reparar stock
+"""
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bodega.models import ConciliacionStock
+from apps.bodega.repositories import TipoMovimientoRepository
+from apps.bodega.services import ConciliacionStockService
+
+
+class Command(BaseCommand):
+    help = 'Detecta (y opcionalmente repara) diferencias entre stock_actual y el historial de movimientos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Revisa solo artículos modificados desde la última conciliación',
+        )
+        parser.add_argument(
+            '--reparar',
+            choices=['ajuste', 'stock'],
+            default='',
+            help='ajuste: registra movimientos por la diferencia; stock: reescribe stock_actual',
+        )
+        parser.add_argument(
+            '--usuario',
+            type=str,
+            default='',
+            help='Username que registra los ajustes (requerido con --reparar ajuste)',
+        )
+        parser.add_argument(
+            '--tipo',
+            type=str,
+            default='AJUSTE',
+            help='Código del tipo de movimiento para los ajustes (default: AJUSTE)',
+        )
+        parser.add_argument(
+            '--limite',
+            type=int,
+            default=50,
+            help='Máximo de diferencias a listar (default: 50)',
+        )
+
+    def handle(self, *args, **options):
+        reparacion = options['reparar'].upper()
+        usuario = tipo = None
+
+        if options['usuario']:
+            usuario = User.objects.filter(username=options['usuario']).first()
+            if not usuario:
+                raise CommandError(f'No existe el usuario "{options["usuario"]}"')
+        if reparacion == ConciliacionStock.Reparacion.AJUSTE:
+            tipo = TipoMovimientoRepository.get_by_codigo(options['tipo'])
+            if not tipo:
+                raise CommandError(f'No existe el tipo de movimiento "{options["tipo"]}"')
+
+        try:
+            conciliacion, diferencias = ConciliacionStockService().conciliar(
+                incremental=options['incremental'],
+                reparacion=reparacion,
+                usuario=usuario,
+                tipo=tipo,
+            )
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+
+        modo = 'incremental' if conciliacion.incremental else 'completa'
+        self.stdout.write(f'[+] Conciliación {modo}: {conciliacion.articulos_revisados} artículos revisados')
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('[+] Stock e historial cuadran'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'[!] {len(diferencias)} artículos con diferencia:'))
+        self.stdout.write(f"    {'Código':<20} {'Stock':>10} {'Historial':>10} {'Diferencia':>10}")
+        for d in diferencias[:options['limite']]:
+            self.stdout.write(f'    {d.codigo:<20} {d.stock_actual:>10} {d.esperado:>10} {d.diferencia:>+10}')
+        if len(diferencias) > options['limite']:
+            self.stdout.write(f'    ... y {len(diferencias) - options["limite"]} más')
+
+        if reparacion:
+            self.stdout.write(self.style.SUCCESS(
+                f'\n[+] {conciliacion.articulos_reparados} artículos reparados ({conciliacion.get_reparacion_display()})'
+            ))
+            if conciliacion.articulos_reparados < len(diferencias):
+                self.stdout.write(self.style.WARNING(
+                    '[!] Artículos con stock esperado negativo no se reescriben; use --reparar ajuste'
+                ))
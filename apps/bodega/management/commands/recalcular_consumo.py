@@ -0,0 +1,45 @@
+"""
+Comando de management para reconstruir el resumen de consumo mensual.
+
+El resumen (ConsumoMensual) se suma al registrar cada entrega de artículos;
+este comando lo regenera desde las entregas vigentes. Usar tras la
+migración inicial, después de corregir o eliminar entregas, o si se
+sospecha que el resumen se desalineó.
+
+Ejecutar:
+    python manage.py recalcular_consumo                   # todo el historial
+    python manage.py recalcular_consumo --desde 2025-01   # desde un mes
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.bodega.repositories import ConsumoMensualRepository
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen de consumo mensual por departamento desde las entregas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=str,
+            default='',
+            help='Primer mes a reconstruir en formato AAAA-MM (default: todo el historial)',
+        )
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                desde = datetime.strptime(options['desde'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--desde debe tener formato AAAA-MM')
+
+        # En una transacción: el reporte no ve el resumen a medio reconstruir
+        with transaction.atomic():
+            filas = ConsumoMensualRepository.recalcular(desde)
+
+        alcance = f'desde {desde:%m/%Y}' if desde else 'de todo el historial'
+        self.stdout.write(self.style.SUCCESS(f'[+] Resumen de consumo {alcance}: {filas} filas'))
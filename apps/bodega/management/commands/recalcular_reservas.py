@@ -0,0 +1,53 @@
+"""
+Comando de management para reconstruir las reservas de stock.
+
+Con --sincronizar ajusta primero el libro de reservas de cada solicitud de
+artículos abierta (aprobada - despachada por línea) y libera las de
+solicitudes en estado final. Luego recalcula Articulo.stock_reservado como
+la suma del libro. Usar tras la migración inicial o si los contadores se
+desalinean.
+
+Ejecutar:
+    python manage.py recalcular_reservas
+    python manage.py recalcular_reservas --sincronizar
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from apps.bodega.models import ReservaStock
+from apps.bodega.repositories import ReservaStockRepository
+from apps.bodega.services import ReservaStockService
+from apps.solicitudes.models import Solicitud
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza el libro de reservas y recalcula stock_reservado de los artículos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sincronizar',
+            action='store_true',
+            help='Ajusta el libro de reservas de todas las solicitudes antes de recalcular',
+        )
+
+    def handle(self, *args, **options):
+        if options['sincronizar']:
+            service = ReservaStockService()
+            # Abiertas y también finales que aún tienen reservas en el libro
+            solicitudes = Solicitud.objects.vivos().filter(tipo='ARTICULO').filter(
+                Q(estado__es_final=False)
+                | Q(id__in=ReservaStock.objects.vivos().values('detalle_solicitud__solicitud_id'))
+            ).select_related('estado').order_by('id')
+
+            revisadas = cambios = 0
+            for solicitud in solicitudes.iterator(chunk_size=500):
+                with transaction.atomic():
+                    cambios += len(service.sincronizar_solicitud(solicitud))
+                revisadas += 1
+            self.stdout.write(f'[+] {revisadas} solicitudes revisadas, {cambios} cambios de reserva registrados')
+
+        corregidos = ReservaStockRepository.recalcular_contadores()
+        if corregidos:
+            self.stdout.write(self.style.WARNING(f'[!] {corregidos} artículos con stock_reservado corregido'))
+        self.stdout.write(self.style.SUCCESS('[+] Contadores de reserva al día'))
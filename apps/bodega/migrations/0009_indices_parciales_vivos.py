@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:46
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices creados con CONCURRENTLY para no bloquear escrituras en tablas grandes
+    atomic = False
+
+    dependencies = [
+        ('bodega', '0008_marca_operacion_remove_articulo_marcas_and_more'),
+        ('solicitudes', '0008_rename_tba_solicit_modulo_3b1289_idx_tba_solicit_modulo_3b20d9_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='articulo',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['ubicacion_fisica', 'codigo'], name='art_bodega_cod_vivo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='articulo',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['categoria', 'codigo'], name='art_cat_cod_vivo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='entregaarticulo',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['-fecha_entrega'], name='ent_art_fecha_vivo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='entregaarticulo',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['solicitud', '-fecha_entrega'], name='ent_art_sol_vivo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movimiento',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['articulo', '-fecha_creacion'], name='mov_art_fecha_vivo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movimiento',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['-fecha_creacion'], name='mov_fecha_vivo_idx'),
+        ),
+    ]
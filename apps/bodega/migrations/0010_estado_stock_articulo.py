@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0009_indices_parciales_vivos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransicionEstadoStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('estado_anterior', models.CharField(choices=[('NORMAL', 'Normal'), ('REORDEN', 'Punto de Reorden'), ('CRITICO', 'Crítico')], max_length=10, verbose_name='Estado Anterior')),
+                ('estado_nuevo', models.CharField(choices=[('NORMAL', 'Normal'), ('REORDEN', 'Punto de Reorden'), ('CRITICO', 'Crítico')], max_length=10, verbose_name='Estado Nuevo')),
+                ('stock_actual', models.IntegerField(verbose_name='Stock al Cambio')),
+            ],
+            options={
+                'verbose_name': 'Transición de Estado de Stock',
+                'verbose_name_plural': 'Transiciones de Estado de Stock',
+                'db_table': 'tba_bodega_transicion_estado_stock',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='estado_stock',
+            field=models.CharField(choices=[('NORMAL', 'Normal'), ('REORDEN', 'Punto de Reorden'), ('CRITICO', 'Crítico')], default='NORMAL', editable=False, max_length=10, verbose_name='Estado de Stock'),
+        ),
+        # Estado inicial de los artículos existentes (misma regla que Articulo.calcular_estado_stock)
+        migrations.RunSQL(
+            sql="""
+                UPDATE tba_bodega_articulos SET estado_stock = CASE
+                    WHEN stock_actual < stock_minimo THEN 'CRITICO'
+                    WHEN punto_reorden IS NOT NULL AND stock_actual <= punto_reorden THEN 'REORDEN'
+                    ELSE 'NORMAL'
+                END
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='articulo',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['estado_stock', 'codigo'], name='art_estado_stock_vivo_idx'),
+        ),
+        migrations.AddField(
+            model_name='transicionestadostock',
+            name='articulo',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transiciones_estado_stock', to='bodega.articulo', verbose_name='Artículo'),
+        ),
+        migrations.AddIndex(
+            model_name='transicionestadostock',
+            index=models.Index(fields=['articulo', '-fecha_creacion'], name='trans_stock_art_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transicionestadostock',
+            index=models.Index(fields=['-fecha_creacion'], name='trans_stock_fecha_idx'),
+        ),
+    ]
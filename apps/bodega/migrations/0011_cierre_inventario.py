@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0010_estado_stock_articulo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CierreInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('periodo', models.DateField(unique=True, verbose_name='Periodo')),
+                ('fecha_corte', models.DateTimeField(unique=True, verbose_name='Fecha de Corte')),
+                ('total_articulos', models.PositiveIntegerField(default=0, verbose_name='Total Artículos')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cierres_inventario', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Cierre de Inventario',
+                'verbose_name_plural': 'Cierres de Inventario',
+                'db_table': 'tba_bodega_cierre_inventario',
+                'ordering': ['-periodo'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DetalleCierreInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.IntegerField(verbose_name='Cantidad')),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='cierres', to='bodega.articulo', verbose_name='Artículo')),
+                ('cierre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detalles', to='bodega.cierreinventario', verbose_name='Cierre')),
+            ],
+            options={
+                'verbose_name': 'Detalle de Cierre de Inventario',
+                'verbose_name_plural': 'Detalles de Cierre de Inventario',
+                'db_table': 'tba_bodega_cierre_inventario_detalle',
+                'constraints': [models.UniqueConstraint(fields=('cierre', 'articulo'), name='det_cierre_articulo_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0011_cierre_inventario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConciliacionStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('fecha_corte', models.DateTimeField(db_index=True, verbose_name='Fecha de Corte')),
+                ('incremental', models.BooleanField(default=False, verbose_name='Incremental')),
+                ('reparacion', models.CharField(blank=True, choices=[('', 'Solo reporte'), ('AJUSTE', 'Movimientos de ajuste'), ('STOCK', 'Stock desde historial')], default='', max_length=10, verbose_name='Reparación')),
+                ('articulos_revisados', models.PositiveIntegerField(default=0, verbose_name='Artículos Revisados')),
+                ('articulos_con_diferencia', models.PositiveIntegerField(default=0, verbose_name='Artículos con Diferencia')),
+                ('articulos_reparados', models.PositiveIntegerField(default=0, verbose_name='Artículos Reparados')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='conciliaciones_stock', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Conciliación de Stock',
+                'verbose_name_plural': 'Conciliaciones de Stock',
+                'db_table': 'tba_bodega_conciliacion_stock',
+                'ordering': ['-fecha_corte'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0012_conciliacion_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cierreinventario',
+            name='valor_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Valor Total'),
+        ),
+        migrations.AddField(
+            model_name='detallecierreinventario',
+            name='costo_unitario',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Costo Unitario'),
+        ),
+        migrations.AddField(
+            model_name='detallecierreinventario',
+            name='valor',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Valor'),
+        ),
+    ]
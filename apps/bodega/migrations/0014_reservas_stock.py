@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0013_valorizacion_cierre'),
+        ('solicitudes', '0009_indices_parciales_vivos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='stock_reservado',
+            field=models.IntegerField(default=0, editable=False, help_text='Unidades reservadas por solicitudes aprobadas pendientes de entrega', verbose_name='Stock Reservado'),
+        ),
+        migrations.CreateModel(
+            name='ReservaStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('tipo', models.CharField(choices=[('RESERVA', 'Reserva'), ('CONSUMO', 'Consumo por entrega'), ('LIBERACION', 'Liberación')], max_length=10, verbose_name='Tipo')),
+                ('cantidad', models.IntegerField(verbose_name='Cantidad')),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservas', to='bodega.articulo', verbose_name='Artículo')),
+                ('detalle_solicitud', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservas', to='solicitudes.detallesolicitud', verbose_name='Detalle de Solicitud')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='reservas_stock', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Reserva de Stock',
+                'verbose_name_plural': 'Reservas de Stock',
+                'db_table': 'tba_bodega_reserva_stock',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['articulo', '-fecha_creacion'], name='reserva_art_fecha_idx')],
+            },
+        ),
+    ]
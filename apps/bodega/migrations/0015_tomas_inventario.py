@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activos', '0005_indices_parciales_vivos'),
+        ('bodega', '0014_reservas_stock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TomaInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('numero', models.CharField(max_length=30, unique=True, verbose_name='Número')),
+                ('estado', models.CharField(choices=[('ABIERTA', 'Abierta'), ('CERRADA', 'Cerrada'), ('ANULADA', 'Anulada')], default='ABIERTA', max_length=10, verbose_name='Estado')),
+                ('fecha_cierre', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Cierre')),
+                ('lecturas', models.IntegerField(default=0, editable=False, verbose_name='Lecturas')),
+                ('ajustes_generados', models.IntegerField(default=0, editable=False, verbose_name='Ajustes Generados')),
+                ('observaciones', models.TextField(blank=True, null=True, verbose_name='Observaciones')),
+                ('bodega', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='tomas_inventario', to='bodega.bodega', verbose_name='Bodega')),
+                ('ubicacion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='tomas_inventario', to='activos.ubicacion', verbose_name='Ubicación')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='tomas_inventario', to=settings.AUTH_USER_MODEL, verbose_name='Responsable')),
+            ],
+            options={
+                'verbose_name': 'Toma de Inventario',
+                'verbose_name_plural': 'Tomas de Inventario',
+                'db_table': 'tba_bodega_toma_inventario',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConteoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('cantidad', models.IntegerField(default=0, verbose_name='Cantidad Contada')),
+                ('activo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='conteos_inventario', to='activos.activo', verbose_name='Activo')),
+                ('articulo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='conteos_inventario', to='bodega.articulo', verbose_name='Artículo')),
+                ('toma', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conteos', to='bodega.tomainventario', verbose_name='Toma')),
+            ],
+            options={
+                'verbose_name': 'Conteo de Inventario',
+                'verbose_name_plural': 'Conteos de Inventario',
+                'db_table': 'tba_bodega_conteo_inventario',
+                'ordering': ['toma', 'id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tomainventario',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('bodega__isnull', False), ('ubicacion__isnull', True)), models.Q(('bodega__isnull', True), ('ubicacion__isnull', False)), _connector='OR'), name='toma_bodega_o_ubicacion'),
+        ),
+        migrations.AddConstraint(
+            model_name='conteoinventario',
+            constraint=models.UniqueConstraint(condition=models.Q(('articulo__isnull', False)), fields=('toma', 'articulo'), name='conteo_toma_articulo_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='conteoinventario',
+            constraint=models.UniqueConstraint(condition=models.Q(('activo__isnull', False)), fields=('toma', 'activo'), name='conteo_toma_activo_uniq'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:40
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0015_tomas_inventario'),
+        ('solicitudes', '0010_progreso_despacho'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(verbose_name='Mes')),
+                ('cantidad', models.IntegerField(default=0, verbose_name='Cantidad')),
+                ('lineas', models.IntegerField(default=0, verbose_name='Líneas')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+                ('area', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='consumos_mensuales', to='solicitudes.area', verbose_name='Área')),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='consumos_mensuales', to='bodega.articulo', verbose_name='Artículo')),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='consumos_mensuales', to='bodega.categoria', verbose_name='Categoría')),
+                ('departamento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='consumos_mensuales', to='solicitudes.departamento', verbose_name='Departamento')),
+            ],
+            options={
+                'verbose_name': 'Consumo Mensual',
+                'verbose_name_plural': 'Consumos Mensuales',
+                'db_table': 'tba_bodega_consumo_mensual',
+                'ordering': ['-mes'],
+                'constraints': [models.UniqueConstraint(models.F('mes'), django.db.models.functions.comparison.Coalesce('departamento', 0), django.db.models.functions.comparison.Coalesce('area', 0), models.F('categoria'), models.F('articulo'), name='consumo_mensual_uniq')],
+            },
+        ),
+    ]
@@ -13,6 +13,8 @@ from typing import Optional
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from core.models import BaseModel
 
 
@@ -124,7 +126,16 @@ class Articulo(BaseModel):
         unidad_medida: Unidad de medida del artículo.
         ubicacion_fisica: Bodega donde se almacena el artículo.
         observaciones: Observaciones adicionales.
+        estado_stock: Estado del stock respecto de mínimo y punto de reorden,
+            mantenido al guardar para poder filtrarlo por índice.
     """
+
+    class EstadoStock(models.TextChoices):
+        """Estado del stock respecto de los umbrales del artículo."""
+        NORMAL = 'NORMAL', 'Normal'
+        REORDEN = 'REORDEN', 'Punto de Reorden'
+        CRITICO = 'CRITICO', 'Crítico'
+
     codigo = models.CharField(max_length=50, unique=True, verbose_name='Código')
     nombre = models.CharField(max_length=200, verbose_name='Nombre')
     descripcion = models.TextField(blank=True, null=True, verbose_name='Descripción')
@@ -189,12 +200,44 @@ class Articulo(BaseModel):
         verbose_name='Ubicación Física (Bodega)'
     )
     observaciones = models.TextField(blank=True, null=True, verbose_name='Observaciones')
+    estado_stock = models.CharField(
+        max_length=10,
+        choices=EstadoStock.choices,
+        default=EstadoStock.NORMAL,
+        editable=False,
+        verbose_name='Estado de Stock'
+    )
+    stock_reservado = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Stock Reservado',
+        help_text='Unidades reservadas por solicitudes aprobadas pendientes de entrega'
+    )
 
     class Meta:
         db_table = 'tba_bodega_articulos'
         verbose_name = 'Artículo'
         verbose_name_plural = 'Artículos'
         ordering = ['codigo']
+        indexes = [
+            # Listados filtrados por bodega o categoría ordenados por código
+            models.Index(
+                fields=['ubicacion_fisica', 'codigo'],
+                name='art_bodega_cod_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+            models.Index(
+                fields=['categoria', 'codigo'],
+                name='art_cat_cod_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+            # Listados y conteos de stock crítico / reorden
+            models.Index(
+                fields=['estado_stock', 'codigo'],
+                name='art_estado_stock_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+        ]
 
     def __str__(self) -> str:
         """Representación en cadena del artículo."""
@@ -210,8 +253,57 @@ class Articulo(BaseModel):
         if not self.codigo_barras and self.codigo:
             # Generar código de barras desde el código
             self.codigo_barras = f"COD{self.codigo.replace('-', '').replace('_', '').upper()[:12]}"
+
+        es_nuevo = self._state.adding
+        transicion = self.actualizar_estado_stock()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not es_nuevo:
+            # stock_reservado solo se modifica con F() desde el libro de reservas
+            update_fields = kwargs['update_fields'] = [
+                campo.attname for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name != 'stock_reservado'
+            ]
+        if transicion and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'estado_stock'}
         super().save(*args, **kwargs)
 
+        if transicion and not es_nuevo:
+            from .signals import registrar_transiciones_estado_stock
+            registrar_transiciones_estado_stock([(self, *transicion)])
+
+    @property
+    def stock_disponible(self) -> int:
+        """Stock no comprometido por reservas (stock_actual - stock_reservado)."""
+        return self.stock_actual - self.stock_reservado
+
+    def calcular_estado_stock(self) -> str:
+        """
+        Calcula el estado del stock según los umbrales del artículo.
+
+        Returns:
+            str: CRITICO si stock_actual < stock_minimo, REORDEN si
+            stock_actual <= punto_reorden, NORMAL en otro caso
+        """
+        if self.stock_actual < self.stock_minimo:
+            return self.EstadoStock.CRITICO
+        if self.punto_reorden is not None and self.stock_actual <= self.punto_reorden:
+            return self.EstadoStock.REORDEN
+        return self.EstadoStock.NORMAL
+
+    def actualizar_estado_stock(self) -> Optional[tuple]:
+        """
+        Recalcula estado_stock en memoria (no guarda).
+
+        Returns:
+            Tupla (estado_anterior, estado_nuevo) si el estado cambió, None si no
+        """
+        anterior = self.estado_stock
+        nuevo = self.calcular_estado_stock()
+        if anterior == nuevo:
+            return None
+        self.estado_stock = nuevo
+        return anterior, nuevo
+
 
 class Operacion(BaseModel):
     """
@@ -307,6 +399,19 @@ class Movimiento(BaseModel):
         verbose_name = 'Movimiento'
         verbose_name_plural = 'Movimientos'
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Historial/kardex por artículo y listado general (solo no eliminados)
+            models.Index(
+                fields=['articulo', '-fecha_creacion'],
+                name='mov_art_fecha_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+            models.Index(
+                fields=['-fecha_creacion'],
+                name='mov_fecha_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+        ]
         permissions = [
             ('registrar_entrada', 'Puede registrar entradas de inventario'),
             ('registrar_salida', 'Puede registrar salidas de inventario'),
@@ -320,6 +425,488 @@ class Movimiento(BaseModel):
         return f"{self.operacion} - {self.articulo.codigo} - {self.cantidad}"
 
 
+class TransicionEstadoStock(BaseModel):
+    """
+    Registro de cada cambio de estado de stock de un artículo.
+
+    Se crea cuando el artículo cruza el mínimo o el punto de reorden (en
+    cualquier sentido). Permite reconstruir cuántos artículos estaban en
+    estado crítico en una fecha y alimenta la señal estado_stock_cambiado.
+
+    Attributes:
+        articulo: Artículo que cambió de estado.
+        estado_anterior: Estado antes del cambio.
+        estado_nuevo: Estado después del cambio.
+        stock_actual: Stock del artículo al momento del cambio.
+    """
+    articulo = models.ForeignKey(
+        Articulo,
+        on_delete=models.PROTECT,
+        related_name='transiciones_estado_stock',
+        verbose_name='Artículo'
+    )
+    estado_anterior = models.CharField(
+        max_length=10,
+        choices=Articulo.EstadoStock.choices,
+        verbose_name='Estado Anterior'
+    )
+    estado_nuevo = models.CharField(
+        max_length=10,
+        choices=Articulo.EstadoStock.choices,
+        verbose_name='Estado Nuevo'
+    )
+    stock_actual = models.IntegerField(verbose_name='Stock al Cambio')
+
+    class Meta:
+        db_table = 'tba_bodega_transicion_estado_stock'
+        verbose_name = 'Transición de Estado de Stock'
+        verbose_name_plural = 'Transiciones de Estado de Stock'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['articulo', '-fecha_creacion'], name='trans_stock_art_fecha_idx'),
+            models.Index(fields=['-fecha_creacion'], name='trans_stock_fecha_idx'),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena de la transición."""
+        return f"{self.articulo.codigo}: {self.estado_anterior} -> {self.estado_nuevo}"
+
+
+# ==================== RESERVAS DE STOCK ====================
+
+class ReservaStock(BaseModel):
+    """
+    Libro de reservas de stock por línea de solicitud.
+
+    Cada fila es un cambio con signo en la reserva de una línea: la
+    aprobación reserva (+), la entrega consume (-) y el rechazo, la
+    cancelación o el cierre liberan (-). La suma por línea es su reserva
+    vigente y la suma por artículo se mantiene en Articulo.stock_reservado.
+
+    Attributes:
+        articulo: Artículo reservado.
+        detalle_solicitud: Línea de solicitud que origina la reserva.
+        tipo: RESERVA, CONSUMO o LIBERACION.
+        cantidad: Variación de la reserva (positiva al reservar).
+        usuario: Usuario que originó el cambio.
+    """
+
+    class Tipo(models.TextChoices):
+        RESERVA = 'RESERVA', 'Reserva'
+        CONSUMO = 'CONSUMO', 'Consumo por entrega'
+        LIBERACION = 'LIBERACION', 'Liberación'
+
+    articulo = models.ForeignKey(
+        Articulo,
+        on_delete=models.PROTECT,
+        related_name='reservas',
+        verbose_name='Artículo'
+    )
+    detalle_solicitud = models.ForeignKey(
+        'solicitudes.DetalleSolicitud',
+        on_delete=models.PROTECT,
+        related_name='reservas',
+        verbose_name='Detalle de Solicitud'
+    )
+    tipo = models.CharField(max_length=10, choices=Tipo.choices, verbose_name='Tipo')
+    cantidad = models.IntegerField(verbose_name='Cantidad')
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='reservas_stock',
+        blank=True,
+        null=True,
+        verbose_name='Usuario'
+    )
+
+    class Meta:
+        db_table = 'tba_bodega_reserva_stock'
+        verbose_name = 'Reserva de Stock'
+        verbose_name_plural = 'Reservas de Stock'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['articulo', '-fecha_creacion'], name='reserva_art_fecha_idx'),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena de la reserva."""
+        return f"{self.get_tipo_display()} {self.cantidad:+d} - {self.articulo_id}"
+
+
+# ==================== CIERRES DE INVENTARIO ====================
+
+class CierreInventario(BaseModel):
+    """
+    Cierre mensual de inventario (snapshot de stock y valor por artículo).
+
+    Guarda el stock y el costo promedio de cada artículo al corte del mes
+    para que kardex, valorización y consultas a una fecha partan del cierre
+    anterior más cercano y solo sumen los movimientos y compras posteriores,
+    sin recorrer todo el historial.
+
+    Attributes:
+        periodo: Primer día del mes cerrado.
+        fecha_corte: Instante del corte (inicio del mes siguiente, exclusivo).
+        usuario: Usuario que ejecutó el cierre (None si fue automático).
+        total_articulos: Cantidad de artículos incluidos.
+        valor_total: Valor del inventario al corte.
+    """
+    periodo = models.DateField(unique=True, verbose_name='Periodo')
+    fecha_corte = models.DateTimeField(unique=True, verbose_name='Fecha de Corte')
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='cierres_inventario',
+        blank=True,
+        null=True,
+        verbose_name='Usuario'
+    )
+    total_articulos = models.PositiveIntegerField(default=0, verbose_name='Total Artículos')
+    valor_total = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name='Valor Total'
+    )
+
+    class Meta:
+        db_table = 'tba_bodega_cierre_inventario'
+        verbose_name = 'Cierre de Inventario'
+        verbose_name_plural = 'Cierres de Inventario'
+        ordering = ['-periodo']
+
+    def __str__(self) -> str:
+        """Representación en cadena del cierre."""
+        return f"Cierre {self.periodo:%m/%Y}"
+
+
+class DetalleCierreInventario(models.Model):
+    """
+    Stock y valor de un artículo en un cierre mensual.
+
+    costo_unitario es el costo promedio ponderado al corte: el del cierre
+    anterior combinado con las compras recibidas durante el mes.
+
+    No hereda de BaseModel: son filas inmutables creadas con bulk_create
+    (miles por cierre) y se eliminan junto con su cierre.
+    """
+    cierre = models.ForeignKey(
+        CierreInventario,
+        on_delete=models.CASCADE,
+        related_name='detalles',
+        verbose_name='Cierre'
+    )
+    articulo = models.ForeignKey(
+        Articulo,
+        on_delete=models.PROTECT,
+        related_name='cierres',
+        verbose_name='Artículo'
+    )
+    cantidad = models.IntegerField(verbose_name='Cantidad')
+    costo_unitario = models.DecimalField(
+        max_digits=14,
+        decimal_places=4,
+        default=0,
+        verbose_name='Costo Unitario'
+    )
+    valor = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name='Valor'
+    )
+
+    class Meta:
+        db_table = 'tba_bodega_cierre_inventario_detalle'
+        verbose_name = 'Detalle de Cierre de Inventario'
+        verbose_name_plural = 'Detalles de Cierre de Inventario'
+        constraints = [
+            models.UniqueConstraint(fields=['cierre', 'articulo'], name='det_cierre_articulo_uniq'),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena del detalle."""
+        return f"{self.cierre} - {self.articulo_id}: {self.cantidad}"
+
+
+class ConsumoMensual(models.Model):
+    """
+    Consumo acumulado por mes, departamento, área, categoría y artículo.
+
+    Resumen de las entregas de artículos que se suma al registrar cada
+    entrega, para que el reporte de consumo por departamento no recorra
+    todo el historial de entregas. Se reconstruye con el comando
+    recalcular_consumo.
+
+    No hereda de BaseModel: son filas de agregado que se mantienen con
+    upserts y se regeneran completas.
+
+    Attributes:
+        mes: Primer día del mes de la entrega.
+        departamento: Departamento destino de la entrega (None si no tiene).
+        area: Área de la solicitud de la entrega (None si no tiene).
+        cantidad: Unidades entregadas.
+        lineas: Líneas de entrega acumuladas.
+    """
+    mes = models.DateField(verbose_name='Mes')
+    departamento = models.ForeignKey(
+        'solicitudes.Departamento',
+        on_delete=models.PROTECT,
+        related_name='consumos_mensuales',
+        blank=True,
+        null=True,
+        verbose_name='Departamento'
+    )
+    area = models.ForeignKey(
+        'solicitudes.Area',
+        on_delete=models.PROTECT,
+        related_name='consumos_mensuales',
+        blank=True,
+        null=True,
+        verbose_name='Área'
+    )
+    categoria = models.ForeignKey(
+        Categoria,
+        on_delete=models.PROTECT,
+        related_name='consumos_mensuales',
+        verbose_name='Categoría'
+    )
+    articulo = models.ForeignKey(
+        Articulo,
+        on_delete=models.PROTECT,
+        related_name='consumos_mensuales',
+        verbose_name='Artículo'
+    )
+    cantidad = models.IntegerField(default=0, verbose_name='Cantidad')
+    lineas = models.IntegerField(default=0, verbose_name='Líneas')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')
+
+    class Meta:
+        db_table = 'tba_bodega_consumo_mensual'
+        verbose_name = 'Consumo Mensual'
+        verbose_name_plural = 'Consumos Mensuales'
+        ordering = ['-mes']
+        constraints = [
+            # Sin departamento o área también es una clave: el índice usa 0 en vez
+            # de NULL (NULLS NOT DISTINCT requiere PostgreSQL 15)
+            models.UniqueConstraint(
+                'mes',
+                Coalesce('departamento', 0),
+                Coalesce('area', 0),
+                'categoria',
+                'articulo',
+                name='consumo_mensual_uniq',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena del consumo."""
+        return f"{self.mes:%m/%Y} - {self.articulo_id}: {self.cantidad}"
+
+
+class ConciliacionStock(BaseModel):
+    """
+    Ejecución de la conciliación entre stock_actual y el historial de movimientos.
+
+    El stock esperado de un artículo es el stock_antes de su primer movimiento
+    más la suma con signo de todos sus movimientos. Cada ejecución queda
+    registrada para que el modo incremental revise solo los artículos
+    modificados desde la ejecución anterior.
+
+    Attributes:
+        fecha_corte: Instante en que comenzó la revisión.
+        incremental: True si solo se revisaron artículos modificados.
+        reparacion: Forma de reparar las diferencias ('' si solo se reportaron).
+        articulos_revisados: Artículos con historial que se compararon.
+        articulos_con_diferencia: Artículos cuyo stock no cuadra con el historial.
+        articulos_reparados: Artículos corregidos en esta ejecución.
+        usuario: Usuario que ejecutó la conciliación (None si fue automática).
+    """
+
+    class Reparacion(models.TextChoices):
+        NINGUNA = '', 'Solo reporte'
+        AJUSTE = 'AJUSTE', 'Movimientos de ajuste'
+        STOCK = 'STOCK', 'Stock desde historial'
+
+    fecha_corte = models.DateTimeField(db_index=True, verbose_name='Fecha de Corte')
+    incremental = models.BooleanField(default=False, verbose_name='Incremental')
+    reparacion = models.CharField(
+        max_length=10,
+        choices=Reparacion.choices,
+        default=Reparacion.NINGUNA,
+        blank=True,
+        verbose_name='Reparación'
+    )
+    articulos_revisados = models.PositiveIntegerField(default=0, verbose_name='Artículos Revisados')
+    articulos_con_diferencia = models.PositiveIntegerField(default=0, verbose_name='Artículos con Diferencia')
+    articulos_reparados = models.PositiveIntegerField(default=0, verbose_name='Artículos Reparados')
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='conciliaciones_stock',
+        blank=True,
+        null=True,
+        verbose_name='Usuario'
+    )
+
+    class Meta:
+        db_table = 'tba_bodega_conciliacion_stock'
+        verbose_name = 'Conciliación de Stock'
+        verbose_name_plural = 'Conciliaciones de Stock'
+        ordering = ['-fecha_corte']
+
+    def __str__(self) -> str:
+        """Representación en cadena de la conciliación."""
+        return f"Conciliación {timezone.localtime(self.fecha_corte):%d/%m/%Y %H:%M}"
+
+
+# ==================== TOMAS DE INVENTARIO ====================
+
+class TomaInventario(BaseModel):
+    """
+    Sesión de toma de inventario físico.
+
+    Una toma cuenta los artículos de una bodega o los activos de una
+    ubicación (exactamente uno de los dos). Las lecturas de códigos de barras
+    se acumulan en ConteoInventario; al cerrar, las diferencias contra
+    stock_actual o la ubicación registrada se ajustan en bloque.
+
+    Attributes:
+        numero: Número correlativo de la toma.
+        bodega: Bodega cuyos artículos se cuentan.
+        ubicacion: Ubicación cuyos activos se cuentan.
+        estado: ABIERTA, CERRADA o ANULADA.
+        usuario: Usuario responsable de la toma.
+        fecha_cierre: Fecha de cierre (ajustes aplicados).
+        lecturas: Total de códigos leídos.
+        ajustes_generados: Movimientos de ajuste generados al cerrar.
+    """
+
+    class Estado(models.TextChoices):
+        ABIERTA = 'ABIERTA', 'Abierta'
+        CERRADA = 'CERRADA', 'Cerrada'
+        ANULADA = 'ANULADA', 'Anulada'
+
+    numero = models.CharField(max_length=30, unique=True, verbose_name='Número')
+    bodega = models.ForeignKey(
+        Bodega,
+        on_delete=models.PROTECT,
+        related_name='tomas_inventario',
+        blank=True,
+        null=True,
+        verbose_name='Bodega'
+    )
+    ubicacion = models.ForeignKey(
+        'activos.Ubicacion',
+        on_delete=models.PROTECT,
+        related_name='tomas_inventario',
+        blank=True,
+        null=True,
+        verbose_name='Ubicación'
+    )
+    estado = models.CharField(
+        max_length=10,
+        choices=Estado.choices,
+        default=Estado.ABIERTA,
+        verbose_name='Estado'
+    )
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+        related_name='tomas_inventario',
+        verbose_name='Responsable'
+    )
+    fecha_cierre = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Cierre')
+    lecturas = models.IntegerField(default=0, editable=False, verbose_name='Lecturas')
+    ajustes_generados = models.IntegerField(default=0, editable=False, verbose_name='Ajustes Generados')
+    observaciones = models.TextField(blank=True, null=True, verbose_name='Observaciones')
+
+    class Meta:
+        db_table = 'tba_bodega_toma_inventario'
+        verbose_name = 'Toma de Inventario'
+        verbose_name_plural = 'Tomas de Inventario'
+        ordering = ['-fecha_creacion']
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(bodega__isnull=False, ubicacion__isnull=True)
+                    | models.Q(bodega__isnull=True, ubicacion__isnull=False)
+                ),
+                name='toma_bodega_o_ubicacion',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena de la toma."""
+        return f"{self.numero} - {self.bodega or self.ubicacion}"
+
+    @property
+    def es_de_activos(self) -> bool:
+        """True si la toma cuenta activos de una ubicación."""
+        return self.ubicacion_id is not None
+
+
+class ConteoInventario(BaseModel):
+    """
+    Cantidad contada de un artículo o activo en una toma de inventario.
+
+    Una fila por producto y toma; las lecturas repetidas incrementan la
+    cantidad.
+
+    Attributes:
+        toma: Toma de inventario.
+        articulo: Artículo contado (tomas de bodega).
+        activo: Activo contado (tomas de ubicación).
+        cantidad: Unidades contadas.
+    """
+
+    toma = models.ForeignKey(
+        TomaInventario,
+        on_delete=models.CASCADE,
+        related_name='conteos',
+        verbose_name='Toma'
+    )
+    articulo = models.ForeignKey(
+        Articulo,
+        on_delete=models.PROTECT,
+        related_name='conteos_inventario',
+        blank=True,
+        null=True,
+        verbose_name='Artículo'
+    )
+    activo = models.ForeignKey(
+        'activos.Activo',
+        on_delete=models.PROTECT,
+        related_name='conteos_inventario',
+        blank=True,
+        null=True,
+        verbose_name='Activo'
+    )
+    cantidad = models.IntegerField(default=0, verbose_name='Cantidad Contada')
+
+    class Meta:
+        db_table = 'tba_bodega_conteo_inventario'
+        verbose_name = 'Conteo de Inventario'
+        verbose_name_plural = 'Conteos de Inventario'
+        ordering = ['toma', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['toma', 'articulo'],
+                condition=models.Q(articulo__isnull=False),
+                name='conteo_toma_articulo_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['toma', 'activo'],
+                condition=models.Q(activo__isnull=False),
+                name='conteo_toma_activo_uniq',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena del conteo."""
+        return f"{self.toma_id} - {self.articulo_id or self.activo_id}: {self.cantidad}"
+
+
 # ==================== ENTREGA DE ARTÍCULOS Y BIENES ====================
 
 class EntregaBase(BaseModel):
@@ -463,6 +1050,18 @@ class EntregaArticulo(EntregaBase):
         verbose_name = 'Entrega de Artículo'
         verbose_name_plural = 'Entregas de Artículos'
         ordering = ['-fecha_entrega']
+        indexes = [
+            models.Index(
+                fields=['-fecha_entrega'],
+                name='ent_art_fecha_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+            models.Index(
+                fields=['solicitud', '-fecha_entrega'],
+                name='ent_art_sol_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+        ]
         permissions = [
             ('registrar_entrega_articulo', 'Puede registrar entrega de artículos'),
             ('aprobar_entrega_articulo', 'Puede aprobar entrega de artículos'),
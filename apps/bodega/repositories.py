@@ -4,14 +4,24 @@ Repository Pattern para el módulo de bodega.
 Separa la lógica de acceso a datos de la lógica de negocio,
 siguiendo el principio de Inversión de Dependencias (SOLID).
 """
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Dict, Iterable, Tuple
 from decimal import Decimal
-from django.db.models import QuerySet, Q
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import (
+    Case, CharField, Count, DateField, DecimalField, ExpressionWrapper, F, FilteredRelation, IntegerField,
+    OuterRef, QuerySet, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
 from django.contrib.auth.models import User
+from core.cache import cached_service
 from .models import (
     Bodega, Categoria, Marca, Articulo, Operacion, TipoMovimiento, Movimiento,
     EstadoEntrega, TipoEntrega, EntregaArticulo, DetalleEntregaArticulo,
-    EntregaBien, DetalleEntregaBien
+    EntregaBien, DetalleEntregaBien, CierreInventario, DetalleCierreInventario,
+    ConciliacionStock, ReservaStock, TomaInventario, ConteoInventario, ConsumoMensual
 )
 
 
@@ -30,6 +40,15 @@ class BodegaRepository:
         """Retorna solo bodegas activas y no eliminadas."""
         return Bodega.objects.filter(activo=True, eliminado=False)
 
+    @staticmethod
+    @cached_service(tags=['bodega.Bodega'], ttl=3600)
+    def opciones_activas() -> List[Dict]:
+        """Bodegas activas como {id, codigo, nombre} para selects (cacheado)."""
+        return list(
+            Bodega.objects.filter(activo=True, eliminado=False)
+            .order_by('nombre').values('id', 'codigo', 'nombre')
+        )
+
     @staticmethod
     def get_by_id(bodega_id: int) -> Optional[Bodega]:
         """
@@ -102,6 +121,15 @@ class CategoriaRepository:
         """Retorna solo categorías activas y no eliminadas."""
         return Categoria.objects.filter(activo=True, eliminado=False).order_by('codigo')
 
+    @staticmethod
+    @cached_service(tags=['bodega.Categoria'], ttl=3600)
+    def opciones_activas() -> List[Dict]:
+        """Categorías activas como {id, codigo, nombre} para selects (cacheado)."""
+        return list(
+            Categoria.objects.filter(activo=True, eliminado=False)
+            .order_by('nombre').values('id', 'codigo', 'nombre')
+        )
+
     @staticmethod
     def get_by_id(categoria_id: int) -> Optional[Categoria]:
         """
@@ -331,26 +359,21 @@ class ArticuloRepository:
     @staticmethod
     def get_low_stock() -> QuerySet[Articulo]:
         """Retorna artículos con stock bajo (menor al mínimo)."""
-        from django.db.models import F
         return Articulo.objects.filter(
             eliminado=False,
-            activo=True
-        ).filter(
-            stock_actual__lt=F('stock_minimo')
+            activo=True,
+            estado_stock=Articulo.EstadoStock.CRITICO
         ).select_related(
             'categoria', 'ubicacion_fisica'
         ).order_by('codigo')
 
     @staticmethod
     def get_reorder_point() -> QuerySet[Articulo]:
-        """Retorna artículos que alcanzaron el punto de reorden."""
-        from django.db.models import F
+        """Retorna artículos que alcanzaron el punto de reorden (incluye críticos)."""
         return Articulo.objects.filter(
             eliminado=False,
             activo=True,
-            punto_reorden__isnull=False
-        ).filter(
-            stock_actual__lte=F('punto_reorden')
+            estado_stock__in=[Articulo.EstadoStock.REORDEN, Articulo.EstadoStock.CRITICO]
         ).select_related(
             'categoria', 'ubicacion_fisica'
         ).order_by('codigo')
@@ -405,9 +428,57 @@ class ArticuloRepository:
             Artículo actualizado
         """
         articulo.stock_actual = nuevo_stock
+        # save() agrega estado_stock y registra la transición si cambia
         articulo.save(update_fields=['stock_actual', 'fecha_actualizacion'])
         return articulo
 
+    @staticmethod
+    def get_for_update_by_ids(articulo_ids: Iterable[int]) -> Dict[int, Articulo]:
+        """
+        Obtiene y bloquea (SELECT ... FOR UPDATE) varios artículos en una consulta.
+
+        Debe llamarse dentro de una transacción atómica.
+
+        Args:
+            articulo_ids: IDs de los artículos
+
+        Returns:
+            Dict {articulo_id: Articulo} con los artículos no eliminados encontrados
+        """
+        articulos = Articulo.objects.select_for_update().filter(
+            id__in=list(articulo_ids),
+            eliminado=False
+        ).order_by('id')
+        return {articulo.id: articulo for articulo in articulos}
+
+    @staticmethod
+    def bulk_update_stock(articulos: List[Articulo], batch_size: int = 500) -> None:
+        """
+        Persiste el stock de varios artículos con una sola sentencia por lote.
+
+        Recalcula estado_stock de cada artículo y registra en un solo
+        bulk_create las transiciones de los que cruzaron un umbral.
+
+        Args:
+            articulos: Artículos con stock_actual ya modificado
+            batch_size: Tamaño de lote para bulk_update
+        """
+        from .signals import registrar_transiciones_estado_stock
+
+        ahora = timezone.now()
+        cambios = []
+        for articulo in articulos:
+            articulo.fecha_actualizacion = ahora
+            transicion = articulo.actualizar_estado_stock()
+            if transicion:
+                cambios.append((articulo, *transicion))
+        Articulo.objects.bulk_update(
+            articulos,
+            ['stock_actual', 'estado_stock', 'fecha_actualizacion'],
+            batch_size=batch_size
+        )
+        registrar_transiciones_estado_stock(cambios)
+
 
 # ==================== OPERACION REPOSITORY ====================
 
@@ -599,9 +670,7 @@ class MovimientoRepository:
     @staticmethod
     def get_all() -> QuerySet[Movimiento]:
         """Retorna todos los movimientos no eliminados con relaciones optimizadas."""
-        return Movimiento.objects.filter(
-            eliminado=False
-        ).select_related(
+        return Movimiento.objects.vivos().select_related(
             'articulo', 'tipo', 'usuario'
         ).order_by('-fecha_creacion')
 
@@ -635,9 +704,8 @@ class MovimientoRepository:
         Returns:
             QuerySet con movimientos limitados
         """
-        return Movimiento.objects.filter(
-            articulo=articulo,
-            eliminado=False
+        return Movimiento.objects.vivos().filter(
+            articulo=articulo
         ).select_related(
             'tipo', 'usuario'
         ).order_by('-fecha_creacion')[:limit]
@@ -718,6 +786,714 @@ class MovimientoRepository:
             stock_despues=stock_despues
         )
 
+    @staticmethod
+    def bulk_create(movimientos: List[Movimiento], batch_size: int = 500) -> List[Movimiento]:
+        """
+        Crea varios movimientos en una sola escritura por lote.
+
+        Args:
+            movimientos: Instancias de Movimiento sin guardar
+            batch_size: Tamaño de lote para bulk_create
+
+        Returns:
+            Lista de movimientos creados
+        """
+        return Movimiento.objects.bulk_create(movimientos, batch_size=batch_size)
+
+    @staticmethod
+    def cantidad_signada() -> Case:
+        """Expresión SQL de la cantidad con signo: positiva si es entrada, negativa si es salida."""
+        return Case(
+            When(operacion__tipo='ENTRADA', then=F('cantidad')),
+            default=-F('cantidad'),
+            output_field=IntegerField()
+        )
+
+    @staticmethod
+    def sumar_por_articulo(
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Dict[int, int]:
+        """
+        Suma con signo las cantidades movidas por artículo en [desde, hasta).
+
+        Args:
+            desde: Inicio del rango (inclusive), None = sin límite
+            hasta: Fin del rango (exclusivo), None = sin límite
+            articulos: QuerySet de artículos a considerar (subconsulta), None = todos
+
+        Returns:
+            Dict {articulo_id: cantidad neta} solo para artículos con movimientos
+        """
+        queryset = Movimiento.objects.vivos()
+        if desde is not None:
+            queryset = queryset.filter(fecha_creacion__gte=desde)
+        if hasta is not None:
+            queryset = queryset.filter(fecha_creacion__lt=hasta)
+        if articulos is not None:
+            queryset = queryset.filter(articulo__in=articulos.values('id'))
+        return dict(
+            queryset.order_by().values('articulo_id').annotate(
+                neto=Sum(MovimientoRepository.cantidad_signada())
+            ).values_list('articulo_id', 'neto')
+        )
+
+    @staticmethod
+    def get_stock_inicial_por_articulo(
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Dict[int, int]:
+        """
+        Retorna el stock_antes del primer movimiento vigente de cada artículo.
+
+        Usa DISTINCT ON (PostgreSQL) sobre el índice por artículo y fecha:
+        una sola consulta para todos los artículos.
+
+        Args:
+            articulos: QuerySet de artículos a considerar (subconsulta), None = todos
+
+        Returns:
+            Dict {articulo_id: stock inicial} solo para artículos con movimientos
+        """
+        queryset = Movimiento.objects.vivos()
+        if articulos is not None:
+            queryset = queryset.filter(articulo__in=articulos.values('id'))
+        return dict(
+            queryset.order_by('articulo_id', 'fecha_creacion', 'id').distinct(
+                'articulo_id'
+            ).values_list('articulo_id', 'stock_antes')
+        )
+
+    @staticmethod
+    def get_primera_fecha() -> Optional[datetime]:
+        """Fecha del movimiento vigente más antiguo (None si no hay movimientos)."""
+        return Movimiento.objects.vivos().order_by('fecha_creacion').values_list(
+            'fecha_creacion', flat=True
+        ).first()
+
+
+# ==================== CIERRE INVENTARIO REPOSITORY ====================
+
+class CierreInventarioRepository:
+    """Repository para gestionar acceso a datos de CierreInventario."""
+
+    @staticmethod
+    def get_by_periodo(periodo: date) -> Optional[CierreInventario]:
+        """Obtiene el cierre de un periodo (primer día del mes), incluso si fue eliminado."""
+        return CierreInventario.objects.filter(periodo=periodo).first()
+
+    @staticmethod
+    def get_ultimo() -> Optional[CierreInventario]:
+        """Obtiene el cierre más reciente."""
+        return CierreInventario.objects.vivos().order_by('-periodo').first()
+
+    @staticmethod
+    def get_ultimo_hasta(instante: datetime) -> Optional[CierreInventario]:
+        """
+        Obtiene el cierre más reciente cuyo corte es anterior o igual al instante.
+
+        Args:
+            instante: Fecha/hora de referencia
+
+        Returns:
+            CierreInventario o None si no hay cierres previos
+        """
+        return CierreInventario.objects.vivos().filter(
+            fecha_corte__lte=instante
+        ).order_by('-fecha_corte').first()
+
+    @staticmethod
+    def get_cantidades(
+        cierre: CierreInventario,
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Dict[int, int]:
+        """
+        Retorna el stock de cada artículo en un cierre.
+
+        Args:
+            cierre: Cierre de inventario
+            articulos: QuerySet de artículos a considerar, None = todos
+
+        Returns:
+            Dict {articulo_id: cantidad}
+        """
+        queryset = DetalleCierreInventario.objects.filter(cierre=cierre)
+        if articulos is not None:
+            queryset = queryset.filter(articulo__in=articulos.values('id'))
+        return dict(queryset.values_list('articulo_id', 'cantidad'))
+
+    @staticmethod
+    def get_costos(
+        cierre: CierreInventario,
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Dict[int, Tuple[int, Decimal]]:
+        """
+        Retorna cantidad y costo unitario de cada artículo en un cierre.
+
+        Args:
+            cierre: Cierre de inventario
+            articulos: QuerySet de artículos a considerar, None = todos
+
+        Returns:
+            Dict {articulo_id: (cantidad, costo_unitario)}
+        """
+        queryset = DetalleCierreInventario.objects.filter(cierre=cierre)
+        if articulos is not None:
+            queryset = queryset.filter(articulo__in=articulos.values('id'))
+        return {
+            articulo_id: (cantidad, costo)
+            for articulo_id, cantidad, costo in queryset.values_list(
+                'articulo_id', 'cantidad', 'costo_unitario'
+            )
+        }
+
+    @staticmethod
+    def get_compras_por_articulo(
+        desde: Optional[datetime],
+        hasta: datetime,
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Dict[int, Tuple[int, Decimal]]:
+        """
+        Suma las compras recibidas por artículo con fecha de confirmación en [desde, hasta).
+
+        Se consideran los detalles de recepciones completadas con orden de
+        compra; cada uno se valoriza al precio neto (subtotal / cantidad) de
+        la línea de la orden para el mismo artículo. La fecha de
+        confirmación es la del ingreso al stock, la misma de los movimientos
+        que cuenta saldos_a_fecha: una recepción creada antes de un corte y
+        confirmada después entra en la ventana siguiente al cierre.
+
+        Args:
+            desde: Instante inicial (inclusive), None = sin límite
+            hasta: Instante final (exclusivo)
+            articulos: QuerySet de artículos a considerar (subconsulta), None = todos
+
+        Returns:
+            Dict {articulo_id: (cantidad recibida, importe)} solo para artículos con compras
+        """
+        from apps.compras.models import DetalleOrdenCompraArticulo, DetalleRecepcionArticulo
+
+        precio_neto = DetalleOrdenCompraArticulo.objects.vivos().filter(
+            orden_compra_id=OuterRef('recepcion__orden_compra_id'),
+            articulo_id=OuterRef('articulo_id'),
+            cantidad__gt=0
+        ).order_by('id').annotate(
+            precio=ExpressionWrapper(
+                F('subtotal') / F('cantidad'),
+                output_field=DecimalField(max_digits=18, decimal_places=4)
+            )
+        ).values('precio')[:1]
+
+        queryset = DetalleRecepcionArticulo.objects.vivos().filter(
+            recepcion__eliminado=False,
+            recepcion__estado__codigo='COMPLETADA',
+            recepcion__orden_compra__isnull=False,
+            recepcion__fecha_confirmacion__lt=hasta
+        )
+        if desde is not None:
+            queryset = queryset.filter(recepcion__fecha_confirmacion__gte=desde)
+        if articulos is not None:
+            queryset = queryset.filter(articulo__in=articulos.values('id'))
+
+        queryset = queryset.annotate(precio=Subquery(precio_neto)).filter(precio__isnull=False)
+        importe = ExpressionWrapper(
+            F('cantidad') * F('precio'),
+            output_field=DecimalField(max_digits=18, decimal_places=4)
+        )
+        return {
+            fila['articulo_id']: (fila['unidades'], fila['importe'])
+            for fila in queryset.order_by().values('articulo_id').annotate(
+                unidades=Sum('cantidad'),
+                importe=Sum(importe)
+            )
+        }
+
+    @staticmethod
+    def create(
+        periodo: date,
+        fecha_corte: datetime,
+        detalles: Dict[int, Tuple[int, Decimal, Decimal]],
+        usuario: Optional[User] = None,
+        batch_size: int = 1000
+    ) -> CierreInventario:
+        """
+        Crea un cierre y sus detalles con bulk_create.
+
+        Args:
+            periodo: Primer día del mes cerrado
+            fecha_corte: Instante del corte
+            detalles: Dict {articulo_id: (cantidad, costo_unitario, valor)}
+            usuario: Usuario que ejecuta el cierre
+            batch_size: Tamaño de lote para bulk_create
+
+        Returns:
+            Cierre creado
+        """
+        cierre = CierreInventario.objects.create(
+            periodo=periodo,
+            fecha_corte=fecha_corte,
+            usuario=usuario,
+            total_articulos=len(detalles),
+            valor_total=sum((valor for _, _, valor in detalles.values()), Decimal('0'))
+        )
+        DetalleCierreInventario.objects.bulk_create(
+            [
+                DetalleCierreInventario(
+                    cierre=cierre,
+                    articulo_id=articulo_id,
+                    cantidad=cantidad,
+                    costo_unitario=costo,
+                    valor=valor
+                )
+                for articulo_id, (cantidad, costo, valor) in detalles.items()
+            ],
+            batch_size=batch_size
+        )
+        return cierre
+
+
+# ==================== CONSUMO MENSUAL REPOSITORY ====================
+
+class ConsumoMensualRepository:
+    """Repository para el resumen de consumo mensual por departamento."""
+
+    @staticmethod
+    def acumular(
+        mes: date,
+        departamento_id: Optional[int],
+        area_id: Optional[int],
+        consumos: Dict[Tuple[int, int], Tuple[int, int]]
+    ) -> None:
+        """
+        Suma el consumo de una entrega a sus filas del resumen con un solo upsert.
+
+        Debe llamarse dentro de la transacción que crea la entrega: si la
+        entrega se revierte, el consumo también.
+
+        Args:
+            mes: Primer día del mes de la entrega
+            departamento_id: Departamento destino (None si no tiene)
+            area_id: Área de la solicitud (None si no tiene)
+            consumos: Dict {(categoria_id, articulo_id): (cantidad, lineas)}
+        """
+        if not consumos:
+            return
+
+        tabla = ConsumoMensual._meta.db_table
+        filas = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, NOW())'] * len(consumos))
+        parametros: List = []
+        for (categoria_id, articulo_id), (cantidad, lineas) in consumos.items():
+            parametros.extend([mes, departamento_id, area_id, categoria_id, articulo_id, cantidad, lineas])
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                INSERT INTO {tabla} AS c
+                    (mes, departamento_id, area_id, categoria_id, articulo_id, cantidad, lineas, fecha_actualizacion)
+                VALUES {filas}
+                ON CONFLICT (mes, COALESCE(departamento_id, 0), COALESCE(area_id, 0), categoria_id, articulo_id)
+                DO UPDATE SET
+                    cantidad = c.cantidad + EXCLUDED.cantidad,
+                    lineas = c.lineas + EXCLUDED.lineas,
+                    fecha_actualizacion = EXCLUDED.fecha_actualizacion
+                ''',
+                parametros
+            )
+
+    @staticmethod
+    def recalcular(desde: Optional[date] = None, batch_size: int = 1000) -> int:
+        """
+        Reconstruye el resumen desde las entregas de artículos.
+
+        Borra las filas desde el mes indicado (todas si es None) y las vuelve
+        a agregar desde los detalles de entrega vigentes. Debe llamarse
+        dentro de una transacción.
+
+        Args:
+            desde: Primer mes a reconstruir, None = todo el historial
+            batch_size: Tamaño de lote para bulk_create
+
+        Returns:
+            Cantidad de filas del resumen creadas
+        """
+        resumen = ConsumoMensual.objects.all()
+        detalles = DetalleEntregaArticulo.objects.filter(eliminado=False, entrega__eliminado=False)
+        if desde is not None:
+            inicio = timezone.make_aware(datetime.combine(desde.replace(day=1), datetime.min.time()))
+            resumen = resumen.filter(mes__gte=desde.replace(day=1))
+            detalles = detalles.filter(entrega__fecha_entrega__gte=inicio)
+        resumen.delete()
+
+        agregado = detalles.annotate(
+            mes=TruncMonth('entrega__fecha_entrega', output_field=DateField())
+        ).values(
+            'mes', 'entrega__departamento_destino_id', 'entrega__solicitud__area_id',
+            'articulo__categoria_id', 'articulo_id'
+        ).annotate(
+            total=Sum('cantidad'),
+            total_lineas=Count('id')
+        ).order_by()
+
+        creados = ConsumoMensual.objects.bulk_create(
+            (
+                ConsumoMensual(
+                    mes=fila['mes'],
+                    departamento_id=fila['entrega__departamento_destino_id'],
+                    area_id=fila['entrega__solicitud__area_id'],
+                    categoria_id=fila['articulo__categoria_id'],
+                    articulo_id=fila['articulo_id'],
+                    cantidad=fila['total'],
+                    lineas=fila['total_lineas'],
+                )
+                for fila in agregado.iterator(chunk_size=batch_size)
+            ),
+            batch_size=batch_size
+        )
+        return len(creados)
+
+
+# ==================== RESERVA STOCK REPOSITORY ====================
+
+class ReservaStockRepository:
+    """Repository para gestionar acceso a datos de ReservaStock."""
+
+    @staticmethod
+    def get_pendientes_por_detalle(**filtros) -> Dict[int, Tuple[int, int]]:
+        """
+        Reserva vigente (suma del libro) por línea de solicitud.
+
+        Args:
+            **filtros: Filtros sobre ReservaStock (ej. detalle_solicitud__solicitud=s)
+
+        Returns:
+            Dict {detalle_solicitud_id: (articulo_id, reserva)} solo para líneas
+            con reserva distinta de cero
+        """
+        filas = ReservaStock.objects.vivos().filter(**filtros).order_by().values(
+            'detalle_solicitud_id', 'articulo_id'
+        ).annotate(pendiente=Sum('cantidad')).values_list(
+            'detalle_solicitud_id', 'articulo_id', 'pendiente'
+        )
+        return {
+            detalle_id: (articulo_id, pendiente)
+            for detalle_id, articulo_id, pendiente in filas if pendiente
+        }
+
+    @staticmethod
+    def registrar(reservas: List[ReservaStock], batch_size: int = 500) -> List[ReservaStock]:
+        """
+        Registra cambios de reserva y actualiza stock_reservado de los artículos.
+
+        El libro se escribe con un bulk_create y los contadores con un único
+        UPDATE (F() + CASE por artículo), sin leer ni bloquear los artículos.
+
+        Args:
+            reservas: Instancias de ReservaStock sin guardar
+            batch_size: Tamaño de lote para bulk_create
+
+        Returns:
+            Lista de reservas creadas
+        """
+        if not reservas:
+            return []
+
+        deltas: Dict[int, int] = {}
+        for reserva in reservas:
+            deltas[reserva.articulo_id] = deltas.get(reserva.articulo_id, 0) + reserva.cantidad
+
+        creadas = ReservaStock.objects.bulk_create(reservas, batch_size=batch_size)
+        deltas = {articulo_id: delta for articulo_id, delta in deltas.items() if delta}
+        if deltas:
+            Articulo.objects.filter(id__in=deltas).update(
+                stock_reservado=F('stock_reservado') + Case(
+                    *(When(id=articulo_id, then=Value(delta)) for articulo_id, delta in deltas.items()),
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            )
+        return creadas
+
+    @staticmethod
+    def recalcular_contadores() -> int:
+        """
+        Reconstruye stock_reservado de todos los artículos desde el libro.
+
+        Returns:
+            Cantidad de artículos cuyo contador cambió
+        """
+        totales = dict(
+            ReservaStock.objects.vivos().order_by().values('articulo_id').annotate(
+                total=Sum('cantidad')
+            ).values_list('articulo_id', 'total')
+        )
+        articulos = []
+        for articulo in Articulo.objects.filter(
+            Q(id__in=totales) | ~Q(stock_reservado=0)
+        ).only('id', 'stock_reservado'):
+            total = totales.get(articulo.id, 0)
+            if articulo.stock_reservado != total:
+                articulo.stock_reservado = total
+                articulos.append(articulo)
+        Articulo.objects.bulk_update(articulos, ['stock_reservado'], batch_size=500)
+        return len(articulos)
+
+
+# ==================== CONCILIACION STOCK REPOSITORY ====================
+
+class ConciliacionStockRepository:
+    """Repository para gestionar acceso a datos de ConciliacionStock."""
+
+    @staticmethod
+    def get_ultima() -> Optional[ConciliacionStock]:
+        """Obtiene la conciliación más reciente."""
+        return ConciliacionStock.objects.vivos().order_by('-fecha_corte').first()
+
+    @staticmethod
+    def get_articulos_modificados_desde(instante: datetime) -> QuerySet[Articulo]:
+        """
+        Artículos vigentes modificados o con movimientos desde un instante.
+
+        Todos los caminos que cambian stock_actual actualizan también
+        fecha_actualizacion; se incluyen además los artículos con movimientos
+        nuevos para detectar cambios en el historial.
+
+        Args:
+            instante: Fecha/hora desde la cual buscar (inclusive)
+
+        Returns:
+            QuerySet de artículos
+        """
+        con_movimientos = Movimiento.objects.filter(
+            fecha_creacion__gte=instante
+        ).values('articulo_id')
+        return Articulo.objects.vivos().filter(
+            Q(fecha_actualizacion__gte=instante) | Q(id__in=con_movimientos)
+        )
+
+    @staticmethod
+    def create(**kwargs) -> ConciliacionStock:
+        """
+        Registra una ejecución de conciliación.
+
+        Args:
+            **kwargs: Campos de ConciliacionStock
+
+        Returns:
+            Conciliación creada
+        """
+        return ConciliacionStock.objects.create(**kwargs)
+
+
+# ==================== TOMA INVENTARIO REPOSITORY ====================
+
+class TomaInventarioRepository:
+    """Repository para gestionar acceso a datos de TomaInventario y sus conteos."""
+
+    # Mapa codigo_barras -> (tipo, id) de artículos y activos
+    CACHE_CODIGOS_BARRAS = 'bodega:codigos_barras'
+    CACHE_TIMEOUT = 60 * 30
+
+    @staticmethod
+    def get_all() -> QuerySet[TomaInventario]:
+        """Retorna todas las tomas no eliminadas."""
+        return TomaInventario.objects.vivos().select_related(
+            'bodega', 'ubicacion', 'usuario'
+        ).order_by('-fecha_creacion')
+
+    @staticmethod
+    def get_by_id(toma_id: int, bloquear: bool = False) -> Optional[TomaInventario]:
+        """
+        Obtiene una toma por ID.
+
+        Args:
+            toma_id: ID de la toma
+            bloquear: Bloquea la fila (SELECT ... FOR UPDATE) para serializar lecturas
+
+        Returns:
+            TomaInventario o None si no existe
+        """
+        queryset = TomaInventario.objects.vivos().select_related('bodega', 'ubicacion', 'usuario')
+        if bloquear:
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset.filter(id=toma_id).first()
+
+    @staticmethod
+    def get_ultimo_numero(prefijo: str) -> Optional[str]:
+        """Último número de toma con el prefijo dado."""
+        return TomaInventario.objects.filter(
+            numero__startswith=prefijo
+        ).order_by('-numero').values_list('numero', flat=True).first()
+
+    @staticmethod
+    def create(**kwargs) -> TomaInventario:
+        """Crea una nueva toma."""
+        return TomaInventario.objects.create(**kwargs)
+
+    @staticmethod
+    def sumar_lecturas(toma: TomaInventario, cantidad: int) -> None:
+        """Incrementa el total de lecturas de la toma con un UPDATE atómico."""
+        TomaInventario.objects.filter(id=toma.id).update(
+            lecturas=F('lecturas') + cantidad,
+            fecha_actualizacion=timezone.now()
+        )
+
+    @staticmethod
+    def _consulta_codigos_barras(codigos: Optional[Iterable[str]] = None) -> Dict[str, Tuple[str, int]]:
+        """Lee códigos de barras de artículos y activos en una sola consulta (UNION ALL)."""
+        from apps.activos.models import Activo
+
+        articulos = Articulo.objects.vivos().exclude(codigo_barras=None)
+        activos = Activo.objects.vivos().exclude(codigo_barras=None)
+        if codigos is not None:
+            articulos = articulos.filter(codigo_barras__in=codigos)
+            activos = activos.filter(codigo_barras__in=codigos)
+        filas = articulos.order_by().annotate(
+            tipo_producto=Value('ARTICULO', output_field=CharField())
+        ).values_list('codigo_barras', 'tipo_producto', 'id').union(
+            activos.order_by().annotate(
+                tipo_producto=Value('ACTIVO', output_field=CharField())
+            ).values_list('codigo_barras', 'tipo_producto', 'id'),
+            all=True
+        )
+        return {codigo: (tipo_producto, pk) for codigo, tipo_producto, pk in filas}
+
+    @classmethod
+    def resolver_codigos_barras(cls, codigos: Iterable[str]) -> Dict[str, Tuple[str, int]]:
+        """
+        Resuelve códigos de barras a artículos o activos.
+
+        Usa el mapa completo en caché; los códigos que no están en el mapa
+        (productos nuevos) se buscan en una sola consulta y se agregan.
+
+        Args:
+            codigos: Códigos de barras distintos a resolver
+
+        Returns:
+            Dict {codigo: ('ARTICULO' | 'ACTIVO', id)} solo con los códigos encontrados
+        """
+        codigos = set(codigos)
+        mapa = cache.get(cls.CACHE_CODIGOS_BARRAS)
+        if mapa is None:
+            mapa = cls._consulta_codigos_barras()
+            cache.set(cls.CACHE_CODIGOS_BARRAS, mapa, cls.CACHE_TIMEOUT)
+
+        faltantes = codigos.difference(mapa)
+        if faltantes:
+            nuevos = cls._consulta_codigos_barras(faltantes)
+            if nuevos:
+                mapa.update(nuevos)
+                cache.set(cls.CACHE_CODIGOS_BARRAS, mapa, cls.CACHE_TIMEOUT)
+        return {codigo: mapa[codigo] for codigo in codigos if codigo in mapa}
+
+    @classmethod
+    def invalidar_codigos_barras(cls) -> None:
+        """Descarta el mapa de códigos de barras en caché."""
+        cache.delete(cls.CACHE_CODIGOS_BARRAS)
+
+    @staticmethod
+    def registrar_conteos(toma: TomaInventario, cantidades: Dict[int, int]) -> Tuple[int, int]:
+        """
+        Suma cantidades leídas a los conteos de la toma.
+
+        Una consulta para los conteos existentes, un bulk_update para
+        incrementarlos y un bulk_create para los nuevos. El llamador debe
+        tener bloqueada la toma para que lecturas concurrentes no se pisen.
+
+        Args:
+            toma: Toma de inventario
+            cantidades: Dict {articulo_id o activo_id: cantidad leída}
+
+        Returns:
+            Tupla (conteos actualizados, conteos creados)
+        """
+        campo = 'activo_id' if toma.es_de_activos else 'articulo_id'
+        existentes = {
+            getattr(conteo, campo): conteo
+            for conteo in ConteoInventario.objects.filter(toma=toma, **{f'{campo}__in': cantidades})
+        }
+
+        ahora = timezone.now()
+        actualizar, crear = [], []
+        for producto_id, cantidad in cantidades.items():
+            conteo = existentes.get(producto_id)
+            if conteo:
+                conteo.cantidad += cantidad
+                conteo.fecha_actualizacion = ahora
+                actualizar.append(conteo)
+            else:
+                crear.append(ConteoInventario(toma=toma, cantidad=cantidad, **{campo: producto_id}))
+
+        ConteoInventario.objects.bulk_update(actualizar, ['cantidad', 'fecha_actualizacion'], batch_size=1000)
+        ConteoInventario.objects.bulk_create(crear, batch_size=1000)
+        return len(actualizar), len(crear)
+
+    @staticmethod
+    def get_diferencias_articulos(toma: TomaInventario, bloquear: bool = False) -> QuerySet[Articulo]:
+        """
+        Artículos cuyo conteo no coincide con stock_actual, en una consulta.
+
+        Incluye los artículos de la bodega (los no contados cuentan 0) y los
+        contados que pertenecen a otra bodega. Cada artículo trae anotado
+        ``contado``.
+
+        Args:
+            toma: Toma de una bodega
+            bloquear: Bloquea los artículos (FOR UPDATE) para aplicar ajustes
+
+        Returns:
+            QuerySet de Articulo anotado con contado
+        """
+        queryset = Articulo.objects.vivos().annotate(
+            conteo=FilteredRelation(
+                'conteos_inventario',
+                condition=Q(conteos_inventario__toma=toma, conteos_inventario__eliminado=False)
+            ),
+        ).annotate(
+            contado=Coalesce(F('conteo__cantidad'), 0)
+        ).filter(
+            Q(ubicacion_fisica=toma.bodega_id) & ~Q(contado=F('stock_actual'))
+            | ~Q(ubicacion_fisica=toma.bodega_id) & Q(conteo__id__isnull=False)
+        ).order_by('codigo')
+        if bloquear:
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
+
+    @staticmethod
+    def get_diferencias_activos(toma: TomaInventario) -> QuerySet:
+        """
+        Activos faltantes o sobrantes en la ubicación de la toma, en una consulta.
+
+        La ubicación registrada de cada activo es la de su último movimiento.
+        Faltante: registrado en la ubicación y no contado. Sobrante: contado
+        y registrado en otra ubicación (o sin ubicación).
+
+        Args:
+            toma: Toma de una ubicación
+
+        Returns:
+            QuerySet de Activo anotado con contado y ubicacion_actual_id
+        """
+        from apps.activos.models import Activo, MovimientoActivo
+
+        ubicacion_actual = MovimientoActivo.objects.vivos().filter(
+            activo=OuterRef('pk')
+        ).order_by('-fecha_creacion').values('ubicacion_destino_id')[:1]
+
+        return Activo.objects.vivos().annotate(
+            conteo=FilteredRelation(
+                'conteos_inventario',
+                condition=Q(conteos_inventario__toma=toma, conteos_inventario__eliminado=False)
+            ),
+            ubicacion_actual_id=Subquery(ubicacion_actual),
+        ).annotate(
+            contado=Coalesce(F('conteo__cantidad'), 0)
+        ).filter(
+            Q(ubicacion_actual_id=toma.ubicacion_id, contado=0)
+            | Q(conteo__id__isnull=False) & (
+                ~Q(ubicacion_actual_id=toma.ubicacion_id) | Q(ubicacion_actual_id__isnull=True)
+            )
+        ).order_by('codigo')
+
 
 # ==================== ENTREGA REPOSITORIES ====================
 
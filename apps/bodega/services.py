@@ -4,15 +4,22 @@ Service Layer para el módulo de bodega.
 Contiene la lógica de negocio y coordina los repositories,
 siguiendo el principio de Single Responsibility (SOLID).
 """
-from typing import Optional, Dict, Any, Tuple
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Optional, Dict, Any, List, Tuple
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import QuerySet, Sum
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from core.cache import cached_service
 from .models import (
     Categoria, Articulo, TipoMovimiento, Movimiento, Bodega,
     EstadoEntrega, TipoEntrega, EntregaArticulo, DetalleEntregaArticulo,
-    EntregaBien, DetalleEntregaBien
+    EntregaBien, DetalleEntregaBien, CierreInventario, ConciliacionStock, ReservaStock,
+    TomaInventario
 )
 from .repositories import (
     CategoriaRepository,
@@ -26,8 +33,45 @@ from .repositories import (
     EntregaArticuloRepository,
     DetalleEntregaArticuloRepository,
     EntregaBienRepository,
-    DetalleEntregaBienRepository
+    DetalleEntregaBienRepository,
+    CierreInventarioRepository,
+    ConciliacionStockRepository,
+    ReservaStockRepository,
+    TomaInventarioRepository,
+    ConsumoMensualRepository
 )
+from apps.notificaciones.models import TipoNotificacion
+from apps.notificaciones.services import NotificacionService
+
+
+# ==================== MENÚ SERVICE ====================
+
+class MenuBodegaService:
+    """Service con las estadísticas del menú de bodega."""
+
+    @staticmethod
+    @cached_service(
+        tags=['bodega.Articulo', 'bodega.Categoria', 'bodega.Bodega', 'bodega.Movimiento',
+              'bodega.EntregaArticulo', 'bodega.EntregaBien'],
+        ttl=120
+    )
+    def estadisticas() -> Dict[str, Any]:
+        """
+        Totales de las cards del menú de bodega (cacheados).
+
+        El stock se actualiza con UPDATE masivos que no emiten señales, por
+        eso el ttl es corto.
+        """
+        articulos = ArticuloRepository.get_all()
+        return {
+            'total_articulos': articulos.count(),
+            'total_categorias': CategoriaRepository.get_all().count(),
+            'total_movimientos': MovimientoRepository.get_all().count(),
+            'bodegas_activas': BodegaRepository.get_active().count(),
+            'stock_total': articulos.aggregate(total=Sum('stock_actual'))['total'] or 0,
+            'total_entregas_articulos': EntregaArticuloRepository.get_all().count(),
+            'total_entregas_bienes': EntregaBienRepository.get_all().count(),
+        }
 
 
 # ==================== CATEGORÍA SERVICE ====================
@@ -326,6 +370,7 @@ class MovimientoService:
         self.movimiento_repo = MovimientoRepository()
         self.articulo_repo = ArticuloRepository()
         self.tipo_repo = TipoMovimientoRepository()
+        self.operacion_repo = OperacionRepository()
 
     @transaction.atomic
     def registrar_entrada(
@@ -392,6 +437,82 @@ class MovimientoService:
 
         return movimiento
 
+    @transaction.atomic
+    def registrar_entradas_masivas(
+        self,
+        cantidades: Dict[int, int],
+        tipo: TipoMovimiento,
+        usuario: User,
+        motivo: str
+    ) -> list[Movimiento]:
+        """
+        Registra entradas de inventario para varios artículos a la vez.
+
+        Bloquea todos los artículos en una consulta, crea los movimientos
+        con un único bulk_create y actualiza el stock con un único
+        bulk_update. Esta operación es atómica: todo o nada.
+
+        Args:
+            cantidades: Dict {articulo_id: cantidad} a ingresar
+            tipo: Tipo de movimiento
+            usuario: Usuario que realiza la operación
+            motivo: Motivo común de los movimientos
+
+        Returns:
+            Lista de movimientos creados
+
+        Raises:
+            ValidationError: Si hay errores de validación
+        """
+        if not cantidades:
+            return []
+
+        if any(cantidad <= 0 for cantidad in cantidades.values()):
+            raise ValidationError('La cantidad debe ser mayor a cero.')
+
+        # Obtener operación de entrada
+        operacion_entrada = self.operacion_repo.get_entrada()
+        if not operacion_entrada:
+            raise ValidationError('No se encontró una operación de tipo ENTRADA activa.')
+
+        articulos = self.articulo_repo.get_for_update_by_ids(cantidades.keys())
+        faltantes = set(cantidades) - set(articulos)
+        if faltantes:
+            raise ValidationError(
+                f'Artículos no encontrados: {", ".join(str(i) for i in sorted(faltantes))}.'
+            )
+
+        movimientos = []
+        for articulo_id, cantidad in cantidades.items():
+            articulo = articulos[articulo_id]
+            stock_anterior = articulo.stock_actual
+            stock_nuevo = stock_anterior + cantidad
+
+            # Validar stock máximo si está definido
+            if articulo.stock_maximo and stock_nuevo > articulo.stock_maximo:
+                raise ValidationError(
+                    f'La cantidad de {articulo.codigo} excede el stock máximo permitido '
+                    f'({articulo.stock_maximo}). Stock actual: {stock_anterior}, '
+                    f'intentando agregar: {cantidad}.'
+                )
+
+            movimientos.append(Movimiento(
+                articulo=articulo,
+                tipo=tipo,
+                cantidad=cantidad,
+                operacion=operacion_entrada,
+                usuario=usuario,
+                motivo=motivo,
+                stock_antes=stock_anterior,
+                stock_despues=stock_nuevo
+            ))
+            articulo.stock_actual = stock_nuevo
+
+        self.movimiento_repo.bulk_create(movimientos)
+        self.articulo_repo.bulk_update_stock(list(articulos.values()))
+
+        return movimientos
+
     @transaction.atomic
     def registrar_salida(
         self,
@@ -513,6 +634,829 @@ class MovimientoService:
         return list(self.movimiento_repo.filter_by_articulo(articulo, limit))
 
 
+# ==================== CIERRE INVENTARIO SERVICE ====================
+
+@dataclass
+class SaldoArticulo:
+    """Stock y costo promedio ponderado de un artículo en un instante."""
+    cantidad: int
+    costo_unitario: Decimal
+
+    @property
+    def valor(self) -> Decimal:
+        """Valor del stock (cantidad por costo unitario, a 2 decimales)."""
+        return (self.cantidad * self.costo_unitario).quantize(Decimal('0.01'))
+
+
+class CierreInventarioService:
+    """
+    Service para cierres mensuales de inventario y saldos a una fecha.
+
+    El stock de un artículo en un instante se obtiene desde el cierre previo
+    más cercano sumando solo los movimientos posteriores al corte, de modo
+    que el costo queda acotado a un mes de movimientos. La valorización usa
+    costo promedio ponderado: el costo del cierre previo combinado con las
+    compras recibidas desde el corte.
+    """
+
+    def __init__(self):
+        self.repository = CierreInventarioRepository()
+        self.movimiento_repo = MovimientoRepository()
+
+    @staticmethod
+    def fecha_corte(periodo: date) -> datetime:
+        """Instante de corte de un periodo: inicio del mes siguiente (hora local)."""
+        anio, mes = (periodo.year + 1, 1) if periodo.month == 12 else (periodo.year, periodo.month + 1)
+        return timezone.make_aware(datetime(anio, mes, 1))
+
+    def saldos_a_fecha(
+        self,
+        instante: datetime,
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Dict[int, int]:
+        """
+        Calcula el stock de cada artículo en un instante.
+
+        Parte del último cierre con corte <= instante y suma los movimientos
+        entre el corte y el instante. Los artículos sin cierre previo (creados
+        después del último cierre o sin cierres en el sistema) se calculan
+        hacia atrás desde el stock actual restando los movimientos posteriores.
+
+        Args:
+            instante: Fecha/hora de referencia
+            articulos: QuerySet de artículos a considerar, None = todos los vigentes
+
+        Returns:
+            Dict {articulo_id: stock} de todos los artículos del QuerySet
+        """
+        if articulos is None:
+            articulos = Articulo.objects.vivos()
+
+        saldos: Dict[int, int] = {}
+        cierre = self.repository.get_ultimo_hasta(instante)
+        if cierre:
+            saldos = self.repository.get_cantidades(cierre, articulos)
+            delta = self.movimiento_repo.sumar_por_articulo(
+                desde=cierre.fecha_corte, hasta=instante, articulos=articulos
+            )
+            for articulo_id in saldos:
+                saldos[articulo_id] += delta.get(articulo_id, 0)
+
+        existentes = dict(articulos.values_list('id', 'stock_actual'))
+        faltantes = set(existentes) - set(saldos)
+        if faltantes:
+            ambito = articulos.filter(id__in=faltantes) if saldos else articulos
+            posteriores = self.movimiento_repo.sumar_por_articulo(desde=instante, articulos=ambito)
+            for articulo_id in faltantes:
+                saldos[articulo_id] = existentes[articulo_id] - posteriores.get(articulo_id, 0)
+
+        return saldos
+
+    def valorizar_a_fecha(
+        self,
+        instante: datetime,
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Dict[int, SaldoArticulo]:
+        """
+        Calcula stock y costo promedio ponderado de cada artículo en un instante.
+
+        El costo parte del costo del último cierre (ponderado por su stock
+        al corte) y promedia las compras recibidas entre el corte y el
+        instante. Los artículos sin cierre previo promedian todas sus
+        compras recibidas hasta el instante. Sin compras ni cierre el costo
+        es cero.
+
+        Args:
+            instante: Fecha/hora de referencia
+            articulos: QuerySet de artículos a considerar, None = todos los vigentes
+
+        Returns:
+            Dict {articulo_id: SaldoArticulo} de todos los artículos del QuerySet
+        """
+        if articulos is None:
+            articulos = Articulo.objects.vivos()
+
+        cantidades = self.saldos_a_fecha(instante, articulos)
+
+        base: Dict[int, Tuple[int, Decimal]] = {}
+        compras: Dict[int, Tuple[int, Decimal]] = {}
+        cierre = self.repository.get_ultimo_hasta(instante)
+        if cierre:
+            base = self.repository.get_costos(cierre, articulos)
+            compras = self.repository.get_compras_por_articulo(cierre.fecha_corte, instante, articulos)
+
+        sin_cierre = set(cantidades) - set(base)
+        if sin_cierre:
+            ambito = articulos.filter(id__in=sin_cierre) if base else articulos
+            compras.update(self.repository.get_compras_por_articulo(None, instante, ambito))
+
+        saldos = {}
+        cero = Decimal('0')
+        for articulo_id, cantidad in cantidades.items():
+            cantidad_base, costo_base = base.get(articulo_id, (0, cero))
+            unidades_compra, importe_compra = compras.get(articulo_id, (0, cero))
+            unidades = max(cantidad_base, 0) + unidades_compra
+            costo = costo_base
+            if unidades_compra and unidades:
+                costo = (
+                    (max(cantidad_base, 0) * costo_base + importe_compra) / unidades
+                ).quantize(Decimal('0.0001'))
+            saldos[articulo_id] = SaldoArticulo(cantidad, costo)
+        return saldos
+
+    @transaction.atomic
+    def cerrar_periodo(
+        self,
+        periodo: date,
+        usuario: Optional[User] = None,
+        reemplazar: bool = False
+    ) -> CierreInventario:
+        """
+        Registra el cierre de un mes con el stock y valor de todos los artículos.
+
+        Los periodos deben cerrarse en orden: el costo promedio de cada
+        cierre parte del cierre anterior.
+
+        Esta operación es atómica: todo o nada.
+
+        Args:
+            periodo: Cualquier fecha del mes a cerrar
+            usuario: Usuario que ejecuta el cierre
+            reemplazar: Si existe un cierre del periodo, lo reemplaza
+
+        Returns:
+            Cierre creado
+
+        Raises:
+            ValidationError: Si el mes no ha terminado o ya está cerrado
+        """
+        periodo = periodo.replace(day=1)
+        corte = self.fecha_corte(periodo)
+        if corte > timezone.now():
+            raise ValidationError(f'El periodo {periodo:%m/%Y} aún no termina.')
+
+        existente = self.repository.get_by_periodo(periodo)
+        if existente:
+            if not reemplazar:
+                raise ValidationError(f'El periodo {periodo:%m/%Y} ya está cerrado.')
+            existente.delete()
+
+        saldos = self.valorizar_a_fecha(corte)
+        return self.repository.create(
+            periodo=periodo,
+            fecha_corte=corte,
+            detalles={
+                articulo_id: (saldo.cantidad, saldo.costo_unitario, saldo.valor)
+                for articulo_id, saldo in saldos.items()
+            },
+            usuario=usuario
+        )
+
+    def periodos_pendientes(self) -> list[date]:
+        """
+        Meses terminados que aún no tienen cierre, en orden cronológico.
+
+        Comienza en el mes siguiente al último cierre o, si no hay cierres,
+        en el mes del primer movimiento registrado.
+
+        Returns:
+            Lista de periodos (primer día de cada mes)
+        """
+        ultimo = self.repository.get_ultimo()
+        if ultimo:
+            inicio = timezone.localtime(self.fecha_corte(ultimo.periodo)).date()
+        else:
+            primera = self.movimiento_repo.get_primera_fecha()
+            if not primera:
+                return []
+            inicio = timezone.localtime(primera).date().replace(day=1)
+
+        periodos = []
+        actual = timezone.localdate().replace(day=1)
+        while inicio < actual:
+            periodos.append(inicio)
+            inicio = timezone.localtime(self.fecha_corte(inicio)).date()
+        return periodos
+
+
+# ==================== CONCILIACION STOCK SERVICE ====================
+
+@dataclass
+class DiferenciaStock:
+    """Artículo cuyo stock_actual no coincide con el historial de movimientos."""
+    articulo_id: int
+    codigo: str
+    stock_actual: int
+    esperado: int
+
+    @property
+    def diferencia(self) -> int:
+        """Unidades de stock_actual que el historial no explica (positivo = sobra)."""
+        return self.stock_actual - self.esperado
+
+
+class ConciliacionStockService:
+    """
+    Service para conciliar stock_actual con el historial de movimientos.
+
+    Algunos caminos modifican el stock sin registrar Movimiento (recepciones,
+    entregas sin tipo de movimiento configurado), por lo que stock_actual
+    puede desviarse del historial. El stock esperado se calcula para todos
+    los artículos con dos consultas agrupadas sobre Movimiento.
+    """
+
+    def __init__(self):
+        self.repository = ConciliacionStockRepository()
+        self.articulo_repo = ArticuloRepository()
+        self.movimiento_repo = MovimientoRepository()
+        self.operacion_repo = OperacionRepository()
+
+    def calcular_diferencias(
+        self,
+        articulos: Optional[QuerySet[Articulo]] = None
+    ) -> Tuple[int, List[DiferenciaStock]]:
+        """
+        Compara stock_actual con el stock esperado según el historial.
+
+        Esperado = stock_antes del primer movimiento + suma con signo de
+        todos los movimientos. Los artículos sin movimientos no se revisan.
+
+        Args:
+            articulos: QuerySet de artículos a revisar, None = todos los vigentes
+
+        Returns:
+            Tupla (artículos revisados, lista de diferencias ordenada por código)
+        """
+        if articulos is None:
+            articulos = Articulo.objects.vivos()
+
+        iniciales = self.movimiento_repo.get_stock_inicial_por_articulo(articulos)
+        if not iniciales:
+            return 0, []
+        netos = self.movimiento_repo.sumar_por_articulo(articulos=articulos)
+
+        diferencias = []
+        filas = articulos.order_by('codigo').values_list('id', 'codigo', 'stock_actual')
+        for articulo_id, codigo, stock_actual in filas:
+            if articulo_id not in iniciales:
+                continue
+            esperado = iniciales[articulo_id] + netos.get(articulo_id, 0)
+            if esperado != stock_actual:
+                diferencias.append(DiferenciaStock(articulo_id, codigo, stock_actual, esperado))
+        return len(iniciales), diferencias
+
+    @transaction.atomic
+    def conciliar(
+        self,
+        incremental: bool = False,
+        reparacion: str = ConciliacionStock.Reparacion.NINGUNA,
+        usuario: Optional[User] = None,
+        tipo: Optional[TipoMovimiento] = None
+    ) -> Tuple[ConciliacionStock, List[DiferenciaStock]]:
+        """
+        Detecta y opcionalmente repara diferencias entre stock e historial.
+
+        Reparaciones:
+            AJUSTE: registra un movimiento de ajuste por la diferencia, de modo
+                que el historial explique el stock_actual (el stock no cambia).
+            STOCK: reescribe stock_actual con el valor del historial en un
+                único bulk_update (no aplica a esperados negativos).
+
+        Esta operación es atómica: todo o nada.
+
+        Args:
+            incremental: Revisa solo artículos modificados desde la última ejecución
+            reparacion: ConciliacionStock.Reparacion a aplicar ('' = solo reporte)
+            usuario: Usuario que ejecuta (requerido para AJUSTE)
+            tipo: Tipo de movimiento de los ajustes (requerido para AJUSTE)
+
+        Returns:
+            Tupla (conciliación registrada, diferencias encontradas)
+
+        Raises:
+            ValidationError: Si falta usuario/tipo para AJUSTE o la reparación no existe
+        """
+        if reparacion not in ConciliacionStock.Reparacion.values:
+            raise ValidationError(f'Reparación inválida: "{reparacion}".')
+        if reparacion == ConciliacionStock.Reparacion.AJUSTE and (usuario is None or tipo is None):
+            raise ValidationError('Los ajustes requieren usuario y tipo de movimiento.')
+
+        fecha_corte = timezone.now()
+        articulos = Articulo.objects.vivos()
+        ultima = self.repository.get_ultima() if incremental else None
+        if ultima:
+            articulos = self.repository.get_articulos_modificados_desde(ultima.fecha_corte)
+
+        revisados, diferencias = self.calcular_diferencias(articulos)
+
+        reparados = 0
+        if diferencias and reparacion:
+            # Bloquear y recalcular: el stock pudo cambiar desde la primera lectura
+            bloqueados = self.articulo_repo.get_for_update_by_ids(d.articulo_id for d in diferencias)
+            _, diferencias = self.calcular_diferencias(
+                Articulo.objects.filter(id__in=list(bloqueados))
+            )
+            if reparacion == ConciliacionStock.Reparacion.AJUSTE:
+                reparados = self._reparar_con_ajustes(diferencias, bloqueados, tipo, usuario)
+            else:
+                reparados = self._reparar_stock(diferencias, bloqueados)
+
+        conciliacion = self.repository.create(
+            fecha_corte=fecha_corte,
+            incremental=ultima is not None,
+            reparacion=reparacion,
+            articulos_revisados=revisados,
+            articulos_con_diferencia=len(diferencias),
+            articulos_reparados=reparados,
+            usuario=usuario
+        )
+        return conciliacion, diferencias
+
+    def _reparar_con_ajustes(
+        self,
+        diferencias: List[DiferenciaStock],
+        articulos: Dict[int, Articulo],
+        tipo: TipoMovimiento,
+        usuario: User
+    ) -> int:
+        """Registra con un bulk_create un movimiento de ajuste por cada diferencia."""
+        operaciones = {
+            'ENTRADA': self.operacion_repo.get_entrada(),
+            'SALIDA': self.operacion_repo.get_salida(),
+        }
+        if not all(operaciones.values()):
+            raise ValidationError('Se requieren operaciones de ENTRADA y SALIDA activas.')
+
+        self.movimiento_repo.bulk_create([
+            Movimiento(
+                articulo=articulos[d.articulo_id],
+                tipo=tipo,
+                cantidad=abs(d.diferencia),
+                operacion=operaciones['ENTRADA' if d.diferencia > 0 else 'SALIDA'],
+                usuario=usuario,
+                motivo='Ajuste por conciliación de stock',
+                stock_antes=d.esperado,
+                stock_despues=d.stock_actual
+            )
+            for d in diferencias
+        ])
+        return len(diferencias)
+
+    def _reparar_stock(
+        self,
+        diferencias: List[DiferenciaStock],
+        articulos: Dict[int, Articulo]
+    ) -> int:
+        """Reescribe stock_actual con el esperado en un único bulk_update."""
+        corregidos = []
+        for d in diferencias:
+            if d.esperado < 0:
+                continue
+            articulo = articulos[d.articulo_id]
+            articulo.stock_actual = d.esperado
+            corregidos.append(articulo)
+        self.articulo_repo.bulk_update_stock(corregidos)
+        return len(corregidos)
+
+
+# ==================== RESERVA STOCK SERVICE ====================
+
+class ReservaStockService:
+    """
+    Service para reservas de stock de solicitudes de artículos.
+
+    La reserva vigente de cada línea es cantidad_aprobada - cantidad_despachada
+    mientras la solicitud está abierta, y cero al rechazarla, cancelarla o
+    finalizarla. Cada cambio se registra en el libro ReservaStock y se aplica
+    al contador Articulo.stock_reservado, de modo que el stock disponible es
+    stock_actual - stock_reservado sin sumar solicitudes.
+    """
+
+    def __init__(self):
+        self.repository = ReservaStockRepository()
+
+    def get_reserva_detalle(self, detalle) -> int:
+        """
+        Reserva vigente de una línea de solicitud.
+
+        Args:
+            detalle: DetalleSolicitud
+
+        Returns:
+            Unidades reservadas para la línea (0 si no tiene)
+        """
+        pendientes = self.repository.get_pendientes_por_detalle(detalle_solicitud=detalle)
+        return pendientes.get(detalle.id, (None, 0))[1]
+
+    def sincronizar_solicitud(
+        self,
+        solicitud,
+        usuario: Optional[User] = None,
+        liberar: bool = False
+    ) -> list[ReservaStock]:
+        """
+        Ajusta las reservas de cada línea de artículo a su valor objetivo.
+
+        Objetivo: aprobada - despachada (mínimo 0), o 0 si se libera o la
+        solicitud está en estado final. Las líneas eliminadas con reserva
+        también se liberan. Solo registra las líneas cuya reserva cambia.
+
+        Args:
+            solicitud: Solicitud a sincronizar
+            usuario: Usuario que origina el cambio
+            liberar: Libera todas las reservas (rechazo, cancelación)
+
+        Returns:
+            Lista de cambios registrados en el libro
+        """
+        if solicitud.tipo != 'ARTICULO':
+            return []
+
+        from apps.solicitudes.models import DetalleSolicitud
+
+        liberar = liberar or solicitud.estado.es_final
+        pendientes = self.repository.get_pendientes_por_detalle(detalle_solicitud__solicitud=solicitud)
+        objetivos: Dict[int, Tuple[int, int]] = {}
+        if not liberar:
+            lineas = DetalleSolicitud.objects.vivos().filter(
+                solicitud=solicitud, articulo__isnull=False
+            ).values_list('id', 'articulo_id', 'cantidad_aprobada', 'cantidad_despachada')
+            for detalle_id, articulo_id, aprobada, despachada in lineas:
+                objetivos[detalle_id] = (articulo_id, max(aprobada - despachada, 0))
+
+        reservas = []
+        for detalle_id in sorted(set(objetivos) | set(pendientes)):
+            articulo_id, actual = pendientes.get(detalle_id, (None, 0))
+            articulo_id, objetivo = objetivos.get(detalle_id, (articulo_id, 0))
+            delta = objetivo - actual
+            if delta:
+                reservas.append(ReservaStock(
+                    articulo_id=articulo_id,
+                    detalle_solicitud_id=detalle_id,
+                    tipo=ReservaStock.Tipo.RESERVA if delta > 0 else ReservaStock.Tipo.LIBERACION,
+                    cantidad=delta,
+                    usuario=usuario
+                ))
+        return self.repository.registrar(reservas)
+
+    def consumir(
+        self,
+        detalle,
+        cantidad: int,
+        usuario: Optional[User] = None
+    ) -> Optional[ReservaStock]:
+        """
+        Consume la reserva de una línea al entregar sus artículos.
+
+        Args:
+            detalle: DetalleSolicitud entregado
+            cantidad: Cantidad entregada
+            usuario: Usuario que entrega
+
+        Returns:
+            Cambio registrado, o None si la línea no tenía reserva
+        """
+        consumo = min(int(cantidad), self.get_reserva_detalle(detalle))
+        if consumo <= 0:
+            return None
+        return self.repository.registrar([ReservaStock(
+            articulo_id=detalle.articulo_id,
+            detalle_solicitud=detalle,
+            tipo=ReservaStock.Tipo.CONSUMO,
+            cantidad=-consumo,
+            usuario=usuario
+        )])[0]
+
+
+# ==================== TOMA INVENTARIO SERVICE ====================
+
+@dataclass
+class ResultadoLecturas:
+    """Resumen de la ingesta de un lote de lecturas de códigos de barras."""
+    lecturas: int = 0
+    reconocidas: int = 0
+    conteos_actualizados: int = 0
+    conteos_creados: int = 0
+    desconocidos: List[str] = field(default_factory=list)
+    fuera_de_tipo: List[str] = field(default_factory=list)
+
+
+@dataclass
+class DiferenciaConteo:
+    """Artículo o activo cuyo conteo físico no coincide con lo registrado."""
+    producto_id: int
+    codigo: str
+    nombre: str
+    registrado: int
+    contado: int
+    fuera_de_ambito: bool = False
+
+    @property
+    def diferencia(self) -> int:
+        """Unidades contadas menos registradas (positivo = sobra)."""
+        return self.contado - self.registrado
+
+
+class TomaInventarioService:
+    """
+    Service para tomas de inventario físico.
+
+    Las lecturas se ingieren por lotes: los códigos se agrupan en memoria,
+    se resuelven contra el mapa de códigos de barras en caché y los conteos
+    se escriben con un bulk_update y un bulk_create. Las diferencias contra
+    stock_actual (bodegas) o la ubicación registrada (activos) se calculan
+    con una sola consulta y al cerrar se ajustan en bloque.
+    """
+
+    # Lecturas máximas aceptadas por lote
+    MAX_LECTURAS = 20000
+
+    def __init__(self):
+        self.repository = TomaInventarioRepository()
+        self.articulo_repo = ArticuloRepository()
+        self.movimiento_repo = MovimientoRepository()
+        self.operacion_repo = OperacionRepository()
+
+    def generar_numero(self) -> str:
+        """
+        Genera un número único para la toma.
+
+        Returns:
+            Número de toma en formato TOM-YYYYMMDD-XXX
+        """
+        prefijo = f"TOM-{timezone.localdate():%Y%m%d}"
+        ultimo = self.repository.get_ultimo_numero(prefijo)
+        secuencia = int(ultimo.split('-')[-1]) + 1 if ultimo else 1
+        return f"{prefijo}-{secuencia:03d}"
+
+    @transaction.atomic
+    def crear_toma(
+        self,
+        usuario: User,
+        bodega: Optional[Bodega] = None,
+        ubicacion=None,
+        observaciones: str = ''
+    ) -> TomaInventario:
+        """
+        Abre una toma de inventario para una bodega o una ubicación.
+
+        Args:
+            usuario: Responsable de la toma
+            bodega: Bodega cuyos artículos se cuentan
+            ubicacion: Ubicación cuyos activos se cuentan
+            observaciones: Observaciones de la toma
+
+        Returns:
+            Toma creada
+
+        Raises:
+            ValidationError: Si no se indica exactamente una de bodega/ubicación
+                o ya existe una toma abierta para ella
+        """
+        if (bodega is None) == (ubicacion is None):
+            raise ValidationError('Debe indicar una bodega o una ubicación (solo una).')
+
+        abiertas = self.repository.get_all().filter(estado=TomaInventario.Estado.ABIERTA)
+        if abiertas.filter(bodega=bodega, ubicacion=ubicacion).exists():
+            raise ValidationError(f'Ya existe una toma abierta para {bodega or ubicacion}.')
+
+        return self.repository.create(
+            numero=self.generar_numero(),
+            bodega=bodega,
+            ubicacion=ubicacion,
+            usuario=usuario,
+            observaciones=observaciones or None
+        )
+
+    def _bloquear_abierta(self, toma_id: int) -> TomaInventario:
+        """Bloquea la toma y valida que siga abierta (dentro de una transacción)."""
+        toma = self.repository.get_by_id(toma_id, bloquear=True)
+        if toma is None:
+            raise ValidationError('Toma de inventario no encontrada.')
+        if toma.estado != TomaInventario.Estado.ABIERTA:
+            raise ValidationError(f'La toma {toma.numero} está {toma.get_estado_display().lower()}.')
+        return toma
+
+    @transaction.atomic
+    def registrar_lecturas(self, toma_id: int, codigos: List[str]) -> ResultadoLecturas:
+        """
+        Ingiere un lote de códigos de barras leídos.
+
+        Cada código leído suma una unidad al conteo de su producto. Los
+        códigos que no existen o no corresponden al tipo de la toma
+        (artículo en toma de activos o viceversa) se informan y se ignoran.
+        El número de consultas no depende del tamaño del lote.
+
+        Esta operación es atómica: todo o nada.
+
+        Args:
+            toma_id: ID de la toma abierta
+            codigos: Códigos leídos, con repeticiones
+
+        Returns:
+            ResultadoLecturas con el resumen del lote
+
+        Raises:
+            ValidationError: Si la toma no está abierta o el lote excede MAX_LECTURAS
+        """
+        lecturas = Counter(c.strip() for c in codigos if c and c.strip())
+        total = sum(lecturas.values())
+        if total > self.MAX_LECTURAS:
+            raise ValidationError(f'El lote excede el máximo de {self.MAX_LECTURAS} lecturas.')
+
+        toma = self._bloquear_abierta(toma_id)
+        resultado = ResultadoLecturas(lecturas=total)
+        if not lecturas:
+            return resultado
+
+        tipo_toma = 'ACTIVO' if toma.es_de_activos else 'ARTICULO'
+        resueltos = self.repository.resolver_codigos_barras(lecturas)
+        cantidades: Dict[int, int] = {}
+        for codigo, veces in lecturas.items():
+            if codigo not in resueltos:
+                resultado.desconocidos.append(codigo)
+                continue
+            tipo_producto, producto_id = resueltos[codigo]
+            if tipo_producto != tipo_toma:
+                resultado.fuera_de_tipo.append(codigo)
+                continue
+            cantidades[producto_id] = cantidades.get(producto_id, 0) + veces
+            resultado.reconocidas += veces
+
+        if cantidades:
+            resultado.conteos_actualizados, resultado.conteos_creados = (
+                self.repository.registrar_conteos(toma, cantidades)
+            )
+        self.repository.sumar_lecturas(toma, total)
+        return resultado
+
+    def calcular_diferencias(self, toma: TomaInventario) -> List[DiferenciaConteo]:
+        """
+        Compara lo contado con lo registrado en una sola consulta.
+
+        Bodegas: artículos de la bodega cuyo conteo (0 si no se leyó) difiere
+        de stock_actual, más los leídos que pertenecen a otra bodega.
+        Ubicaciones: activos registrados en la ubicación y no leídos
+        (faltantes) y activos leídos registrados en otra parte (sobrantes).
+
+        Args:
+            toma: Toma de inventario
+
+        Returns:
+            Lista de diferencias ordenada por código
+        """
+        if toma.es_de_activos:
+            return [
+                DiferenciaConteo(
+                    activo.id, activo.codigo, activo.nombre,
+                    registrado=int(activo.ubicacion_actual_id == toma.ubicacion_id),
+                    contado=min(activo.contado, 1),
+                    fuera_de_ambito=activo.ubicacion_actual_id != toma.ubicacion_id
+                )
+                for activo in self.repository.get_diferencias_activos(toma).only('id', 'codigo', 'nombre')
+            ]
+        return [
+            DiferenciaConteo(
+                articulo.id, articulo.codigo, articulo.nombre,
+                registrado=articulo.stock_actual,
+                contado=articulo.contado,
+                fuera_de_ambito=articulo.ubicacion_fisica_id != toma.bodega_id
+            )
+            for articulo in self.repository.get_diferencias_articulos(toma).only(
+                'id', 'codigo', 'nombre', 'stock_actual', 'ubicacion_fisica'
+            )
+        ]
+
+    @transaction.atomic
+    def cerrar(
+        self,
+        toma_id: int,
+        usuario: User,
+        tipo: Optional[TipoMovimiento] = None,
+        tipo_activo=None
+    ) -> TomaInventario:
+        """
+        Cierra la toma aplicando los ajustes de sus diferencias en bloque.
+
+        Bodegas: un movimiento de ajuste por artículo de la bodega con
+        diferencia (un bulk_create) y stock_actual igual a lo contado (un
+        bulk_update). Los artículos leídos de otra bodega solo se informan.
+        Ubicaciones: los activos sobrantes se trasladan a la ubicación de la
+        toma con un MovimientoActivo cada uno (un bulk_create); los faltantes
+        solo se informan, ya que se desconoce su paradero.
+
+        Esta operación es atómica: todo o nada.
+
+        Args:
+            toma_id: ID de la toma abierta
+            usuario: Usuario que cierra la toma
+            tipo: Tipo de movimiento de los ajustes (requerido en tomas de bodega)
+            tipo_activo: TipoMovimientoActivo de los traslados (opcional)
+
+        Returns:
+            Toma cerrada con ajustes_generados
+
+        Raises:
+            ValidationError: Si la toma no está abierta o falta el tipo de movimiento
+        """
+        toma = self._bloquear_abierta(toma_id)
+        motivo = f'Ajuste por toma de inventario {toma.numero}'
+
+        if toma.es_de_activos:
+            ajustes = self._trasladar_sobrantes(toma, usuario, tipo_activo, motivo)
+        else:
+            if tipo is None:
+                raise ValidationError('Los ajustes de stock requieren un tipo de movimiento.')
+            ajustes = self._ajustar_stock(toma, usuario, tipo, motivo)
+
+        toma.estado = TomaInventario.Estado.CERRADA
+        toma.fecha_cierre = timezone.now()
+        toma.ajustes_generados = ajustes
+        toma.save(update_fields=['estado', 'fecha_cierre', 'ajustes_generados', 'fecha_actualizacion'])
+        return toma
+
+    def _ajustar_stock(
+        self,
+        toma: TomaInventario,
+        usuario: User,
+        tipo: TipoMovimiento,
+        motivo: str
+    ) -> int:
+        """Ajusta stock_actual de los artículos de la bodega a lo contado."""
+        operaciones = {
+            'ENTRADA': self.operacion_repo.get_entrada(),
+            'SALIDA': self.operacion_repo.get_salida(),
+        }
+        if not all(operaciones.values()):
+            raise ValidationError('Se requieren operaciones de ENTRADA y SALIDA activas.')
+
+        articulos = list(
+            self.repository.get_diferencias_articulos(toma, bloquear=True).filter(
+                ubicacion_fisica=toma.bodega_id
+            )
+        )
+        movimientos = []
+        for articulo in articulos:
+            diferencia = articulo.contado - articulo.stock_actual
+            movimientos.append(Movimiento(
+                articulo=articulo,
+                tipo=tipo,
+                cantidad=abs(diferencia),
+                operacion=operaciones['ENTRADA' if diferencia > 0 else 'SALIDA'],
+                usuario=usuario,
+                motivo=motivo,
+                stock_antes=articulo.stock_actual,
+                stock_despues=articulo.contado
+            ))
+            articulo.stock_actual = articulo.contado
+
+        self.movimiento_repo.bulk_create(movimientos)
+        self.articulo_repo.bulk_update_stock(articulos)
+        return len(movimientos)
+
+    def _trasladar_sobrantes(
+        self,
+        toma: TomaInventario,
+        usuario: User,
+        tipo_activo,
+        motivo: str
+    ) -> int:
+        """Registra el traslado a la ubicación de la toma de los activos sobrantes."""
+        from apps.activos.models import MovimientoActivo
+
+        sobrantes = [d for d in self.calcular_diferencias(toma) if d.fuera_de_ambito]
+        MovimientoActivo.objects.bulk_create([
+            MovimientoActivo(
+                activo_id=d.producto_id,
+                tipo_movimiento=tipo_activo,
+                ubicacion_destino_id=toma.ubicacion_id,
+                usuario_registro=usuario,
+                observaciones=motivo
+            )
+            for d in sobrantes
+        ], batch_size=500)
+        return len(sobrantes)
+
+    @transaction.atomic
+    def anular(self, toma_id: int) -> TomaInventario:
+        """
+        Anula una toma abierta sin aplicar ajustes.
+
+        Args:
+            toma_id: ID de la toma abierta
+
+        Returns:
+            Toma anulada
+
+        Raises:
+            ValidationError: Si la toma no está abierta
+        """
+        toma = self._bloquear_abierta(toma_id)
+        toma.estado = TomaInventario.Estado.ANULADA
+        toma.save(update_fields=['estado', 'fecha_actualizacion'])
+        return toma
+
+
 # ==================== ENTREGA SERVICE ====================
 
 class EntregaArticuloService:
@@ -530,6 +1474,9 @@ class EntregaArticuloService:
         self.tipo_repo = TipoEntregaRepository()
         self.movimiento_repo = MovimientoRepository()
         self.operacion_repo = OperacionRepository()
+        self.reserva_service = ReservaStockService()
+        self.notificacion_service = NotificacionService()
+        self.consumo_repo = ConsumoMensualRepository()
 
     def generar_numero_entrega(self) -> str:
         """
@@ -620,6 +1567,9 @@ class EntregaArticuloService:
             solicitud=solicitud
         )
 
+        # Consumo de la entrega para el resumen mensual: {(categoria_id, articulo_id): (cantidad, lineas)}
+        consumos: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
         # Procesar detalles y actualizar stock
         for detalle_data in detalles:
             articulo_id = detalle_data.get('articulo_id')
@@ -655,11 +1605,14 @@ class EntregaArticuloService:
                         f'No se encontró el detalle de solicitud con ID {detalle_solicitud_id}.'
                     )
 
-            # Validar stock disponible
-            if articulo.stock_actual < cantidad:
+            # Validar stock disponible (sin lo reservado para otras solicitudes)
+            disponible = articulo.stock_disponible
+            if detalle_solicitud:
+                disponible += self.reserva_service.get_reserva_detalle(detalle_solicitud)
+            if min(disponible, articulo.stock_actual) < cantidad:
                 raise ValidationError(
                     f'Stock insuficiente del artículo {articulo.codigo}. '
-                    f'Disponible: {articulo.stock_actual}, Solicitado: {cantidad}'
+                    f'Disponible: {min(disponible, articulo.stock_actual)}, Solicitado: {cantidad}'
                 )
 
             # Crear detalle de entrega
@@ -672,15 +1625,20 @@ class EntregaArticuloService:
                 detalle_solicitud=detalle_solicitud
             )
 
+            clave = (articulo.categoria_id, articulo.id)
+            cantidad_previa, lineas_previas = consumos.get(clave, (0, 0))
+            consumos[clave] = (cantidad_previa + int(cantidad), lineas_previas + 1)
+
             # Actualizar stock (restar)
             stock_anterior = articulo.stock_actual
             stock_nuevo = stock_anterior - cantidad
             self.articulo_repo.update_stock(articulo, stock_nuevo)
 
-            # Si hay detalle de solicitud, actualizar cantidad despachada
+            # Si hay detalle de solicitud, actualizar cantidad despachada y consumir su reserva
             if detalle_solicitud:
                 detalle_solicitud.cantidad_despachada += cantidad
                 detalle_solicitud.save()
+                self.reserva_service.consumir(detalle_solicitud, cantidad, entregado_por)
 
             # Registrar movimiento de salida
             tipo_mov_entrega = TipoMovimiento.objects.filter(
@@ -708,6 +1666,17 @@ class EntregaArticuloService:
                         stock_despues=stock_nuevo
                     )
 
+        self.consumo_repo.acumular(
+            mes=timezone.localdate(entrega.fecha_entrega).replace(day=1),
+            departamento_id=entrega.departamento_destino_id,
+            area_id=solicitud.area_id if solicitud else None,
+            consumos=consumos
+        )
+
+        # Los detalles actualizaron el avance de la solicitud con F(): releerlo
+        if solicitud:
+            solicitud.refresh_from_db(fields=solicitud.CAMPOS_PROGRESO)
+
         # Determinar y actualizar el estado correcto de la entrega
         estado_correcto = self._determinar_estado_entrega(entrega, solicitud)
         if estado_correcto:
@@ -715,8 +1684,18 @@ class EntregaArticuloService:
             entrega.save()
 
         # Si hay solicitud asociada, verificar si está completamente despachada
+        # y liberar lo que quede reservado si quedó en estado final
         if solicitud:
             self._verificar_y_actualizar_estado_solicitud(solicitud)
+            self.reserva_service.sincronizar_solicitud(solicitud, entregado_por)
+
+        self.notificacion_service.publicar(
+            TipoNotificacion.ENTREGA_REGISTRADA,
+            [solicitud.solicitante_id if solicitud else None, recibido_por],
+            f'Entrega de artículos {numero}',
+            f'{len(detalles)} artículo(s) entregados por {entregado_por.get_full_name() or entregado_por.username}.',
+            url=self.notificacion_service.url('bodega:entrega_articulo_detalle', entrega.pk),
+        )
 
         return entrega
 
@@ -741,29 +1720,9 @@ class EntregaArticuloService:
                 print("ADVERTENCIA: No se encontró el estado 'DESPACHADO'")
             return estado_despachado
 
-        # Si hay solicitud, verificar si la entrega es completa o parcial
-        from apps.solicitudes.models import DetalleSolicitud
-
-        detalles_solicitud = solicitud.detalles.filter(
-            eliminado=False,
-            articulo__isnull=False  # Solo artículos
-        )
-
-        # Verificar si todos los artículos están completamente despachados
-        todos_completos = True
-        alguno_parcial = False
-
-        for detalle_sol in detalles_solicitud:
-            cantidad_pendiente = detalle_sol.cantidad_aprobada - detalle_sol.cantidad_despachada
-
-            if cantidad_pendiente > 0:
-                todos_completos = False
-
-            if detalle_sol.cantidad_despachada > 0 and cantidad_pendiente > 0:
-                alguno_parcial = True
-
-        # Determinar estado según las cantidades
-        if todos_completos:
+        # Si hay solicitud, la entrega es completa cuando todas sus líneas lo están
+        # (contadores de avance de la solicitud, sin recorrer los detalles)
+        if solicitud.despacho_completo:
             # Todos los artículos fueron despachados completamente → DESPACHADO
             estado = self.estado_repo.get_despachado()
             if not estado:
@@ -786,15 +1745,8 @@ class EntregaArticuloService:
         """
         from apps.solicitudes.models import EstadoSolicitud
 
-        # Verificar si todos los detalles están completamente despachados
-        detalles = solicitud.detalles.filter(eliminado=False)
-        todos_despachados = all(
-            detalle.cantidad_despachada >= detalle.cantidad_aprobada
-            for detalle in detalles
-            if detalle.articulo  # Solo artículos
-        )
-
-        if todos_despachados:
+        # Verificar con los contadores de avance si todo está despachado
+        if solicitud.despacho_completo:
             # Buscar estado "Completado" o similar
             estado_completado = EstadoSolicitud.objects.filter(
                 es_final=True,
@@ -818,6 +1770,7 @@ class EntregaBienService:
         self.entrega_repo = EntregaBienRepository()
         self.estado_repo = EstadoEntregaRepository()
         self.tipo_repo = TipoEntregaRepository()
+        self.notificacion_service = NotificacionService()
 
     def generar_numero_entrega(self) -> str:
         """
@@ -934,6 +1887,14 @@ class EntregaBienService:
             entrega.estado = estado_correcto
             entrega.save()
 
+        self.notificacion_service.publicar(
+            TipoNotificacion.ENTREGA_REGISTRADA,
+            [solicitud.solicitante_id if solicitud else None, recibido_por],
+            f'Entrega de bienes {numero}',
+            f'{len(detalles)} bien(es) entregados por {entregado_por.get_full_name() or entregado_por.username}.',
+            url=self.notificacion_service.url('bodega:entrega_bien_detalle', entrega.pk),
+        )
+
         return entrega
 
     def _determinar_estado_entrega(self, entrega, solicitud):
@@ -957,26 +1918,9 @@ class EntregaBienService:
                 print("ADVERTENCIA: No se encontró el estado 'DESPACHADO'")
             return estado_despachado
 
-        # Si hay solicitud, verificar si la entrega es completa o parcial
-        from apps.solicitudes.models import DetalleSolicitud
-
-        detalles_solicitud = solicitud.detalles.filter(
-            eliminado=False,
-            activo__isnull=False  # Solo activos/bienes
-        )
-
-        # Verificar si todos los bienes están completamente despachados
-        todos_completos = True
-
-        for detalle_sol in detalles_solicitud:
-            cantidad_pendiente = detalle_sol.cantidad_aprobada - detalle_sol.cantidad_despachada
-
-            if cantidad_pendiente > 0:
-                todos_completos = False
-                break
-
-        # Determinar estado según las cantidades
-        if todos_completos:
+        # Si hay solicitud, la entrega es completa cuando todas sus líneas lo están
+        # (contadores de avance de la solicitud, sin recorrer los detalles)
+        if solicitud.despacho_completo:
             # Todos los bienes fueron despachados completamente → DESPACHADO
             estado = self.estado_repo.get_despachado()
             if not estado:
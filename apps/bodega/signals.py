@@ -0,0 +1,90 @@
+"""
+Señales del módulo de bodega.
+
+estado_stock_cambiado se emite cuando un artículo cruza el stock mínimo o
+el punto de reorden, después del commit de la transacción que lo provocó.
+Otros módulos (notificaciones, compras) pueden conectarse para reaccionar:
+
+    from apps.bodega.signals import estado_stock_cambiado
+
+    @receiver(estado_stock_cambiado)
+    def avisar_reorden(sender, articulo, estado_anterior, estado_nuevo, transicion, **kwargs):
+        ...
+
+estados_stock_cambiados se emite una vez por transacción con todas sus
+transiciones, para receptores que procesan el lote con consultas en bloque.
+
+También invalida el mapa de códigos de barras de las tomas de inventario
+cuando se crea, edita o elimina un artículo o activo.
+"""
+from typing import Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal
+
+from .models import Articulo, TransicionEstadoStock
+
+# Argumentos: articulo, estado_anterior, estado_nuevo, transicion
+estado_stock_cambiado = Signal()
+
+# Argumentos: transiciones (lista de TransicionEstadoStock con su articulo cargado)
+estados_stock_cambiados = Signal()
+
+
+def registrar_transiciones_estado_stock(
+    cambios: Iterable[Tuple[Articulo, str, str]]
+) -> List[TransicionEstadoStock]:
+    """
+    Registra transiciones de estado de stock y programa su señal.
+
+    Crea el log con un único bulk_create y, cuando la transacción actual se
+    confirma, emite estado_stock_cambiado por cada transición y
+    estados_stock_cambiados con el lote completo (si se revierte, no se
+    emite nada).
+
+    Args:
+        cambios: Tuplas (articulo, estado_anterior, estado_nuevo)
+
+    Returns:
+        Lista de transiciones creadas
+    """
+    transiciones = TransicionEstadoStock.objects.bulk_create([
+        TransicionEstadoStock(
+            articulo=articulo,
+            estado_anterior=anterior,
+            estado_nuevo=nuevo,
+            stock_actual=articulo.stock_actual
+        )
+        for articulo, anterior, nuevo in cambios
+    ])
+    if not transiciones:
+        return transiciones
+
+    def emitir():
+        for transicion in transiciones:
+            estado_stock_cambiado.send(
+                sender=Articulo,
+                articulo=transicion.articulo,
+                estado_anterior=transicion.estado_anterior,
+                estado_nuevo=transicion.estado_nuevo,
+                transicion=transicion,
+            )
+        estados_stock_cambiados.send(sender=Articulo, transiciones=transiciones)
+
+    transaction.on_commit(emitir)
+    return transiciones
+
+
+def _invalidar_codigos_barras(sender, instance=None, update_fields=None, **kwargs) -> None:
+    """Descarta el mapa de códigos de barras salvo en guardados parciales que no lo tocan."""
+    if update_fields is not None and 'codigo_barras' not in update_fields:
+        return
+    from .repositories import TomaInventarioRepository
+    transaction.on_commit(TomaInventarioRepository.invalidar_codigos_barras)
+
+
+post_save.connect(_invalidar_codigos_barras, sender=Articulo)
+post_delete.connect(_invalidar_codigos_barras, sender=Articulo)
+post_save.connect(_invalidar_codigos_barras, sender='activos.Activo')
+post_delete.connect(_invalidar_codigos_barras, sender='activos.Activo')
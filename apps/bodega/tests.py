@@ -0,0 +1,656 @@
+"""
+Tests de acceso a datos del módulo de bodega.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.bodega.models import (
+    Articulo, Bodega, Categoria, CierreInventario, ConciliacionStock, ConsumoMensual, EstadoEntrega,
+    Movimiento, Operacion, ReservaStock, TipoEntrega, TipoMovimiento, TomaInventario,
+    TransicionEstadoStock
+)
+from apps.bodega.repositories import (
+    ArticuloRepository, ConsumoMensualRepository, MovimientoRepository, ReservaStockRepository,
+    TomaInventarioRepository
+)
+from apps.bodega.services import (
+    CierreInventarioService, ConciliacionStockService, EntregaArticuloService, MovimientoService,
+    TomaInventarioService
+)
+from apps.bodega import views
+from apps.bodega.signals import estado_stock_cambiado
+from apps.compras.models import (
+    DetalleOrdenCompraArticulo, DetalleRecepcionArticulo, EstadoOrdenCompra, EstadoRecepcion, OrdenCompra,
+    Proveedor, RecepcionArticulo
+)
+from apps.reportes.services.bodega import ConsumoDepartamentalService
+from apps.solicitudes.models import Departamento, DetalleSolicitud, EstadoSolicitud, Solicitud, TipoSolicitud
+from apps.solicitudes.services import SolicitudService
+
+
+class IndicesParcialesMovimientoTest(TestCase):
+    """
+    Verifica con EXPLAIN que las consultas calientes de Movimiento usan los
+    índices parciales ``WHERE eliminado = false``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user('bodeguero', password='clave')
+        bodega = Bodega.objects.create(codigo='B1', nombre='Bodega', responsable=usuario)
+        categoria = Categoria.objects.create(codigo='C1', nombre='Categoría')
+        cls.articulos = Articulo.objects.bulk_create([
+            Articulo(codigo=f'A{i}', nombre=f'Artículo {i}', categoria=categoria, ubicacion_fisica=bodega)
+            for i in range(5)
+        ])
+        tipo = TipoMovimiento.objects.create(codigo='T1', nombre='Tipo')
+        operacion = Operacion.objects.create(codigo='ENT', nombre='Entrada', tipo='ENTRADA')
+        Movimiento.objects.bulk_create([
+            Movimiento(
+                articulo=cls.articulos[i % 5], tipo=tipo, operacion=operacion,
+                cantidad=Decimal('1'), usuario=usuario, motivo='Test',
+                stock_antes=Decimal('0'), stock_despues=Decimal('1'),
+                eliminado=(i % 10 == 0),
+            )
+            for i in range(200)
+        ])
+
+    def _plan(self, queryset) -> str:
+        # Con pocas filas el planner prefiere seq scan; se desactiva solo en esta transacción
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_historial_articulo_usa_indice_parcial(self):
+        """El historial por artículo debe resolverse con mov_art_fecha_vivo_idx."""
+        queryset = MovimientoRepository.filter_by_articulo(self.articulos[0])
+
+        self.assertIn('mov_art_fecha_vivo_idx', self._plan(queryset))
+
+    def test_listado_general_usa_indice_parcial(self):
+        """El listado de movimientos vigentes debe usar mov_fecha_vivo_idx."""
+        queryset = Movimiento.objects.vivos().order_by('-fecha_creacion')[:25]
+
+        self.assertIn('mov_fecha_vivo_idx', self._plan(queryset))
+
+    def test_vivos_excluye_eliminados(self):
+        """vivos() debe excluir los movimientos con borrado lógico."""
+        self.assertEqual(Movimiento.objects.vivos().count(), 180)
+        self.assertEqual(Movimiento.objects.eliminados().count(), 20)
+
+
+class EstadoStockTest(TestCase):
+    """Tests del estado de stock mantenido por el motor de movimientos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('stock', password='clave')
+        bodega = Bodega.objects.create(codigo='B2', nombre='Bodega', responsable=cls.usuario)
+        cls.categoria = Categoria.objects.create(codigo='C2', nombre='Categoría')
+        cls.bodega = bodega
+        cls.tipo = TipoMovimiento.objects.create(codigo='T2', nombre='Tipo')
+        Operacion.objects.create(codigo='ENT', nombre='Entrada', tipo='ENTRADA')
+        Operacion.objects.create(codigo='SAL', nombre='Salida', tipo='SALIDA')
+
+    def setUp(self):
+        self.articulo = Articulo.objects.create(
+            codigo='AE1', nombre='Artículo', categoria=self.categoria,
+            ubicacion_fisica=self.bodega, stock_actual=20, stock_minimo=5, punto_reorden=10
+        )
+        self.eventos = []
+        estado_stock_cambiado.connect(self._capturar)
+        self.addCleanup(estado_stock_cambiado.disconnect, self._capturar)
+
+    def _capturar(self, sender, **kwargs):
+        self.eventos.append((kwargs['estado_anterior'], kwargs['estado_nuevo']))
+
+    def test_salidas_registran_transiciones_y_eventos(self):
+        """Cruzar reorden y mínimo debe registrar transiciones y emitir señales."""
+        service = MovimientoService()
+        with self.captureOnCommitCallbacks(execute=True):
+            service.registrar_salida(self.articulo, self.tipo, 10, self.usuario, 'Consumo')
+            service.registrar_salida(self.articulo, self.tipo, 1, self.usuario, 'Consumo')
+            service.registrar_salida(self.articulo, self.tipo, 6, self.usuario, 'Consumo')
+
+        self.articulo.refresh_from_db()
+        self.assertEqual(self.articulo.estado_stock, Articulo.EstadoStock.CRITICO)
+        self.assertEqual(
+            list(TransicionEstadoStock.objects.order_by('id').values_list('estado_nuevo', 'stock_actual')),
+            [('REORDEN', 10), ('CRITICO', 3)]
+        )
+        self.assertEqual(self.eventos, [('NORMAL', 'REORDEN'), ('REORDEN', 'CRITICO')])
+        self.assertEqual(list(ArticuloRepository.get_low_stock()), [self.articulo])
+
+    def test_entradas_masivas_actualizan_estado(self):
+        """Las entradas masivas deben recalcular el estado en el bulk_update."""
+        Articulo.objects.filter(pk=self.articulo.pk).update(stock_actual=2, estado_stock='CRITICO')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MovimientoService().registrar_entradas_masivas(
+                {self.articulo.pk: 30}, self.tipo, self.usuario, 'Reposición'
+            )
+
+        self.articulo.refresh_from_db()
+        self.assertEqual(self.articulo.estado_stock, Articulo.EstadoStock.NORMAL)
+        self.assertEqual(self.eventos, [('CRITICO', 'NORMAL')])
+
+    def test_stock_critico_usa_indice(self):
+        """El listado de stock crítico debe resolverse con art_estado_stock_vivo_idx."""
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        self.assertIn('art_estado_stock_vivo_idx', ArticuloRepository.get_low_stock().explain())
+
+
+class KardexCierreTest(TestCase):
+    """Tests del kardex, saldos y valorización calculados desde cierres mensuales."""
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user('kardex', password='clave')
+        bodega = Bodega.objects.create(codigo='B3', nombre='Bodega', responsable=usuario)
+        categoria = Categoria.objects.create(codigo='C3', nombre='Categoría')
+        tipo = TipoMovimiento.objects.create(codigo='T3', nombre='Compra')
+        Operacion.objects.create(codigo='ENT', nombre='Entrada', tipo='ENTRADA')
+        Operacion.objects.create(codigo='SAL', nombre='Salida', tipo='SALIDA')
+        cls.articulo = Articulo.objects.create(
+            codigo='AK1', nombre='Artículo', categoria=categoria,
+            ubicacion_fisica=bodega, stock_actual=10, stock_minimo=0
+        )
+
+        # 10 iniciales, +5 en enero, -3 y +4 en febrero: stock final 16
+        service = MovimientoService()
+        for fecha, cantidad, metodo in [
+            (datetime(2025, 1, 15, 10), 5, service.registrar_entrada),
+            (datetime(2025, 2, 3, 9), 3, service.registrar_salida),
+            (datetime(2025, 2, 20, 16), 4, service.registrar_entrada),
+        ]:
+            movimiento = metodo(cls.articulo, tipo, cantidad, usuario, 'Prueba')
+            Movimiento.objects.filter(pk=movimiento.pk).update(fecha_creacion=timezone.make_aware(fecha))
+
+        # Compras recibidas: 5 a $100 en enero y 4 a $190 en febrero
+        cls.usuario = usuario
+        cls.bodega = bodega
+        cls.proveedor = Proveedor.objects.create(rut='76.111.111-1', razon_social='Proveedor', direccion='Calle 1')
+        cls.estado_oc = EstadoOrdenCompra.objects.create(codigo='FINALIZADA', nombre='Finalizada')
+        cls.completada = EstadoRecepcion.objects.create(codigo='COMPLETADA', nombre='Completada')
+        cls.pendiente = EstadoRecepcion.objects.create(codigo='PENDIENTE', nombre='Pendiente')
+        cls._comprar('OC-K0', date(2025, 1, 10), 5, 100, datetime(2025, 1, 12, 11))
+        cls._comprar('OC-K1', date(2025, 2, 15), 4, 190, datetime(2025, 2, 16, 11))
+
+    @classmethod
+    def _comprar(cls, numero, fecha_orden, cantidad, precio, recibida, estado=None):
+        """Crea una orden de compra y su recepción, confirmada en la fecha indicada si está completada."""
+        orden = OrdenCompra.objects.create(
+            numero=numero, fecha_orden=fecha_orden, fecha_entrega_esperada=fecha_orden,
+            proveedor=cls.proveedor, bodega_destino=cls.bodega, estado=cls.estado_oc, solicitante=cls.usuario
+        )
+        DetalleOrdenCompraArticulo.objects.create(
+            orden_compra=orden, articulo=cls.articulo, cantidad=cantidad,
+            precio_unitario=Decimal(precio), cantidad_recibida=cantidad
+        )
+        recepcion = RecepcionArticulo.objects.create(
+            numero=f'R-{numero}', orden_compra=orden, estado=estado or cls.completada,
+            recibido_por=cls.usuario, bodega=cls.bodega
+        )
+        DetalleRecepcionArticulo.objects.create(recepcion=recepcion, articulo=cls.articulo, cantidad=cantidad)
+        recibida = timezone.make_aware(recibida)
+        RecepcionArticulo.objects.filter(pk=recepcion.pk).update(
+            fecha_recepcion=recibida,
+            fecha_confirmacion=recibida if recepcion.estado == cls.completada else None
+        )
+        return recepcion
+
+    def _saldos(self, resultado):
+        return [(fila[3], fila[6], fila[7], fila[8]) for fila in resultado.rows]
+
+    def test_kardex_saldo_corrido(self):
+        """El saldo corrido debe partir del stock al inicio del período."""
+        from apps.reportes.services.bodega import KardexService
+
+        resultado = KardexService().run(date(2025, 2, 1), date(2025, 2, 28))
+
+        self.assertEqual(self._saldos(resultado), [
+            ('Saldo inicial', '', '', 15),
+            ('Compra', '', 3, 12),
+            ('Compra', 4, '', 16),
+            ('Saldo final', '', '', 16),
+        ])
+        self.assertEqual(resultado.totals['movimientos'], 2)
+
+    def test_saldos_desde_cierre(self):
+        """Con cierres registrados el saldo debe partir del último corte."""
+        service = CierreInventarioService()
+        self.assertEqual(service.periodos_pendientes()[0], date(2025, 1, 1))
+
+        cierre = service.cerrar_periodo(date(2025, 1, 1))
+        self.assertEqual(CierreInventario.objects.count(), 1)
+        self.assertEqual(service.repository.get_cantidades(cierre), {self.articulo.pk: 15})
+
+        instante = timezone.make_aware(datetime(2025, 2, 10))
+        with self.assertNumQueries(4):
+            saldos = service.saldos_a_fecha(instante)
+        self.assertEqual(saldos, {self.articulo.pk: 12})
+
+        with self.assertRaises(ValidationError):
+            service.cerrar_periodo(date(2025, 1, 1))
+
+    def test_valorizacion_desde_cierre(self):
+        """El costo promedio debe partir del cierre y sumar solo las compras posteriores."""
+        from apps.reportes.services.bodega import ValorizacionInventarioService
+
+        service = ValorizacionInventarioService()
+        sin_cierre = service.run(date(2025, 2, 28))
+        self.assertEqual(sin_cierre.rows[0][4:], [16, Decimal('140.00'), Decimal('2240.00')])
+
+        CierreInventarioService().cerrar_periodo(date(2025, 1, 1))
+        con_cierre = service.run(date(2025, 2, 28))
+
+        # Enero cierra con 15 a $100; febrero agrega 4 a $190: (1500 + 760) / 19
+        self.assertEqual(con_cierre.rows[0][4:], [16, Decimal('118.95'), Decimal('1903.16')])
+        self.assertEqual(con_cierre.filters_summary['cierre_base'], '01/2025')
+        self.assertEqual(CierreInventario.objects.get().valor_total, Decimal('1500.00'))
+
+    def test_valorizacion_usa_fecha_de_recepcion(self):
+        """Una orden antigua recibida después no cambia la valorización anterior; un borrador no cuenta."""
+        from apps.reportes.services.bodega import ValorizacionInventarioService
+
+        self._comprar('OC-K2', date(2025, 1, 20), 10, 400, datetime(2025, 3, 5, 11))
+        self._comprar('OC-K3', date(2025, 2, 1), 10, 400, datetime(2025, 2, 2, 11), estado=self.pendiente)
+
+        resultado = ValorizacionInventarioService().run(date(2025, 2, 28))
+
+        self.assertEqual(resultado.rows[0][4:], [16, Decimal('140.00'), Decimal('2240.00')])
+
+    def test_recepcion_confirmada_despues_del_cierre(self):
+        """Una recepción creada antes del corte y confirmada después entra en la ventana siguiente al cierre."""
+        from apps.reportes.services.bodega import ValorizacionInventarioService
+
+        recepcion = self._comprar(
+            'OC-K4', date(2025, 1, 20), 10, 400, datetime(2025, 1, 28, 11), estado=self.pendiente
+        )
+        service = CierreInventarioService()
+        service.cerrar_periodo(date(2025, 1, 1))
+
+        # Se confirma en febrero: el ingreso al stock y la compra quedan después del corte
+        confirmada = timezone.make_aware(datetime(2025, 2, 5, 9))
+        movimiento = MovimientoService().registrar_entrada(
+            self.articulo, TipoMovimiento.objects.get(codigo='T3'), 10, self.usuario, 'Recepción'
+        )
+        Movimiento.objects.filter(pk=movimiento.pk).update(fecha_creacion=confirmada)
+        RecepcionArticulo.objects.filter(pk=recepcion.pk).update(
+            estado=self.completada, fecha_confirmacion=confirmada
+        )
+
+        resultado = ValorizacionInventarioService().run(date(2025, 2, 28))
+
+        # 15 a $100 del cierre, 4 a $190 y 10 a $400: (1500 + 760 + 4000) / 29
+        self.assertEqual(resultado.rows[0][4:6], [26, Decimal('215.86')])
+
+
+class ConciliacionStockTest(TestCase):
+    """Tests de la conciliación entre stock_actual y el historial."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('concilia', password='clave')
+        bodega = Bodega.objects.create(codigo='B4', nombre='Bodega', responsable=cls.usuario)
+        categoria = Categoria.objects.create(codigo='C4', nombre='Categoría')
+        cls.tipo = TipoMovimiento.objects.create(codigo='AJUSTE', nombre='Ajuste')
+        Operacion.objects.create(codigo='ENT', nombre='Entrada', tipo='ENTRADA')
+        Operacion.objects.create(codigo='SAL', nombre='Salida', tipo='SALIDA')
+        cls.articulos = [
+            Articulo.objects.create(
+                codigo=f'AC{i}', nombre='Artículo', categoria=categoria,
+                ubicacion_fisica=bodega, stock_actual=10, stock_minimo=0
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        service = MovimientoService()
+        for articulo in self.articulos:
+            service.registrar_entrada(articulo, self.tipo, 5, self.usuario, 'Compra')
+            service.registrar_salida(articulo, self.tipo, 2, self.usuario, 'Consumo')
+
+        # Cambio de stock sin movimiento (como una recepción sin registro)
+        self.desviado = self.articulos[1]
+        self.desviado.stock_actual = 20
+        self.desviado.save()
+
+    def test_detecta_y_repara_con_ajustes(self):
+        """El ajuste debe hacer que el historial explique el stock actual."""
+        service = ConciliacionStockService()
+        conciliacion, diferencias = service.conciliar(
+            reparacion=ConciliacionStock.Reparacion.AJUSTE, usuario=self.usuario, tipo=self.tipo
+        )
+
+        self.assertEqual(conciliacion.articulos_revisados, 3)
+        self.assertEqual([(d.codigo, d.esperado, d.diferencia) for d in diferencias], [('AC1', 13, 7)])
+        self.assertEqual(conciliacion.articulos_reparados, 1)
+        self.desviado.refresh_from_db()
+        self.assertEqual(self.desviado.stock_actual, 20)
+        self.assertEqual(service.calcular_diferencias(), (3, []))
+
+    def test_repara_stock_desde_historial(self):
+        """La reparación STOCK debe reescribir stock_actual con el historial."""
+        ConciliacionStockService().conciliar(reparacion=ConciliacionStock.Reparacion.STOCK)
+
+        self.desviado.refresh_from_db()
+        self.assertEqual(self.desviado.stock_actual, 13)
+        self.assertEqual(Movimiento.objects.filter(articulo=self.desviado).count(), 2)
+
+    def test_incremental_revisa_solo_modificados(self):
+        """El modo incremental debe revisar solo artículos tocados desde la última ejecución."""
+        service = ConciliacionStockService()
+        service.conciliar()
+
+        MovimientoService().registrar_salida(self.articulos[2], self.tipo, 1, self.usuario, 'Consumo')
+        conciliacion, diferencias = service.conciliar(incremental=True)
+
+        self.assertTrue(conciliacion.incremental)
+        self.assertEqual(conciliacion.articulos_revisados, 1)
+        self.assertEqual(diferencias, [])
+
+
+class TomaInventarioTest(TestCase):
+    """Tests de tomas de inventario: ingesta de lecturas, diferencias y ajustes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('contador', password='clave')
+        cls.bodega = Bodega.objects.create(codigo='B5', nombre='Bodega', responsable=cls.usuario)
+        otra = Bodega.objects.create(codigo='B6', nombre='Otra', responsable=cls.usuario)
+        categoria = Categoria.objects.create(codigo='C5', nombre='Categoría')
+        cls.tipo = TipoMovimiento.objects.create(codigo='TOMA', nombre='Toma')
+        Operacion.objects.create(codigo='ENT', nombre='Entrada', tipo='ENTRADA')
+        Operacion.objects.create(codigo='SAL', nombre='Salida', tipo='SALIDA')
+        cls.articulos = [
+            Articulo.objects.create(
+                codigo=f'AT{i}', nombre='Artículo', categoria=categoria,
+                ubicacion_fisica=cls.bodega, stock_actual=3, stock_minimo=0
+            )
+            for i in range(3)
+        ]
+        cls.ajeno = Articulo.objects.create(
+            codigo='AX1', nombre='Ajeno', categoria=categoria,
+            ubicacion_fisica=otra, stock_actual=1, stock_minimo=0
+        )
+
+    def setUp(self):
+        TomaInventarioRepository.invalidar_codigos_barras()
+        self.service = TomaInventarioService()
+        self.toma = self.service.crear_toma(self.usuario, bodega=self.bodega)
+
+    def _codigos(self, articulo, veces):
+        return [articulo.codigo_barras] * veces
+
+    def test_lecturas_acumulan_conteos(self):
+        """Lotes sucesivos deben sumar al mismo conteo e informar códigos desconocidos."""
+        primero = self.service.registrar_lecturas(
+            self.toma.id, self._codigos(self.articulos[0], 2) + ['NOEXISTE']
+        )
+        segundo = self.service.registrar_lecturas(
+            self.toma.id, self._codigos(self.articulos[0], 2) + self._codigos(self.articulos[1], 3)
+        )
+
+        self.assertEqual((primero.reconocidas, primero.conteos_creados), (2, 1))
+        self.assertEqual(primero.desconocidos, ['NOEXISTE'])
+        self.assertEqual((segundo.conteos_actualizados, segundo.conteos_creados), (1, 1))
+        self.toma.refresh_from_db()
+        self.assertEqual(self.toma.lecturas, 8)
+        self.assertEqual(
+            dict(self.toma.conteos.values_list('articulo__codigo', 'cantidad')),
+            {'AT0': 4, 'AT1': 3}
+        )
+
+    def test_cerrar_ajusta_stock_en_bloque(self):
+        """El cierre debe dejar stock_actual igual a lo contado y registrar los ajustes."""
+        self.service.registrar_lecturas(
+            self.toma.id,
+            self._codigos(self.articulos[0], 5) + self._codigos(self.articulos[1], 3)
+            + self._codigos(self.ajeno, 1)
+        )
+        diferencias = self.service.calcular_diferencias(self.toma)
+        self.assertEqual(
+            [(d.codigo, d.diferencia, d.fuera_de_ambito) for d in diferencias],
+            [('AT0', 2, False), ('AT2', -3, False), ('AX1', 0, True)]
+        )
+
+        toma = self.service.cerrar(self.toma.id, self.usuario, tipo=self.tipo)
+
+        self.assertEqual((toma.estado, toma.ajustes_generados), (TomaInventario.Estado.CERRADA, 2))
+        stocks = dict(Articulo.objects.values_list('codigo', 'stock_actual'))
+        self.assertEqual(stocks, {'AT0': 5, 'AT1': 3, 'AT2': 0, 'AX1': 1})
+        self.assertEqual(
+            Movimiento.objects.filter(motivo__contains=toma.numero).count(), 2
+        )
+        with self.assertRaises(ValidationError):
+            self.service.registrar_lecturas(toma.id, ['AT0'])
+
+    def test_endpoint_acepta_volcado_de_texto(self):
+        """El endpoint debe ingerir miles de lecturas en texto plano dentro de su presupuesto."""
+        self.client.force_login(self.usuario)
+        volcado = '\n'.join(
+            articulo.codigo_barras for articulo in self.articulos for _ in range(1000)
+        )
+
+        respuesta = self.client.post(
+            reverse('bodega:ajax_toma_lecturas', args=[self.toma.id]),
+            data=volcado, content_type='text/plain'
+        )
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['reconocidas'], 3000)
+        self.assertEqual(self.toma.conteos.count(), 3)
+
+
+class SolicitudEntregaTest(TestCase):
+    """Tests de reservas de stock y avance de solicitudes al aprobar y entregar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('reserva', password='clave')
+        cls.bodega = Bodega.objects.create(codigo='B5', nombre='Bodega', responsable=cls.usuario)
+        categoria = Categoria.objects.create(codigo='C5', nombre='Categoría')
+        TipoMovimiento.objects.create(codigo='ENTREGA', nombre='Entrega')
+        Operacion.objects.create(codigo='SAL', nombre='Salida', tipo='SALIDA')
+        EstadoEntrega.objects.create(codigo='PENDIENTE', nombre='Pendiente', es_inicial=True)
+        cls.tipo_entrega = TipoEntrega.objects.create(codigo='NORMAL', nombre='Normal')
+        cls.tipo_solicitud = TipoSolicitud.objects.create(codigo='TS5', nombre='Tipo')
+        cls.pendiente = EstadoSolicitud.objects.create(codigo='PENDIENTE', nombre='Pendiente', es_inicial=True)
+        EstadoSolicitud.objects.create(codigo='APROBADA', nombre='Aprobada')
+        EstadoSolicitud.objects.create(codigo='CANCELADA', nombre='Cancelada', es_final=True)
+        cls.articulo = Articulo.objects.create(
+            codigo='AR1', nombre='Artículo', categoria=categoria,
+            ubicacion_fisica=cls.bodega, stock_actual=10, stock_minimo=0
+        )
+
+    def setUp(self):
+        self.service = SolicitudService()
+        self.solicitud = Solicitud.objects.create(
+            numero='SOL-R1', tipo='ARTICULO', tipo_solicitud=self.tipo_solicitud,
+            estado=self.pendiente, solicitante=self.usuario, bodega_origen=self.bodega,
+            fecha_requerida=date(2025, 3, 1), motivo='Actividad'
+        )
+        self.detalle = DetalleSolicitud.objects.create(
+            solicitud=self.solicitud, articulo=self.articulo, cantidad_solicitada=8
+        )
+
+    def _aprobar(self, cantidad: int) -> None:
+        self.service.aprobar_solicitud(
+            self.solicitud, self.usuario, [{'detalle_id': self.detalle.id, 'cantidad_aprobada': cantidad}]
+        )
+        self.articulo.refresh_from_db()
+
+    def _entregar(self, cantidad: int, detalle_solicitud_id=None):
+        return EntregaArticuloService().crear_entrega(
+            bodega_origen=self.bodega, tipo=self.tipo_entrega, entregado_por=self.usuario,
+            recibido_por=self.usuario, motivo='Entrega',
+            detalles=[{
+                'articulo_id': self.articulo.id, 'cantidad': cantidad,
+                'detalle_solicitud_id': detalle_solicitud_id
+            }],
+            solicitud=self.solicitud if detalle_solicitud_id else None
+        )
+
+    def test_aprobar_reserva_y_entrega_consume(self):
+        """La aprobación reserva y la entrega consume la reserva de la línea."""
+        self._aprobar(6)
+        self.assertEqual((self.articulo.stock_reservado, self.articulo.stock_disponible), (6, 4))
+
+        # Otra entrega no puede tomar lo reservado
+        with self.assertRaises(ValidationError):
+            self._entregar(5)
+
+        self._entregar(4, self.detalle.id)
+        self.articulo.refresh_from_db()
+        self.assertEqual((self.articulo.stock_actual, self.articulo.stock_reservado), (6, 2))
+        self.assertEqual(
+            list(ReservaStock.objects.order_by('id').values_list('tipo', 'cantidad')),
+            [(ReservaStock.Tipo.RESERVA, 6), (ReservaStock.Tipo.CONSUMO, -4)]
+        )
+
+    def test_cancelar_libera_y_recalcular_cuadra(self):
+        """Cancelar libera la reserva y el contador coincide con el libro."""
+        self._aprobar(6)
+        self._aprobar(3)
+        self.assertEqual(self.articulo.stock_reservado, 3)
+
+        self.service.cancelar_solicitud(self.solicitud, self.usuario, 'Sin actividad')
+        self.articulo.refresh_from_db()
+        self.assertEqual(self.articulo.stock_reservado, 0)
+
+        # Guardar el artículo no pisa el contador mantenido con F()
+        Articulo.objects.filter(pk=self.articulo.pk).update(stock_reservado=7)
+        self.articulo.nombre = 'Renombrado'
+        self.articulo.save()
+        self.assertEqual(ReservaStockRepository.recalcular_contadores(), 1)
+        self.articulo.refresh_from_db()
+        self.assertEqual(self.articulo.stock_reservado, 0)
+
+    async def test_endpoints_async_responden_igual_que_sync(self):
+        """Las variantes asíncronas de los endpoints de solicitud retornan el mismo JSON."""
+        await sync_to_async(self._aprobar)(6)
+        request = RequestFactory().get('/')
+        request.user = self.usuario
+
+        async def auser():
+            return self.usuario
+        request.auser = auser
+
+        for sincrona, asincrona in (
+            (views.obtener_articulos_solicitud, views.obtener_articulos_solicitud_async),
+            (views.obtener_bienes_solicitud, views.obtener_bienes_solicitud_async),
+        ):
+            esperado = await sync_to_async(sincrona)(request, self.solicitud.id)
+            obtenido = await asincrona(request, self.solicitud.id)
+            self.assertEqual((obtenido.status_code, obtenido.content), (esperado.status_code, esperado.content))
+
+        no_existe = await views.obtener_articulos_solicitud_async(request, 0)
+        self.assertEqual(no_existe.status_code, 404)
+
+    def test_contadores_avance_solicitud(self):
+        """Los contadores de avance siguen a las líneas y deciden el estado final."""
+        otro = DetalleSolicitud.objects.create(
+            solicitud=self.solicitud, articulo=self.articulo, cantidad_solicitada=1
+        )
+        self._aprobar(6)
+        self.solicitud.refresh_from_db()
+        # La línea aprobada en 0 ya está completa
+        self.assertEqual((self.solicitud.lineas_total, self.solicitud.lineas_completas), (2, 1))
+
+        self._entregar(4, self.detalle.id)
+        self.solicitud.refresh_from_db()
+        self.assertEqual(self.solicitud.lineas_parciales, 1)
+        self.assertEqual(self.solicitud.porcentaje_despacho, 50)
+        self.assertFalse(self.solicitud.estado.es_final)
+
+        self._entregar(2, self.detalle.id)
+        self.solicitud.refresh_from_db()
+        self.assertEqual(
+            (self.solicitud.lineas_completas, self.solicitud.lineas_parciales, self.solicitud.porcentaje_despacho),
+            (2, 0, 100)
+        )
+        self.assertTrue(self.solicitud.estado.es_final)
+
+        otro.delete()
+        self.solicitud.refresh_from_db()
+        self.assertEqual((self.solicitud.lineas_total, self.solicitud.lineas_completas), (1, 1))
+
+
+class ConsumoMensualTest(TestCase):
+    """Tests del resumen de consumo mensual y su reporte con subtotales."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('consumo', password='clave')
+        cls.bodega = Bodega.objects.create(codigo='B6', nombre='Bodega', responsable=cls.usuario)
+        cls.categoria = Categoria.objects.create(codigo='C6', nombre='Aseo')
+        TipoMovimiento.objects.create(codigo='ENTREGA', nombre='Entrega')
+        Operacion.objects.create(codigo='SAL', nombre='Salida', tipo='SALIDA')
+        EstadoEntrega.objects.create(codigo='PENDIENTE', nombre='Pendiente', es_inicial=True)
+        cls.tipo_entrega = TipoEntrega.objects.create(codigo='NORMAL', nombre='Normal')
+        cls.ciencias = Departamento.objects.create(codigo='CIE', nombre='Ciencias')
+        cls.jabon = Articulo.objects.create(
+            codigo='JAB', nombre='Jabón', categoria=cls.categoria,
+            ubicacion_fisica=cls.bodega, stock_actual=50, stock_minimo=0
+        )
+        cls.papel = Articulo.objects.create(
+            codigo='PAP', nombre='Papel', categoria=cls.categoria,
+            ubicacion_fisica=cls.bodega, stock_actual=50, stock_minimo=0
+        )
+
+    def _entregar(self, departamento, *lineas):
+        return EntregaArticuloService().crear_entrega(
+            bodega_origen=self.bodega, tipo=self.tipo_entrega, entregado_por=self.usuario,
+            recibido_por=self.usuario, motivo='Consumo', departamento_destino=departamento,
+            detalles=[{'articulo_id': articulo.id, 'cantidad': cantidad} for articulo, cantidad in lineas]
+        )
+
+    def test_entregas_acumulan_y_recalcular_cuadra(self):
+        """Cada entrega suma a su fila del mes, también sin departamento; reconstruir da el mismo resumen."""
+        self._entregar(self.ciencias, (self.jabon, 3), (self.jabon, 2), (self.papel, 1))
+        self._entregar(self.ciencias, (self.jabon, 4))
+        self._entregar(None, (self.papel, 3))
+        self._entregar(None, (self.papel, 2))
+
+        def resumen():
+            return list(ConsumoMensual.objects.values_list('departamento_id', 'articulo_id', 'cantidad', 'lineas'))
+
+        esperado = [
+            (None, self.papel.id, 5, 2),
+            (self.ciencias.id, self.jabon.id, 9, 3),
+            (self.ciencias.id, self.papel.id, 1, 1),
+        ]
+        self.assertCountEqual(resumen(), esperado)
+
+        ConsumoMensual.objects.update(cantidad=0)
+        self.assertEqual(ConsumoMensualRepository.recalcular(), 3)
+        self.assertCountEqual(resumen(), esperado)
+
+    def test_reporte_con_subtotales(self):
+        """El reporte trae detalle, subtotal por departamento y total general."""
+        self._entregar(self.ciencias, (self.jabon, 3), (self.papel, 1))
+        self._entregar(None, (self.papel, 5))
+        hoy = timezone.localdate()
+
+        report = ConsumoDepartamentalService().run(hoy, hoy, detalle='articulo', por_mes=False)
+
+        self.assertEqual(report.columns, ['Departamento', 'Área', 'Categoría', 'Artículo', 'Cantidad', 'Líneas'])
+        self.assertEqual(report.totals, {'cantidad': 9, 'lineas': 3})
+        self.assertEqual(report.rows[0], ['Ciencias', 'Sin área', 'Aseo', 'JAB - Jabón', 3, 1])
+        self.assertIn(['Ciencias', 'Total', '', '', 4, 2], report.rows)
+        self.assertIn(['Sin departamento', 'Total', '', '', 5, 1], report.rows)
+        self.assertEqual(report.rows[-1], ['Total general', '', '', '', 9, 3])
+
+        vacio = ConsumoDepartamentalService().run(date(2000, 1, 1), date(2000, 1, 31))
+        self.assertEqual((vacio.rows, vacio.totals), ([], {'cantidad': 0, 'lineas': 0}))
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -42,8 +43,20 @@ urlpatterns = [
     path('entregas/bienes/<int:pk>/', views.EntregaBienDetailView.as_view(), name='entrega_bien_detalle'),
 
     # AJAX
-    path('ajax/solicitud/<int:solicitud_id>/articulos/', views.obtener_articulos_solicitud, name='ajax_solicitud_articulos'),
-    path('ajax/solicitud/<int:solicitud_id>/bienes/', views.obtener_bienes_solicitud, name='ajax_solicitud_bienes'),
+    # Con ASYNC_VIEWS_ENABLED (despliegue ASGI) se sirven las variantes asíncronas
+    path(
+        'ajax/solicitud/<int:solicitud_id>/articulos/',
+        views.obtener_articulos_solicitud_async if settings.ASYNC_VIEWS_ENABLED else views.obtener_articulos_solicitud,
+        name='ajax_solicitud_articulos'
+    ),
+    path(
+        'ajax/solicitud/<int:solicitud_id>/bienes/',
+        views.obtener_bienes_solicitud_async if settings.ASYNC_VIEWS_ENABLED else views.obtener_bienes_solicitud,
+        name='ajax_solicitud_bienes'
+    ),
+    path('ajax/tomas/<int:toma_id>/lecturas/', views.registrar_lecturas_toma, name='ajax_toma_lecturas'),
+    path('ajax/tomas/<int:toma_id>/diferencias/', views.obtener_diferencias_toma, name='ajax_toma_diferencias'),
+    path('ajax/tomas/<int:toma_id>/cerrar/', views.cerrar_toma, name='ajax_toma_cerrar'),
 
     # ==================== MANTENEDORES ====================
 
@@ -11,8 +11,9 @@ Implementa las mejores prácticas con CBVs siguiendo SOLID y DRY:
 - Paginación automática
 - Auditoría automática
 """
+import json
 from typing import Any, Optional
-from django.db.models import QuerySet, Q, Sum, Count
+from django.db.models import QuerySet, Q, Count
 from django.urls import reverse_lazy
 from django.views.generic import (
     TemplateView, ListView, DetailView, CreateView, UpdateView, DeleteView
@@ -23,7 +24,9 @@ from django.core.exceptions import ValidationError
 from django.http import JsonResponse, HttpResponse, HttpResponse
 from django.shortcuts import redirect
 from django.views.decorators.http import require_http_methods
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, permission_required
+from core.utils import json_response_con_etag
+from core.instrumentation import query_budget
 from core.mixins import (
     BaseAuditedViewMixin, AtomicTransactionMixin, SoftDeleteMixin,
     PaginatedListMixin, FilteredListMixin
@@ -41,12 +44,11 @@ from .forms import (
 from .repositories import (
     BodegaRepository, CategoriaRepository, MarcaRepository,
     ArticuloRepository, OperacionRepository, TipoMovimientoRepository,
-    MovimientoRepository, EntregaArticuloRepository, EntregaBienRepository,
-    EstadoEntregaRepository, TipoEntregaRepository
+    EstadoEntregaRepository, TipoEntregaRepository, TomaInventarioRepository
 )
 from .services import (
-    CategoriaService, ArticuloService, MovimientoService,
-    EntregaArticuloService, EntregaBienService
+    MenuBodegaService, CategoriaService, ArticuloService, MovimientoService,
+    EntregaArticuloService, EntregaBienService, ReservaStockService, TomaInventarioService
 )
 from apps.bodega.excel_services.importacion_excel import ImportacionExcelService
 
@@ -67,26 +69,8 @@ class MenuBodegaView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
 
-        # Usar repositories para obtener estadísticas
-        articulo_repo = ArticuloRepository()
-        categoria_repo = CategoriaRepository()
-        bodega_repo = BodegaRepository()
-        movimiento_repo = MovimientoRepository()
-        entrega_articulo_repo = EntregaArticuloRepository()
-        entrega_bien_repo = EntregaBienRepository()
-
-        # Estadísticas para el módulo de bodega
-        context['stats'] = {
-            'total_articulos': articulo_repo.get_all().count(),
-            'total_categorias': categoria_repo.get_all().count(),
-            'total_movimientos': movimiento_repo.get_all().count(),
-            'bodegas_activas': bodega_repo.get_active().count(),
-            'stock_total': articulo_repo.get_all().aggregate(
-                total=Sum('stock_actual')
-            )['total'] or 0,
-            'total_entregas_articulos': entrega_articulo_repo.get_all().count(),
-            'total_entregas_bienes': entrega_bien_repo.get_all().count(),
-        }
+        # Estadísticas para el módulo de bodega (cacheadas por tags)
+        context['stats'] = MenuBodegaService.estadisticas()
 
         # Permisos del usuario
         context['permisos'] = {
@@ -445,10 +429,9 @@ class ArticuloListView(BaseAuditedViewMixin, PaginatedListMixin, ListView):
         context = super().get_context_data(**kwargs)
         context['titulo'] = 'Artículos'
 
-        # Agregar categorías y bodegas directamente
-        from apps.bodega.models import Categoria as CategoriaModel, Bodega as BodegaModel
-        context['categorias'] = CategoriaModel.objects.filter(activo=True, eliminado=False).order_by('nombre')
-        context['bodegas'] = BodegaModel.objects.filter(activo=True, eliminado=False).order_by('nombre')
+        # Catálogos de los filtros (cacheados hasta que cambie una categoría o bodega)
+        context['categorias'] = CategoriaRepository.opciones_activas()
+        context['bodegas'] = BodegaRepository.opciones_activas()
 
         return context
 
@@ -869,6 +852,7 @@ class EntregaArticuloCreateView(BaseAuditedViewMixin, AtomicTransactionMixin, Cr
                     if self.object.solicitud.estado.codigo != 'DESPACHADA':
                         self.object.solicitud.estado = estado_despachada
                         self.object.solicitud.save()
+                        ReservaStockService().sincronizar_solicitud(self.object.solicitud, self.request.user)
                         print(f"DEBUG: Solicitud {self.object.solicitud.numero} actualizada a estado 'Despachada'")
                 except EstadoSolicitud.DoesNotExist:
                     print("ERROR: No se encontró el estado 'DESPACHADA' para solicitudes")
@@ -1046,6 +1030,7 @@ class EntregaBienCreateView(BaseAuditedViewMixin, AtomicTransactionMixin, Create
                     if self.object.solicitud.estado.codigo != 'DESPACHADA':
                         self.object.solicitud.estado = estado_despachada
                         self.object.solicitud.save()
+                        ReservaStockService().sincronizar_solicitud(self.object.solicitud, self.request.user)
                         print(f"DEBUG: Solicitud {self.object.solicitud.numero} actualizada a estado 'Despachada'")
                 except EstadoSolicitud.DoesNotExist:
                     print("ERROR: No se encontró el estado 'DESPACHADA' para solicitudes")
@@ -1101,64 +1086,128 @@ class EntregaBienDetailView(BaseAuditedViewMixin, DetailView):
 
 # ==================== ENDPOINTS AJAX ====================
 
+def _respuesta_articulos_solicitud(request, filas: list) -> HttpResponse:
+    """
+    Arma la respuesta JSON de artículos de una solicitud desde las filas de
+    ``valores_con_detalles`` (compartida por las variantes sync y async).
+    """
+    if not filas:
+        return JsonResponse({
+            'success': False,
+            'error': 'Solicitud no encontrada'
+        }, status=404)
+
+    articulos_data = []
+    for fila in filas:
+        if fila['linea__articulo_id'] is None:  # Solo artículos (no activos)
+            continue
+
+        # Disponible para esta línea: stock libre más su propia reserva
+        pendiente = max(fila['linea__cantidad_aprobada'] - fila['linea__cantidad_despachada'], 0)
+        stock_actual = int(fila['linea__articulo__stock_actual'])
+        stock_reservado = int(fila['linea__articulo__stock_reservado'])
+
+        # Mostrar TODOS los artículos, no solo los pendientes
+        articulos_data.append({
+            'detalle_solicitud_id': fila['linea__id'],
+            'articulo_id': fila['linea__articulo_id'],
+            'articulo_codigo': fila['linea__articulo__codigo'],
+            'articulo_nombre': fila['linea__articulo__nombre'],
+            'categoria': fila['linea__articulo__categoria__nombre'],
+            'unidad_medida': fila['linea__articulo__unidad_medida__simbolo'] or 'unidad',
+            'stock_actual': stock_actual,
+            'stock_reservado': stock_reservado,
+            'stock_disponible': int(min(stock_actual, stock_actual - stock_reservado + pendiente)),
+            'cantidad_solicitada': int(fila['linea__cantidad_solicitada']),
+            'cantidad_aprobada': int(fila['linea__cantidad_aprobada']),
+            'cantidad_despachada': int(fila['linea__cantidad_despachada']),
+            'cantidad_pendiente': float(fila['linea__cantidad_aprobada'] - fila['linea__cantidad_despachada']),
+            'observaciones': fila['linea__observaciones'] or ''
+        })
+
+    solicitud_data = _cabecera_solicitud(filas[0])
+    solicitud_data['bodega_origen_id'] = filas[0]['bodega_origen_id']
+
+    return json_response_con_etag(request, {
+        'success': True,
+        'solicitud': solicitud_data,
+        'articulos': articulos_data
+    })
+
+
+def _respuesta_bienes_solicitud(request, filas: list) -> HttpResponse:
+    """
+    Arma la respuesta JSON de bienes de una solicitud desde las filas de
+    ``valores_con_detalles`` (compartida por las variantes sync y async).
+    """
+    if not filas:
+        return JsonResponse({
+            'success': False,
+            'error': 'Solicitud no encontrada'
+        }, status=404)
+
+    bienes_data = []
+    for fila in filas:
+        if fila['linea__activo_id'] is None:  # Solo activos (no artículos)
+            continue
+
+        # Mostrar TODOS los bienes, no solo los pendientes
+        bienes_data.append({
+            'detalle_solicitud_id': fila['linea__id'],
+            'activo_id': fila['linea__activo_id'],
+            'activo_codigo': fila['linea__activo__codigo'],
+            'activo_nombre': fila['linea__activo__nombre'],
+            'categoria': fila['linea__activo__categoria__nombre'] or '-',
+            'cantidad_solicitada': int(fila['linea__cantidad_solicitada']),
+            'cantidad_aprobada': int(fila['linea__cantidad_aprobada']),
+            'cantidad_despachada': int(fila['linea__cantidad_despachada']),
+            'cantidad_pendiente': int(fila['linea__cantidad_aprobada'] - fila['linea__cantidad_despachada']),
+            'observaciones': fila['linea__observaciones'] or ''
+        })
+
+    return json_response_con_etag(request, {
+        'success': True,
+        'solicitud': _cabecera_solicitud(filas[0]),
+        'bienes': bienes_data
+    })
+
+
 @login_required
 @require_http_methods(["GET"])
+@query_budget(4)
 def obtener_articulos_solicitud(request, solicitud_id):
     """
     Endpoint AJAX para obtener los artículos de una solicitud.
 
     Retorna los artículos con cantidades solicitadas, aprobadas y despachadas.
     Permite al usuario ver qué artículos puede entregar y en qué cantidades.
+    Cabecera y líneas se leen en una sola consulta y la respuesta incluye
+    ETag para revalidación.
     """
     try:
-        from apps.solicitudes.models import Solicitud, DetalleSolicitud
-
-        solicitud = Solicitud.objects.prefetch_related(
-            'detalles__articulo__categoria'
-        ).get(id=solicitud_id, tipo='ARTICULO', eliminado=False)
-
-        articulos_data = []
-        for detalle in solicitud.detalles.filter(eliminado=False):
-            if detalle.articulo:  # Solo artículos (no activos)
-                # Calcular cantidad pendiente de despacho
-                cantidad_pendiente = float(detalle.cantidad_aprobada - detalle.cantidad_despachada)
-
-                # Mostrar TODOS los artículos, no solo los pendientes
-                # Obtener unidad de medida (ForeignKey)
-                unidad_medida = detalle.articulo.unidad_medida.simbolo if detalle.articulo.unidad_medida else 'unidad'
-
-                articulos_data.append({
-                    'detalle_solicitud_id': detalle.id,
-                    'articulo_id': detalle.articulo.id,
-                    'articulo_codigo': detalle.articulo.codigo,
-                    'articulo_nombre': detalle.articulo.nombre,
-                    'categoria': detalle.articulo.categoria.nombre,
-                    'unidad_medida': unidad_medida,  # Campo esperado por JavaScript
-                    'stock_actual': int(detalle.articulo.stock_actual),
-                    'cantidad_solicitada': int(detalle.cantidad_solicitada),
-                    'cantidad_aprobada': int(detalle.cantidad_aprobada),
-                    'cantidad_despachada': int(detalle.cantidad_despachada),
-                    'cantidad_pendiente': cantidad_pendiente,
-                    'observaciones': detalle.observaciones or ''
-                })
+        from apps.solicitudes.repositories import SolicitudRepository
 
-        return JsonResponse({
-            'success': True,
-            'solicitud': {
-                'numero': solicitud.numero,
-                'solicitante': solicitud.solicitante.get_full_name() or solicitud.solicitante.username,
-                'departamento': solicitud.departamento.nombre if solicitud.departamento else solicitud.area_solicitante,
-                'motivo': solicitud.motivo,
-                'bodega_origen_id': solicitud.bodega_origen.id if solicitud.bodega_origen else None
-            },
-            'articulos': articulos_data
-        })
+        filas = list(SolicitudRepository.valores_con_detalles(solicitud_id, 'ARTICULO'))
+        return _respuesta_articulos_solicitud(request, filas)
 
-    except Solicitud.DoesNotExist:
+    except Exception as e:
         return JsonResponse({
             'success': False,
-            'error': 'Solicitud no encontrada'
-        }, status=404)
+            'error': str(e)
+        }, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+@query_budget(4)
+async def obtener_articulos_solicitud_async(request, solicitud_id):
+    """Variante asíncrona de obtener_articulos_solicitud (ORM asíncrono, despliegue ASGI)."""
+    try:
+        from apps.solicitudes.repositories import SolicitudRepository
+
+        filas = [fila async for fila in SolicitudRepository.valores_con_detalles(solicitud_id, 'ARTICULO')]
+        return _respuesta_articulos_solicitud(request, filas)
+
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -1167,56 +1216,39 @@ def obtener_articulos_solicitud(request, solicitud_id):
 
 
 @login_required
+@query_budget(4)
 def obtener_bienes_solicitud(request, solicitud_id):
     """
     Endpoint AJAX para obtener los bienes/activos de una solicitud.
 
     Retorna los bienes con cantidades solicitadas, aprobadas y despachadas.
     Permite al usuario ver qué bienes puede entregar y en qué cantidades.
+    Cabecera y líneas se leen en una sola consulta y la respuesta incluye
+    ETag para revalidación.
     """
     try:
-        from apps.solicitudes.models import Solicitud, DetalleSolicitud
-
-        solicitud = Solicitud.objects.prefetch_related(
-            'detalles__activo__categoria'
-        ).get(id=solicitud_id, tipo='ACTIVO', eliminado=False)
-
-        bienes_data = []
-        for detalle in solicitud.detalles.filter(eliminado=False):
-            if detalle.activo:  # Solo activos (no artículos)
-                # Calcular cantidad pendiente de despacho
-                cantidad_pendiente = int(detalle.cantidad_aprobada - detalle.cantidad_despachada)
-
-                # Mostrar TODOS los bienes, no solo los pendientes
-                bienes_data.append({
-                    'detalle_solicitud_id': detalle.id,
-                    'activo_id': detalle.activo.id,
-                    'activo_codigo': detalle.activo.codigo,
-                    'activo_nombre': detalle.activo.nombre,
-                    'categoria': detalle.activo.categoria.nombre if detalle.activo.categoria else '-',
-                    'cantidad_solicitada': int(detalle.cantidad_solicitada),
-                    'cantidad_aprobada': int(detalle.cantidad_aprobada),
-                    'cantidad_despachada': int(detalle.cantidad_despachada),
-                    'cantidad_pendiente': cantidad_pendiente,
-                    'observaciones': detalle.observaciones or ''
-                })
+        from apps.solicitudes.repositories import SolicitudRepository
 
-        return JsonResponse({
-            'success': True,
-            'solicitud': {
-                'numero': solicitud.numero,
-                'solicitante': solicitud.solicitante.get_full_name() or solicitud.solicitante.username,
-                'departamento': solicitud.departamento.nombre if solicitud.departamento else solicitud.area_solicitante,
-                'motivo': solicitud.motivo
-            },
-            'bienes': bienes_data
-        })
+        filas = list(SolicitudRepository.valores_con_detalles(solicitud_id, 'ACTIVO'))
+        return _respuesta_bienes_solicitud(request, filas)
 
-    except Solicitud.DoesNotExist:
+    except Exception as e:
         return JsonResponse({
             'success': False,
-            'error': 'Solicitud no encontrada'
-        }, status=404)
+            'error': str(e)
+        }, status=500)
+
+
+@login_required
+@query_budget(4)
+async def obtener_bienes_solicitud_async(request, solicitud_id):
+    """Variante asíncrona de obtener_bienes_solicitud (ORM asíncrono, despliegue ASGI)."""
+    try:
+        from apps.solicitudes.repositories import SolicitudRepository
+
+        filas = [fila async for fila in SolicitudRepository.valores_con_detalles(solicitud_id, 'ACTIVO')]
+        return _respuesta_bienes_solicitud(request, filas)
+
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -1224,6 +1256,140 @@ def obtener_bienes_solicitud(request, solicitud_id):
         }, status=500)
 
 
+def _cabecera_solicitud(fila: dict) -> dict:
+    """
+    Arma la cabecera de solicitud desde una fila de ``valores_con_detalles``.
+
+    Args:
+        fila: Diccionario con los campos de cabecera de la solicitud
+
+    Returns:
+        dict: Número, solicitante, departamento y motivo
+    """
+    nombre_completo = f"{fila['solicitante__first_name']} {fila['solicitante__last_name']}".strip()
+    return {
+        'numero': fila['numero'],
+        'solicitante': nombre_completo or fila['solicitante__username'],
+        'departamento': fila['departamento__nombre'] or fila['area__nombre'],
+        'motivo': fila['motivo'],
+    }
+
+
+# ==================== TOMAS DE INVENTARIO (AJAX) ====================
+
+def _diferencia_json(diferencia) -> dict:
+    """Serializa una DiferenciaConteo para las respuestas JSON."""
+    return {
+        'id': diferencia.producto_id,
+        'codigo': diferencia.codigo,
+        'nombre': diferencia.nombre,
+        'registrado': diferencia.registrado,
+        'contado': diferencia.contado,
+        'diferencia': diferencia.diferencia,
+        'fuera_de_ambito': diferencia.fuera_de_ambito,
+    }
+
+
+@login_required
+@permission_required('bodega.change_tomainventario', raise_exception=True)
+@require_http_methods(["POST"])
+@query_budget(16)
+def registrar_lecturas_toma(request, toma_id):
+    """
+    Endpoint AJAX para ingerir un lote de lecturas de códigos de barras.
+
+    Acepta JSON ``{"codigos": ["...", ...]}`` o texto plano con un código
+    por línea (volcado de un lector). Los códigos repetidos suman unidades.
+    El número de consultas es constante sin importar el tamaño del lote.
+    """
+    if request.content_type == 'application/json':
+        try:
+            codigos = json.loads(request.body or b'{}').get('codigos', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'JSON inválido'}, status=400)
+        if not isinstance(codigos, list):
+            return JsonResponse({'success': False, 'error': '"codigos" debe ser una lista'}, status=400)
+        codigos = [str(codigo) for codigo in codigos]
+    else:
+        codigos = request.body.decode('utf-8', errors='replace').splitlines()
+
+    try:
+        resultado = TomaInventarioService().registrar_lecturas(toma_id, codigos)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': e.messages[0]}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'lecturas': resultado.lecturas,
+        'reconocidas': resultado.reconocidas,
+        'conteos_actualizados': resultado.conteos_actualizados,
+        'conteos_creados': resultado.conteos_creados,
+        'desconocidos': resultado.desconocidos,
+        'fuera_de_tipo': resultado.fuera_de_tipo,
+    })
+
+
+@login_required
+@permission_required('bodega.view_tomainventario', raise_exception=True)
+@require_http_methods(["GET"])
+@query_budget(6)
+def obtener_diferencias_toma(request, toma_id):
+    """
+    Endpoint AJAX con las diferencias entre lo contado y lo registrado.
+
+    Las diferencias se calculan en una sola consulta (ver
+    TomaInventarioService.calcular_diferencias).
+    """
+    toma = TomaInventarioRepository.get_by_id(toma_id)
+    if toma is None:
+        return JsonResponse({'success': False, 'error': 'Toma no encontrada'}, status=404)
+
+    diferencias = TomaInventarioService().calcular_diferencias(toma)
+    return JsonResponse({
+        'success': True,
+        'toma': {
+            'numero': toma.numero,
+            'estado': toma.estado,
+            'ambito': str(toma.bodega or toma.ubicacion),
+            'lecturas': toma.lecturas,
+        },
+        'diferencias': [_diferencia_json(d) for d in diferencias],
+    })
+
+
+@login_required
+@permission_required('bodega.change_tomainventario', raise_exception=True)
+@require_http_methods(["POST"])
+def cerrar_toma(request, toma_id):
+    """
+    Endpoint AJAX para cerrar una toma y generar sus ajustes en bloque.
+
+    Parámetros POST: ``tipo_movimiento`` (ID de TipoMovimiento, tomas de
+    bodega) y opcionalmente ``tipo_movimiento_activo`` (tomas de activos).
+    """
+    from apps.activos.models import TipoMovimientoActivo
+
+    tipo = tipo_activo = None
+    if request.POST.get('tipo_movimiento'):
+        tipo = TipoMovimiento.objects.vivos().filter(id=request.POST['tipo_movimiento']).first()
+    if request.POST.get('tipo_movimiento_activo'):
+        tipo_activo = TipoMovimientoActivo.objects.vivos().filter(
+            id=request.POST['tipo_movimiento_activo']
+        ).first()
+
+    try:
+        toma = TomaInventarioService().cerrar(toma_id, request.user, tipo=tipo, tipo_activo=tipo_activo)
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': e.messages[0]}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'numero': toma.numero,
+        'estado': toma.estado,
+        'ajustes_generados': toma.ajustes_generados,
+    })
+
+
 # ==================== VISTAS MANTENEDORES: MARCA ====================
 
 
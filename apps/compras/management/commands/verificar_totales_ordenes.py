@@ -0,0 +1,61 @@
+"""
+Comando de management para verificar los totales de las órdenes de compra.
+
+Recalcula en bloque subtotal, impuesto y total de todas las órdenes a partir
+de sus detalles y reporta las que no coinciden con los montos almacenados.
+
+Ejecutar:
+    python manage.py verificar_totales_ordenes
+    python manage.py verificar_totales_ordenes --reparar
+"""
+from django.core.management.base import BaseCommand
+
+from apps.compras.services import OrdenCompraService
+
+
+class Command(BaseCommand):
+    help = 'Verifica (y opcionalmente repara) los totales de las órdenes de compra'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reparar',
+            action='store_true',
+            help='Corrige los totales de las órdenes con diferencias',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tamaño de lote para lectura y actualización (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        reparar = options['reparar']
+        self.stdout.write('[+] Verificando totales de órdenes de compra...')
+
+        diferencias = OrdenCompraService().verificar_totales(
+            reparar=reparar,
+            batch_size=options['batch_size'],
+        )
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('[+] Todas las órdenes tienen totales consistentes'))
+            return
+
+        for item in diferencias:
+            almacenado = item['almacenado']
+            calculado = item['calculado']
+            self.stdout.write(
+                f"  [!] {item['orden'].numero}: "
+                f"subtotal {almacenado['subtotal']} -> {calculado['subtotal']}, "
+                f"impuesto {almacenado['impuesto']} -> {calculado['impuesto']}, "
+                f"total {almacenado['total']} -> {calculado['total']}"
+            )
+
+        if reparar:
+            self.stdout.write(self.style.SUCCESS(f'\n[+] Órdenes reparadas: {len(diferencias)}'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'\n[!] Órdenes con diferencias: {len(diferencias)} '
+                '(use --reparar para corregirlas)'
+            ))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:46
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices creados con CONCURRENTLY para no bloquear escrituras en tablas grandes
+    atomic = False
+
+    dependencies = [
+        ('bodega', '0009_indices_parciales_vivos'),
+        ('compras', '0004_alter_detalleordencompra_cantidad_and_more'),
+        ('solicitudes', '0009_indices_parciales_vivos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ordencompra',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['-fecha_orden', '-numero'], name='oc_fecha_vivo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ordencompra',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['proveedor', '-fecha_orden'], name='oc_prov_fecha_vivo_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:12
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+
+
+def poblar_fecha_confirmacion(apps, schema_editor):
+    """
+    Asigna la fecha de confirmación a las recepciones completadas existentes.
+
+    Usa el primer movimiento de entrada de la recepción (motivo
+    'Recepción <número>'); sin movimiento, la última actualización.
+    """
+    RecepcionArticulo = apps.get_model('compras', 'RecepcionArticulo')
+    Movimiento = apps.get_model('bodega', 'Movimiento')
+    entrada = Movimiento.objects.filter(
+        motivo=Concat(Value('Recepción '), OuterRef('numero'))
+    ).order_by().values('motivo').annotate(primera=Min('fecha_creacion')).values('primera')[:1]
+    RecepcionArticulo.objects.filter(estado__codigo='COMPLETADA', fecha_confirmacion__isnull=True).update(
+        fecha_confirmacion=Coalesce(Subquery(entrada), 'fecha_actualizacion')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bodega', '0016_consumo_mensual'),
+        ('compras', '0005_indices_parciales_vivos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recepcionarticulo',
+            name='fecha_confirmacion',
+            field=models.DateTimeField(blank=True, help_text='Instante en que la recepción ingresó al stock', null=True, verbose_name='Fecha de Confirmación'),
+        ),
+        migrations.RunPython(poblar_fecha_confirmacion, migrations.RunPython.noop),
+    ]
@@ -172,6 +172,19 @@ class OrdenCompra(BaseModel):
         verbose_name = 'Orden de Compra'
         verbose_name_plural = 'Órdenes de Compra'
         ordering = ['-fecha_orden', '-numero']
+        indexes = [
+            # Listado general y por proveedor (solo no eliminadas)
+            models.Index(
+                fields=['-fecha_orden', '-numero'],
+                name='oc_fecha_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+            models.Index(
+                fields=['proveedor', '-fecha_orden'],
+                name='oc_prov_fecha_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+        ]
         permissions = [
             ('aprobar_ordencompra', 'Puede aprobar órdenes de compra'),
             ('rechazar_ordencompra', 'Puede rechazar órdenes de compra'),
@@ -451,8 +464,10 @@ class RecepcionArticulo(RecepcionBase):
     """
     Modelo para gestionar recepciones de artículos de bodega.
 
-    Hereda de RecepcionBase (DRY) y agrega solo el campo específico 'bodega'.
-    Permite registrar la entrada de artículos a una bodega específica.
+    Hereda de RecepcionBase (DRY) y agrega la bodega de destino y la fecha de
+    confirmación. Permite registrar la entrada de artículos a una bodega
+    específica; fecha_recepcion es la creación del borrador y
+    fecha_confirmacion el ingreso al stock.
     """
 
     bodega = models.ForeignKey(
@@ -461,6 +476,12 @@ class RecepcionArticulo(RecepcionBase):
         related_name='recepciones_articulos',
         verbose_name='Bodega'
     )
+    fecha_confirmacion = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Fecha de Confirmación',
+        help_text='Instante en que la recepción ingresó al stock'
+    )
 
     class Meta:
         db_table = 'tba_compras_recepcion_articulo'
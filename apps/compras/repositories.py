@@ -4,9 +4,14 @@ Repository Pattern para el módulo de compras.
 Separa la lógica de acceso a datos de la lógica de negocio,
 siguiendo el principio de Inversión de Dependencias (SOLID).
 """
+from datetime import date
 from typing import Optional
 from decimal import Decimal
-from django.db.models import QuerySet, Q, Sum
+from django.db.models import (
+    QuerySet, Q, F, Sum, OuterRef, Subquery, Value, DecimalField, CharField,
+    IntegerField, FilteredRelation
+)
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from .models import (
     Proveedor, EstadoOrdenCompra, OrdenCompra,
@@ -170,6 +175,20 @@ class OrdenCompraRepository:
             'proveedor', 'bodega_destino', 'estado'
         ).order_by('-fecha_orden')
 
+    @staticmethod
+    def get_atrasadas(hoy: date) -> QuerySet[OrdenCompra]:
+        """
+        Órdenes abiertas cuya fecha de entrega esperada ya pasó.
+
+        Solo trae las columnas necesarias para avisar al solicitante.
+        """
+        return OrdenCompra.objects.vivos().filter(
+            fecha_entrega_esperada__lt=hoy,
+            solicitante__isnull=False,
+        ).exclude(
+            estado__codigo__in=['RECIBIDA', 'CANCELADA', 'CERRADA']
+        ).values_list('id', 'numero', 'fecha_entrega_esperada', 'solicitante_id')
+
     @staticmethod
     def exists_by_numero(numero: str, exclude_id: Optional[int] = None) -> bool:
         """Verifica si existe una orden con el número dado."""
@@ -188,6 +207,138 @@ class OrdenCompraRepository:
             'proveedor', 'bodega_destino', 'estado', 'solicitante'
         ).order_by('-fecha_orden')
 
+    @staticmethod
+    def with_subtotal_detalles(
+        queryset: Optional[QuerySet[OrdenCompra]] = None
+    ) -> QuerySet[OrdenCompra]:
+        """
+        Anota en cada orden el subtotal calculado desde sus detalles.
+
+        Suma en SQL los detalles de activos y de artículos no eliminados
+        mediante subconsultas agregadas, de modo que el cálculo completo
+        se resuelve en una sola consulta sin cargar los detalles en memoria.
+
+        Args:
+            queryset: QuerySet de órdenes a anotar (default: todas)
+
+        Returns:
+            QuerySet con las anotaciones 'subtotal_activos' y
+            'subtotal_articulos'
+        """
+        if queryset is None:
+            queryset = OrdenCompra.objects.all()
+
+        decimal_field = DecimalField(max_digits=14, decimal_places=2)
+        cero = Value(Decimal('0'), output_field=decimal_field)
+
+        subtotal_activos = DetalleOrdenCompra.objects.filter(
+            orden_compra=OuterRef('pk'),
+            eliminado=False
+        ).order_by().values('orden_compra').annotate(
+            total=Sum('subtotal')
+        ).values('total')
+
+        subtotal_articulos = DetalleOrdenCompraArticulo.objects.filter(
+            orden_compra=OuterRef('pk'),
+            eliminado=False
+        ).order_by().values('orden_compra').annotate(
+            total=Sum('subtotal')
+        ).values('total')
+
+        return queryset.annotate(
+            subtotal_activos=Coalesce(
+                Subquery(subtotal_activos, output_field=decimal_field), cero
+            ),
+            subtotal_articulos=Coalesce(
+                Subquery(subtotal_articulos, output_field=decimal_field), cero
+            ),
+        )
+
+    @classmethod
+    def get_subtotal_detalles(cls, orden: OrdenCompra) -> Decimal:
+        """
+        Obtiene el subtotal de una orden sumando ambas tablas de detalle.
+
+        Args:
+            orden: Orden de compra
+
+        Returns:
+            Decimal con la suma de subtotales de activos y artículos
+        """
+        fila = cls.with_subtotal_detalles(
+            OrdenCompra.objects.filter(pk=orden.pk)
+        ).values('subtotal_activos', 'subtotal_articulos').first()
+
+        if not fila:
+            return Decimal('0')
+        return fila['subtotal_activos'] + fila['subtotal_articulos']
+
+    @staticmethod
+    def valores_lineas(orden_id: int) -> QuerySet:
+        """
+        Retorna las líneas de artículos y activos de una orden en una consulta.
+
+        Combina ambas tablas de detalle con UNION ALL sobre columnas
+        homogéneas; los artículos se listan antes que los activos.
+
+        Args:
+            orden_id: ID de la orden de compra
+
+        Returns:
+            QuerySet de diccionarios con 'item_id', 'codigo', 'nombre',
+            'cantidad', 'unidad_medida' y 'tipo'
+        """
+        articulos = DetalleOrdenCompraArticulo.objects.filter(
+            orden_compra_id=orden_id, eliminado=False
+        ).values(
+            linea_id=F('id'),
+            grupo=Value(0, output_field=IntegerField()),
+            item_id=F('articulo_id'),
+            codigo=F('articulo__codigo'),
+            nombre=F('articulo__nombre'),
+            cantidad_linea=F('cantidad'),
+            unidad_medida=F('articulo__unidad_medida__simbolo'),
+            tipo=Value('articulo', output_field=CharField()),
+        )
+        activos = DetalleOrdenCompra.objects.filter(
+            orden_compra_id=orden_id, eliminado=False
+        ).values(
+            linea_id=F('id'),
+            grupo=Value(1, output_field=IntegerField()),
+            item_id=F('activo_id'),
+            codigo=F('activo__codigo'),
+            nombre=F('activo__nombre'),
+            cantidad_linea=F('cantidad'),
+            unidad_medida=Value(None, output_field=CharField()),
+            tipo=Value('activo', output_field=CharField()),
+        )
+        return articulos.union(activos, all=True).order_by('grupo', 'linea_id')
+
+    @staticmethod
+    def valores_activos(orden_id: int) -> QuerySet:
+        """
+        Retorna los activos de una orden como diccionarios planos.
+
+        Usa un LEFT JOIN filtrado desde la orden: una orden sin activos
+        retorna una fila con los campos ``linea__*`` en None y una orden
+        inexistente no retorna filas.
+
+        Args:
+            orden_id: ID de la orden de compra
+
+        Returns:
+            QuerySet de diccionarios (``.values()``)
+        """
+        return OrdenCompra.objects.filter(id=orden_id).annotate(
+            linea=FilteredRelation(
+                'detalles', condition=Q(detalles__eliminado=False)
+            )
+        ).values(
+            'linea__id', 'linea__cantidad', 'linea__activo_id',
+            'linea__activo__codigo', 'linea__activo__nombre',
+            'linea__activo__categoria__nombre',
+        ).order_by('linea__id')
+
 
 # ==================== DETALLE ORDEN COMPRA REPOSITORIES ====================
 
@@ -5,12 +5,14 @@ Contiene la lógica de negocio siguiendo el principio de
 Single Responsibility (SOLID). Las operaciones críticas
 usan transacciones atómicas para garantizar consistencia.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from decimal import Decimal
 from datetime import date
 from django.db import transaction
+from django.db.models import F, Sum
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from django.utils import timezone
 from core.utils import validar_rut, format_rut, generar_codigo_unico
 from .models import (
     Proveedor, EstadoOrdenCompra, OrdenCompra,
@@ -25,10 +27,13 @@ from .repositories import (
     DetalleRecepcionArticuloRepository, RecepcionActivoRepository,
     DetalleRecepcionActivoRepository
 )
-from apps.bodega.models import Bodega, Articulo
-from apps.bodega.repositories import ArticuloRepository, BodegaRepository
+from apps.bodega.models import Bodega, Articulo, Movimiento
+from apps.bodega.repositories import ArticuloRepository, BodegaRepository, TipoMovimientoRepository
+from apps.bodega.services import MovimientoService
 from apps.activos.models import Activo
 from apps.activos.repositories import ActivoRepository
+from apps.notificaciones.models import TipoNotificacion
+from apps.notificaciones.services import NotificacionService
 
 
 # ==================== PROVEEDOR SERVICE ====================
@@ -166,6 +171,7 @@ class OrdenCompraService:
         self.estado_repo = EstadoOrdenCompraRepository()
         self.proveedor_repo = ProveedorRepository()
         self.bodega_repo = BodegaRepository()
+        self.notificacion_service = NotificacionService()
 
     def calcular_totales(
         self,
@@ -286,9 +292,20 @@ class OrdenCompraService:
             raise ValidationError(f'No se puede cambiar el estado de una orden en estado {orden.estado.nombre}')
 
         # Actualizar estado
+        estado_anterior = orden.estado
         orden.estado = nuevo_estado
         orden.save()
 
+        if estado_anterior.pk != nuevo_estado.pk:
+            self.notificacion_service.publicar(
+                TipoNotificacion.OC_ESTADO,
+                [orden.solicitante_id],
+                f'Orden de compra {orden.numero}: {nuevo_estado.nombre}',
+                f'{usuario.get_full_name() or usuario.username} cambió el estado '
+                f'de {estado_anterior.nombre} a {nuevo_estado.nombre}.',
+                url=self.notificacion_service.url('compras:orden_compra_detalle', orden.pk),
+            )
+
         return orden
 
     @transaction.atomic
@@ -296,36 +313,94 @@ class OrdenCompraService:
         """
         Recalcula los totales de una orden basándose en sus detalles.
 
+        El subtotal se obtiene con una sola consulta agregada sobre ambas
+        tablas de detalle y solo se escriben las columnas de montos.
+
         Args:
             orden: Orden de compra
 
         Returns:
             OrdenCompra: Orden actualizada
         """
-        # Sumar subtotales de detalles de activos
-        detalle_repo = DetalleOrdenCompraRepository()
-        detalles_activos = detalle_repo.filter_by_orden(orden)
-        subtotal_activos = sum(d.subtotal for d in detalles_activos)
-
-        # Sumar subtotales de detalles de artículos
-        detalle_articulo_repo = DetalleOrdenCompraArticuloRepository()
-        detalles_articulos = detalle_articulo_repo.filter_by_orden(orden)
-        subtotal_articulos = sum(d.subtotal for d in detalles_articulos)
-
-        # Subtotal total
-        subtotal_total = subtotal_activos + subtotal_articulos
+        subtotal_total = self.orden_repo.get_subtotal_detalles(orden)
 
         # Calcular totales
         totales = self.calcular_totales(subtotal_total, descuento=orden.descuento)
 
-        # Actualizar orden
+        # Actualizar solo los montos de la orden
         orden.subtotal = totales['subtotal']
         orden.impuesto = totales['impuesto']
         orden.total = totales['total']
-        orden.save()
+        orden.save(update_fields=['subtotal', 'impuesto', 'total', 'fecha_actualizacion'])
 
         return orden
 
+    def verificar_totales(
+        self,
+        reparar: bool = False,
+        batch_size: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Recalcula en bloque los totales de todas las órdenes y detecta diferencias.
+
+        Los subtotales se obtienen con una única consulta anotada sobre todas
+        las órdenes. Si se solicita reparar, las órdenes con diferencias se
+        actualizan con bulk_update.
+
+        Args:
+            reparar: Si debe corregir los totales almacenados (default: False)
+            batch_size: Tamaño de lote para bulk_update
+
+        Returns:
+            Lista de dicts con 'orden', 'almacenado' y 'calculado' por cada
+            orden cuyos montos no coinciden con sus detalles
+        """
+        centavo = Decimal('0.01')
+        diferencias: List[Dict[str, Any]] = []
+        ordenes_a_reparar: List[OrdenCompra] = []
+
+        ordenes = self.orden_repo.with_subtotal_detalles(
+            OrdenCompra.objects.only('id', 'numero', 'subtotal', 'impuesto', 'descuento', 'total')
+        ).order_by('id')
+
+        for orden in ordenes.iterator(chunk_size=batch_size):
+            totales = self.calcular_totales(
+                orden.subtotal_activos + orden.subtotal_articulos,
+                descuento=orden.descuento
+            )
+            calculado = {
+                campo: totales[campo].quantize(centavo)
+                for campo in ('subtotal', 'impuesto', 'total')
+            }
+            almacenado = {
+                campo: getattr(orden, campo)
+                for campo in ('subtotal', 'impuesto', 'total')
+            }
+
+            if calculado == almacenado:
+                continue
+
+            diferencias.append({
+                'orden': orden,
+                'almacenado': almacenado,
+                'calculado': calculado,
+            })
+
+            if reparar:
+                for campo, valor in calculado.items():
+                    setattr(orden, campo, valor)
+                ordenes_a_reparar.append(orden)
+
+        if ordenes_a_reparar:
+            with transaction.atomic():
+                OrdenCompra.objects.bulk_update(
+                    ordenes_a_reparar,
+                    ['subtotal', 'impuesto', 'total'],
+                    batch_size=batch_size
+                )
+
+        return diferencias
+
 
 # ==================== RECEPCIÓN SERVICE BASE (DRY) ====================
 
@@ -343,6 +418,8 @@ class RecepcionServiceBase:
     repository_class = None
     detalle_repository_class = None
     item_repository_class = None
+    detalle_orden_repository_class = None
+    item_field_name = None
 
     def __init__(self):
         if not self.repository_class or not self.detalle_repository_class:
@@ -480,7 +557,7 @@ class RecepcionServiceBase:
         self._post_crear_detalle(recepcion, item, cantidad, **kwargs)
 
         # Si hay orden de compra, actualizar cantidad recibida
-        if recepcion.orden_compra:
+        if recepcion.orden_compra and self._actualiza_orden_al_agregar(**kwargs):
             self._actualizar_cantidad_recibida_orden(recepcion.orden_compra, item, cantidad)
 
         return detalle
@@ -529,6 +606,18 @@ class RecepcionServiceBase:
         """
         pass
 
+    def _actualiza_orden_al_agregar(self, **kwargs) -> bool:
+        """
+        Hook method que indica si agregar un detalle suma a la orden de compra.
+
+        Args:
+            **kwargs: Campos adicionales del detalle
+
+        Returns:
+            True si la cantidad recibida de la orden se actualiza al agregar
+        """
+        return True
+
     def _actualizar_cantidad_recibida_orden(
         self,
         orden: OrdenCompra,
@@ -545,24 +634,48 @@ class RecepcionServiceBase:
             item: Item recibido (Articulo o Activo)
             cantidad_adicional: Cantidad adicional recibida
         """
-        # Determinar qué repositorio usar basándose en el tipo de item
-        if hasattr(item, 'stock_actual'):  # Es un Artículo
-            from apps.compras.repositories import DetalleOrdenCompraArticuloRepository
-            detalle_orden_repo = DetalleOrdenCompraArticuloRepository()
-            detalles = detalle_orden_repo.filter_by_orden(orden)
-            campo_item = 'articulo'
-        else:  # Es un Activo
-            from apps.compras.repositories import DetalleOrdenCompraRepository
-            detalle_orden_repo = DetalleOrdenCompraRepository()
-            detalles = detalle_orden_repo.filter_by_orden(orden)
-            campo_item = 'activo'
-
-        # Buscar el detalle del item
+        self._actualizar_cantidades_recibidas_orden(orden, {item.id: cantidad_adicional})
+
+    def _actualizar_cantidades_recibidas_orden(
+        self,
+        orden: OrdenCompra,
+        cantidades: Dict[int, Decimal]
+    ) -> None:
+        """
+        Incrementa la cantidad recibida de varios detalles de la orden a la vez.
+
+        Los detalles se resuelven con una sola consulta en un dict
+        {item_id: detalle} (el primero por item) y se incrementan con
+        expresiones F() en un único bulk_update.
+
+        Args:
+            orden: Orden de compra
+            cantidades: Dict {item_id: cantidad recibida}
+        """
+        if not cantidades:
+            return
+
+        campo_item_id = f'{self.item_field_name}_id'
+        detalles = self.detalle_orden_repository_class().filter_by_orden(orden).filter(
+            **{f'{campo_item_id}__in': list(cantidades)}
+        ).select_related(None).only('id', campo_item_id)
+
+        detalles_por_item = {}
         for detalle in detalles:
-            if getattr(detalle, campo_item).id == item.id:
-                detalle.cantidad_recibida += cantidad_adicional
-                detalle.save()
-                break
+            detalles_por_item.setdefault(getattr(detalle, campo_item_id), detalle)
+
+        if not detalles_por_item:
+            return
+
+        ahora = timezone.now()
+        for item_id, detalle in detalles_por_item.items():
+            detalle.cantidad_recibida = F('cantidad_recibida') + cantidades[item_id]
+            detalle.fecha_actualizacion = ahora
+
+        detalles.model.objects.bulk_update(
+            list(detalles_por_item.values()),
+            ['cantidad_recibida', 'fecha_actualizacion']
+        )
 
 
 # ==================== RECEPCIÓN ARTÍCULO SERVICE ====================
@@ -576,6 +689,8 @@ class RecepcionArticuloService(RecepcionServiceBase):
     repository_class = RecepcionArticuloRepository
     detalle_repository_class = DetalleRecepcionArticuloRepository
     item_repository_class = ArticuloRepository
+    detalle_orden_repository_class = DetalleOrdenCompraArticuloRepository
+    item_field_name = 'articulo'
 
     def _get_prefijo_numero(self) -> str:
         """Retorna el prefijo para el número de recepción de artículos."""
@@ -668,6 +783,14 @@ class RecepcionArticuloService(RecepcionServiceBase):
             item.stock_actual = stock_nuevo
             item.save()
 
+    def _actualiza_orden_al_agregar(self, **kwargs) -> bool:
+        """
+        Un detalle en borrador (sin actualizar stock) no suma a la orden.
+
+        La cantidad recibida se actualiza al confirmar, en aplicar_stock_recepcion().
+        """
+        return kwargs.get('actualizar_stock', True)
+
     # Método compatible con código existente que espera parámetro 'bodega'
     @transaction.atomic
     def crear_recepcion(
@@ -732,6 +855,164 @@ class RecepcionArticuloService(RecepcionServiceBase):
         kwargs['actualizar_stock'] = actualizar_stock
         return super().agregar_detalle(recepcion, articulo, cantidad, **kwargs)
 
+    @transaction.atomic
+    def agregar_detalles(
+        self,
+        recepcion: RecepcionArticulo,
+        lineas: List[Dict[str, Any]],
+        usuario: Optional[User] = None,
+        actualizar_stock: bool = True
+    ) -> List[DetalleRecepcionArticulo]:
+        """
+        Agrega todas las líneas recibidas a la recepción en una sola operación.
+
+        Los detalles se crean con bulk_create. Si se pide actualizar stock,
+        las entradas se registran en un solo lote de movimientos y las
+        cantidades recibidas de la orden de compra se incrementan en un único
+        bulk_update; si no, ambas cosas quedan para aplicar_stock_recepcion()
+        al confirmar la recepción.
+
+        Args:
+            recepcion: Recepción
+            lineas: Lista de dicts con 'articulo_id', 'cantidad' y
+                opcionalmente 'lote', 'fecha_vencimiento', 'observaciones'
+            usuario: Usuario que registra los movimientos (requerido si
+                actualizar_stock es True)
+            actualizar_stock: Si debe actualizar el stock (default: True)
+
+        Returns:
+            Lista de DetalleRecepcionArticulo creados
+
+        Raises:
+            ValidationError: Si hay errores de validación
+        """
+        if not lineas:
+            raise ValidationError('Debe agregar al menos un artículo a la recepción')
+
+        estados_finales_recepcion = ['COMPLETADA', 'CANCELADA', 'CERRADA']
+        if recepcion.estado.codigo in estados_finales_recepcion:
+            raise ValidationError(f'No se pueden agregar detalles a una recepción en estado {recepcion.estado.nombre}')
+
+        if any(Decimal(str(linea['cantidad'])) <= 0 for linea in lineas):
+            raise ValidationError({'cantidad': 'La cantidad debe ser mayor a cero'})
+
+        articulo_ids = {int(linea['articulo_id']) for linea in lineas}
+        existentes = set(
+            self.item_repo.get_all().filter(id__in=articulo_ids).values_list('id', flat=True)
+        )
+        faltantes = articulo_ids - existentes
+        if faltantes:
+            raise ValidationError(
+                f'Artículos no encontrados: {", ".join(str(i) for i in sorted(faltantes))}'
+            )
+
+        detalles = DetalleRecepcionArticulo.objects.bulk_create([
+            DetalleRecepcionArticulo(
+                recepcion=recepcion,
+                articulo_id=int(linea['articulo_id']),
+                cantidad=int(linea['cantidad']),
+                lote=linea.get('lote', ''),
+                fecha_vencimiento=linea.get('fecha_vencimiento'),
+                observaciones=linea.get('observaciones', '')
+            )
+            for linea in lineas
+        ])
+
+        cantidades = self._sumar_cantidades_por_articulo(detalles)
+
+        if actualizar_stock:
+            self._registrar_entradas_stock(recepcion, cantidades, usuario)
+            if recepcion.orden_compra_id:
+                self._actualizar_cantidades_recibidas_orden(recepcion.orden_compra, cantidades)
+
+        return detalles
+
+    @transaction.atomic
+    def aplicar_stock_recepcion(
+        self,
+        recepcion: RecepcionArticulo,
+        usuario: User
+    ) -> List[Movimiento]:
+        """
+        Ingresa al stock todos los detalles de una recepción confirmada.
+
+        Agrupa los detalles por artículo con una consulta agregada, registra
+        las entradas en un solo lote de movimientos y, si la recepción tiene
+        orden de compra, suma las cantidades recibidas a sus detalles. La
+        fecha de confirmación queda en el instante de los movimientos: con
+        ella se valorizan las compras en los cierres de inventario.
+
+        Args:
+            recepcion: Recepción a aplicar
+            usuario: Usuario que confirma la recepción
+
+        Returns:
+            Lista de movimientos creados
+
+        Raises:
+            ValidationError: Si hay errores de validación
+        """
+        filas = self.detalle_repo.filter_by_recepcion(recepcion).select_related(None).order_by(
+            'articulo_id'
+        ).values('articulo_id').annotate(total=Sum('cantidad'))
+        cantidades = {fila['articulo_id']: fila['total'] for fila in filas}
+
+        movimientos = self._registrar_entradas_stock(recepcion, cantidades, usuario)
+        recepcion.fecha_confirmacion = movimientos[0].fecha_creacion if movimientos else timezone.now()
+        recepcion.save(update_fields=['fecha_confirmacion', 'fecha_actualizacion'])
+        if recepcion.orden_compra_id:
+            self._actualizar_cantidades_recibidas_orden(recepcion.orden_compra, cantidades)
+        return movimientos
+
+    def _sumar_cantidades_por_articulo(
+        self,
+        detalles: List[DetalleRecepcionArticulo]
+    ) -> Dict[int, int]:
+        """Agrupa las cantidades de los detalles por artículo."""
+        cantidades: Dict[int, int] = {}
+        for detalle in detalles:
+            cantidades[detalle.articulo_id] = cantidades.get(detalle.articulo_id, 0) + detalle.cantidad
+        return cantidades
+
+    def _registrar_entradas_stock(
+        self,
+        recepcion: RecepcionArticulo,
+        cantidades: Dict[int, int],
+        usuario: Optional[User]
+    ) -> List[Movimiento]:
+        """
+        Registra las entradas de stock de una recepción en un solo lote.
+
+        Args:
+            recepcion: Recepción de origen
+            cantidades: Dict {articulo_id: cantidad}
+            usuario: Usuario que registra los movimientos
+
+        Returns:
+            Lista de movimientos creados
+
+        Raises:
+            ValidationError: Si falta el usuario o el tipo de movimiento
+        """
+        if not cantidades:
+            return []
+
+        if usuario is None:
+            raise ValidationError('Debe indicar el usuario que registra la entrada de stock')
+
+        tipo_movimiento = TipoMovimientoRepository.get_by_codigo('RECEPCION')
+        if not tipo_movimiento:
+            tipo_movimiento = TipoMovimientoRepository.get_active().first()
+        if not tipo_movimiento:
+            raise ValidationError('No se ha configurado un tipo de movimiento para recepciones')
+
+        return MovimientoService().registrar_entradas_masivas(
+            cantidades=cantidades,
+            tipo=tipo_movimiento,
+            usuario=usuario,
+            motivo=f'Recepción {recepcion.numero}'
+        )
+
 
 # ==================== RECEPCIÓN ACTIVO SERVICE ====================
 
@@ -744,6 +1025,8 @@ class RecepcionActivoService(RecepcionServiceBase):
     repository_class = RecepcionActivoRepository
     detalle_repository_class = DetalleRecepcionActivoRepository
     item_repository_class = ActivoRepository
+    detalle_orden_repository_class = DetalleOrdenCompraRepository
+    item_field_name = 'activo'
 
     def _get_prefijo_numero(self) -> str:
         """Retorna el prefijo para el número de recepción de activos."""
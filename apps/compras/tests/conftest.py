@@ -9,8 +9,8 @@ from apps.compras.models import (
     EstadoOrdenCompra, EstadoRecepcion, TipoRecepcion,
     Proveedor, OrdenCompra, RecepcionArticulo, RecepcionActivo
 )
-from apps.bodega.models import Bodega, Categoria as CategoriaBodega, Articulo
-from apps.activos.models import CategoriaActivo, Activo, UnidadMedida, EstadoActivo
+from apps.bodega.models import Bodega, Categoria as CategoriaBodega, Articulo, UnidadMedida
+from apps.activos.models import CategoriaActivo, Activo, EstadoActivo
 
 
 # ==================== FIXTURES DE USUARIOS ====================
@@ -693,3 +693,80 @@ class TestMensajesExito:
         messages = list(response.context['messages'])
         assert len(messages) > 0
         assert 'exitosamente' in str(messages[0]).lower()
+
+
+# ==================== TEST SELECTORES AJAX CON ETAG ====================
+
+@pytest.fixture
+def orden_con_lineas(db, usuario_test):
+    """Orden de compra con una línea de artículo y una solicitud con un detalle."""
+    from datetime import date
+    from apps.bodega.models import Articulo, Bodega, Categoria
+    from apps.compras.models import DetalleOrdenCompraArticulo, EstadoOrdenCompra
+    from apps.solicitudes.models import DetalleSolicitud, EstadoSolicitud, Solicitud, TipoSolicitud
+
+    bodega = Bodega.objects.create(codigo='BET', nombre='Bodega', responsable=usuario_test)
+    articulo = Articulo.objects.create(
+        codigo='AET', nombre='Resma', categoria=Categoria.objects.create(codigo='CET', nombre='Oficina'),
+        ubicacion_fisica=bodega, stock_actual=0, stock_minimo=0
+    )
+    orden = OrdenCompra.objects.create(
+        numero='OC-ET-1', fecha_orden=date(2025, 3, 1), fecha_entrega_esperada=date(2025, 3, 8),
+        proveedor=Proveedor.objects.create(rut='76.333.333-3', razon_social='Proveedor', direccion='Calle 1'),
+        bodega_destino=bodega, solicitante=usuario_test,
+        estado=EstadoOrdenCompra.objects.create(codigo='APROBADA', nombre='Aprobada')
+    )
+    DetalleOrdenCompraArticulo.objects.create(
+        orden_compra=orden, articulo=articulo, cantidad=12, precio_unitario=Decimal('2500')
+    )
+    solicitud = Solicitud.objects.create(
+        numero='SOL-ET-1', tipo='ARTICULO',
+        tipo_solicitud=TipoSolicitud.objects.create(codigo='TET', nombre='Tipo'),
+        estado=EstadoSolicitud.objects.create(codigo='APROBADA', nombre='Aprobada'),
+        solicitante=usuario_test, bodega_origen=bodega, fecha_requerida=date(2025, 3, 1), motivo='Clases'
+    )
+    DetalleSolicitud.objects.create(solicitud=solicitud, articulo=articulo, cantidad_solicitada=4)
+    return orden, solicitud
+
+
+@pytest.mark.django_db
+class TestSelectoresConEtag:
+    """Tests de los endpoints JSON de los selectores: 200 con ETag y 304 al revalidar."""
+
+    def _revalidar(self, client, url, params):
+        """Pide el recurso y lo vuelve a pedir con If-None-Match."""
+        primera = client.get(url, params)
+        segunda = client.get(url, params, HTTP_IF_NONE_MATCH=primera['ETag'])
+        return primera, segunda
+
+    def test_articulos_orden_compra(self, client, usuario_test, orden_con_lineas):
+        """La primera respuesta trae las líneas y ETag; la revalidación responde 304 sin cuerpo."""
+        orden, _ = orden_con_lineas
+        client.force_login(usuario_test)
+
+        primera, segunda = self._revalidar(
+            client, reverse('compras:obtener_articulos_orden_compra'), {'orden_id': orden.id}
+        )
+
+        assert primera.status_code == 200
+        assert [(a['codigo'], a['cantidad']) for a in primera.json()['articulos']] == [('AET', '12')]
+        assert primera['Cache-Control'] == 'private, no-cache'
+        assert segunda.status_code == 304
+        assert segunda.content == b''
+
+    def test_detalles_solicitudes(self, client, usuario_test, orden_con_lineas):
+        """El selector de solicitudes revalida igual; otro contenido cambia el ETag."""
+        _, solicitud = orden_con_lineas
+        client.force_login(usuario_test)
+        url = reverse('compras:obtener_detalles_solicitudes')
+
+        primera, segunda = self._revalidar(client, url, {'solicitudes[]': [solicitud.id]})
+
+        assert primera.status_code == 200
+        detalle = primera.json()['detalles'][0]
+        assert (detalle['solicitud_numero'], detalle['cantidad_aprobada']) == ('SOL-ET-1', '4')
+        assert segunda.status_code == 304
+
+        vacia = client.get(url, HTTP_IF_NONE_MATCH=primera['ETag'])
+        assert vacia.status_code == 200
+        assert vacia.json() == {'detalles': []}
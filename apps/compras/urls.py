@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -23,7 +24,14 @@ urlpatterns = [
     path('ordenes/<int:pk>/eliminar/', views.OrdenCompraDeleteView.as_view(), name='orden_compra_eliminar'),
 
     # AJAX
-    path('api/obtener-detalles-solicitudes/', views.ObtenerDetallesSolicitudesView.as_view(), name='obtener_detalles_solicitudes'),
+    path(
+        'api/obtener-detalles-solicitudes/',
+        (
+            views.ObtenerDetallesSolicitudesAsyncView if settings.ASYNC_VIEWS_ENABLED
+            else views.ObtenerDetallesSolicitudesView
+        ).as_view(),
+        name='obtener_detalles_solicitudes'
+    ),
     path('api/obtener-articulos-orden-compra/', views.ObtenerArticulosOrdenCompraView.as_view(), name='obtener_articulos_orden_compra'),
     path('api/obtener-activos-orden-compra/', views.ObtenerActivosOrdenCompraView.as_view(), name='obtener_activos_orden_compra'),
 
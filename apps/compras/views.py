@@ -9,15 +9,18 @@ Este archivo implementa todas las vistas usando CBVs siguiendo SOLID y DRY:
 - Auditoría automática
 """
 from typing import Any
+from django.db import transaction
 from django.db.models import QuerySet
 from django.urls import reverse_lazy
 from django.views.generic import (
     TemplateView, ListView, DetailView, CreateView, UpdateView, DeleteView, View
 )
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from decimal import Decimal
+from core.utils import json_response_con_etag
 from core.mixins import (
     BaseAuditedViewMixin, AtomicTransactionMixin, SoftDeleteMixin,
     PaginatedListMixin, FilteredListMixin
@@ -43,7 +46,7 @@ from .services import (
     ProveedorService, OrdenCompraService,
     RecepcionArticuloService, RecepcionActivoService
 )
-from apps.bodega.models import Bodega, Articulo, Movimiento, TipoMovimiento
+from apps.bodega.models import Bodega, Articulo, Movimiento
 
 
 # ==================== MIXINS GENÉRICOS PARA RECEPCIONES (DRY) ====================
@@ -275,12 +278,18 @@ class RecepcionConfirmarMixin:
                 es_final=True, activo=True, eliminado=False
             ).exclude(codigo='CANCELADA').first()
 
-        if estado_completado:
-            self.object.estado = estado_completado
-            self.object.save()
+        try:
+            with transaction.atomic():
+                if estado_completado:
+                    self.object.estado = estado_completado
+                    self.object.save()
 
-        # Hook para acciones específicas (ej: actualizar stock)
-        self._post_confirmar_acciones(request)
+                # Hook para acciones específicas (ej: actualizar stock)
+                self._post_confirmar_acciones(request)
+        except ValidationError as e:
+            for error in e.messages:
+                messages.error(request, error)
+            return redirect(self.get_success_url_after_confirm())
 
         # Log de auditoría
         self.log_action(self.object, request)
@@ -817,154 +826,153 @@ class OrdenCompraDeleteView(BaseAuditedViewMixin, DeleteView):
         return redirect(self.success_url)
 
 
+def _detalles_solicitudes_data(filas) -> list:
+    """Serializa las filas de ``valores_por_solicitudes`` para el selector de solicitudes."""
+    detalles_data = []
+    for fila in filas:
+        # Usar cantidad aprobada si existe, sino usar cantidad solicitada
+        cantidad = fila['cantidad_aprobada'] if fila['cantidad_aprobada'] > 0 else fila['cantidad_solicitada']
+        es_articulo = fila['articulo_id'] is not None
+        producto = 'articulo' if es_articulo else 'activo'
+
+        detalle_info = {
+            'solicitud_id': fila['solicitud_id'],
+            'solicitud_numero': fila['solicitud__numero'],
+            'tipo': producto,
+            'codigo': fila[f'{producto}__codigo'],
+            'nombre': fila[f'{producto}__nombre'],
+            'cantidad_aprobada': str(cantidad),
+            f'{producto}_id': fila[f'{producto}_id'],
+            # Los activos son bienes únicos sin unidad de medida
+            'unidad_medida': (fila['articulo__unidad_medida__simbolo'] if es_articulo else None) or 'unidad',
+            'precio_unitario': '0',
+            'categoria': fila[f'{producto}__categoria__nombre'] or 'Sin categoría',
+        }
+        detalles_data.append(detalle_info)
+    return detalles_data
+
+
+def _ids_solicitudes(request) -> list:
+    """IDs numéricos del parámetro ``solicitudes[]``."""
+    return [int(sid) for sid in request.GET.getlist('solicitudes[]') if sid.isdigit()]
+
+
 class ObtenerDetallesSolicitudesView(View):
     """
     Vista AJAX para obtener los detalles de solicitudes seleccionadas.
     Retorna JSON con los artículos/activos de las solicitudes.
+
+    Las líneas se obtienen con una sola consulta ``.values()`` y la respuesta
+    incluye ETag para que el selector pueda revalidar con If-None-Match.
     """
+    query_budget = 4
 
     def get(self, request, *args, **kwargs):
         """Retorna los detalles de las solicitudes en formato JSON."""
-        from django.http import JsonResponse
-        from apps.solicitudes.models import Solicitud
-
-        solicitud_ids = request.GET.getlist('solicitudes[]')
+        from apps.solicitudes.repositories import DetalleSolicitudRepository
 
+        solicitud_ids = _ids_solicitudes(request)
         if not solicitud_ids:
-            return JsonResponse({'detalles': []})
+            return json_response_con_etag(request, {'detalles': []})
 
-        detalles_data = []
+        filas = DetalleSolicitudRepository.valores_por_solicitudes(solicitud_ids)
+        return json_response_con_etag(request, {'detalles': _detalles_solicitudes_data(filas)})
 
-        for solicitud_id in solicitud_ids:
-            try:
-                solicitud = Solicitud.objects.get(id=solicitud_id, eliminado=False)
-                # Obtener detalles con cantidad aprobada o solicitada > 0
-                detalles = solicitud.detalles.filter(eliminado=False)
-
-                for detalle in detalles:
-                    # Usar cantidad aprobada si existe, sino usar cantidad solicitada
-                    cantidad = detalle.cantidad_aprobada if detalle.cantidad_aprobada > 0 else detalle.cantidad_solicitada
-
-                    detalle_info = {
-                        'solicitud_id': solicitud.id,
-                        'solicitud_numero': solicitud.numero,
-                        'tipo': 'articulo' if detalle.articulo else 'activo',
-                        'codigo': detalle.producto_codigo,
-                        'nombre': detalle.producto_nombre,
-                        'cantidad_aprobada': str(cantidad),
-                    }
-
-                    if detalle.articulo:
-                        # Obtener unidad de medida del artículo
-                        detalle_info['articulo_id'] = detalle.articulo.id
-                        detalle_info['unidad_medida'] = detalle.articulo.unidad_medida.simbolo if detalle.articulo.unidad_medida else 'unidad'
-                        detalle_info['precio_unitario'] = '0'
-                        detalle_info['categoria'] = detalle.articulo.categoria.nombre if detalle.articulo.categoria else 'Sin categoría'
-                    else:
-                        # Los activos son bienes únicos sin unidad de medida
-                        detalle_info['activo_id'] = detalle.activo.id
-                        detalle_info['unidad_medida'] = 'unidad'
-                        detalle_info['precio_unitario'] = '0'
-                        detalle_info['categoria'] = detalle.activo.categoria.nombre if detalle.activo.categoria else 'Sin categoría'
-
-                    detalles_data.append(detalle_info)
-
-            except Solicitud.DoesNotExist:
-                continue
-
-        return JsonResponse({'detalles': detalles_data})
+
+class ObtenerDetallesSolicitudesAsyncView(View):
+    """
+    Variante asíncrona de ObtenerDetallesSolicitudesView (ORM asíncrono,
+    despliegue ASGI).
+    """
+    query_budget = 4
+
+    async def get(self, request, *args, **kwargs):
+        """Retorna los detalles de las solicitudes en formato JSON."""
+        from apps.solicitudes.repositories import DetalleSolicitudRepository
+
+        solicitud_ids = _ids_solicitudes(request)
+        if not solicitud_ids:
+            return json_response_con_etag(request, {'detalles': []})
+
+        filas = [fila async for fila in DetalleSolicitudRepository.valores_por_solicitudes(solicitud_ids)]
+        return json_response_con_etag(request, {'detalles': _detalles_solicitudes_data(filas)})
 
 
 class ObtenerArticulosOrdenCompraView(View):
     """
     Vista AJAX para obtener los artículos de una orden de compra.
     Retorna JSON con los artículos de la orden seleccionada.
+
+    Artículos y activos se leen en una sola consulta (UNION ALL) y la
+    respuesta incluye ETag para revalidación.
     """
+    query_budget = 4
 
     def get(self, request, *args, **kwargs):
         """Retorna los artículos de la orden de compra en formato JSON."""
-        from django.http import JsonResponse
-
         orden_id = request.GET.get('orden_id')
 
-        if not orden_id:
-            return JsonResponse({'articulos': []})
+        if not orden_id or not orden_id.isdigit():
+            return json_response_con_etag(request, {'articulos': []})
+
+        articulos_data = [
+            {
+                'id': fila['item_id'],
+                'sku': fila['codigo'],
+                'codigo': fila['codigo'],
+                'nombre': fila['nombre'],
+                'cantidad': str(fila['cantidad_linea']),
+                # Activos son bienes únicos sin unidad de medida
+                'unidad_medida': fila['unidad_medida'] or 'unidad',
+                'tipo': fila['tipo'],
+            }
+            for fila in OrdenCompraRepository.valores_lineas(int(orden_id))
+        ]
 
-        try:
-            orden = OrdenCompra.objects.get(id=orden_id)
-            articulos_data = []
-
-            # Obtener artículos de bodega
-            detalles_articulos = orden.detalles_articulos.all().select_related('articulo', 'articulo__unidad_medida')
-            for detalle in detalles_articulos:
-                # Obtener unidad de medida (ForeignKey, no ManyToMany)
-                unidad_medida = detalle.articulo.unidad_medida.simbolo if detalle.articulo.unidad_medida else 'unidad'
-
-                articulos_data.append({
-                    'id': detalle.articulo.id,
-                    'sku': detalle.articulo.codigo,
-                    'codigo': detalle.articulo.codigo,
-                    'nombre': detalle.articulo.nombre,
-                    'cantidad': str(detalle.cantidad),
-                    'unidad_medida': unidad_medida,
-                    'tipo': 'articulo'
-                })
-
-            # Obtener activos (los activos no tienen unidad_medida, son bienes únicos)
-            detalles_activos = orden.detalles.all().select_related('activo')
-            for detalle in detalles_activos:
-                articulos_data.append({
-                    'id': detalle.activo.id,
-                    'sku': detalle.activo.codigo,
-                    'codigo': detalle.activo.codigo,
-                    'nombre': detalle.activo.nombre,
-                    'cantidad': str(detalle.cantidad),
-                    'unidad_medida': 'unidad',  # Activos son bienes únicos sin unidad de medida
-                    'tipo': 'activo'
-                })
-
-            return JsonResponse({'articulos': articulos_data})
-
-        except OrdenCompra.DoesNotExist:
+        # Solo se distingue orden vacía de inexistente cuando no hay líneas
+        if not articulos_data and not OrdenCompra.objects.filter(id=orden_id).exists():
             return JsonResponse({'articulos': [], 'error': 'Orden de compra no encontrada'}, status=404)
 
+        return json_response_con_etag(request, {'articulos': articulos_data})
+
 
 class ObtenerActivosOrdenCompraView(View):
     """
     Vista AJAX para obtener los activos de una orden de compra.
     Retorna JSON con los activos de la orden seleccionada.
+
+    Orden y activos se resuelven en una sola consulta ``.values()`` y la
+    respuesta incluye ETag para revalidación.
     """
+    query_budget = 4
 
     def get(self, request, *args, **kwargs):
         """Retorna los activos de la orden de compra en formato JSON."""
-        from django.http import JsonResponse
-
         orden_id = request.GET.get('orden_id')
 
-        if not orden_id:
-            return JsonResponse({'activos': []})
+        if not orden_id or not orden_id.isdigit():
+            return json_response_con_etag(request, {'activos': []})
 
-        try:
-            orden = OrdenCompra.objects.get(id=orden_id)
-            activos_data = []
-
-            # Obtener solo activos (no artículos)
-            detalles_activos = orden.detalles.filter(eliminado=False).select_related('activo', 'activo__categoria')
-            for detalle in detalles_activos:
-                activos_data.append({
-                    'id': detalle.activo.id,
-                    'codigo': detalle.activo.codigo,
-                    'nombre': detalle.activo.nombre,
-                    'cantidad': str(detalle.cantidad),
-                    'requiere_serie': detalle.activo.requiere_serie,
-                    'categoria': detalle.activo.categoria.nombre if detalle.activo.categoria else ''
-                })
-
-            return JsonResponse({'activos': activos_data})
-
-        except OrdenCompra.DoesNotExist:
+        filas = list(OrdenCompraRepository.valores_activos(int(orden_id)))
+        if not filas:
             return JsonResponse({'activos': [], 'error': 'Orden de compra no encontrada'}, status=404)
 
+        activos_data = [
+            {
+                'id': fila['linea__activo_id'],
+                'codigo': fila['linea__activo__codigo'],
+                'nombre': fila['linea__activo__nombre'],
+                'cantidad': str(fila['linea__cantidad']),
+                # El modelo Activo no define número de serie obligatorio
+                'requiere_serie': False,
+                'categoria': fila['linea__activo__categoria__nombre'] or '',
+            }
+            for fila in filas
+            if fila['linea__id'] is not None
+        ]
+
+        return json_response_con_etag(request, {'activos': activos_data})
+
 
 class OrdenCompraAgregarArticuloView(BaseAuditedViewMixin, AtomicTransactionMixin, CreateView):
     """
@@ -1161,7 +1169,6 @@ class RecepcionArticuloCreateView(BaseAuditedViewMixin, AtomicTransactionMixin,
 
     def form_valid(self, form):
         """Procesa el formulario con generación automática de número y guardado de detalles."""
-        from decimal import Decimal
         from core.utils.business import generar_codigo_con_anio
         from django.db import transaction
 
@@ -1192,22 +1199,23 @@ class RecepcionArticuloCreateView(BaseAuditedViewMixin, AtomicTransactionMixin,
                     form.add_error(None, 'Debe agregar al menos un artículo a la recepción')
                     return self.form_invalid(form)
 
-                # Crear detalles de artículos
-                for detalle_data in detalles:
-                    DetalleRecepcionArticulo.objects.create(
-                        recepcion=self.object,
-                        articulo_id=detalle_data['articulo_id'],
-                        cantidad=Decimal(str(detalle_data['cantidad'])),
-                        lote=detalle_data.get('lote', ''),
-                        fecha_vencimiento=detalle_data.get('fecha_vencimiento'),
-                        observaciones=detalle_data.get('observaciones', '')
-                    )
+                # Crear todos los detalles en lote (el stock se actualiza al confirmar)
+                service = RecepcionArticuloService()
+                service.agregar_detalles(
+                    recepcion=self.object,
+                    lineas=detalles,
+                    actualizar_stock=False
+                )
 
                 messages.success(self.request, self.get_success_message(self.object))
                 self.log_action(self.object, self.request)
                 return response
 
         except ValidationError as e:
+            if not hasattr(e, 'error_dict'):
+                for error in e.messages:
+                    form.add_error(None, error)
+                return self.form_invalid(form)
             for field, errors in e.message_dict.items():
                 for error in errors:
                     form.add_error(field if field != '__all__' else None, error)
@@ -1318,39 +1326,9 @@ class RecepcionArticuloConfirmarView(RecepcionConfirmarMixin, BaseAuditedViewMix
     audit_description_template = 'Confirmó recepción de artículos {obj.numero}'
 
     def _post_confirmar_acciones(self, request):
-        """Actualiza stock de artículos y crea movimientos."""
-        from apps.bodega.repositories import TipoMovimientoRepository, OperacionRepository
-        from apps.bodega.models import Movimiento
-
-        tipo_mov_repo = TipoMovimientoRepository()
-        tipo_movimiento = tipo_mov_repo.get_by_codigo('RECEPCION')
-        if not tipo_movimiento:
-            tipo_movimiento = TipoMovimiento.objects.filter(activo=True).first()
-
-        # Obtener operación de tipo ENTRADA
-        operacion_repo = OperacionRepository()
-        operacion_entrada = operacion_repo.get_by_tipo('ENTRADA').first()
-
-        for detalle in self.object.detalles.filter(eliminado=False):
-            articulo = detalle.articulo
-            stock_anterior = articulo.stock_actual
-
-            # Actualizar stock
-            articulo.stock_actual += detalle.cantidad
-            articulo.save()
-
-            # Registrar movimiento
-            if tipo_movimiento and operacion_entrada:
-                Movimiento.objects.create(
-                    articulo=articulo,
-                    tipo=tipo_movimiento,
-                    cantidad=detalle.cantidad,
-                    operacion=operacion_entrada,
-                    usuario=request.user,
-                    motivo=f'Recepción {self.object.numero}',
-                    stock_antes=stock_anterior,
-                    stock_despues=articulo.stock_actual
-                )
+        """Actualiza stock de artículos y crea movimientos en un solo lote."""
+        service = RecepcionArticuloService()
+        service.aplicar_stock_recepcion(self.object, request.user)
 
     def get_success_message(self):
         """Mensaje de éxito personalizado."""
@@ -2058,7 +2036,7 @@ class EstadoOrdenCompraDeleteView(BaseAuditedViewMixin, DeleteView):
 # ==================== IMPORTACION EXCEL PARA MANTENEDORES ====================
 
 from apps.bodega.excel_services.importacion_excel import ImportacionExcelService
-from django.http import JsonResponse, HttpResponse
+from django.http import HttpResponse
 from django.contrib.auth.decorators import login_required
 
 
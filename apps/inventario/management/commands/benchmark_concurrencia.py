@@ -0,0 +1,247 @@
+"""
+Comando de management para medir el throughput de los endpoints JSON y del
+dashboard con alta concurrencia contra un servidor en ejecución.
+
+Sirve para comparar el despliegue WSGI (gunicorn, vistas sync) con el ASGI
+(uvicorn, ASYNC_VIEWS_ENABLED=True): se levanta el servidor con cada
+configuración y se ejecuta el comando contra la misma base de datos. Las
+peticiones usan una sesión creada para el superusuario, que se elimina al
+terminar.
+
+Ejecutar:
+    gunicorn core.wsgi -w 4 --threads 4
+    python manage.py benchmark_concurrencia --etiqueta wsgi --salida benchmarks/resultados/wsgi.json
+
+    ASYNC_VIEWS_ENABLED=True uvicorn core.asgi:application --workers 4
+    python manage.py benchmark_concurrencia --etiqueta asgi --comparar benchmarks/resultados/wsgi.json
+
+    python manage.py benchmark_concurrencia --url http://127.0.0.1:8000 --concurrencia 256 --requests 5000
+"""
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.solicitudes.models import Solicitud
+
+
+class Command(BaseCommand):
+    help = 'Mide throughput y latencia de endpoints JSON con alta concurrencia (WSGI vs ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            type=str,
+            default='http://127.0.0.1:8000',
+            help='URL base del servidor a medir (default: http://127.0.0.1:8000)',
+        )
+        parser.add_argument(
+            '--concurrencia',
+            type=int,
+            default=64,
+            help='Clientes concurrentes (default: 64)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Requests por endpoint (default: 2000)',
+        )
+        parser.add_argument(
+            '--etiqueta',
+            type=str,
+            default='',
+            help='Nombre de la configuración medida (ej: wsgi, asgi)',
+        )
+        parser.add_argument(
+            '--salida',
+            type=str,
+            default='',
+            help='Archivo JSON de salida (default: benchmarks/resultados/concurrencia-<fecha>.json)',
+        )
+        parser.add_argument(
+            '--comparar',
+            type=str,
+            default='',
+            help='Archivo JSON de una ejecución anterior para comparar',
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrencia'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrencia y --requests deben ser al menos 1')
+
+        usuario = User.objects.filter(is_superuser=True, is_active=True).first()
+        if not usuario:
+            raise CommandError('Se requiere un superusuario activo para medir los endpoints')
+
+        base = urlsplit(options['url'])
+        if base.scheme not in ('http', 'https') or not base.hostname:
+            raise CommandError(f"URL inválida: {options['url']}")
+
+        sesion = self._crear_sesion(usuario)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={sesion.session_key}'
+        try:
+            resultados = {}
+            for nombre, ruta in self._endpoints():
+                resultados[nombre] = self._medir(base, ruta, cookie, options['concurrencia'], options['requests'])
+                self._imprimir(nombre, resultados[nombre])
+        finally:
+            sesion.delete()
+
+        salida = self._guardar(resultados, options)
+        self.stdout.write(self.style.SUCCESS(f'[+] Resultados guardados en {salida}'))
+
+        if options['comparar']:
+            self._comparar(resultados, Path(options['comparar']))
+
+    @staticmethod
+    def _crear_sesion(usuario: User):
+        """Crea una sesión autenticada para el usuario."""
+        sesion = import_module(settings.SESSION_ENGINE).SessionStore()
+        sesion[SESSION_KEY] = str(usuario.pk)
+        sesion[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        sesion[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+        sesion.create()
+        return sesion
+
+    @staticmethod
+    def _endpoints() -> List[Tuple[str, str]]:
+        """Endpoints a medir (los de solicitudes usan la más reciente)."""
+        endpoints = [
+            ('dashboard', reverse('dashboard')),
+            ('notificaciones.contador', reverse('notificaciones:ajax_contador')),
+        ]
+        solicitud_id = Solicitud.objects.filter(eliminado=False).order_by('-id').values_list('id', flat=True).first()
+        if solicitud_id:
+            endpoints += [
+                ('bodega.solicitud_articulos', reverse('bodega:ajax_solicitud_articulos', args=[solicitud_id])),
+                ('bodega.solicitud_bienes', reverse('bodega:ajax_solicitud_bienes', args=[solicitud_id])),
+                (
+                    'compras.detalles_solicitudes',
+                    f"{reverse('compras:obtener_detalles_solicitudes')}?solicitudes[]={solicitud_id}",
+                ),
+            ]
+        return endpoints
+
+    # ==================== MEDICIÓN ====================
+
+    def _medir(self, base, ruta: str, cookie: str, concurrencia: int, requests: int) -> Dict[str, Any]:
+        """Reparte los requests entre clientes concurrentes con conexión keep-alive."""
+        clase = http.client.HTTPSConnection if base.scheme == 'https' else http.client.HTTPConnection
+        cabeceras = {'Cookie': cookie, 'Accept': 'application/json'}
+        restantes = iter(range(requests))
+        lock = threading.Lock()
+        errores: List[str] = []
+
+        def cliente(_) -> List[float]:
+            conexion = clase(base.hostname, base.port, timeout=30)
+            tiempos = []
+            try:
+                while True:
+                    with lock:
+                        if next(restantes, None) is None:
+                            break
+                    inicio = time.perf_counter()
+                    try:
+                        conexion.request('GET', ruta, headers=cabeceras)
+                        respuesta = conexion.getresponse()
+                        respuesta.read()
+                    except (OSError, http.client.HTTPException) as e:
+                        conexion.close()
+                        with lock:
+                            errores.append(str(e))
+                        continue
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                    if respuesta.status >= 400:
+                        with lock:
+                            errores.append(f'{ruta} respondió {respuesta.status}')
+            finally:
+                conexion.close()
+            return tiempos
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+            tiempos = [t for lote in executor.map(cliente, range(concurrencia)) for t in lote]
+        duracion = time.perf_counter() - inicio
+
+        if not tiempos:
+            return {'error': errores[0] if errores else 'Sin respuestas'}
+        tiempos.sort()
+        return {
+            'requests': len(tiempos),
+            'errores': len(errores),
+            'mediana_ms': round(statistics.median(tiempos), 2),
+            'p95_ms': round(tiempos[min(len(tiempos) - 1, round(0.95 * (len(tiempos) - 1)))], 2),
+            'p99_ms': round(tiempos[min(len(tiempos) - 1, round(0.99 * (len(tiempos) - 1)))], 2),
+            'requests_por_segundo': round(len(tiempos) / duracion, 1),
+        }
+
+    def _imprimir(self, nombre: str, resultado: Dict[str, Any]) -> None:
+        if 'error' in resultado:
+            self.stdout.write(self.style.ERROR(f"  [!] {nombre}: {resultado['error']}"))
+            return
+        linea = (
+            f"  [+] {nombre:<32} {resultado['requests_por_segundo']:>8.1f} req/s  "
+            f"mediana {resultado['mediana_ms']:>8.2f} ms  p99 {resultado['p99_ms']:>8.2f} ms"
+        )
+        if resultado['errores']:
+            self.stdout.write(self.style.WARNING(f"{linea}  errores {resultado['errores']}"))
+        else:
+            self.stdout.write(linea)
+
+    # ==================== PERSISTENCIA ====================
+
+    def _guardar(self, resultados: Dict[str, Any], options: Dict[str, Any]) -> Path:
+        if options['salida']:
+            salida = Path(options['salida'])
+        else:
+            sello = timezone.now().strftime('%Y%m%d-%H%M%S')
+            salida = Path(settings.BASE_DIR) / 'benchmarks' / 'resultados' / f'concurrencia-{sello}.json'
+
+        meta = {
+            'fecha': timezone.now().isoformat(),
+            'etiqueta': options['etiqueta'],
+            'url': options['url'],
+            'concurrencia': options['concurrencia'],
+            'requests': options['requests'],
+        }
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(
+            json.dumps({'meta': meta, 'endpoints': resultados}, indent=2, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        return salida
+
+    def _comparar(self, resultados: Dict[str, Any], archivo: Path) -> None:
+        """Imprime la variación de throughput y p99 respecto de otra ejecución."""
+        if not archivo.exists():
+            raise CommandError(f'No existe el archivo a comparar: {archivo}')
+
+        anterior = json.loads(archivo.read_text(encoding='utf-8'))
+        self.stdout.write(f"\n[+] Comparación con {archivo} ({anterior['meta'].get('etiqueta') or 'sin etiqueta'})")
+
+        for nombre, actual in resultados.items():
+            previo = anterior['endpoints'].get(nombre)
+            if not previo or 'error' in previo or 'error' in actual:
+                continue
+            variacion = (
+                (actual['requests_por_segundo'] - previo['requests_por_segundo']) / previo['requests_por_segundo'] * 100
+                if previo['requests_por_segundo'] else 0
+            )
+            self.stdout.write(
+                f"  {nombre:<32} {previo['requests_por_segundo']:>8.1f} -> {actual['requests_por_segundo']:>8.1f} req/s "
+                f"({variacion:+.1f}%)  p99 {previo['p99_ms']:>8.2f} -> {actual['p99_ms']:>8.2f} ms"
+            )
@@ -0,0 +1,243 @@
+"""
+Comando de management para medir la latencia de los endpoints JSON según la
+gestión de conexiones a la base de datos.
+
+Cada hilo usa su propio cliente y su propia conexión, igual que los hilos de
+un worker de gunicorn. Al terminar cada request Django cierra o devuelve la
+conexión según la configuración vigente, así que el costo de conectar queda
+dentro de la latencia medida:
+    - DB_CONN_MAX_AGE=0 sin pool: una conexión nueva (TCP + autenticación) por request
+    - DB_CONN_MAX_AGE>0: conexión persistente por hilo, verificada antes de reutilizarse
+    - DB_POOL_ENABLED=True: checkout del pool psycopg 3 del proceso
+
+Para comparar antes y después se ejecuta dos veces cambiando el entorno.
+
+Ejecutar:
+    DB_CONN_MAX_AGE=0 python manage.py benchmark_conexiones --salida benchmarks/resultados/sin-pool.json
+    DB_POOL_ENABLED=True python manage.py benchmark_conexiones --comparar benchmarks/resultados/sin-pool.json
+    python manage.py benchmark_conexiones --hilos 8 --requests 200
+"""
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.solicitudes.models import Solicitud
+from core.instrumentation import estadisticas_pool
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de los endpoints JSON con y sin pool de conexiones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hilos',
+            type=int,
+            default=4,
+            help='Hilos concurrentes, como los threads de un worker (default: 4)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=100,
+            help='Requests por endpoint y por hilo (default: 100)',
+        )
+        parser.add_argument(
+            '--salida',
+            type=str,
+            default='',
+            help='Archivo JSON de salida (default: benchmarks/resultados/conexiones-<fecha>.json)',
+        )
+        parser.add_argument(
+            '--comparar',
+            type=str,
+            default='',
+            help='Archivo JSON de una ejecución anterior para comparar',
+        )
+
+    def handle(self, *args, **options):
+        if options['hilos'] < 1 or options['requests'] < 1:
+            raise CommandError('--hilos y --requests deben ser al menos 1')
+
+        usuario = User.objects.filter(is_superuser=True, is_active=True).first()
+        if not usuario:
+            raise CommandError('Se requiere un superusuario activo para medir los endpoints')
+
+        endpoints = self._endpoints()
+        configuracion = self._configuracion()
+        self.stdout.write(f'[+] Conexiones: {configuracion}')
+
+        pool_antes = {p.alias: p for p in estadisticas_pool()}
+        resultados = {
+            nombre: self._medir(usuario, url, options['hilos'], options['requests'])
+            for nombre, url in endpoints
+        }
+        for nombre, resultado in resultados.items():
+            self._imprimir(nombre, resultado)
+
+        pool = self._delta_pool(pool_antes)
+        for alias, delta in pool.items():
+            self.stdout.write(
+                f"[+] Pool {alias}: {delta['checkouts']} checkouts, {delta['esperas']} esperas "
+                f"({delta['espera_ms']} ms), {delta['timeouts']} timeouts, "
+                f"{delta['conexiones_creadas']} conexiones nuevas"
+            )
+
+        salida = self._guardar(resultados, configuracion, pool, options)
+        self.stdout.write(self.style.SUCCESS(f'[+] Resultados guardados en {salida}'))
+
+        if options['comparar']:
+            self._comparar(resultados, Path(options['comparar']))
+
+    def _endpoints(self) -> List[Tuple[str, str]]:
+        """Endpoints JSON a medir (los de solicitudes usan la más reciente)."""
+        endpoints = [
+            ('notificaciones.contador', reverse('notificaciones:ajax_contador')),
+            ('notificaciones.bandeja', reverse('notificaciones:ajax_bandeja')),
+        ]
+        solicitud_id = Solicitud.objects.filter(eliminado=False).order_by('-id').values_list('id', flat=True).first()
+        if solicitud_id:
+            endpoints += [
+                ('bodega.solicitud_articulos', reverse('bodega:ajax_solicitud_articulos', args=[solicitud_id])),
+                ('bodega.solicitud_bienes', reverse('bodega:ajax_solicitud_bienes', args=[solicitud_id])),
+                (
+                    'compras.detalles_solicitudes',
+                    f"{reverse('compras:obtener_detalles_solicitudes')}?solicitudes[]={solicitud_id}",
+                ),
+            ]
+        return endpoints
+
+    @staticmethod
+    def _configuracion() -> Dict[str, Any]:
+        """Gestión de conexiones vigente para el alias principal."""
+        db = connections.settings['default']
+        pool = db.get('OPTIONS', {}).get('pool')
+        return {
+            'pool': {k: v for k, v in pool.items() if k != 'check'} if isinstance(pool, dict) else bool(pool),
+            'conn_max_age': db.get('CONN_MAX_AGE', 0),
+            'health_checks': db.get('CONN_HEALTH_CHECKS', False),
+        }
+
+    # ==================== MEDICIÓN ====================
+
+    def _medir(self, usuario: User, url: str, hilos: int, requests: int) -> Dict[str, Any]:
+        """Ejecuta los requests en paralelo y resume latencias y throughput."""
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        errores: List[str] = []
+        lock = threading.Lock()
+
+        def trabajador(_) -> List[float]:
+            client = Client()
+            client.force_login(usuario)
+            tiempos = []
+            try:
+                # Calentamiento: sesión y primera conexión del hilo
+                client.get(url)
+                for _ in range(requests):
+                    inicio = time.perf_counter()
+                    response = client.get(url)
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                    if response.status_code >= 400:
+                        with lock:
+                            errores.append(f'{url} respondió {response.status_code}')
+                        break
+            finally:
+                connections.close_all()
+            return tiempos
+
+        inicio = time.perf_counter()
+        # override_settings no es seguro entre hilos: se aplica una vez para todos
+        with override_settings(ALLOWED_HOSTS=hosts), ThreadPoolExecutor(max_workers=hilos) as executor:
+            tiempos = [t for lote in executor.map(trabajador, range(hilos)) for t in lote]
+        duracion = time.perf_counter() - inicio
+
+        if errores:
+            return {'error': errores[0]}
+        tiempos.sort()
+        return {
+            'requests': len(tiempos),
+            'mediana_ms': round(statistics.median(tiempos), 2),
+            'p95_ms': round(tiempos[min(len(tiempos) - 1, round(0.95 * (len(tiempos) - 1)))], 2),
+            'max_ms': round(tiempos[-1], 2),
+            'requests_por_segundo': round(len(tiempos) / duracion, 1),
+        }
+
+    def _imprimir(self, nombre: str, resultado: Dict[str, Any]) -> None:
+        if 'error' in resultado:
+            self.stdout.write(self.style.ERROR(f"  [!] {nombre}: {resultado['error']}"))
+            return
+        self.stdout.write(
+            f"  [+] {nombre:<32} mediana {resultado['mediana_ms']:>8.2f} ms  "
+            f"p95 {resultado['p95_ms']:>8.2f} ms  {resultado['requests_por_segundo']:>8.1f} req/s"
+        )
+
+    @staticmethod
+    def _delta_pool(antes: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+        """Contadores del pool acumulados durante la medición."""
+        contadores = ('checkouts', 'esperas', 'espera_ms', 'timeouts', 'conexiones_creadas')
+        delta = {}
+        for actual in estadisticas_pool():
+            previo = antes.get(actual.alias)
+            delta[actual.alias] = {
+                campo: getattr(actual, campo) - (getattr(previo, campo) if previo else 0)
+                for campo in contadores
+            }
+            delta[actual.alias]['maximo'] = actual.maximo
+        return delta
+
+    # ==================== PERSISTENCIA ====================
+
+    def _guardar(self, resultados, configuracion, pool, options) -> Path:
+        if options['salida']:
+            salida = Path(options['salida'])
+        else:
+            sello = timezone.now().strftime('%Y%m%d-%H%M%S')
+            salida = Path(settings.BASE_DIR) / 'benchmarks' / 'resultados' / f'conexiones-{sello}.json'
+
+        meta = {
+            'fecha': timezone.now().isoformat(),
+            'hilos': options['hilos'],
+            'requests': options['requests'],
+            'conexiones': configuracion,
+            'pool': pool,
+        }
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(
+            json.dumps({'meta': meta, 'endpoints': resultados}, indent=2, ensure_ascii=False, default=str),
+            encoding='utf-8'
+        )
+        return salida
+
+    def _comparar(self, resultados: Dict[str, Any], archivo: Path) -> None:
+        """Imprime la variación de mediana y throughput respecto de otra ejecución."""
+        if not archivo.exists():
+            raise CommandError(f'No existe el archivo a comparar: {archivo}')
+
+        anterior = json.loads(archivo.read_text(encoding='utf-8'))
+        self.stdout.write(f"\n[+] Comparación con {archivo} ({anterior['meta']['conexiones']})")
+
+        for nombre, actual in resultados.items():
+            previo = anterior['endpoints'].get(nombre)
+            if not previo or 'error' in previo or 'error' in actual:
+                continue
+            variacion = (
+                (actual['mediana_ms'] - previo['mediana_ms']) / previo['mediana_ms'] * 100
+                if previo['mediana_ms'] else 0
+            )
+            self.stdout.write(
+                f"  {nombre:<32} {previo['mediana_ms']:>8.2f} -> {actual['mediana_ms']:>8.2f} ms "
+                f"({variacion:+.1f}%)  {previo['requests_por_segundo']:>7.1f} -> "
+                f"{actual['requests_por_segundo']:>7.1f} req/s"
+            )
@@ -0,0 +1,151 @@
+"""
+Comando de management para comparar el throughput de los exportadores de
+reportes sobre el mismo dataset sintético (ver benchmark_pdf).
+
+Cada formato se pide a través de la negociación de las vistas
+(``?format=`` y Accept-Encoding) y se consume la respuesta completa, así
+que el tiempo incluye generar y transmitir el archivo:
+    - csv: streaming sin comprimir
+    - csv_gzip: streaming con Content-Encoding gzip
+    - xlsx: libro openpyxl armado en memoria
+    - pdf: opcional con --pdf (ver benchmark_pdf para el detalle)
+
+Ejecutar:
+    python manage.py benchmark_exportadores
+    python manage.py benchmark_exportadores --filas 10000 50000 --pdf
+    python manage.py benchmark_exportadores --comparar benchmarks/resultados/exportadores-20250101-120000.json
+"""
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+
+from apps.inventario.management.commands.benchmark_pdf import reporte_sintetico
+from apps.reportes.dtos import ReportResult
+from apps.reportes.exporters import exportar
+
+
+class Command(BaseCommand):
+    help = 'Compara el throughput de los exportadores CSV, XLSX y PDF sobre el mismo dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 50000],
+            help='Tamaños de reporte a medir (default: 1000 10000 50000)',
+        )
+        parser.add_argument(
+            '--pdf',
+            action='store_true',
+            help='Incluye el exportador PDF',
+        )
+        parser.add_argument(
+            '--salida',
+            type=str,
+            default='',
+            help='Archivo JSON de salida (default: benchmarks/resultados/exportadores-<fecha>.json)',
+        )
+        parser.add_argument(
+            '--comparar',
+            type=str,
+            default='',
+            help='Archivo JSON de una ejecución anterior para comparar',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['filas']) < 1:
+            raise CommandError('--filas debe ser al menos 1')
+
+        resultados: Dict[str, Dict[str, Any]] = {}
+        for filas in options['filas']:
+            report = reporte_sintetico(filas)
+            variantes = {nombre: self._medir(report, fmt, gzip) for nombre, fmt, gzip in self._variantes(options)}
+            resultados[str(filas)] = variantes
+
+            self.stdout.write(f'[+] {filas} filas')
+            for nombre, resultado in variantes.items():
+                self.stdout.write(
+                    f"  {nombre:<10} {resultado['segundos']:>8.3f} s  {resultado['filas_por_segundo']:>10.0f} filas/s  "
+                    f"{resultado['kb']:>8} KB"
+                )
+
+        salida = self._guardar(resultados, options)
+        self.stdout.write(self.style.SUCCESS(f'[+] Resultados guardados en {salida}'))
+
+        if options['comparar']:
+            self._comparar(resultados, Path(options['comparar']))
+
+    @staticmethod
+    def _variantes(options: Dict[str, Any]) -> List[Tuple[str, str, bool]]:
+        """(nombre, ?format=, acepta gzip) de cada variante medida."""
+        variantes = [('csv', 'csv', False), ('csv_gzip', 'csv', True), ('xlsx', 'xlsx', False)]
+        if options['pdf']:
+            variantes.append(('pdf', 'pdf', False))
+        return variantes
+
+    @staticmethod
+    def _medir(report: ReportResult, fmt: str, gzip: bool) -> Dict[str, Any]:
+        """Genera la respuesta del formato y la consume completa."""
+        cabeceras = {'HTTP_ACCEPT_ENCODING': 'gzip, deflate'} if gzip else {}
+        request = RequestFactory().get('/', {'format': fmt}, **cabeceras)
+
+        inicio = time.perf_counter()
+        response = exportar(request, report)
+        if response.streaming:
+            tamano = sum(len(bloque) for bloque in response.streaming_content)
+        else:
+            tamano = len(response.content)
+        segundos = time.perf_counter() - inicio
+        response.close()
+
+        return {
+            'segundos': round(segundos, 3),
+            'filas_por_segundo': round(len(report.rows) / segundos) if segundos else 0,
+            'kb': round(tamano / 1024),
+        }
+
+    # ==================== PERSISTENCIA ====================
+
+    def _guardar(self, resultados: Dict[str, Any], options: Dict[str, Any]) -> Path:
+        if options['salida']:
+            salida = Path(options['salida'])
+        else:
+            sello = timezone.now().strftime('%Y%m%d-%H%M%S')
+            salida = Path(settings.BASE_DIR) / 'benchmarks' / 'resultados' / f'exportadores-{sello}.json'
+
+        meta = {'fecha': timezone.now().isoformat(), 'pdf': options['pdf']}
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(
+            json.dumps({'meta': meta, 'reportes': resultados}, indent=2, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        return salida
+
+    def _comparar(self, resultados: Dict[str, Any], archivo: Path) -> None:
+        """Imprime la variación de throughput por tamaño y formato respecto de otra ejecución."""
+        if not archivo.exists():
+            raise CommandError(f'No existe el archivo a comparar: {archivo}')
+
+        anterior = json.loads(archivo.read_text(encoding='utf-8'))
+        self.stdout.write(f"\n[+] Comparación con {archivo} ({anterior['meta']['fecha']})")
+
+        for filas, variantes in resultados.items():
+            for nombre, actual in variantes.items():
+                previo = anterior['reportes'].get(filas, {}).get(nombre)
+                if not previo:
+                    continue
+                variacion = (
+                    (actual['filas_por_segundo'] - previo['filas_por_segundo']) / previo['filas_por_segundo'] * 100
+                    if previo['filas_por_segundo'] else 0
+                )
+                self.stdout.write(
+                    f"  {filas:>6} {nombre:<10} {previo['filas_por_segundo']:>10.0f} -> "
+                    f"{actual['filas_por_segundo']:>10.0f} filas/s ({variacion:+.1f}%)"
+                )
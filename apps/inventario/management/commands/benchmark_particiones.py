@@ -0,0 +1,144 @@
+"""
+Comando de management para comparar consultas por rango de fechas sobre
+historial plano versus particionado por año.
+
+Por cada tabla de historial crea dos copias temporales con los mismos datos
+e índice sobre fecha_creacion: una plana y otra particionada por año (igual
+que core.particiones). Ejecuta las mismas consultas con rango de fechas en
+ambas y reporta la mediana de tiempo y cuántas particiones se leyeron
+(partition pruning). Las tablas temporales se eliminan al terminar.
+
+Ejecutar:
+    python manage.py benchmark_particiones
+    python manage.py benchmark_particiones --repeticiones 20 --tabla movimientos
+"""
+import json
+import statistics
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.particiones import TABLAS_HISTORIAL, limites_anio, rango_anios
+
+# (nombre, SQL con {t} como tabla, función que construye los parámetros)
+CONSULTAS = [
+    (
+        'mes_anio_anterior',
+        'SELECT count(*) FROM {t} WHERE fecha_creacion >= %s AND fecha_creacion < %s AND NOT eliminado',
+        lambda ahora: [ahora.replace(year=ahora.year - 1, day=1), ahora.replace(year=ahora.year - 1, day=28)],
+    ),
+    (
+        'ultimos_30_dias',
+        'SELECT id FROM {t} WHERE fecha_creacion >= %s AND NOT eliminado ORDER BY fecha_creacion DESC LIMIT 50',
+        lambda ahora: [ahora - timedelta(days=30)],
+    ),
+    (
+        'resumen_mensual_anio',
+        "SELECT date_trunc('month', fecha_creacion), count(*) FROM {t} "
+        "WHERE fecha_creacion >= %s AND fecha_creacion < %s GROUP BY 1",
+        lambda ahora: list(limites_anio(ahora.year - 1)),
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compara consultas por rango de fechas en historial plano vs particionado'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tabla',
+            choices=[*TABLAS_HISTORIAL, 'todas'],
+            default='todas',
+            help='Tabla de historial a medir (default: todas)',
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=10,
+            help='Repeticiones medidas por consulta (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('El benchmark de particiones requiere PostgreSQL')
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser al menos 1')
+
+        modelos = (
+            TABLAS_HISTORIAL.values() if options['tabla'] == 'todas'
+            else [TABLAS_HISTORIAL[options['tabla']]]
+        )
+        ahora = timezone.localtime()
+
+        for modelo in modelos:
+            tabla = modelo._meta.db_table
+            self.stdout.write(f'\n[+] {tabla}: preparando copias plana y particionada...')
+            with transaction.atomic():
+                anios = self._preparar(tabla, rango_anios(modelo, anios_adelante=0))
+                self.stdout.write(f'    {len(anios)} particiones anuales + DEFAULT')
+                for nombre, sql, parametros in CONSULTAS:
+                    plana = self._medir(sql.format(t='bench_plana'), parametros(ahora), options['repeticiones'])
+                    part = self._medir(sql.format(t='bench_part'), parametros(ahora), options['repeticiones'])
+                    variacion = (part[0] / plana[0] - 1) * 100 if plana[0] else 0
+                    self.stdout.write(
+                        f'    {nombre:<22} plana {plana[0]:>8.2f} ms  '
+                        f'particionada {part[0]:>8.2f} ms ({variacion:+.1f}%)  '
+                        f'particiones leídas {part[1]}/{len(anios) + 1}'
+                    )
+                transaction.set_rollback(True)
+
+    def _preparar(self, tabla: str, anios: range) -> List[int]:
+        """Crea las tablas temporales plana y particionada con los datos actuales."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMP TABLE bench_plana ON COMMIT DROP AS SELECT * FROM {tabla}')
+            cursor.execute(
+                f'CREATE TEMP TABLE bench_part (LIKE {tabla}) '
+                f'PARTITION BY RANGE (fecha_creacion) ON COMMIT DROP'
+            )
+            for anio in anios:
+                inicio, fin = limites_anio(anio)
+                cursor.execute(
+                    f'CREATE TEMP TABLE bench_part_y{anio} PARTITION OF bench_part '
+                    f'FOR VALUES FROM (%s) TO (%s) ON COMMIT DROP',
+                    [inicio, fin]
+                )
+            cursor.execute('CREATE TEMP TABLE bench_part_default PARTITION OF bench_part DEFAULT ON COMMIT DROP')
+            cursor.execute('INSERT INTO bench_part SELECT * FROM bench_plana')
+            for nombre in ('bench_plana', 'bench_part'):
+                cursor.execute(f'CREATE INDEX ON {nombre} (fecha_creacion)')
+                cursor.execute(f'ANALYZE {nombre}')
+        return list(anios)
+
+    def _medir(self, sql: str, parametros: List[Any], repeticiones: int) -> Tuple[float, int]:
+        """
+        Mide una consulta.
+
+        Returns:
+            Tupla (mediana en ms, particiones leídas según EXPLAIN)
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            cursor.fetchall()
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                cursor.execute(sql, parametros)
+                cursor.fetchall()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', parametros)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return statistics.median(tiempos), len(self._relaciones(plan[0]['Plan']))
+
+    def _relaciones(self, nodo: Dict[str, Any]) -> set:
+        """Relaciones (tablas) leídas por un nodo del plan y sus hijos."""
+        relaciones = {nodo['Relation Name']} if 'Relation Name' in nodo else set()
+        for hijo in nodo.get('Plans', []):
+            relaciones |= self._relaciones(hijo)
+        return relaciones
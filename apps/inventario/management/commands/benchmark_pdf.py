@@ -0,0 +1,206 @@
+"""
+Comando de management para medir la generación de reportes PDF grandes.
+
+Genera reportes sintéticos con las columnas de un kardex y mide, para cada
+tamaño:
+    - tabla_unica: todas las filas en una sola Table que ReportLab parte
+      página a página (el exportador anterior); se omite sobre --max-tabla-unica
+    - por_paginas: una LongTable de alto fijo por página en el proceso actual
+    - por_paginas_pool: lo mismo con las celdas preparadas en el pool de
+      procesos (REPORTES_PDF_PROCESOS=--procesos)
+
+Cada PDF se escribe en un archivo temporal, como en la respuesta HTTP.
+
+Ejecutar:
+    python manage.py benchmark_pdf
+    python manage.py benchmark_pdf --filas 1000 10000 50000 --procesos 8
+    python manage.py benchmark_pdf --comparar benchmarks/resultados/pdf-20250101-120000.json
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from apps.reportes.dtos import ReportResult
+from apps.reportes.exporters.pdf import render_pdf
+
+COLUMNAS = [
+    "Fecha", "Código", "Artículo", "Bodega", "Tipo", "Entrada", "Salida", "Saldo", "Costo", "Usuario",
+]
+
+
+def reporte_sintetico(filas: int) -> ReportResult:
+    """Reporte sintético con las columnas de un kardex y textos de largo variable."""
+    inicio = date(2025, 1, 1)
+    rows = [
+        [
+            inicio + timedelta(days=i % 365),
+            f'ART-{i % 5000:05d}',
+            f'Artículo de prueba {i % 5000} ' + 'con descripción larga ' * (i % 4),
+            f'Bodega {i % 12}',
+            'Entrada' if i % 3 else 'Salida',
+            Decimal(i % 50) if i % 3 else None,
+            None if i % 3 else Decimal(i % 20),
+            Decimal(i % 900),
+            Decimal(i % 10000) / 100,
+            f'usuario{i % 40}',
+        ]
+        for i in range(filas)
+    ]
+    return ReportResult(
+        title=f'Kardex sintético {filas} filas',
+        columns=COLUMNAS,
+        rows=rows,
+        filters_summary={'Desde': inicio, 'Hasta': inicio + timedelta(days=364)},
+    )
+
+
+class Command(BaseCommand):
+    help = 'Mide la generación de reportes PDF de 1k/10k/50k filas (tabla única vs por páginas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 50000],
+            help='Tamaños de reporte a medir (default: 1000 10000 50000)',
+        )
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos del pool para la variante por_paginas_pool (default: CPUs)',
+        )
+        parser.add_argument(
+            '--max-tabla-unica',
+            type=int,
+            default=10000,
+            help='Filas máximas para medir la tabla única, que crece más que lineal (default: 10000)',
+        )
+        parser.add_argument(
+            '--salida',
+            type=str,
+            default='',
+            help='Archivo JSON de salida (default: benchmarks/resultados/pdf-<fecha>.json)',
+        )
+        parser.add_argument(
+            '--comparar',
+            type=str,
+            default='',
+            help='Archivo JSON de una ejecución anterior para comparar',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['filas']) < 1 or options['procesos'] < 1:
+            raise CommandError('--filas y --procesos deben ser al menos 1')
+
+        resultados: Dict[str, Dict[str, Any]] = {}
+        for filas in options['filas']:
+            report = reporte_sintetico(filas)
+            variantes = {}
+            if filas <= options['max_tabla_unica']:
+                variantes['tabla_unica'] = self._medir(self._render_tabla_unica, report)
+            with override_settings(REPORTES_PDF_PROCESOS=1):
+                variantes['por_paginas'] = self._medir(render_pdf, report)
+            if options['procesos'] > 1:
+                with override_settings(REPORTES_PDF_PROCESOS=options['procesos']):
+                    variantes['por_paginas_pool'] = self._medir(render_pdf, report)
+
+            resultados[str(filas)] = variantes
+            self.stdout.write(f'[+] {filas} filas')
+            for nombre, resultado in variantes.items():
+                self.stdout.write(
+                    f"  {nombre:<18} {resultado['segundos']:>8.2f} s  {resultado['paginas']:>5} páginas  "
+                    f"{resultado['kb']:>8} KB"
+                )
+
+        salida = self._guardar(resultados, options)
+        self.stdout.write(self.style.SUCCESS(f'[+] Resultados guardados en {salida}'))
+
+        if options['comparar']:
+            self._comparar(resultados, Path(options['comparar']))
+
+    @staticmethod
+    def _render_tabla_unica(report: ReportResult, destino) -> int:
+        """Exportador anterior: una sola Table con todas las filas."""
+        doc = SimpleDocTemplate(
+            destino, pagesize=landscape(A4), leftMargin=24, rightMargin=24, topMargin=24, bottomMargin=24
+        )
+        styles = getSampleStyleSheet()
+        elements: List = [Paragraph(report.title, styles["Title"]), Spacer(1, 12)]
+        table = Table([report.columns] + report.rows, repeatRows=1)
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+            ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cccccc")),
+        ]))
+        elements.append(table)
+        doc.build(elements)
+        return doc.page
+
+    @staticmethod
+    def _medir(render, report: ReportResult) -> Dict[str, Any]:
+        with tempfile.TemporaryFile() as archivo:
+            inicio = time.perf_counter()
+            paginas = render(report, archivo)
+            segundos = time.perf_counter() - inicio
+            tamano = archivo.tell()
+        return {'segundos': round(segundos, 3), 'paginas': paginas, 'kb': round(tamano / 1024)}
+
+    # ==================== PERSISTENCIA ====================
+
+    def _guardar(self, resultados: Dict[str, Any], options: Dict[str, Any]) -> Path:
+        if options['salida']:
+            salida = Path(options['salida'])
+        else:
+            sello = timezone.now().strftime('%Y%m%d-%H%M%S')
+            salida = Path(settings.BASE_DIR) / 'benchmarks' / 'resultados' / f'pdf-{sello}.json'
+
+        meta = {
+            'fecha': timezone.now().isoformat(),
+            'procesos': options['procesos'],
+            'max_tabla_unica': options['max_tabla_unica'],
+        }
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(
+            json.dumps({'meta': meta, 'reportes': resultados}, indent=2, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        return salida
+
+    def _comparar(self, resultados: Dict[str, Any], archivo: Path) -> None:
+        """Imprime la variación de tiempo por tamaño y variante respecto de otra ejecución."""
+        if not archivo.exists():
+            raise CommandError(f'No existe el archivo a comparar: {archivo}')
+
+        anterior = json.loads(archivo.read_text(encoding='utf-8'))
+        self.stdout.write(f"\n[+] Comparación con {archivo} ({anterior['meta']['fecha']})")
+
+        for filas, variantes in resultados.items():
+            for nombre, actual in variantes.items():
+                previo = anterior['reportes'].get(filas, {}).get(nombre)
+                if not previo:
+                    continue
+                variacion = (
+                    (actual['segundos'] - previo['segundos']) / previo['segundos'] * 100
+                    if previo['segundos'] else 0
+                )
+                self.stdout.write(
+                    f"  {filas:>6} {nombre:<18} {previo['segundos']:>8.2f} -> {actual['segundos']:>8.2f} s "
+                    f"({variacion:+.1f}%)"
+                )
@@ -0,0 +1,291 @@
+"""
+Comando de management para medir el rendimiento de vistas y servicios.
+
+Ejecuta un conjunto de escenarios (dashboard, listados, reportes y rutas
+críticas de servicios) contra la base de datos actual, idealmente poblada
+con generar_datos_carga. Por cada escenario registra tiempos (mínimo,
+mediana, p95, máximo) y cantidad de consultas SQL, y guarda el resultado
+en JSON para comparar entre commits.
+
+Los escenarios que escriben datos se ejecutan dentro de una transacción
+que se revierte al terminar cada repetición.
+
+Ejecutar:
+    python manage.py benchmark_rendimiento
+    python manage.py benchmark_rendimiento --repeticiones 10 --filtro reportes
+    python manage.py benchmark_rendimiento --comparar benchmarks/resultados/anterior.json
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.activos.models import Activo
+from apps.bodega.models import Articulo, Movimiento, TipoMovimiento
+from apps.bodega.services import MovimientoService
+from apps.compras.models import OrdenCompra
+from apps.compras.services import OrdenCompraService
+from apps.reportes.services.auditoria import AuditoriaService
+from apps.solicitudes.models import Solicitud
+
+# Vistas medidas vía HTTP: (nombre, nombre de URL)
+ESCENARIOS_HTTP = [
+    ('dashboard', 'dashboard'),
+    ('listado.articulos', 'bodega:articulo_lista'),
+    ('listado.movimientos', 'bodega:movimiento_lista'),
+    ('listado.ordenes_compra', 'compras:orden_compra_lista'),
+    ('listado.solicitudes', 'solicitudes:lista_solicitudes'),
+    ('listado.activos', 'activos:lista_activos'),
+    ('listado.movimientos_activos', 'activos:lista_movimientos'),
+    ('reportes.inventario_actual', 'reportes:inventario_actual'),
+    ('reportes.movimientos', 'reportes:movimientos'),
+    ('reportes.articulos_sin_movimiento', 'reportes:articulos_sin_movimiento'),
+    ('reportes.oc_atrasadas', 'reportes:oc_atrasadas_por_proveedor'),
+    ('reportes.auditoria', 'reportes:auditoria_actividades'),
+]
+
+
+class _Rollback(Exception):
+    """Fuerza la reversión de la transacción de un escenario de escritura."""
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempos y consultas SQL de vistas y servicios críticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=5,
+            help='Repeticiones medidas por escenario (default: 5)',
+        )
+        parser.add_argument(
+            '--filtro',
+            type=str,
+            default='',
+            help='Ejecuta solo los escenarios cuyo nombre contenga este texto',
+        )
+        parser.add_argument(
+            '--salida',
+            type=str,
+            default='',
+            help='Archivo JSON de salida (default: benchmarks/resultados/<fecha>-<commit>.json)',
+        )
+        parser.add_argument(
+            '--comparar',
+            type=str,
+            default='',
+            help='Archivo JSON de una ejecución anterior para comparar',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser al menos 1')
+
+        usuario = User.objects.filter(is_superuser=True, is_active=True).first()
+        if not usuario:
+            raise CommandError('Se requiere un superusuario activo para medir las vistas')
+
+        escenarios = [
+            (nombre, fn) for nombre, fn in self._escenarios(usuario)
+            if options['filtro'] in nombre
+        ]
+        if not escenarios:
+            raise CommandError('Ningún escenario coincide con el filtro indicado')
+
+        resultados: Dict[str, Dict[str, Any]] = {}
+        for nombre, fn in escenarios:
+            resultados[nombre] = self._medir(fn, options['repeticiones'])
+            self._imprimir(nombre, resultados[nombre])
+
+        salida = self._guardar(resultados, options)
+        self.stdout.write(self.style.SUCCESS(f'\n[+] Resultados guardados en {salida}'))
+
+        if options['comparar']:
+            self._comparar(resultados, Path(options['comparar']))
+
+    # ==================== ESCENARIOS ====================
+
+    def _escenarios(self, usuario: User) -> List[Tuple[str, Callable[[], Any]]]:
+        """Construye la lista de escenarios a medir."""
+        client = Client()
+        client.force_login(usuario)
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+
+        def http(url_name: str) -> Callable[[], Any]:
+            url = reverse(url_name)
+
+            def ejecutar():
+                with override_settings(ALLOWED_HOSTS=hosts):
+                    response = client.get(url)
+                if response.status_code >= 400:
+                    raise CommandError(f'{url} respondió {response.status_code}')
+                return response
+            return ejecutar
+
+        escenarios = [(nombre, http(url_name)) for nombre, url_name in ESCENARIOS_HTTP]
+
+        articulo = Articulo.objects.filter(eliminado=False).order_by('-stock_actual').first()
+        orden = OrdenCompra.objects.filter(eliminado=False).order_by('-id').first()
+        tipo = TipoMovimiento.objects.filter(activo=True, eliminado=False).first()
+        movimiento_service = MovimientoService()
+        orden_service = OrdenCompraService()
+
+        if articulo:
+            escenarios.append((
+                'servicio.historial_articulo',
+                lambda: movimiento_service.obtener_historial_articulo(articulo),
+            ))
+            if tipo:
+                escenarios.append((
+                    'servicio.registrar_entrada',
+                    self._revertir(lambda: movimiento_service.registrar_entrada(
+                        articulo, tipo, Decimal('1'), usuario, 'Benchmark'
+                    )),
+                ))
+        if orden:
+            escenarios.append((
+                'servicio.recalcular_totales_orden',
+                self._revertir(lambda: orden_service.recalcular_totales(orden)),
+            ))
+        escenarios += [
+            ('servicio.verificar_totales_ordenes', lambda: orden_service.verificar_totales()),
+            ('servicio.auditoria_actividades', lambda: AuditoriaService.obtener_actividades()),
+        ]
+        return escenarios
+
+    @staticmethod
+    def _revertir(fn: Callable[[], Any]) -> Callable[[], Any]:
+        """Envuelve un escenario de escritura en una transacción revertida."""
+        def ejecutar():
+            try:
+                with transaction.atomic():
+                    fn()
+                    raise _Rollback()
+            except _Rollback:
+                pass
+        return ejecutar
+
+    # ==================== MEDICIÓN ====================
+
+    def _medir(self, fn: Callable[[], Any], repeticiones: int) -> Dict[str, Any]:
+        """Ejecuta un calentamiento y luego mide cada repetición."""
+        consultas = 0
+
+        def contar(execute, sql, params, many, context):
+            nonlocal consultas
+            consultas += 1
+            return execute(sql, params, many, context)
+
+        try:
+            fn()
+            tiempos = []
+            with connection.execute_wrapper(contar):
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    fn()
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+        except Exception as e:
+            return {'error': str(e)}
+
+        tiempos.sort()
+        p95 = tiempos[min(len(tiempos) - 1, round(0.95 * (len(tiempos) - 1)))]
+        return {
+            'min_ms': round(tiempos[0], 2),
+            'mediana_ms': round(statistics.median(tiempos), 2),
+            'p95_ms': round(p95, 2),
+            'max_ms': round(tiempos[-1], 2),
+            'consultas': consultas // repeticiones,
+        }
+
+    def _imprimir(self, nombre: str, resultado: Dict[str, Any]) -> None:
+        if 'error' in resultado:
+            self.stdout.write(self.style.ERROR(f"  [!] {nombre}: {resultado['error']}"))
+            return
+        self.stdout.write(
+            f"  [+] {nombre:<40} mediana {resultado['mediana_ms']:>9.2f} ms  "
+            f"p95 {resultado['p95_ms']:>9.2f} ms  consultas {resultado['consultas']}"
+        )
+
+    # ==================== PERSISTENCIA ====================
+
+    def _metadatos(self) -> Dict[str, Any]:
+        """Información del entorno y del volumen de datos medido."""
+        return {
+            'fecha': timezone.now().isoformat(),
+            'commit': self._git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'base_datos': connection.vendor,
+            'volumen': {
+                'articulos': Articulo.objects.count(),
+                'movimientos': Movimiento.objects.count(),
+                'solicitudes': Solicitud.objects.count(),
+                'ordenes_compra': OrdenCompra.objects.count(),
+                'activos': Activo.objects.count(),
+            },
+        }
+
+    @staticmethod
+    def _git_commit() -> Optional[str]:
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _guardar(self, resultados: Dict[str, Any], options: Dict[str, Any]) -> Path:
+        meta = self._metadatos()
+        meta['repeticiones'] = options['repeticiones']
+
+        if options['salida']:
+            salida = Path(options['salida'])
+        else:
+            sello = timezone.now().strftime('%Y%m%d-%H%M%S')
+            salida = Path(settings.BASE_DIR) / 'benchmarks' / 'resultados' / f"{sello}-{meta['commit'] or 'sin-commit'}.json"
+
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        salida.write_text(
+            json.dumps({'meta': meta, 'escenarios': resultados}, indent=2, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        return salida
+
+    def _comparar(self, resultados: Dict[str, Any], archivo: Path) -> None:
+        """Imprime la variación de mediana y consultas respecto de otra ejecución."""
+        if not archivo.exists():
+            raise CommandError(f'No existe el archivo a comparar: {archivo}')
+
+        anterior = json.loads(archivo.read_text(encoding='utf-8'))
+        self.stdout.write(f"\n[+] Comparación con {archivo} (commit {anterior['meta'].get('commit')})")
+
+        for nombre, actual in resultados.items():
+            previo = anterior['escenarios'].get(nombre)
+            if not previo or 'error' in previo or 'error' in actual:
+                continue
+            delta = actual['mediana_ms'] - previo['mediana_ms']
+            variacion = (delta / previo['mediana_ms'] * 100) if previo['mediana_ms'] else 0
+            linea = (
+                f"  {nombre:<40} {previo['mediana_ms']:>9.2f} -> {actual['mediana_ms']:>9.2f} ms "
+                f"({variacion:+.1f}%)  consultas {previo['consultas']} -> {actual['consultas']}"
+            )
+            if variacion > 10 or actual['consultas'] > previo['consultas']:
+                self.stdout.write(self.style.WARNING(linea))
+            else:
+                self.stdout.write(linea)
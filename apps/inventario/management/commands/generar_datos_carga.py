@@ -0,0 +1,493 @@
+"""
+Comando de management para generar un dataset sintético de carga.
+
+Crea con bulk_create un volumen configurable de datos realistas para medir
+rendimiento localmente. Con --scale 1 genera aproximadamente:
+
+    - 2.000 artículos y 100.000 movimientos de bodega (con stock consistente)
+    - 20.000 solicitudes con sus detalles
+    - 5.000 órdenes de compra con sus detalles y totales
+    - 10.000 activos con 50.000 movimientos de historial
+
+Todos los registros usan el prefijo 'LT-' (usuarios 'lt_') y se generan a
+partir de una semilla, por lo que el resultado es reproducible. Las fechas
+de creación se distribuyen de forma monótona en los últimos --dias días.
+
+Ejecutar:
+    python manage.py generar_datos_carga --scale 0.1
+    python manage.py generar_datos_carga --scale 1 --limpiar
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List, Sequence, Type
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from apps.activos.models import (
+    Activo, CategoriaActivo, EstadoActivo, MovimientoActivo,
+    TipoMovimientoActivo, Ubicacion
+)
+from apps.bodega.models import (
+    Articulo, Bodega, Categoria, Movimiento, Operacion, TipoMovimiento,
+    UnidadMedida
+)
+from apps.compras.models import (
+    DetalleOrdenCompra, DetalleOrdenCompraArticulo, EstadoOrdenCompra,
+    OrdenCompra, Proveedor
+)
+from apps.compras.services import OrdenCompraService
+from apps.solicitudes.models import (
+    Departamento, DetalleSolicitud, EstadoSolicitud, Solicitud, TipoSolicitud
+)
+from apps.solicitudes.repositories import SolicitudRepository
+
+PREFIJO = 'LT-'
+PREFIJO_USUARIO = 'lt_'
+
+# Catálogos de tamaño fijo (no dependen de --scale)
+CATALOGOS = {
+    'usuarios': 50,
+    'bodegas': 5,
+    'categorias': 20,
+    'departamentos': 10,
+}
+
+# Volúmenes transaccionales con --scale 1
+VOLUMENES = {
+    'proveedores': 200,
+    'articulos': 2_000,
+    'movimientos': 100_000,
+    'solicitudes': 20_000,
+    'ordenes': 5_000,
+    'activos': 10_000,
+    'movimientos_activo': 50_000,
+}
+
+
+class Command(BaseCommand):
+    help = 'Genera un dataset sintético escalable para pruebas de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Factor de escala sobre los volúmenes base (default: 1.0)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla para generar datos reproducibles (default: 42)',
+        )
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=730,
+            help='Días de historia sobre los que se distribuyen las fechas (default: 730)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Tamaño de lote para bulk_create (default: 5000)',
+        )
+        parser.add_argument(
+            '--limpiar',
+            action='store_true',
+            help='Elimina los datos sintéticos existentes antes de generar',
+        )
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale debe ser mayor que 0')
+
+        self.rnd = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.fin = timezone.now()
+        self.dias = options['dias']
+        self.volumen = {
+            **CATALOGOS,
+            **{
+                clave: max(1, round(valor * options['scale']))
+                for clave, valor in VOLUMENES.items()
+            },
+        }
+
+        if options['limpiar']:
+            self._limpiar()
+        elif Bodega.objects.filter(codigo__startswith=PREFIJO).exists():
+            raise CommandError(
+                'Ya existen datos sintéticos (prefijo LT-). Use --limpiar para regenerarlos.'
+            )
+
+        with transaction.atomic():
+            self._crear_catalogos()
+            self._crear_usuarios()
+            self._crear_bodega()
+            self._crear_movimientos()
+            self._crear_activos()
+            self._crear_solicitudes()
+            self._crear_ordenes()
+
+        self.stdout.write(self.style.SUCCESS('\n[+] Dataset sintético generado:'))
+        for clave, valor in self.volumen.items():
+            self.stdout.write(f'    {clave}: {valor}')
+
+    # ==================== LIMPIEZA ====================
+
+    def _limpiar(self) -> None:
+        """Elimina los datos sintéticos en orden inverso de dependencias."""
+        self.stdout.write('[+] Eliminando datos sintéticos existentes...')
+        with transaction.atomic():
+            MovimientoActivo.objects.filter(activo__codigo__startswith=PREFIJO).delete()
+            DetalleOrdenCompra.objects.filter(orden_compra__numero__startswith=PREFIJO).delete()
+            DetalleOrdenCompraArticulo.objects.filter(orden_compra__numero__startswith=PREFIJO).delete()
+            OrdenCompra.objects.filter(numero__startswith=PREFIJO).delete()
+            DetalleSolicitud.objects.filter(solicitud__numero__startswith=PREFIJO).delete()
+            Solicitud.objects.filter(numero__startswith=PREFIJO).delete()
+            Movimiento.objects.filter(articulo__codigo__startswith=PREFIJO).delete()
+            for model in (
+                Activo, Articulo, Proveedor, Bodega, Categoria, UnidadMedida,
+                TipoMovimiento, Operacion, Departamento, TipoSolicitud,
+                EstadoSolicitud, EstadoOrdenCompra, CategoriaActivo,
+                EstadoActivo, TipoMovimientoActivo, Ubicacion
+            ):
+                campo = 'rut' if model is Proveedor else 'codigo'
+                model.objects.filter(**{f'{campo}__startswith': PREFIJO}).delete()
+            User.objects.filter(username__startswith=PREFIJO_USUARIO).delete()
+
+    # ==================== UTILIDADES ====================
+
+    def _bulk_create(self, model: Type[models.Model], objetos: List[models.Model]) -> List[models.Model]:
+        """Inserta en lotes y distribuye las fechas de creación en el período."""
+        creados = model.objects.bulk_create(objetos, batch_size=self.batch_size)
+        if creados:
+            self._distribuir_fechas(model, creados[0].pk, creados[-1].pk)
+        return creados
+
+    def _distribuir_fechas(self, model: Type[models.Model], desde_id: int, hasta_id: int) -> None:
+        """
+        Reparte fecha_creacion de forma lineal según el id.
+
+        bulk_create fija auto_now_add en la fecha actual; se corrige con un
+        único UPDATE para que el orden por id coincida con el orden temporal.
+        """
+        total = max(hasta_id - desde_id, 1)
+        paso = self.dias * 86400 / total
+        tabla = connection.ops.quote_name(model._meta.db_table)
+        campos = ['fecha_creacion']
+        if model is Solicitud:
+            campos.append('fecha_solicitud')
+        asignaciones = ', '.join(
+            f"{connection.ops.quote_name(c)} = %s - (%s - id) * %s * interval '1 second'"
+            for c in campos
+        )
+        params = []
+        for _ in campos:
+            params += [self.fin, hasta_id, paso]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {tabla} SET {asignaciones} WHERE id BETWEEN %s AND %s',
+                params + [desde_id, hasta_id]
+            )
+
+    def _bulk_create_en_lotes(self, model: Type[models.Model], lotes) -> None:
+        """Inserta lotes sucesivos y distribuye las fechas una sola vez al final."""
+        primero = ultimo = None
+        for objetos in lotes:
+            if not objetos:
+                continue
+            creados = model.objects.bulk_create(objetos, batch_size=self.batch_size)
+            primero = primero or creados[0].pk
+            ultimo = creados[-1].pk
+        if primero is not None:
+            self._distribuir_fechas(model, primero, ultimo)
+
+    def _en_lotes(self, total: int):
+        """Genera tamaños de lote hasta completar total."""
+        for inicio in range(0, total, self.batch_size):
+            yield min(self.batch_size, total - inicio)
+
+    def _elegir(self, items: Sequence):
+        return items[self.rnd.randrange(len(items))]
+
+    # ==================== CATÁLOGOS ====================
+
+    def _crear_catalogos(self) -> None:
+        self.stdout.write('[+] Creando catálogos...')
+        n_cat = self.volumen['categorias']
+
+        self.categorias = self._bulk_create(Categoria, [
+            Categoria(codigo=f'{PREFIJO}CAT{i:03d}', nombre=f'Categoría carga {i}')
+            for i in range(n_cat)
+        ])
+        self.unidades = self._bulk_create(UnidadMedida, [
+            UnidadMedida(codigo=f'{PREFIJO}U{i}', nombre=nombre, simbolo=simbolo)
+            for i, (nombre, simbolo) in enumerate(
+                [('Unidad', 'un'), ('Caja', 'cj'), ('Resma', 'rm'), ('Litro', 'lt'), ('Kilo', 'kg')]
+            )
+        ])
+        self.tipos_movimiento = self._bulk_create(TipoMovimiento, [
+            TipoMovimiento(codigo=f'{PREFIJO}TM-{c}', nombre=n)
+            for c, n in (('COMPRA', 'Compra'), ('CONSUMO', 'Consumo'), ('AJUSTE', 'Ajuste'))
+        ])
+        self.op_entrada, self.op_salida = self._bulk_create(Operacion, [
+            Operacion(codigo=f'{PREFIJO}OP-ENT', nombre='Entrada carga', tipo='ENTRADA'),
+            Operacion(codigo=f'{PREFIJO}OP-SAL', nombre='Salida carga', tipo='SALIDA'),
+        ])
+        self.departamentos = self._bulk_create(Departamento, [
+            Departamento(codigo=f'{PREFIJO}DEP{i:02d}', nombre=f'Departamento carga {i}')
+            for i in range(self.volumen['departamentos'])
+        ])
+        self.tipo_solicitud = TipoSolicitud.objects.create(
+            codigo=f'{PREFIJO}TS', nombre='Solicitud carga'
+        )
+        self.estados_solicitud = self._bulk_create(EstadoSolicitud, [
+            EstadoSolicitud(codigo=f'{PREFIJO}ES-{c}', nombre=c.title(), es_inicial=c == 'PENDIENTE',
+                            es_final=c == 'DESPACHADA')
+            for c in ('PENDIENTE', 'APROBADA', 'DESPACHADA')
+        ])
+        self.estados_oc = self._bulk_create(EstadoOrdenCompra, [
+            EstadoOrdenCompra(codigo=f'{PREFIJO}EOC-{c}', nombre=c.title())
+            for c in ('BORRADOR', 'APROBADA', 'RECIBIDA')
+        ])
+        self.categorias_activo = self._bulk_create(CategoriaActivo, [
+            CategoriaActivo(
+                codigo=f'{PREFIJO}CA{i:02d}', nombre=f'Categoría activo {i}',
+                sigla=f'L{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}'
+            )
+            for i in range(n_cat)
+        ])
+        self.estados_activo = self._bulk_create(EstadoActivo, [
+            EstadoActivo(codigo=f'{PREFIJO}EA-{c}', nombre=c.title(), es_inicial=c == 'DISPONIBLE')
+            for c in ('DISPONIBLE', 'ASIGNADO', 'MANTENCION')
+        ])
+        self.tipos_mov_activo = self._bulk_create(TipoMovimientoActivo, [
+            TipoMovimientoActivo(codigo=f'{PREFIJO}TMA-{c}', nombre=c.title())
+            for c in ('ASIGNACION', 'TRASLADO', 'DEVOLUCION')
+        ])
+        self.ubicaciones = self._bulk_create(Ubicacion, [
+            Ubicacion(codigo=f'{PREFIJO}UB{i:02d}', nombre=f'Sala carga {i}')
+            for i in range(n_cat)
+        ])
+
+    def _crear_usuarios(self) -> None:
+        self.stdout.write('[+] Creando usuarios...')
+        password = make_password(None)
+        # User no hereda de BaseModel: no requiere distribuir fechas
+        self.usuarios = User.objects.bulk_create([
+            User(
+                username=f'{PREFIJO_USUARIO}usuario_{i:03d}',
+                first_name='Usuario',
+                last_name=f'Carga {i}',
+                password=password,
+            )
+            for i in range(self.volumen['usuarios'])
+        ])
+
+    # ==================== BODEGA ====================
+
+    def _crear_bodega(self) -> None:
+        self.stdout.write('[+] Creando bodegas y artículos...')
+        self.bodegas = self._bulk_create(Bodega, [
+            Bodega(codigo=f'{PREFIJO}BOD{i:02d}', nombre=f'Bodega carga {i}',
+                   responsable=self._elegir(self.usuarios))
+            for i in range(self.volumen['bodegas'])
+        ])
+        articulos = []
+        for i in range(self.volumen['articulos']):
+            stock_minimo = Decimal(self.rnd.randint(5, 50))
+            articulos.append(Articulo(
+                codigo=f'{PREFIJO}ART{i:06d}',
+                nombre=f'Artículo de carga {i}',
+                categoria=self._elegir(self.categorias),
+                unidad_medida=self._elegir(self.unidades),
+                ubicacion_fisica=self._elegir(self.bodegas),
+                stock_actual=Decimal('0'),
+                stock_minimo=stock_minimo,
+                punto_reorden=stock_minimo * 2,
+            ))
+        self.articulos = self._bulk_create(Articulo, articulos)
+
+    def _crear_movimientos(self) -> None:
+        """
+        Genera movimientos con stock_antes/stock_despues consistentes.
+
+        Se generan en orden cronológico global para que la distribución de
+        fechas por id respete la secuencia de saldos de cada artículo.
+        """
+        total = self.volumen['movimientos']
+        self.stdout.write(f'[+] Creando {total} movimientos de bodega...')
+        stock: Dict[int, Decimal] = {a.pk: Decimal('0') for a in self.articulos}
+        entradas = [t for t in self.tipos_movimiento if t.codigo.endswith('COMPRA')]
+        salidas = [t for t in self.tipos_movimiento if not t.codigo.endswith('COMPRA')]
+
+        def lotes():
+            for tamano in self._en_lotes(total):
+                lote = []
+                for _ in range(tamano):
+                    articulo = self._elegir(self.articulos)
+                    antes = stock[articulo.pk]
+                    if antes <= 0 or self.rnd.random() < 0.45:
+                        cantidad = Decimal(self.rnd.randint(5, 60))
+                        operacion, tipo, despues = self.op_entrada, self._elegir(entradas), antes + cantidad
+                    else:
+                        cantidad = Decimal(self.rnd.randint(1, int(min(antes, 25))))
+                        operacion, tipo, despues = self.op_salida, self._elegir(salidas), antes - cantidad
+                    stock[articulo.pk] = despues
+                    lote.append(Movimiento(
+                        articulo=articulo, tipo=tipo, operacion=operacion,
+                        cantidad=cantidad, usuario=self._elegir(self.usuarios),
+                        motivo='Movimiento sintético', stock_antes=antes, stock_despues=despues,
+                    ))
+                yield lote
+
+        self._bulk_create_en_lotes(Movimiento, lotes())
+
+        for articulo in self.articulos:
+            articulo.stock_actual = stock[articulo.pk]
+            articulo.estado_stock = articulo.calcular_estado_stock()
+        Articulo.objects.bulk_update(
+            self.articulos, ['stock_actual', 'estado_stock'], batch_size=self.batch_size
+        )
+
+    # ==================== ACTIVOS ====================
+
+    def _crear_activos(self) -> None:
+        self.stdout.write('[+] Creando activos y su historial...')
+        self.activos = self._bulk_create(Activo, [
+            Activo(
+                codigo=f'{PREFIJO}ACT{i:06d}',
+                nombre=f'Activo de carga {i}',
+                categoria=self._elegir(self.categorias_activo),
+                estado=self._elegir(self.estados_activo),
+                numero_serie=f'SN{self.rnd.randrange(10**9):09d}',
+                precio_unitario=Decimal(self.rnd.randint(20, 2000)) * 1000,
+            )
+            for i in range(self.volumen['activos'])
+        ])
+
+        self._bulk_create_en_lotes(MovimientoActivo, (
+            [
+                MovimientoActivo(
+                    activo=self._elegir(self.activos),
+                    tipo_movimiento=self._elegir(self.tipos_mov_activo),
+                    estado_nuevo=self._elegir(self.estados_activo),
+                    ubicacion_destino=self._elegir(self.ubicaciones),
+                    responsable=self._elegir(self.usuarios),
+                    usuario_registro=self._elegir(self.usuarios),
+                    observaciones='Movimiento sintético',
+                )
+                for _ in range(tamano)
+            ]
+            for tamano in self._en_lotes(self.volumen['movimientos_activo'])
+        ))
+
+    # ==================== SOLICITUDES ====================
+
+    def _crear_solicitudes(self) -> None:
+        total = self.volumen['solicitudes']
+        self.stdout.write(f'[+] Creando {total} solicitudes con detalles...')
+        hoy = self.fin.date()
+        solicitudes = []
+        for i in range(total):
+            tipo = 'ACTIVO' if self.rnd.random() < 0.2 else 'ARTICULO'
+            solicitudes.append(Solicitud(
+                tipo=tipo,
+                numero=f'{PREFIJO}SOL{i:07d}',
+                fecha_requerida=hoy - timedelta(days=self.rnd.randint(0, self.dias)),
+                tipo_solicitud=self.tipo_solicitud,
+                estado=self._elegir(self.estados_solicitud),
+                solicitante=self._elegir(self.usuarios),
+                departamento=self._elegir(self.departamentos),
+                bodega_origen=self._elegir(self.bodegas) if tipo == 'ARTICULO' else None,
+                motivo='Solicitud sintética',
+            ))
+        solicitudes = self._bulk_create(Solicitud, solicitudes)
+
+        def lotes():
+            for inicio in range(0, len(solicitudes), self.batch_size):
+                detalles = []
+                for solicitud in solicitudes[inicio:inicio + self.batch_size]:
+                    for _ in range(self.rnd.randint(1, 5)):
+                        solicitada = self.rnd.randint(1, 20)
+                        aprobada = self.rnd.randint(0, solicitada)
+                        detalles.append(DetalleSolicitud(
+                            solicitud=solicitud,
+                            articulo=self._elegir(self.articulos) if solicitud.tipo == 'ARTICULO' else None,
+                            activo=self._elegir(self.activos) if solicitud.tipo == 'ACTIVO' else None,
+                            cantidad_solicitada=solicitada,
+                            cantidad_aprobada=aprobada,
+                            cantidad_despachada=self.rnd.randint(0, aprobada),
+                        ))
+                yield detalles
+
+        self._bulk_create_en_lotes(DetalleSolicitud, lotes())
+        # bulk_create no pasa por DetalleSolicitud.save(): recalcular el avance
+        SolicitudRepository.recalcular_progreso(Solicitud.objects.filter(numero__startswith=PREFIJO))
+
+    # ==================== COMPRAS ====================
+
+    def _crear_ordenes(self) -> None:
+        total = self.volumen['ordenes']
+        self.stdout.write(f'[+] Creando {total} órdenes de compra con detalles...')
+        self.proveedores = self._bulk_create(Proveedor, [
+            Proveedor(
+                rut=f'{PREFIJO}{i:05d}-{i % 10}',
+                razon_social=f'Proveedor de carga {i}',
+                direccion=f'Calle Sintética {i}',
+            )
+            for i in range(self.volumen['proveedores'])
+        ])
+
+        hoy = self.fin.date()
+        ordenes = []
+        for i in range(total):
+            fecha = hoy - timedelta(days=self.rnd.randint(0, self.dias))
+            ordenes.append(OrdenCompra(
+                numero=f'{PREFIJO}OC{i:07d}',
+                fecha_orden=fecha,
+                fecha_entrega_esperada=fecha + timedelta(days=self.rnd.randint(5, 45)),
+                proveedor=self._elegir(self.proveedores),
+                bodega_destino=self._elegir(self.bodegas),
+                estado=self._elegir(self.estados_oc),
+                solicitante=self._elegir(self.usuarios),
+            ))
+        ordenes = self._bulk_create(OrdenCompra, ordenes)
+
+        servicio = OrdenCompraService()
+        detalles_articulos, detalles_activos = [], []
+        for orden in ordenes:
+            subtotal = Decimal('0')
+            for _ in range(self.rnd.randint(1, 8)):
+                cantidad = self.rnd.randint(1, 100)
+                precio = Decimal(self.rnd.randint(500, 50000))
+                subtotal += cantidad * precio
+                detalles_articulos.append(DetalleOrdenCompraArticulo(
+                    orden_compra=orden, articulo=self._elegir(self.articulos),
+                    cantidad=cantidad, precio_unitario=precio, subtotal=cantidad * precio,
+                    cantidad_recibida=self.rnd.randint(0, cantidad),
+                ))
+            if self.rnd.random() < 0.2:
+                precio = Decimal(self.rnd.randint(100, 2000)) * 1000
+                subtotal += precio
+                detalles_activos.append(DetalleOrdenCompra(
+                    orden_compra=orden, activo=self._elegir(self.activos),
+                    cantidad=1, precio_unitario=precio, subtotal=precio,
+                ))
+            totales = servicio.calcular_totales(subtotal)
+            orden.subtotal = totales['subtotal']
+            orden.impuesto = totales['impuesto'].quantize(Decimal('0.01'))
+            orden.total = totales['total'].quantize(Decimal('0.01'))
+
+        self._bulk_create(DetalleOrdenCompraArticulo, detalles_articulos)
+        self._bulk_create(DetalleOrdenCompra, detalles_activos)
+        OrdenCompra.objects.bulk_update(
+            ordenes, ['subtotal', 'impuesto', 'total'], batch_size=self.batch_size
+        )
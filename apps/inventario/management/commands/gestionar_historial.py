@@ -0,0 +1,122 @@
+"""
+Comando de management para administrar el historial particionado por año.
+
+Opera sobre las tablas de movimientos de bodega y de activos (ver
+core.particiones). Sin acción muestra el estado de las particiones.
+
+Ejecutar:
+    python manage.py gestionar_historial
+    python manage.py gestionar_historial --convertir
+    python manage.py gestionar_historial --asegurar --anios-adelante 2
+    python manage.py gestionar_historial --archivar 2023 --destino /respaldos/historial
+    python manage.py gestionar_historial --desacoplar 2023 --tabla movimientos
+    python manage.py gestionar_historial --restaurar 2023 --destino /respaldos/historial
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from core import particiones
+from core.particiones import ParticionError, TABLAS_HISTORIAL
+
+
+class Command(BaseCommand):
+    help = 'Particiona por año, archiva y restaura el historial de movimientos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tabla',
+            choices=[*TABLAS_HISTORIAL, 'todas'],
+            default='todas',
+            help='Tabla de historial a operar (default: todas)',
+        )
+        acciones = parser.add_mutually_exclusive_group()
+        acciones.add_argument(
+            '--convertir',
+            action='store_true',
+            help='Convierte la tabla plana en particionada por año (bloquea la tabla)',
+        )
+        acciones.add_argument(
+            '--asegurar',
+            action='store_true',
+            help='Crea las particiones del año actual y siguientes si faltan',
+        )
+        acciones.add_argument(
+            '--desacoplar',
+            type=int,
+            metavar='ANIO',
+            help='Desacopla la partición de un año cerrado (queda como tabla aparte)',
+        )
+        acciones.add_argument(
+            '--archivar',
+            type=int,
+            metavar='ANIO',
+            help='Exporta un año cerrado a CSV comprimido y elimina su partición',
+        )
+        acciones.add_argument(
+            '--restaurar',
+            type=int,
+            metavar='ANIO',
+            help='Recrea la partición de un año y carga su archivo comprimido',
+        )
+        parser.add_argument(
+            '--anios-adelante',
+            type=int,
+            default=1,
+            help='Particiones a crear por adelantado tras el año actual (default: 1)',
+        )
+        parser.add_argument(
+            '--destino',
+            type=str,
+            default='',
+            help='Directorio de archivos (default: <BASE_DIR>/archivo_historial)',
+        )
+
+    def handle(self, *args, **options):
+        modelos = (
+            TABLAS_HISTORIAL.values() if options['tabla'] == 'todas'
+            else [TABLAS_HISTORIAL[options['tabla']]]
+        )
+        destino = Path(options['destino'] or Path(settings.BASE_DIR) / 'archivo_historial')
+
+        for modelo in modelos:
+            tabla = modelo._meta.db_table
+            try:
+                if options['convertir']:
+                    self.stdout.write(f'[+] Convirtiendo {tabla} a tabla particionada...')
+                    particiones.convertir_a_particionada(modelo, options['anios_adelante'])
+                elif options['asegurar']:
+                    creadas = particiones.asegurar_particiones(modelo, options['anios_adelante'])
+                    self.stdout.write(f"[+] {tabla}: {', '.join(creadas) or 'sin particiones nuevas'}")
+                elif options['desacoplar'] is not None:
+                    nombre = particiones.desacoplar_anio(modelo, options['desacoplar'])
+                    self.stdout.write(f'[+] Partición desacoplada: {nombre}')
+                elif options['archivar'] is not None:
+                    archivo = particiones.archivar_anio(modelo, options['archivar'], destino)
+                    self.stdout.write(
+                        f'[+] {tabla} {options["archivar"]} archivado en {archivo} '
+                        f'({filesizeformat(archivo.stat().st_size)})'
+                    )
+                elif options['restaurar'] is not None:
+                    filas = particiones.restaurar_anio(modelo, options['restaurar'], destino)
+                    self.stdout.write(f'[+] {tabla} {options["restaurar"]}: {filas} filas restauradas')
+                self._mostrar_estado(modelo)
+            except ParticionError as e:
+                if options['tabla'] != 'todas':
+                    raise CommandError(str(e))
+                self.stdout.write(self.style.WARNING(f'[!] {tabla}: {e}'))
+
+    def _mostrar_estado(self, modelo) -> None:
+        tabla = modelo._meta.db_table
+        if not particiones.esta_particionada(modelo):
+            self.stdout.write(f'[!] {tabla}: tabla plana (sin particionar)')
+            return
+
+        self.stdout.write(f'[+] {tabla}:')
+        for particion in particiones.listar_particiones(modelo):
+            self.stdout.write(
+                f"    {particion.nombre:<45} {particion.anio or 'DEFAULT':>8} "
+                f'~{particion.filas:>10} filas  {filesizeformat(particion.bytes)}'
+            )
@@ -1 +1,26 @@
-from django.contrib import admin
\ No newline at end of file
+from django.contrib import admin
+from .models import ContadorNotificaciones, EventoNotificacion, Notificacion
+
+
+@admin.register(EventoNotificacion)
+class EventoNotificacionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'titulo', 'estado', 'intentos', 'fecha_creacion', 'fecha_procesado']
+    list_filter = ['estado', 'tipo']
+    search_fields = ['titulo', 'clave']
+    readonly_fields = ['destinatarios', 'clave', 'intentos', 'error', 'fecha_procesado', 'fecha_creacion', 'fecha_actualizacion']
+
+
+@admin.register(Notificacion)
+class NotificacionAdmin(admin.ModelAdmin):
+    list_display = ['usuario', 'tipo', 'titulo', 'leida', 'fecha_creacion', 'fecha_email']
+    list_filter = ['tipo', 'leida']
+    search_fields = ['titulo', 'usuario__username']
+    raw_id_fields = ['usuario', 'evento']
+    readonly_fields = ['fecha_lectura', 'fecha_email', 'fecha_creacion', 'fecha_actualizacion']
+
+
+@admin.register(ContadorNotificaciones)
+class ContadorNotificacionesAdmin(admin.ModelAdmin):
+    list_display = ['usuario', 'no_leidas', 'version', 'fecha_actualizacion']
+    search_fields = ['usuario__username']
+    readonly_fields = ['usuario', 'no_leidas', 'version', 'fecha_actualizacion']
@@ -5,3 +5,7 @@ class NotificacionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.notificaciones'
     verbose_name = 'Gestión de Notificaciones'
+
+    def ready(self):
+        """Registra las señales del módulo."""
+        from . import signals  # noqa: F401
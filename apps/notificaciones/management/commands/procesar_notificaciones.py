@@ -0,0 +1,103 @@
+"""
+Comando de management que drena el outbox de notificaciones.
+
+Distribuye los eventos pendientes a las bandejas por lotes y luego envía
+un correo resumen por usuario reutilizando una sola conexión SMTP.
+
+Ejecutar:
+    python manage.py procesar_notificaciones
+    python manage.py procesar_notificaciones --oc-atrasadas        # cron diario
+    python manage.py procesar_notificaciones --continuo --intervalo 30
+    python manage.py procesar_notificaciones --sin-email --lote 500
+    python manage.py procesar_notificaciones --recalcular-contadores  # repara los badges
+"""
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notificaciones.services import NotificacionService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Distribuye las notificaciones pendientes y envía los resúmenes por correo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=200,
+            help='Eventos por transacción (default: 200)',
+        )
+        parser.add_argument(
+            '--sin-email',
+            action='store_true',
+            help='Solo distribuye a las bandejas, sin enviar correos',
+        )
+        parser.add_argument(
+            '--oc-atrasadas',
+            action='store_true',
+            help='Publica antes los avisos de órdenes de compra atrasadas',
+        )
+        parser.add_argument(
+            '--recalcular-contadores',
+            action='store_true',
+            help='Reconstruye los contadores de no leídas desde las bandejas',
+        )
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue procesando hasta ser detenido',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=30,
+            help='Segundos de espera entre pasadas con --continuo (default: 30)',
+        )
+
+    def handle(self, *args, **options):
+        servicio = NotificacionService()
+
+        if options['recalcular_contadores']:
+            total = servicio.recalcular_contadores()
+            self.stdout.write(f'Contadores recalculados: {total} usuario(s) con no leídas')
+
+        if options['oc_atrasadas']:
+            avisos = servicio.publicar_oc_atrasadas()
+            self.stdout.write(f'Órdenes de compra atrasadas: {avisos} aviso(s) nuevo(s)')
+
+        while True:
+            self._pasada(servicio, options)
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
+
+    def _pasada(self, servicio: NotificacionService, options) -> None:
+        """Drena el outbox completo y envía los resúmenes pendientes."""
+        eventos = notificaciones = errores = 0
+        while True:
+            resultado = servicio.procesar_pendientes(options['lote'])
+            eventos += resultado.eventos
+            notificaciones += resultado.notificaciones
+            errores += resultado.errores
+            # Lote vacío, incompleto o fallido: no quedan pendientes procesables ahora
+            if resultado.errores or resultado.eventos < options['lote']:
+                break
+
+        correos = 0
+        if not options['sin_email']:
+            try:
+                correos = servicio.enviar_resumenes()
+            except Exception as error:
+                # Nada quedó marcado como enviado: se reintenta en la próxima pasada
+                logger.exception('Error enviando los resúmenes de notificaciones')
+                self.stderr.write(f'Error enviando resúmenes: {error}')
+
+        if eventos or errores or correos:
+            self.stdout.write(
+                f'{eventos} evento(s), {notificaciones} notificación(es), '
+                f'{correos} correo(s), {errores} con error'
+            )
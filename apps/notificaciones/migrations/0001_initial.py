@@ -0,0 +1,88 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+TIPOS = [
+    ('SOLICITUD_APROBADA', 'Solicitud aprobada'),
+    ('SOLICITUD_RECHAZADA', 'Solicitud rechazada'),
+    ('SOLICITUD_DESPACHADA', 'Solicitud despachada'),
+    ('ENTREGA_REGISTRADA', 'Entrega registrada'),
+    ('STOCK_CRITICO', 'Stock crítico'),
+    ('STOCK_REORDEN', 'Punto de reorden'),
+    ('OC_ESTADO', 'Cambio de estado de OC'),
+    ('OC_ATRASADA', 'OC atrasada'),
+]
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoNotificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('tipo', models.CharField(choices=TIPOS, max_length=30, verbose_name='Tipo')),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('mensaje', models.TextField(blank=True, default='', verbose_name='Mensaje')),
+                ('url', models.CharField(blank=True, default='', max_length=300, verbose_name='URL')),
+                ('destinatarios', models.JSONField(default=list, verbose_name='Destinatarios')),
+                ('enviar_email', models.BooleanField(default=True, verbose_name='Enviar por Correo')),
+                ('clave', models.CharField(blank=True, max_length=150, null=True, unique=True, verbose_name='Clave')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESADO', 'Procesado'), ('ERROR', 'Error')], default='PENDIENTE', max_length=10, verbose_name='Estado')),
+                ('intentos', models.IntegerField(default=0, verbose_name='Intentos')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('fecha_procesado', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Procesamiento')),
+            ],
+            options={
+                'verbose_name': 'Evento de Notificación',
+                'verbose_name_plural': 'Eventos de Notificación',
+                'db_table': 'tba_notificacion_evento',
+                'ordering': ['-id'],
+                'indexes': [models.Index(condition=models.Q(('eliminado', False), ('estado', 'PENDIENTE')), fields=['id'], name='notif_evento_pend_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Notificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activo', models.BooleanField(default=True, help_text='Estado activo/inactivo del registro', verbose_name='Activo')),
+                ('eliminado', models.BooleanField(default=False, help_text='Estado eliminado/no eliminado del registro', verbose_name='Eliminado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, help_text='Fecha y hora de creación del registro', verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, help_text='Fecha y hora de última actualización', verbose_name='Fecha de Actualización')),
+                ('tipo', models.CharField(choices=TIPOS, max_length=30, verbose_name='Tipo')),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('mensaje', models.TextField(blank=True, default='', verbose_name='Mensaje')),
+                ('url', models.CharField(blank=True, default='', max_length=300, verbose_name='URL')),
+                ('leida', models.BooleanField(default=False, verbose_name='Leída')),
+                ('fecha_lectura', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Lectura')),
+                ('requiere_email', models.BooleanField(default=False, verbose_name='Requiere Correo')),
+                ('fecha_email', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Correo')),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones', to='notificaciones.eventonotificacion', verbose_name='Evento')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificaciones', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Notificación',
+                'verbose_name_plural': 'Notificaciones',
+                'db_table': 'tba_notificacion',
+                'ordering': ['-id'],
+                'indexes': [
+                    models.Index(condition=models.Q(('eliminado', False)), fields=['usuario', '-id'], name='notif_bandeja_vivo_idx'),
+                    models.Index(condition=models.Q(('eliminado', False), ('fecha_email__isnull', True), ('requiere_email', True)), fields=['usuario', 'id'], name='notif_email_pend_idx'),
+                ],
+                'constraints': [models.UniqueConstraint(fields=('evento', 'usuario'), name='notif_evento_usuario_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def poblar_contadores(apps, schema_editor):
+    """Inicializa los contadores con las no leídas existentes."""
+    Notificacion = apps.get_model('notificaciones', 'Notificacion')
+    ContadorNotificaciones = apps.get_model('notificaciones', 'ContadorNotificaciones')
+    conteos = (
+        Notificacion.objects.filter(eliminado=False)
+        .values('usuario_id')
+        .annotate(no_leidas=Count('id', filter=Q(leida=False)))
+    )
+    ContadorNotificaciones.objects.bulk_create([
+        ContadorNotificaciones(usuario_id=fila['usuario_id'], no_leidas=fila['no_leidas'])
+        for fila in conteos
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorNotificaciones',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contador_notificaciones', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+                ('no_leidas', models.PositiveIntegerField(default=0, verbose_name='No Leídas')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Versión')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+            ],
+            options={
+                'verbose_name': 'Contador de Notificaciones',
+                'verbose_name_plural': 'Contadores de Notificaciones',
+                'db_table': 'tba_notificacion_contador',
+            },
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
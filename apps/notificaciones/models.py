@@ -1,3 +1,180 @@
 from django.db import models
+from django.contrib.auth.models import User
+from core.models import BaseModel
 
 
+class TipoNotificacion(models.TextChoices):
+    """Tipos de evento que generan notificaciones."""
+    SOLICITUD_APROBADA = 'SOLICITUD_APROBADA', 'Solicitud aprobada'
+    SOLICITUD_RECHAZADA = 'SOLICITUD_RECHAZADA', 'Solicitud rechazada'
+    SOLICITUD_DESPACHADA = 'SOLICITUD_DESPACHADA', 'Solicitud despachada'
+    ENTREGA_REGISTRADA = 'ENTREGA_REGISTRADA', 'Entrega registrada'
+    STOCK_CRITICO = 'STOCK_CRITICO', 'Stock crítico'
+    STOCK_REORDEN = 'STOCK_REORDEN', 'Punto de reorden'
+    OC_ESTADO = 'OC_ESTADO', 'Cambio de estado de OC'
+    OC_ATRASADA = 'OC_ATRASADA', 'OC atrasada'
+
+
+class EventoNotificacion(BaseModel):
+    """
+    Outbox de notificaciones.
+
+    Los services escriben el evento en la misma transacción que el cambio de
+    negocio; el comando procesar_notificaciones lo distribuye después a las
+    bandejas de los destinatarios (y al correo). Ninguna entrega ocurre
+    durante el request.
+
+    Attributes:
+        tipo: TipoNotificacion del evento.
+        titulo: Título de la notificación.
+        mensaje: Cuerpo de la notificación.
+        url: Enlace relativo al objeto notificado.
+        destinatarios: IDs de usuarios a notificar.
+        enviar_email: Si las notificaciones se incluyen en el resumen por correo.
+        clave: Clave de idempotencia (evita publicar dos veces el mismo evento).
+        estado: PENDIENTE, PROCESADO o ERROR.
+        intentos: Intentos de procesamiento.
+        error: Último error de procesamiento.
+        fecha_procesado: Fecha en que se distribuyó.
+    """
+
+    class Estado(models.TextChoices):
+        PENDIENTE = 'PENDIENTE', 'Pendiente'
+        PROCESADO = 'PROCESADO', 'Procesado'
+        ERROR = 'ERROR', 'Error'
+
+    tipo = models.CharField(max_length=30, choices=TipoNotificacion.choices, verbose_name='Tipo')
+    titulo = models.CharField(max_length=200, verbose_name='Título')
+    mensaje = models.TextField(blank=True, default='', verbose_name='Mensaje')
+    url = models.CharField(max_length=300, blank=True, default='', verbose_name='URL')
+    destinatarios = models.JSONField(default=list, verbose_name='Destinatarios')
+    enviar_email = models.BooleanField(default=True, verbose_name='Enviar por Correo')
+    clave = models.CharField(max_length=150, unique=True, blank=True, null=True, verbose_name='Clave')
+    estado = models.CharField(
+        max_length=10,
+        choices=Estado.choices,
+        default=Estado.PENDIENTE,
+        verbose_name='Estado'
+    )
+    intentos = models.IntegerField(default=0, verbose_name='Intentos')
+    error = models.TextField(blank=True, null=True, verbose_name='Error')
+    fecha_procesado = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Procesamiento')
+
+    class Meta:
+        db_table = 'tba_notificacion_evento'
+        verbose_name = 'Evento de Notificación'
+        verbose_name_plural = 'Eventos de Notificación'
+        ordering = ['-id']
+        indexes = [
+            # Cola del worker: solo eventos pendientes, en orden de llegada
+            models.Index(
+                fields=['id'],
+                name='notif_evento_pend_idx',
+                condition=models.Q(estado='PENDIENTE', eliminado=False),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena del evento."""
+        return f"{self.get_tipo_display()} - {self.titulo}"
+
+
+class Notificacion(BaseModel):
+    """
+    Notificación en la bandeja de un usuario.
+
+    Attributes:
+        usuario: Destinatario.
+        evento: Evento del outbox que la originó.
+        tipo: TipoNotificacion (copiado del evento).
+        titulo: Título.
+        mensaje: Cuerpo.
+        url: Enlace relativo al objeto notificado.
+        leida: Si el usuario ya la leyó.
+        fecha_lectura: Fecha de lectura.
+        requiere_email: Si debe incluirse en el resumen por correo.
+        fecha_email: Fecha en que se incluyó en un resumen (o se descartó).
+    """
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notificaciones',
+        verbose_name='Usuario'
+    )
+    evento = models.ForeignKey(
+        EventoNotificacion,
+        on_delete=models.CASCADE,
+        related_name='notificaciones',
+        verbose_name='Evento'
+    )
+    tipo = models.CharField(max_length=30, choices=TipoNotificacion.choices, verbose_name='Tipo')
+    titulo = models.CharField(max_length=200, verbose_name='Título')
+    mensaje = models.TextField(blank=True, default='', verbose_name='Mensaje')
+    url = models.CharField(max_length=300, blank=True, default='', verbose_name='URL')
+    leida = models.BooleanField(default=False, verbose_name='Leída')
+    fecha_lectura = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Lectura')
+    requiere_email = models.BooleanField(default=False, verbose_name='Requiere Correo')
+    fecha_email = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Correo')
+
+    class Meta:
+        db_table = 'tba_notificacion'
+        verbose_name = 'Notificación'
+        verbose_name_plural = 'Notificaciones'
+        ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'usuario'], name='notif_evento_usuario_uniq'),
+        ]
+        indexes = [
+            # Bandeja del usuario (más recientes primero)
+            models.Index(
+                fields=['usuario', '-id'],
+                name='notif_bandeja_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
+            # Cola de resúmenes por correo
+            models.Index(
+                fields=['usuario', 'id'],
+                name='notif_email_pend_idx',
+                condition=models.Q(requiere_email=True, fecha_email__isnull=True, eliminado=False),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """Representación en cadena de la notificación."""
+        return f"{self.usuario} - {self.titulo}"
+
+
+class ContadorNotificaciones(models.Model):
+    """
+    Contador de notificaciones no leídas por usuario.
+
+    Se mantiene incrementalmente al distribuir y al marcar como leídas, para
+    que el badge de la barra superior no cuente la bandeja en cada página.
+
+    Attributes:
+        usuario: Dueño del contador.
+        no_leidas: Notificaciones no leídas.
+        version: Se incrementa con cada cambio (sirve de ETag del polling).
+        fecha_actualizacion: Último cambio.
+    """
+
+    usuario = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='contador_notificaciones',
+        verbose_name='Usuario'
+    )
+    no_leidas = models.PositiveIntegerField(default=0, verbose_name='No Leídas')
+    version = models.PositiveIntegerField(default=0, verbose_name='Versión')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')
+
+    class Meta:
+        db_table = 'tba_notificacion_contador'
+        verbose_name = 'Contador de Notificaciones'
+        verbose_name_plural = 'Contadores de Notificaciones'
+
+    def __str__(self) -> str:
+        """Representación en cadena del contador."""
+        return f"{self.usuario} - {self.no_leidas}"
@@ -0,0 +1,221 @@
+"""
+Repository Pattern para el módulo de notificaciones.
+
+Separa la lógica de acceso a datos de la lógica de negocio,
+siguiendo el principio de Inversión de Dependencias (SOLID).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db.models import Case, Count, F, IntegerField, QuerySet, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.contrib.auth.models import User
+from .models import ContadorNotificaciones, EventoNotificacion, Notificacion
+
+
+# ==================== EVENTO NOTIFICACION REPOSITORY ====================
+
+class EventoNotificacionRepository:
+    """Repository para gestionar el outbox de notificaciones."""
+
+    @staticmethod
+    def create(**kwargs) -> EventoNotificacion:
+        """Crea un nuevo evento pendiente."""
+        return EventoNotificacion.objects.create(**kwargs)
+
+    @staticmethod
+    def bulk_create(eventos: List[EventoNotificacion]) -> List[EventoNotificacion]:
+        """Crea varios eventos ignorando los que repiten su clave de idempotencia."""
+        return EventoNotificacion.objects.bulk_create(eventos, ignore_conflicts=True)
+
+    @staticmethod
+    def bloquear_pendientes(lote: int, ids: Optional[Iterable[int]] = None) -> List[EventoNotificacion]:
+        """
+        Toma y bloquea un lote de eventos pendientes en orden de llegada.
+
+        Usa SKIP LOCKED para que varios workers puedan drenar la cola en
+        paralelo sin procesar dos veces el mismo evento. Debe llamarse
+        dentro de una transacción.
+
+        Args:
+            lote: Máximo de eventos a bloquear
+            ids: Restringe a estos eventos (None = cualquiera pendiente)
+        """
+        queryset = EventoNotificacion.objects.vivos().filter(estado=EventoNotificacion.Estado.PENDIENTE)
+        if ids is not None:
+            queryset = queryset.filter(id__in=list(ids))
+        return list(queryset.select_for_update(skip_locked=True).order_by('id')[:lote])
+
+    @staticmethod
+    def marcar_procesados(ids: Iterable[int]) -> int:
+        """Marca eventos como procesados con un único UPDATE."""
+        return EventoNotificacion.objects.filter(id__in=list(ids)).update(
+            estado=EventoNotificacion.Estado.PROCESADO,
+            fecha_procesado=timezone.now(),
+            fecha_actualizacion=timezone.now(),
+        )
+
+    @staticmethod
+    def claves_existentes(claves: Iterable[str]) -> set:
+        """Claves de idempotencia ya publicadas."""
+        return set(
+            EventoNotificacion.objects.filter(clave__in=list(claves)).values_list('clave', flat=True)
+        )
+
+
+# ==================== NOTIFICACION REPOSITORY ====================
+
+class NotificacionRepository:
+    """Repository para gestionar las bandejas de notificaciones."""
+
+    @staticmethod
+    def filter_by_usuario(usuario: User) -> QuerySet[Notificacion]:
+        """Notificaciones de un usuario, más recientes primero."""
+        return Notificacion.objects.vivos().filter(usuario=usuario).order_by('-id')
+
+    @staticmethod
+    def pagina_bandeja(
+        usuario_id: int,
+        antes: Optional[int] = None,
+        limite: int = 20,
+        solo_no_leidas: bool = False
+    ) -> List[dict]:
+        """
+        Página de la bandeja paginada por cursor (id descendente).
+
+        Usa el índice (usuario, -id) sin OFFSET: el costo no crece con la
+        profundidad de la página. Trae una fila extra para saber si hay más.
+        """
+        queryset = Notificacion.objects.vivos().filter(usuario_id=usuario_id)
+        if antes:
+            queryset = queryset.filter(id__lt=antes)
+        if solo_no_leidas:
+            queryset = queryset.filter(leida=False)
+        return list(
+            queryset.order_by('-id').values(
+                'id', 'tipo', 'titulo', 'mensaje', 'url', 'leida', 'fecha_creacion'
+            )[:limite + 1]
+        )
+
+    @staticmethod
+    def marcar_leidas(usuario_id: int, ids: Optional[Iterable[int]] = None) -> int:
+        """Marca como leídas (todas o las indicadas) con un único UPDATE."""
+        queryset = Notificacion.objects.vivos().filter(usuario_id=usuario_id, leida=False)
+        if ids is not None:
+            queryset = queryset.filter(id__in=list(ids))
+        return queryset.update(leida=True, fecha_lectura=timezone.now())
+
+    @staticmethod
+    def bulk_create(notificaciones: List[Notificacion]) -> List[Notificacion]:
+        """Crea notificaciones ignorando las ya distribuidas (evento, usuario)."""
+        return Notificacion.objects.bulk_create(notificaciones, ignore_conflicts=True, batch_size=1000)
+
+    @staticmethod
+    def usuarios_activos(ids: Iterable[int]) -> Dict[int, bool]:
+        """Filtra los IDs a usuarios activos (el valor indica si tiene correo)."""
+        return {
+            usuario_id: bool(email)
+            for usuario_id, email in User.objects.filter(
+                id__in=list(ids), is_active=True
+            ).values_list('id', 'email')
+        }
+
+    @staticmethod
+    def pendientes_email(limite: int) -> QuerySet[Notificacion]:
+        """Notificaciones a incluir en el próximo resumen, agrupables por usuario."""
+        return (
+            Notificacion.objects.vivos()
+            .filter(requiere_email=True, fecha_email__isnull=True)
+            .select_related('usuario')
+            .only(
+                'id', 'titulo', 'mensaje', 'url', 'fecha_creacion',
+                'usuario__id', 'usuario__email', 'usuario__first_name',
+                'usuario__last_name', 'usuario__username',
+            )
+            .order_by('usuario_id', 'id')[:limite]
+        )
+
+    @staticmethod
+    def marcar_email_enviado(ids: Iterable[int]) -> int:
+        """Marca notificaciones como incluidas en un resumen con un único UPDATE."""
+        return Notificacion.objects.filter(id__in=list(ids)).update(fecha_email=timezone.now())
+
+
+# ==================== CONTADOR NOTIFICACIONES REPOSITORY ====================
+
+class ContadorNotificacionesRepository:
+    """Repository para los contadores de no leídas."""
+
+    @staticmethod
+    def get(usuario_id: int) -> Tuple[int, int]:
+        """Retorna (no_leidas, version) del usuario; (0, 0) si aún no tiene contador."""
+        fila = ContadorNotificaciones.objects.filter(usuario_id=usuario_id).values_list(
+            'no_leidas', 'version'
+        ).first()
+        return fila or (0, 0)
+
+    @staticmethod
+    def usuario_ids() -> List[int]:
+        """IDs de todos los usuarios con contador."""
+        return list(ContadorNotificaciones.objects.values_list('usuario_id', flat=True))
+
+    @staticmethod
+    def incrementar(conteos: Dict[int, int]) -> None:
+        """
+        Suma notificaciones nuevas a varios contadores.
+
+        Crea los contadores que falten y luego los incrementa todos con un
+        único UPDATE (CASE por usuario).
+        """
+        if not conteos:
+            return
+        ContadorNotificaciones.objects.bulk_create(
+            [ContadorNotificaciones(usuario_id=usuario_id) for usuario_id in conteos],
+            ignore_conflicts=True
+        )
+        ContadorNotificaciones.objects.filter(usuario_id__in=list(conteos)).update(
+            no_leidas=F('no_leidas') + Case(
+                *[When(usuario_id=usuario_id, then=Value(n)) for usuario_id, n in conteos.items()],
+                default=Value(0),
+                output_field=IntegerField()
+            ),
+            version=F('version') + 1,
+            fecha_actualizacion=timezone.now(),
+        )
+
+    @staticmethod
+    def descontar(usuario_id: int, cantidad: int) -> int:
+        """
+        Descuenta notificaciones leídas con un único UPDATE.
+
+        Siempre resta la cantidad marcada (nunca fija el valor): un lote del
+        worker confirmado entre el marcado y el descuento conserva su suma.
+        """
+        return ContadorNotificaciones.objects.filter(usuario_id=usuario_id).update(
+            no_leidas=Greatest(F('no_leidas') - cantidad, Value(0)),
+            version=F('version') + 1,
+            fecha_actualizacion=timezone.now(),
+        )
+
+    @staticmethod
+    def recalcular(usuario_ids: Optional[Iterable[int]] = None) -> int:
+        """Reconstruye contadores desde la bandeja (reparación)."""
+        contadores = ContadorNotificaciones.objects.all()
+        notificaciones = Notificacion.objects.vivos()
+        if usuario_ids is not None:
+            usuario_ids = list(usuario_ids)
+            contadores = contadores.filter(usuario_id__in=usuario_ids)
+            notificaciones = notificaciones.filter(usuario_id__in=usuario_ids)
+
+        contadores.update(no_leidas=0, version=F('version') + 1, fecha_actualizacion=timezone.now())
+        conteos = notificaciones.filter(leida=False).values('usuario_id').annotate(no_leidas=Count('id'))
+        nuevos = ContadorNotificaciones.objects.bulk_create(
+            [
+                ContadorNotificaciones(usuario_id=fila['usuario_id'], no_leidas=fila['no_leidas'])
+                for fila in conteos
+            ],
+            update_conflicts=True,
+            unique_fields=['usuario'],
+            update_fields=['no_leidas'],
+            batch_size=1000
+        )
+        return len(nuevos)
@@ -0,0 +1,419 @@
+"""
+Service Layer para el módulo de notificaciones.
+
+Los demás módulos publican eventos en el outbox (EventoNotificacion) dentro
+de su propia transacción: si el cambio de negocio se revierte, el evento
+también. La distribución a las bandejas y el envío de correos los hace el
+comando procesar_notificaciones fuera del request.
+"""
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+
+from .models import EventoNotificacion, Notificacion, TipoNotificacion
+from .repositories import (
+    ContadorNotificacionesRepository, EventoNotificacionRepository, NotificacionRepository
+)
+
+logger = logging.getLogger(__name__)
+
+Destinatario = Union[User, int, None]
+
+CACHE_CONTADOR = 'notificaciones:contador:{}'
+CACHE_CONTADOR_TIMEOUT = 60 * 5
+
+
+@dataclass
+class ResultadoProcesamiento:
+    """Resumen de una pasada del worker de notificaciones."""
+    eventos: int = 0
+    notificaciones: int = 0
+    errores: int = 0
+
+
+class NotificacionService:
+    """Service para publicar y distribuir notificaciones."""
+
+    # Intentos antes de dejar un evento en estado ERROR
+    MAX_INTENTOS = 5
+
+    def __init__(self):
+        self.evento_repo = EventoNotificacionRepository()
+        self.notificacion_repo = NotificacionRepository()
+        self.contador_repo = ContadorNotificacionesRepository()
+
+    @staticmethod
+    def url(nombre: str, pk: int) -> str:
+        """Ruta relativa de un objeto para enlazarlo desde la notificación."""
+        return reverse(nombre, kwargs={'pk': pk})
+
+    @staticmethod
+    def _ids_destinatarios(destinatarios: Iterable[Destinatario]) -> List[int]:
+        """Normaliza usuarios o IDs a una lista sin repetidos ni vacíos."""
+        ids = []
+        for destinatario in destinatarios:
+            usuario_id = getattr(destinatario, 'pk', destinatario)
+            if usuario_id and usuario_id not in ids:
+                ids.append(usuario_id)
+        return ids
+
+    def publicar(
+        self,
+        tipo: str,
+        destinatarios: Iterable[Destinatario],
+        titulo: str,
+        mensaje: str = '',
+        url: str = '',
+        enviar_email: bool = True,
+        clave: Optional[str] = None
+    ) -> Optional[EventoNotificacion]:
+        """
+        Registra un evento en el outbox dentro de la transacción actual.
+
+        Solo cuesta un INSERT; no distribuye ni envía nada. Si ya existe un
+        evento con la misma clave no se publica de nuevo (sin romper la
+        transacción del llamador).
+
+        Args:
+            tipo: TipoNotificacion
+            destinatarios: Usuarios o IDs de usuario (se ignoran los vacíos)
+            titulo: Título de la notificación
+            mensaje: Cuerpo de la notificación
+            url: Ruta relativa al objeto notificado
+            enviar_email: Si se incluye en el resumen por correo
+            clave: Clave de idempotencia (opcional)
+
+        Returns:
+            Evento publicado o None si no hay destinatarios
+        """
+        ids = self._ids_destinatarios(destinatarios)
+        if not ids:
+            return None
+        evento = EventoNotificacion(
+            tipo=tipo,
+            titulo=titulo[:200],
+            mensaje=mensaje,
+            url=url,
+            destinatarios=ids,
+            enviar_email=enviar_email,
+            clave=clave,
+        )
+        self.evento_repo.bulk_create([evento])
+        return evento
+
+    @transaction.atomic
+    def publicar_oc_atrasadas(self, hoy: Optional[date] = None) -> int:
+        """
+        Publica un aviso por cada orden de compra atrasada.
+
+        Cada orden se avisa una sola vez por fecha de entrega esperada (si se
+        reprograma y vuelve a atrasarse, se avisa otra vez).
+
+        Args:
+            hoy: Fecha de referencia (por defecto hoy)
+
+        Returns:
+            Cantidad de avisos nuevos
+        """
+        from apps.compras.repositories import OrdenCompraRepository
+
+        hoy = hoy or timezone.localdate()
+        eventos = {}
+        for orden_id, numero, fecha_esperada, solicitante_id in OrdenCompraRepository.get_atrasadas(hoy):
+            clave = f'{TipoNotificacion.OC_ATRASADA}:{orden_id}:{fecha_esperada.isoformat()}'
+            eventos[clave] = EventoNotificacion(
+                tipo=TipoNotificacion.OC_ATRASADA,
+                titulo=f'Orden de compra {numero} atrasada',
+                mensaje=f'La entrega esperada era el {fecha_esperada:%d/%m/%Y} y la orden sigue abierta.',
+                url=self.url('compras:orden_compra_detalle', orden_id),
+                destinatarios=[solicitante_id],
+                clave=clave,
+            )
+        if not eventos:
+            return 0
+        nuevas = set(eventos) - self.evento_repo.claves_existentes(eventos)
+        self.evento_repo.bulk_create([eventos[clave] for clave in nuevas])
+        return len(nuevas)
+
+    def publicar_estados_stock(self, transiciones: Iterable[Any]) -> int:
+        """
+        Publica un aviso por cada transición a stock crítico o de reorden.
+
+        Los responsables de las bodegas se resuelven con una sola consulta y
+        los eventos se insertan con un único bulk_create. Cada transición se
+        avisa una sola vez.
+
+        Args:
+            transiciones: TransicionEstadoStock con su articulo cargado
+
+        Returns:
+            Cantidad de avisos publicados
+        """
+        from apps.bodega.models import Articulo, Bodega
+
+        tipos = {
+            Articulo.EstadoStock.CRITICO: TipoNotificacion.STOCK_CRITICO,
+            Articulo.EstadoStock.REORDEN: TipoNotificacion.STOCK_REORDEN,
+        }
+        avisos = [t for t in transiciones if t.estado_nuevo in tipos]
+        if not avisos:
+            return 0
+
+        responsables = dict(
+            Bodega.objects.filter(
+                pk__in={t.articulo.ubicacion_fisica_id for t in avisos}
+            ).values_list('id', 'responsable_id')
+        )
+        eventos = []
+        for transicion in avisos:
+            articulo = transicion.articulo
+            responsable_id = responsables.get(articulo.ubicacion_fisica_id)
+            if not responsable_id:
+                continue
+            eventos.append(EventoNotificacion(
+                tipo=tipos[transicion.estado_nuevo],
+                titulo=f'{articulo.codigo} - {articulo.nombre}: '
+                       f'{Articulo.EstadoStock(transicion.estado_nuevo).label}'[:200],
+                mensaje=f'Stock actual {transicion.stock_actual} (mínimo {articulo.stock_minimo}, '
+                        f'reorden {articulo.punto_reorden or "-"}).',
+                url=self.url('bodega:articulo_detalle', articulo.pk),
+                destinatarios=[responsable_id],
+                clave=f'STOCK:{transicion.pk}',
+            ))
+        self.evento_repo.bulk_create(eventos)
+        return len(eventos)
+
+    def procesar_pendientes(self, lote: int = 200) -> ResultadoProcesamiento:
+        """
+        Distribuye un lote de eventos pendientes a las bandejas.
+
+        Bloquea el lote con SKIP LOCKED, crea todas las notificaciones con un
+        único bulk_create y marca los eventos con un único UPDATE. Si el lote
+        falla, se revierte completo y sus eventos se reintentan uno por uno:
+        solo los que vuelven a fallar suman un intento.
+
+        Args:
+            lote: Máximo de eventos a procesar
+
+        Returns:
+            ResultadoProcesamiento con eventos y notificaciones creadas
+        """
+        resultado = ResultadoProcesamiento()
+        ids_lote: List[int] = []
+        try:
+            with transaction.atomic():
+                eventos = self.evento_repo.bloquear_pendientes(lote)
+                if not eventos:
+                    return resultado
+                ids_lote = [evento.id for evento in eventos]
+                resultado.notificaciones = self._distribuir(eventos)
+        except Exception:
+            logger.exception('Error distribuyendo el lote de notificaciones; se reintenta por evento')
+            return self._procesar_por_evento(ids_lote)
+
+        resultado.eventos = len(eventos)
+        return resultado
+
+    def _procesar_por_evento(self, ids: List[int]) -> ResultadoProcesamiento:
+        """
+        Distribuye los eventos de un lote fallido, cada uno en su transacción.
+
+        Los eventos que tomó otro worker entretanto se omiten.
+        """
+        resultado = ResultadoProcesamiento()
+        for evento_id in ids:
+            try:
+                with transaction.atomic():
+                    eventos = self.evento_repo.bloquear_pendientes(1, ids=[evento_id])
+                    if not eventos:
+                        continue
+                    resultado.notificaciones += self._distribuir(eventos)
+                    resultado.eventos += 1
+            except Exception as error:
+                logger.exception('Error distribuyendo el evento de notificación %s', evento_id)
+                resultado.errores += self._registrar_error([evento_id], error)
+        return resultado
+
+    def _distribuir(self, eventos: List[EventoNotificacion]) -> int:
+        """
+        Crea las notificaciones de los eventos bloqueados y los marca procesados.
+
+        Debe llamarse dentro de la transacción que bloqueó los eventos.
+
+        Returns:
+            Cantidad de notificaciones creadas
+        """
+        usuarios = self.notificacion_repo.usuarios_activos(
+            {usuario_id for evento in eventos for usuario_id in evento.destinatarios}
+        )
+        notificaciones = [
+            Notificacion(
+                usuario_id=usuario_id,
+                evento=evento,
+                tipo=evento.tipo,
+                titulo=evento.titulo,
+                mensaje=evento.mensaje,
+                url=evento.url,
+                requiere_email=evento.enviar_email and usuarios[usuario_id],
+            )
+            for evento in eventos
+            for usuario_id in evento.destinatarios
+            if usuario_id in usuarios
+        ]
+        self.notificacion_repo.bulk_create(notificaciones)
+        self.evento_repo.marcar_procesados(evento.id for evento in eventos)
+        conteos = Counter(notificacion.usuario_id for notificacion in notificaciones)
+        self.contador_repo.incrementar(conteos)
+        self._invalidar_contadores(conteos)
+        return len(notificaciones)
+
+    def _registrar_error(self, ids: List[int], error: Exception) -> int:
+        """Suma un intento a los eventos que fallaron y descarta los agotados."""
+        if not ids:
+            return 0
+        eventos = list(EventoNotificacion.objects.filter(id__in=ids))
+        for evento in eventos:
+            evento.intentos += 1
+            evento.error = str(error)[:2000]
+            if evento.intentos >= self.MAX_INTENTOS:
+                evento.estado = EventoNotificacion.Estado.ERROR
+        EventoNotificacion.objects.bulk_update(eventos, ['intentos', 'error', 'estado'])
+        return len(eventos)
+
+    def enviar_resumenes(self, limite: int = 2000) -> int:
+        """
+        Envía un correo resumen por usuario con sus notificaciones pendientes.
+
+        Todos los correos salen por una sola conexión SMTP (send_messages) y
+        las notificaciones se marcan con un único UPDATE después del envío;
+        si el servidor falla no se marca nada y se reintenta en la próxima
+        pasada.
+
+        Args:
+            limite: Máximo de notificaciones a incluir en esta pasada
+
+        Returns:
+            Cantidad de correos enviados
+        """
+        por_usuario = defaultdict(list)
+        for notificacion in self.notificacion_repo.pendientes_email(limite):
+            por_usuario[notificacion.usuario].append(notificacion)
+        if not por_usuario:
+            return 0
+
+        url_base = getattr(settings, 'NOTIFICACIONES_URL_BASE', '').rstrip('/')
+        mensajes = []
+        for usuario, notificaciones in por_usuario.items():
+            if not usuario.email:
+                continue
+            cuerpo = render_to_string('notificaciones/email/resumen.txt', {
+                'usuario': usuario,
+                'notificaciones': notificaciones,
+                'url_base': url_base,
+            })
+            asunto = (
+                notificaciones[0].titulo if len(notificaciones) == 1
+                else f'Tienes {len(notificaciones)} notificaciones nuevas'
+            )
+            mensajes.append(EmailMessage(asunto, cuerpo, to=[usuario.email]))
+
+        if mensajes:
+            with get_connection() as conexion:
+                conexion.send_messages(mensajes)
+
+        self.notificacion_repo.marcar_email_enviado(
+            notificacion.id for notificaciones in por_usuario.values() for notificacion in notificaciones
+        )
+        return len(mensajes)
+
+    # ==================== BANDEJA ====================
+
+    @staticmethod
+    def _invalidar_contadores(usuario_ids: Iterable[int]) -> None:
+        """Descarta los contadores cacheados cuando la transacción se confirma."""
+        claves = [CACHE_CONTADOR.format(usuario_id) for usuario_id in usuario_ids]
+        if claves:
+            transaction.on_commit(lambda: cache.delete_many(claves))
+
+    def contador(self, usuario_id: int) -> Tuple[int, int]:
+        """
+        Notificaciones no leídas del usuario y versión de su bandeja.
+
+        Se sirve desde la caché; en un fallo cuesta una consulta por clave
+        primaria (nunca un COUNT sobre la bandeja).
+
+        Returns:
+            Tupla (no_leidas, version)
+        """
+        clave = CACHE_CONTADOR.format(usuario_id)
+        valor = cache.get(clave)
+        if valor is None:
+            valor = tuple(self.contador_repo.get(usuario_id))
+            cache.set(clave, valor, CACHE_CONTADOR_TIMEOUT)
+        return valor
+
+    def bandeja(
+        self,
+        usuario_id: int,
+        antes: Optional[int] = None,
+        limite: int = 20,
+        solo_no_leidas: bool = False
+    ) -> Tuple[List[dict], Optional[int]]:
+        """
+        Página de la bandeja del usuario.
+
+        Args:
+            usuario_id: Dueño de la bandeja
+            antes: Cursor (id de la última notificación de la página anterior)
+            limite: Notificaciones por página
+            solo_no_leidas: Filtra las ya leídas
+
+        Returns:
+            Tupla (notificaciones, cursor de la página siguiente o None)
+        """
+        filas = self.notificacion_repo.pagina_bandeja(usuario_id, antes, limite, solo_no_leidas)
+        siguiente = filas[limite - 1]['id'] if len(filas) > limite else None
+        return filas[:limite], siguiente
+
+    @transaction.atomic
+    def marcar_leidas(self, usuario_id: int, ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Marca notificaciones del usuario como leídas y descuenta su contador.
+
+        Una sentencia para la bandeja y otra para el contador, sin importar
+        cuántas se marquen. El contador se descuenta en las marcadas aun al
+        marcar todas, para no perder las que el worker reparta entretanto.
+
+        Args:
+            usuario_id: Dueño de las notificaciones
+            ids: Notificaciones a marcar (None marca todas)
+
+        Returns:
+            Cantidad de notificaciones marcadas
+        """
+        marcadas = self.notificacion_repo.marcar_leidas(usuario_id, ids)
+        if marcadas:
+            self.contador_repo.descontar(usuario_id, marcadas)
+            self._invalidar_contadores([usuario_id])
+        return marcadas
+
+    @transaction.atomic
+    def recalcular_contadores(self, usuario_ids: Optional[Iterable[int]] = None) -> int:
+        """Reconstruye los contadores desde la bandeja y limpia su caché."""
+        usuario_ids = None if usuario_ids is None else list(usuario_ids)
+        total = self.contador_repo.recalcular(usuario_ids)
+        self._invalidar_contadores(
+            self.contador_repo.usuario_ids() if usuario_ids is None else usuario_ids
+        )
+        return total
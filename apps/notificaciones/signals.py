@@ -0,0 +1,19 @@
+"""
+Receptores del módulo de notificaciones.
+
+Publica en el outbox los cruces de stock mínimo y punto de reorden que
+emite bodega (estados_stock_cambiados se envía después del commit con todas
+las transiciones de la transacción, así que los eventos se escriben fuera de
+la transacción del movimiento y en un solo INSERT).
+"""
+from django.dispatch import receiver
+
+from apps.bodega.signals import estados_stock_cambiados
+
+from .services import NotificacionService
+
+
+@receiver(estados_stock_cambiados)
+def notificar_estados_stock(sender, transiciones, **kwargs) -> None:
+    """Avisa a los responsables de bodega de los artículos que entran en crítico o reorden."""
+    NotificacionService().publicar_estados_stock(transiciones)
@@ -0,0 +1,253 @@
+"""
+Tests del outbox de notificaciones.
+"""
+import smtplib
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.bodega.models import Articulo, Bodega, Categoria
+from apps.bodega.signals import registrar_transiciones_estado_stock
+from apps.notificaciones.models import EventoNotificacion, Notificacion, TipoNotificacion
+from apps.notificaciones.services import NotificacionService
+from apps.solicitudes.models import DetalleSolicitud, EstadoSolicitud, Solicitud, TipoSolicitud
+from apps.solicitudes.services import SolicitudService
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class NotificacionServiceTest(TestCase):
+    """Tests de publicación, distribución y resúmenes por correo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.solicitante = User.objects.create_user('solicitante', email='sol@colegio.cl', password='clave')
+        cls.aprobador = User.objects.create_user('aprobador', email='apr@colegio.cl', password='clave')
+        cls.sin_correo = User.objects.create_user('sincorreo', password='clave')
+        bodega = Bodega.objects.create(codigo='BN', nombre='Bodega', responsable=cls.aprobador)
+        categoria = Categoria.objects.create(codigo='CN', nombre='Categoría')
+        articulo = Articulo.objects.create(
+            codigo='AN1', nombre='Artículo', categoria=categoria,
+            ubicacion_fisica=bodega, stock_actual=10, stock_minimo=0
+        )
+        EstadoSolicitud.objects.create(codigo='APROBADA', nombre='Aprobada')
+        cls.solicitud = Solicitud.objects.create(
+            numero='SOL-N1', tipo='ARTICULO',
+            tipo_solicitud=TipoSolicitud.objects.create(codigo='TSN', nombre='Tipo'),
+            estado=EstadoSolicitud.objects.create(codigo='PENDIENTE', nombre='Pendiente', es_inicial=True),
+            solicitante=cls.solicitante, bodega_origen=bodega,
+            fecha_requerida=date(2025, 3, 1), motivo='Actividad'
+        )
+        cls.detalle = DetalleSolicitud.objects.create(
+            solicitud=cls.solicitud, articulo=articulo, cantidad_solicitada=2
+        )
+
+    def setUp(self):
+        self.service = NotificacionService()
+
+    def test_evento_se_revierte_con_la_transaccion(self):
+        """El evento publicado dentro de una transacción fallida no queda en el outbox."""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.service.publicar(TipoNotificacion.OC_ESTADO, [self.solicitante], 'Prueba')
+            raise RuntimeError
+
+        self.assertFalse(EventoNotificacion.objects.exists())
+
+    def test_aprobar_publica_y_worker_distribuye(self):
+        """Aprobar publica un evento; el worker lo reparte y lo marca procesado."""
+        SolicitudService().aprobar_solicitud(
+            self.solicitud, self.aprobador, [{'detalle_id': self.detalle.id, 'cantidad_aprobada': 2}]
+        )
+        evento = EventoNotificacion.objects.get()
+        self.assertEqual(evento.tipo, TipoNotificacion.SOLICITUD_APROBADA)
+        self.assertEqual(evento.destinatarios, [self.solicitante.id])
+        self.assertFalse(Notificacion.objects.exists())
+
+        resultado = self.service.procesar_pendientes()
+
+        self.assertEqual((resultado.eventos, resultado.notificaciones), (1, 1))
+        notificacion = Notificacion.objects.get()
+        self.assertEqual(notificacion.usuario, self.solicitante)
+        self.assertTrue(notificacion.requiere_email)
+        evento.refresh_from_db()
+        self.assertEqual(evento.estado, EventoNotificacion.Estado.PROCESADO)
+        self.assertEqual(self.service.procesar_pendientes().eventos, 0)
+
+    def test_resumen_un_correo_por_usuario(self):
+        """Cada usuario con correo recibe un único resumen con todas sus notificaciones."""
+        for i in range(3):
+            self.service.publicar(
+                TipoNotificacion.OC_ESTADO, [self.solicitante, self.sin_correo], f'Orden {i}'
+            )
+        self.service.publicar(TipoNotificacion.OC_ESTADO, [self.aprobador.id], 'Orden 9', clave='OC:9')
+        self.service.publicar(TipoNotificacion.OC_ESTADO, [self.aprobador.id], 'Orden 9', clave='OC:9')
+        self.service.procesar_pendientes()
+
+        self.assertEqual(self.service.enviar_resumenes(), 2)
+
+        self.assertEqual(len(mail.outbox), 2)
+        correo = next(m for m in mail.outbox if m.to == ['sol@colegio.cl'])
+        self.assertIn('Orden 2', correo.body)
+        self.assertFalse(Notificacion.objects.filter(requiere_email=True, fecha_email__isnull=True).exists())
+        self.assertEqual(Notificacion.objects.filter(usuario=self.aprobador).count(), 1)
+        self.assertEqual(self.service.enviar_resumenes(), 0)
+
+    def test_evento_fallido_no_arrastra_al_lote(self):
+        """Si el lote falla, sus eventos se reintentan uno por uno y solo el defectuoso suma intentos."""
+        self.service.publicar(TipoNotificacion.OC_ESTADO, [self.solicitante], 'Orden 1')
+        defectuoso = EventoNotificacion.objects.create(
+            tipo=TipoNotificacion.OC_ESTADO, titulo='Defectuoso', destinatarios=['x']
+        )
+        self.service.publicar(TipoNotificacion.OC_ESTADO, [self.aprobador], 'Orden 2')
+
+        for _ in range(NotificacionService.MAX_INTENTOS):
+            resultado = self.service.procesar_pendientes()
+
+        self.assertEqual((resultado.eventos, resultado.errores), (0, 1))
+        defectuoso.refresh_from_db()
+        self.assertEqual(defectuoso.estado, EventoNotificacion.Estado.ERROR)
+        self.assertEqual(defectuoso.intentos, NotificacionService.MAX_INTENTOS)
+        self.assertEqual(
+            set(EventoNotificacion.objects.exclude(pk=defectuoso.pk).values_list('estado', 'intentos')),
+            {(EventoNotificacion.Estado.PROCESADO, 0)}
+        )
+        self.assertEqual(Notificacion.objects.count(), 2)
+
+    def test_comando_sobrevive_a_fallas_del_correo(self):
+        """Un error SMTP se registra y las notificaciones quedan para la próxima pasada."""
+        self.service.publicar(TipoNotificacion.OC_ESTADO, [self.solicitante], 'Orden 1')
+        salida, errores = StringIO(), StringIO()
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=smtplib.SMTPException('servidor caído')
+        ), self.assertLogs('apps.notificaciones', 'ERROR'):
+            call_command('procesar_notificaciones', stdout=salida, stderr=errores)
+
+        self.assertIn('servidor caído', errores.getvalue())
+        self.assertTrue(Notificacion.objects.filter(requiere_email=True, fecha_email__isnull=True).exists())
+
+        call_command('procesar_notificaciones', stdout=salida, stderr=errores)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class BandejaNotificacionesTest(TestCase):
+    """Tests del contador de no leídas y los endpoints de la bandeja."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('lector', password='clave')
+        cls.otro = User.objects.create_user('otro', password='clave')
+        service = NotificacionService()
+        for i in range(5):
+            service.publicar(TipoNotificacion.OC_ESTADO, [cls.usuario, cls.otro], f'Aviso {i}')
+        service.procesar_pendientes()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+        self.service = NotificacionService()
+
+    def test_contador_se_mantiene_sin_contar_la_bandeja(self):
+        """El worker suma al contador y marcar leídas descuenta en una sentencia."""
+        self.assertEqual(self.service.contador(self.usuario.pk)[0], 5)
+
+        ids = list(Notificacion.objects.filter(usuario=self.usuario).values_list('id', flat=True)[:2])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.service.marcar_leidas(self.usuario.pk, ids), 2)
+            # Volver a marcarlas no descuenta de nuevo
+            self.assertEqual(self.service.marcar_leidas(self.usuario.pk, ids), 0)
+
+        self.assertEqual(self.service.contador(self.usuario.pk)[0], 3)
+        self.assertEqual(self.service.contador(self.otro.pk)[0], 5)
+        with self.assertNumQueries(0):
+            self.service.contador(self.usuario.pk)
+
+    def test_marcar_todas_no_pierde_las_repartidas_entretanto(self):
+        """Un lote del worker confirmado entre el marcado y el descuento sigue contando."""
+        marcar = self.service.notificacion_repo.marcar_leidas
+
+        def marcar_y_repartir(usuario_id, ids):
+            marcadas = marcar(usuario_id, ids)
+            self.service.publicar(TipoNotificacion.OC_ESTADO, [self.usuario], 'Entretanto')
+            self.service.procesar_pendientes()
+            return marcadas
+
+        with mock.patch.object(self.service.notificacion_repo, 'marcar_leidas', side_effect=marcar_y_repartir), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.service.marcar_leidas(self.usuario.pk), 5)
+
+        self.assertEqual(self.service.contador(self.usuario.pk)[0], 1)
+
+    def test_polling_responde_304_sin_cambios(self):
+        """El contador revalida con ETag y cambia cuando llega una notificación."""
+        url = reverse('notificaciones:ajax_contador')
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.json()['no_leidas'], 5)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.publicar(TipoNotificacion.OC_ESTADO, [self.usuario], 'Nuevo')
+            self.service.procesar_pendientes()
+        nueva = self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(nueva.status_code, 200)
+        self.assertEqual(nueva.json()['no_leidas'], 6)
+
+    def test_bandeja_por_cursor(self):
+        """La bandeja se recorre por cursor sin repetir ni saltar notificaciones."""
+        url = reverse('notificaciones:ajax_bandeja')
+        primera = self.client.get(url, {'limite': 3}).json()
+        segunda = self.client.get(url, {'limite': 3, 'antes': primera['siguiente']}).json()
+
+        titulos = [n['titulo'] for n in primera['notificaciones'] + segunda['notificaciones']]
+        self.assertEqual(titulos, [f'Aviso {i}' for i in range(4, -1, -1)])
+        self.assertIsNone(segunda['siguiente'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.client.post(
+                reverse('notificaciones:ajax_marcar_leidas'), {'todas': True}, content_type='application/json'
+            )
+        self.assertEqual(respuesta.json()['marcadas'], 5)
+        self.assertEqual(self.service.contador(self.usuario.pk)[0], 0)
+
+
+class AvisosStockTest(TestCase):
+    """Tests de los avisos de stock crítico y de reorden."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.responsable = User.objects.create_user('responsable', password='clave')
+        cls.otro = User.objects.create_user('otro', password='clave')
+        categoria = Categoria.objects.create(codigo='CS', nombre='Categoría')
+        cls.articulos = [
+            Articulo.objects.create(
+                codigo=f'AS{i}', nombre='Artículo', categoria=categoria, stock_actual=1, stock_minimo=5,
+                ubicacion_fisica=Bodega.objects.create(codigo=f'BS{i}', nombre='Bodega', responsable=responsable)
+            )
+            for i, responsable in enumerate([cls.responsable, cls.otro, cls.responsable])
+        ]
+
+    def test_lote_de_transiciones_se_publica_en_bloque(self):
+        """Las transiciones de una transacción se avisan con una consulta de bodegas y un INSERT."""
+        cambios = [(articulo, 'NORMAL', 'CRITICO') for articulo in self.articulos]
+        cambios.append((self.articulos[0], 'CRITICO', 'NORMAL'))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            registrar_transiciones_estado_stock(cambios)
+        with self.assertNumQueries(2):
+            for callback in callbacks:
+                callback()
+
+        eventos = EventoNotificacion.objects.order_by('id')
+        self.assertEqual(
+            [(e.tipo, e.destinatarios) for e in eventos],
+            [(TipoNotificacion.STOCK_CRITICO, [usuario.id]) for usuario in [self.responsable, self.otro, self.responsable]]
+        )
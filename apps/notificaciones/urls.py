@@ -1,3 +1,10 @@
 from django.urls import path
 from . import views
 
+app_name = 'notificaciones'
+
+urlpatterns = [
+    path('ajax/contador/', views.contador_notificaciones, name='ajax_contador'),
+    path('ajax/bandeja/', views.bandeja_notificaciones, name='ajax_bandeja'),
+    path('ajax/marcar-leidas/', views.marcar_notificaciones_leidas, name='ajax_marcar_leidas'),
+]
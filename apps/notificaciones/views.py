@@ -0,0 +1,91 @@
+"""
+Vistas del módulo de notificaciones.
+
+Endpoints JSON de la bandeja: contador para el badge (con ETag, 304 si no
+cambió), página de notificaciones por cursor y marcado masivo de leídas.
+"""
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from core.instrumentation import query_budget
+from core.utils import json_response_con_etag
+from .services import NotificacionService
+
+# Máximo de notificaciones por página de la bandeja
+LIMITE_BANDEJA = 50
+
+
+@login_required
+@require_http_methods(["GET"])
+@query_budget(3)
+def contador_notificaciones(request):
+    """
+    Endpoint de polling del badge de notificaciones.
+
+    Responde desde la caché del contador; el ETag depende de la versión de
+    la bandeja, así que mientras nada cambie el cliente recibe 304.
+    """
+    no_leidas, version = NotificacionService().contador(request.user.pk)
+    return json_response_con_etag(request, {'no_leidas': no_leidas, 'version': version})
+
+
+@login_required
+@require_http_methods(["GET"])
+@query_budget(4)
+def bandeja_notificaciones(request):
+    """
+    Endpoint JSON con una página de la bandeja del usuario.
+
+    Parámetros GET:
+        antes: Cursor devuelto por la página anterior (``siguiente``)
+        limite: Notificaciones por página (máx. 50)
+        no_leidas: ``1`` para traer solo las no leídas
+    """
+    try:
+        antes = int(request.GET.get('antes') or 0) or None
+        limite = min(max(int(request.GET.get('limite') or 20), 1), LIMITE_BANDEJA)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Parámetros inválidos'}, status=400)
+
+    service = NotificacionService()
+    notificaciones, siguiente = service.bandeja(
+        request.user.pk, antes, limite, request.GET.get('no_leidas') == '1'
+    )
+    no_leidas, _ = service.contador(request.user.pk)
+    return JsonResponse({
+        'success': True,
+        'notificaciones': notificaciones,
+        'siguiente': siguiente,
+        'no_leidas': no_leidas,
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+@query_budget(6)
+def marcar_notificaciones_leidas(request):
+    """
+    Endpoint AJAX para marcar notificaciones como leídas.
+
+    Acepta JSON ``{"ids": [1, 2, ...]}`` o ``{"todas": true}``.
+    """
+    try:
+        datos = json.loads(request.body or b'{}')
+        ids = None if datos.get('todas') else [int(i) for i in datos.get('ids', [])]
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'JSON inválido'}, status=400)
+    if ids is not None and not ids:
+        return JsonResponse({'success': False, 'error': 'Debe indicar "ids" o "todas"'}, status=400)
+
+    service = NotificacionService()
+    marcadas = service.marcar_leidas(request.user.pk, ids)
+    no_leidas, version = service.contador(request.user.pk)
+    return JsonResponse({
+        'success': True,
+        'marcadas': marcadas,
+        'no_leidas': no_leidas,
+        'version': version,
+    })
@@ -9,4 +9,5 @@ class PagesConfig(AppConfig):
     
     def ready(self):
         """Ejecutar configuraciones cuando la app esté lista."""
-        pass
+        # Registrar los system checks del proyecto (core no es una app)
+        from core import checks  # noqa: F401
@@ -4,15 +4,18 @@ Service Layer para el módulo de páginas/dashboard.
 Contiene la lógica de negocio del dashboard siguiendo el principio de
 Single Responsibility (SOLID) y Clean Architecture estricta.
 
-La vista solo orquesta, toda la lógica de negocio está aquí.
+La vista solo orquesta, toda la lógica de negocio está aquí. Las consultas
+son de solo lectura y se ejecutan en la réplica (core.db_router).
 """
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List
 from django.utils import timezone
 from datetime import timedelta, datetime
 from apps.reportes.models import ConsultasReportes
 from apps.bodega.models import Articulo, EntregaArticulo, Movimiento
 from apps.bodega.repositories import ArticuloRepository
 from apps.solicitudes.models import Solicitud
+from core.db_router import use_replica
+from core.utils.asincrono import consultas_en_paralelo
 
 
 class DashboardService:
@@ -26,6 +29,7 @@ class DashboardService:
     """
     
     @staticmethod
+    @use_replica
     def obtener_metricas_principales() -> Dict[str, Any]:
         """
         Obtiene las métricas principales del dashboard operativo.
@@ -52,6 +56,7 @@ class DashboardService:
         }
     
     @staticmethod
+    @use_replica
     def obtener_metricas_complementarias() -> Dict[str, Any]:
         """
         Obtiene métricas complementarias para gráficos y tablas.
@@ -67,6 +72,7 @@ class DashboardService:
         }
     
     @staticmethod
+    @use_replica
     def obtener_datos_graficos() -> Dict[str, Any]:
         """
         Obtiene datos para gráficos de actividad.
@@ -95,6 +101,7 @@ class DashboardService:
         }
     
     @staticmethod
+    @use_replica
     def obtener_datos_grafico_articulos_mas_usados() -> Dict[str, Any]:
         """
         Obtiene datos para el gráfico de artículos más utilizados.
@@ -105,12 +112,12 @@ class DashboardService:
         from django.db.models import Count
         import json
         
-        articulos_mas_usados = Articulo.objects.filter(
+        articulos_mas_usados = list(Articulo.objects.filter(
             eliminado=False,
             movimientos__eliminado=False
         ).annotate(
             total_movimientos=Count('movimientos')
-        ).order_by('-total_movimientos')[:10]
+        ).order_by('-total_movimientos')[:10])
         
         articulos_nombres = json.dumps([art.codigo[:20] for art in articulos_mas_usados])
         articulos_cantidades = json.dumps([art.total_movimientos for art in articulos_mas_usados])
@@ -122,6 +129,7 @@ class DashboardService:
         }
     
     @staticmethod
+    @use_replica
     def obtener_ultimos_productos(limite: int = 10) -> List[Articulo]:
         """
         Obtiene los últimos productos creados.
@@ -141,6 +149,7 @@ class DashboardService:
         )
     
     @staticmethod
+    @use_replica
     def obtener_productos_top_stock(limite: int = 10) -> List[Articulo]:
         """
         Obtiene los productos con mayor stock.
@@ -160,6 +169,7 @@ class DashboardService:
         )
     
     @staticmethod
+    @use_replica
     def obtener_articulos_stock_bajo(limite: int = 10) -> List[Articulo]:
         """
         Obtiene artículos con stock bajo.
@@ -173,6 +183,7 @@ class DashboardService:
         return list(ArticuloRepository.get_low_stock()[:limite])
     
     @staticmethod
+    @use_replica
     def obtener_ultimas_entregas(limite: int = 10) -> List[EntregaArticulo]:
         """
         Obtiene las últimas entregas de inventario.
@@ -194,6 +205,7 @@ class DashboardService:
         )
     
     @staticmethod
+    @use_replica
     def obtener_ultimos_movimientos(limite: int = 10) -> List[Movimiento]:
         """
         Obtiene los últimos movimientos de bodega.
@@ -213,6 +225,7 @@ class DashboardService:
         )
     
     @staticmethod
+    @use_replica
     def obtener_actividades_recientes(limite: int = 2) -> List[Dict[str, Any]]:
         """
         Obtiene actividades recientes combinando movimientos, entregas y solicitudes.
@@ -270,3 +283,98 @@ class DashboardService:
         # Ordenar por fecha (más reciente primero) y tomar las más recientes
         actividades.sort(key=lambda x: x['fecha'], reverse=True)
         return actividades[:limite]
+
+    # ==================== TARJETAS DEL DASHBOARD ====================
+
+    @staticmethod
+    def _tarjeta_inventario() -> Dict[str, Any]:
+        """Indicadores de inventario y activos."""
+        total_articulos = ConsultasReportes.total_articulos()
+        stock_total = ConsultasReportes.stock_total_articulos()
+        total_activos = ConsultasReportes.total_activos()
+        return {
+            'total_articulos': total_articulos,
+            'stock_total': stock_total,
+            'total_activos': total_activos,
+            'articulos_stock_critico': ConsultasReportes.articulos_stock_critico(),
+            'articulos_change': 5.2 if total_articulos > 0 else 0,
+            'stock_change': 8.3 if stock_total > 0 else 0,
+            'activos_change': 3.7 if total_activos > 0 else 0,
+            'stock_critico_change': ConsultasReportes.calcular_tendencia_stock_critico(),
+        }
+
+    @staticmethod
+    def _tarjeta_solicitudes() -> Dict[str, Any]:
+        """Indicadores de solicitudes."""
+        return {
+            'solicitudes_pendientes': ConsultasReportes.solicitudes_pendientes(),
+            'solicitudes_entregadas_mes': ConsultasReportes.solicitudes_entregadas_mes_actual(),
+            'solicitudes_change': ConsultasReportes.calcular_tendencia_solicitudes(),
+            'entregas_change': ConsultasReportes.calcular_tendencia_entregas(),
+        }
+
+    @staticmethod
+    def _tarjeta_compras() -> Dict[str, Any]:
+        """Indicadores de órdenes de compra."""
+        return {
+            'ordenes_pendientes': ConsultasReportes.ordenes_pendientes(),
+            'ordenes_en_proceso': ConsultasReportes.ordenes_compra_en_proceso(),
+            'ordenes_change': ConsultasReportes.calcular_tendencia_ordenes(),
+        }
+
+    @staticmethod
+    def tarjetas() -> Dict[str, Callable[[], Dict[str, Any]]]:
+        """
+        Tarjetas del dashboard. Cada una consulta por su cuenta y retorna su
+        parte del contexto, por lo que pueden ejecutarse en cualquier orden o
+        en paralelo.
+
+        Returns:
+            Dict {nombre: función sin argumentos que retorna un dict de contexto}
+        """
+        return {
+            'inventario': DashboardService._tarjeta_inventario,
+            'solicitudes': DashboardService._tarjeta_solicitudes,
+            'compras': DashboardService._tarjeta_compras,
+            'graficos': lambda: {
+                **DashboardService.obtener_datos_graficos(),
+                'total_movimientos': ConsultasReportes.total_movimientos(),
+            },
+            'articulos_mas_usados': DashboardService.obtener_datos_grafico_articulos_mas_usados,
+            'ultimos_productos': lambda: {'ultimos_productos': DashboardService.obtener_ultimos_productos()},
+            'productos_top_stock': lambda: {'productos_top_stock': DashboardService.obtener_productos_top_stock()},
+            'articulos_stock_bajo': lambda: {'articulos_stock_bajo': DashboardService.obtener_articulos_stock_bajo()},
+            'ultimas_entregas': lambda: {'ultimas_entregas': DashboardService.obtener_ultimas_entregas()},
+            'ultimos_movimientos': lambda: {'ultimos_movimientos': DashboardService.obtener_ultimos_movimientos()},
+            'actividades': lambda: {'actividades_recientes': DashboardService.obtener_actividades_recientes()},
+        }
+
+    @staticmethod
+    @use_replica
+    def obtener_contexto() -> Dict[str, Any]:
+        """
+        Obtiene el contexto completo del dashboard ejecutando las tarjetas en serie.
+
+        Returns:
+            Dict con métricas, gráficos y listados del dashboard.
+        """
+        contexto: Dict[str, Any] = {}
+        for tarjeta in DashboardService.tarjetas().values():
+            contexto.update(tarjeta())
+        return contexto
+
+    @staticmethod
+    async def aobtener_contexto() -> Dict[str, Any]:
+        """
+        Variante asíncrona de obtener_contexto: las tarjetas se consultan
+        en paralelo (asyncio.gather, ver core.utils.asincrono).
+
+        Returns:
+            Dict con métricas, gráficos y listados del dashboard.
+        """
+        with use_replica():
+            partes = await consultas_en_paralelo(DashboardService.tarjetas())
+        contexto: Dict[str, Any] = {}
+        for parte in partes.values():
+            contexto.update(parte)
+        return contexto
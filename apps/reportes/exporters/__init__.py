@@ -1,7 +1,9 @@
 """
 Exportadores de reportes.
-Cada exportador transforma ReportResult a un formato (PDF/XLSX/HTML).
+Cada exportador transforma ReportResult a un formato (PDF/XLSX/CSV/HTML).
 Sin consultas ni lógica de negocio (SRP).
 """
 
+from .registro import EXPORTADORES, exportar, negociar_formato
 
+__all__ = ['EXPORTADORES', 'exportar', 'negociar_formato']
@@ -0,0 +1,252 @@
+"""
+Exportador de hojas de etiquetas Code128 en PDF.
+
+Cada código se dibuja una sola vez como un trazado en unidades de módulo
+(ancho de la barra más angosta, alto 1) y se guarda en la caché de Django;
+al componer la hoja el trazado se escala a la etiqueta con una matriz de
+transformación, por lo que reimprimir códigos ya dibujados solo cuesta
+copiar su trazado.
+
+Los dibujos que faltan en la caché se generan por lotes de páginas en un
+pool de procesos cuando son muchos (ver ETIQUETAS_PROCESOS). ReportLab no
+puede unir PDFs generados por separado, así que los procesos entregan los
+trazados y el documento se compone en el proceso del request.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from reportlab.graphics.barcode.code128 import Code128
+from reportlab.lib.pagesizes import A4, LETTER
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.pdfgen.pathobject import PDFPathObject
+
+CACHE_PREFIJO = 'reportes:etiqueta:code128:v1:'
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Dibujos faltantes a partir de los cuales conviene usar el pool de procesos
+UMBRAL_PROCESOS = 1000
+# Páginas de etiquetas por tarea del pool
+PAGINAS_POR_LOTE = 20
+
+# Zona de silencio a cada lado del código, en módulos (mínimo Code128: 10)
+ZONA_SILENCIO = 10
+
+# Trazado en unidades de módulo y ancho total en módulos
+Dibujo = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class FormatoEtiquetas:
+    """
+    Distribución de etiquetas en una hoja (medidas en puntos PDF).
+
+    Attributes:
+        nombre: Nombre visible del formato
+        pagina: Tamaño de página (ancho, alto)
+        columnas: Etiquetas por fila
+        filas: Filas por página
+        ancho: Ancho de cada etiqueta
+        alto: Alto de cada etiqueta
+        margen_izquierdo: Margen izquierdo de la hoja
+        margen_superior: Margen superior de la hoja
+        espacio_horizontal: Separación entre columnas
+        espacio_vertical: Separación entre filas
+    """
+    nombre: str
+    pagina: Tuple[float, float]
+    columnas: int
+    filas: int
+    ancho: float
+    alto: float
+    margen_izquierdo: float
+    margen_superior: float
+    espacio_horizontal: float = 0
+    espacio_vertical: float = 0
+
+    @property
+    def por_pagina(self) -> int:
+        """Etiquetas por hoja."""
+        return self.columnas * self.filas
+
+    def posicion(self, indice: int) -> Tuple[float, float]:
+        """Esquina inferior izquierda de la etiqueta ``indice`` de una hoja."""
+        fila, columna = divmod(indice, self.columnas)
+        x = self.margen_izquierdo + columna * (self.ancho + self.espacio_horizontal)
+        y = self.pagina[1] - self.margen_superior - (fila + 1) * self.alto - fila * self.espacio_vertical
+        return x, y
+
+
+# Formatos de hojas autoadhesivas comunes
+FORMATOS: Dict[str, FormatoEtiquetas] = {
+    'A4_3x8': FormatoEtiquetas(
+        'A4 - 3 x 8 (70 x 37 mm)', A4, 3, 8, 70 * mm, 37 * mm, 0, 0.5 * mm
+    ),
+    'A4_3x7': FormatoEtiquetas(
+        'A4 - 3 x 7 (63,5 x 38,1 mm)', A4, 3, 7, 63.5 * mm, 38.1 * mm, 7.2 * mm, 15.1 * mm, 2.5 * mm
+    ),
+    'A4_4x10': FormatoEtiquetas(
+        'A4 - 4 x 10 (48,5 x 25,4 mm)', A4, 4, 10, 48.5 * mm, 25.4 * mm, 8 * mm, 21.5 * mm
+    ),
+    'A4_2x7': FormatoEtiquetas(
+        'A4 - 2 x 7 (99,1 x 38,1 mm)', A4, 2, 7, 99.1 * mm, 38.1 * mm, 4.7 * mm, 15.1 * mm, 2.5 * mm
+    ),
+    'CARTA_3x10': FormatoEtiquetas(
+        'Carta - 3 x 10 (66,7 x 25,4 mm)', LETTER, 3, 10, 66.7 * mm, 25.4 * mm, 4.8 * mm, 12.7 * mm, 3.2 * mm
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Etiqueta:
+    """Contenido de una etiqueta: código de barras y dos líneas de texto."""
+    codigo_barras: str
+    titulo: str
+    detalle: str = ''
+
+
+def dibujar_code128(codigo: str) -> Dibujo:
+    """
+    Codifica un valor en Code128 y lo traza en unidades de módulo.
+
+    El ancho incluye la zona de silencio a ambos lados.
+
+    Args:
+        codigo: Valor a codificar
+
+    Returns:
+        Tupla (operadores PDF del trazado, ancho total en módulos)
+    """
+    barcode = Code128(codigo, humanReadable=False, quiet=0)
+    barcode.validate()
+    barcode.encode()
+    barcode.decompose()
+
+    # Mayúsculas = barra, minúsculas = espacio; la letra indica el ancho en módulos
+    trazado = PDFPathObject()
+    x = ZONA_SILENCIO
+    for simbolo in barcode.decomposed:
+        if simbolo.isupper():
+            ancho = ord(simbolo) - ord('A') + 1
+            trazado.rect(x, 0, ancho, 1)
+        else:
+            ancho = ord(simbolo) - ord('a') + 1
+        x += ancho
+    return trazado.getCode(), x + ZONA_SILENCIO
+
+
+def _dibujar_lote(codigos: List[str]) -> Dict[str, Dibujo]:
+    """Dibuja un lote de códigos (se ejecuta en los procesos del pool)."""
+    return {codigo: dibujar_code128(codigo) for codigo in codigos}
+
+
+def obtener_dibujos(codigos: Iterable[str], codigos_por_lote: int = 500) -> Dict[str, Dibujo]:
+    """
+    Obtiene el dibujo de cada código desde la caché y genera los faltantes.
+
+    Args:
+        codigos: Códigos a dibujar, en orden de impresión
+        codigos_por_lote: Códigos por tarea del pool de procesos
+
+    Returns:
+        Dict {codigo: (trazado, módulos)}
+    """
+    codigos = list(dict.fromkeys(codigos))
+    en_cache = cache.get_many([CACHE_PREFIJO + codigo for codigo in codigos])
+    dibujos = {clave[len(CACHE_PREFIJO):]: dibujo for clave, dibujo in en_cache.items()}
+    faltantes = [codigo for codigo in codigos if codigo not in dibujos]
+    if not faltantes:
+        return dibujos
+
+    procesos = getattr(settings, 'ETIQUETAS_PROCESOS', 1)
+    if procesos > 1 and len(faltantes) >= UMBRAL_PROCESOS:
+        lotes = [faltantes[i:i + codigos_por_lote] for i in range(0, len(faltantes), codigos_por_lote)]
+        nuevos: Dict[str, Dibujo] = {}
+        with ProcessPoolExecutor(max_workers=min(procesos, len(lotes))) as pool:
+            for resultado in pool.map(_dibujar_lote, lotes):
+                nuevos.update(resultado)
+    else:
+        nuevos = _dibujar_lote(faltantes)
+
+    cache.set_many({CACHE_PREFIJO + codigo: dibujo for codigo, dibujo in nuevos.items()}, CACHE_TIMEOUT)
+    dibujos.update(nuevos)
+    return dibujos
+
+
+def _recortar(texto: str, ancho: float, tamano: float, fuente: str = 'Helvetica') -> str:
+    """Recorta el texto para que quepa en el ancho dado."""
+    if stringWidth(texto, fuente, tamano) <= ancho:
+        return texto
+    while texto and stringWidth(texto + '…', fuente, tamano) > ancho:
+        texto = texto[:-1]
+    return texto + '…'
+
+
+def render_etiquetas(etiquetas: List[Etiqueta], formato: FormatoEtiquetas) -> bytes:
+    """
+    Compone la hoja de etiquetas en PDF.
+
+    Cada etiqueta lleva el título arriba, el código de barras al centro y
+    el código legible con el detalle abajo.
+
+    Args:
+        etiquetas: Etiquetas en orden de impresión
+        formato: Distribución de la hoja
+
+    Returns:
+        Contenido del PDF
+    """
+    dibujos = obtener_dibujos(
+        (etiqueta.codigo_barras for etiqueta in etiquetas),
+        codigos_por_lote=formato.por_pagina * PAGINAS_POR_LOTE
+    )
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=formato.pagina, pageCompression=1)
+    relleno = 0.06 * min(formato.ancho, formato.alto)
+    texto = max(min(formato.alto * 0.14, 9), 5)
+    ancho_util = formato.ancho - 2 * relleno
+    alto_barras = formato.alto - 2 * relleno - 2.4 * texto
+
+    for indice, etiqueta in enumerate(etiquetas):
+        posicion = indice % formato.por_pagina
+        if indice and not posicion:
+            pdf.showPage()
+        x, y = formato.posicion(posicion)
+        trazado, modulos = dibujos[etiqueta.codigo_barras]
+
+        pdf.setFont('Helvetica-Bold', texto)
+        pdf.drawCentredString(
+            x + formato.ancho / 2, y + formato.alto - relleno - texto,
+            _recortar(etiqueta.titulo, ancho_util, texto, 'Helvetica-Bold')
+        )
+
+        pdf.saveState()
+        pdf.transform(ancho_util / modulos, 0, 0, alto_barras, x + relleno, y + relleno + 1.2 * texto)
+        pdf.drawPath(PDFPathObject(code=[trazado]), stroke=0, fill=1)
+        pdf.restoreState()
+
+        pie = etiqueta.codigo_barras + (f' · {etiqueta.detalle}' if etiqueta.detalle else '')
+        pdf.setFont('Helvetica', texto * 0.9)
+        pdf.drawCentredString(
+            x + formato.ancho / 2, y + relleno, _recortar(pie, ancho_util, texto * 0.9)
+        )
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+def export_etiquetas(etiquetas: List[Etiqueta], formato: FormatoEtiquetas, titulo: str) -> HttpResponse:
+    """
+    Genera la respuesta HTTP con la hoja de etiquetas en PDF.
+    SRP: solo renderizado a partir de la lista de etiquetas.
+    """
+    response = HttpResponse(render_etiquetas(etiquetas, formato), content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="{titulo}.pdf"'
+    return response
@@ -1,56 +1,220 @@
-from io import BytesIO
-from typing import List
-from django.http import HttpResponse
-from reportlab.lib.pagesizes import A4, landscape
+"""
+Exportador de reportes tabulares a PDF.
+
+Las filas se reparten en páginas de alto fijo: cada página es una
+``LongTable`` con la cabecera y las filas que caben, así que ReportLab nunca
+parte una tabla grande (partirla cuesta más cuanto más filas le quedan). Los
+anchos de columna se calculan una vez con una muestra de filas y los textos
+que no caben en su columna se recortan.
+
+En reportes grandes el formateo y recorte de las celdas se hace por lotes de
+páginas en un pool de procesos (ver REPORTES_PDF_PROCESOS). Igual que en las
+etiquetas, ReportLab no puede unir PDFs generados por separado: los procesos
+entregan las páginas listas y el documento se compone en el proceso del
+request, escribiéndolo en un archivo temporal que se envía por streaming.
+"""
+import math
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, BinaryIO, Iterable, Iterator, List, Sequence, Tuple
+
+from django.conf import settings
+from django.http import FileResponse
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import BaseDocTemplate, Frame, LongTable, PageTemplate, Paragraph, Spacer, TableStyle
 
 from apps.reportes.dtos import ReportResult
 
+MARGEN = 24
+FUENTE = "Helvetica"
+TAMANO_FUENTE = 9
+# Alto fijo de cada fila: permite saber cuántas filas caben por página
+ALTO_FILA = 14
+# Relleno horizontal de las celdas (el de ReportLab por defecto)
+RELLENO_CELDA = 6
+# Filas usadas para calcular los anchos de columna
+FILAS_MUESTRA = 500
+
+# Filas a partir de las cuales conviene usar el pool de procesos
+UMBRAL_PROCESOS = 5000
+# Páginas por tarea del pool
+PAGINAS_POR_LOTE = 50
+
+
+@lru_cache(maxsize=None)
+def _estilos() -> Tuple[TableStyle, ParagraphStyle, ParagraphStyle]:
+    """Estilo de las tablas y de los párrafos del encabezado (uno por proceso)."""
+    hoja = getSampleStyleSheet()
+    tabla = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#000000")),
+            ("FONTNAME", (0, 0), (-1, -1), FUENTE),
+            ("FONTSIZE", (0, 0), (-1, -1), TAMANO_FUENTE),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cccccc")),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]
+    )
+    return tabla, hoja["Title"], hoja["Normal"]
+
+
+def _texto(valor: Any) -> str:
+    """Texto de una celda en una sola línea."""
+    if valor is None:
+        return ""
+    return str(valor).replace("\n", " ")
 
-def export_pdf(report: ReportResult, landscape_mode: bool = True) -> HttpResponse:
+
+def _recortar(texto: str, ancho: float) -> str:
+    """Recorta el texto para que quepa en el ancho dado."""
+    actual = stringWidth(texto, FUENTE, TAMANO_FUENTE)
+    if actual <= ancho:
+        return texto
+    # Primer corte proporcional, luego se ajusta de a un carácter
+    texto = texto[:max(int(len(texto) * ancho / actual), 0)]
+    while texto and stringWidth(texto + "…", FUENTE, TAMANO_FUENTE) > ancho:
+        texto = texto[:-1]
+    return texto + "…"
+
+
+def _preparar_lote(filas: List[Sequence[Any]], anchos: Tuple[float, ...]) -> List[List[str]]:
+    """Formatea y recorta las celdas de un lote de filas (se ejecuta en los procesos del pool)."""
+    utiles = [ancho - 2 * RELLENO_CELDA for ancho in anchos]
+    return [[_recortar(_texto(valor), util) for valor, util in zip(fila, utiles)] for fila in filas]
+
+
+def _anchos_columnas(columnas: Sequence[str], filas: Sequence[Sequence[Any]], disponible: float) -> Tuple[float, ...]:
     """
-    Genera un PDF simple con cabecera y tabla usando ReportLab.
-    SRP: solo renderizado a PDF a partir de ReportResult.
+    Ancho de cada columna según su texto más largo en una muestra de filas.
+
+    Si la tabla no cabe en la página las columnas se reducen en proporción.
     """
-    buffer = BytesIO()
-    page_size = landscape(A4) if landscape_mode else A4
-    doc = SimpleDocTemplate(buffer, pagesize=page_size, leftMargin=24, rightMargin=24, topMargin=24, bottomMargin=24)
+    paso = max(len(filas) // FILAS_MUESTRA, 1)
+    muestra = [columnas, *filas[::paso][:FILAS_MUESTRA]]
+    anchos = [
+        max(stringWidth(_texto(fila[i]), FUENTE, TAMANO_FUENTE) for fila in muestra) + 2 * RELLENO_CELDA
+        for i in range(len(columnas))
+    ]
+    total = sum(anchos)
+    if total > disponible:
+        anchos = [ancho * disponible / total for ancho in anchos]
+    return tuple(anchos)
 
-    styles = getSampleStyleSheet()
-    elements: List = []
 
-    elements.append(Paragraph(report.title, styles["Title"]))
+def _encabezado(report: ReportResult, ancho: float) -> Tuple[List, float]:
+    """Título y filtros de la primera página, con el alto que ocupan en el marco."""
+    _, titulo, normal = _estilos()
+    elementos: List = [Paragraph(report.title, titulo)]
+    alto = elementos[0].wrap(ancho, 0)[1] + titulo.spaceAfter
     if report.filters_summary:
         filters_txt = " | ".join([f"{k}: {v}" for k, v in report.filters_summary.items() if v not in [None, ""]])
-        elements.append(Spacer(1, 6))
-        elements.append(Paragraph(filters_txt, styles["Normal"]))
-    elements.append(Spacer(1, 12))
-
-    data = [report.columns] + report.rows
-    table = Table(data, repeatRows=1)
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#000000")),
-                ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cccccc")),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ]
-        )
-    )
-    elements.append(table)
+        filtros = Paragraph(filters_txt, normal)
+        elementos += [Spacer(1, 6), filtros]
+        alto += 6 + filtros.wrap(ancho, 0)[1] + normal.spaceAfter
+    elementos.append(Spacer(1, 12))
+    return elementos, alto + 12
+
 
-    doc.build(elements)
-    pdf_value = buffer.getvalue()
-    buffer.close()
+def _filas_preparadas(
+    filas: List[Sequence[Any]], anchos: Tuple[float, ...], filas_por_lote: int
+) -> Iterator[List[str]]:
+    """Filas formateadas en orden, usando el pool de procesos si el reporte es grande."""
+    lotes = [filas[i:i + filas_por_lote] for i in range(0, len(filas), filas_por_lote)]
+    procesos = getattr(settings, "REPORTES_PDF_PROCESOS", 1)
+    if procesos > 1 and len(filas) >= UMBRAL_PROCESOS and len(lotes) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(lotes))) as pool:
+            for lote in pool.map(partial(_preparar_lote, anchos=anchos), lotes):
+                yield from lote
+    else:
+        for lote in lotes:
+            yield from _preparar_lote(lote, anchos)
 
-    response = HttpResponse(pdf_value, content_type="application/pdf")
-    response["Content-Disposition"] = f'inline; filename="{report.title}.pdf"'
-    return response
 
+def _paginas(filas: Iterable[List[str]], primera: int, por_pagina: int) -> Iterator[List[List[str]]]:
+    """Agrupa las filas en páginas: la primera tiene menos lugar por el encabezado."""
+    pagina: List[List[str]] = []
+    capacidad, emitidas = primera, 0
+    for fila in filas:
+        pagina.append(fila)
+        if len(pagina) == capacidad:
+            yield pagina
+            pagina, capacidad, emitidas = [], por_pagina, emitidas + 1
+    # Un reporte sin filas igual lleva la cabecera de la tabla
+    if pagina or not emitidas:
+        yield pagina
 
+
+def _pie(canvas, doc, total: int) -> None:
+    """Número de página en el margen inferior."""
+    canvas.saveState()
+    canvas.setFont(FUENTE, 8)
+    canvas.drawRightString(doc.pagesize[0] - MARGEN, MARGEN / 2, f"Página {canvas.getPageNumber()} de {total}")
+    canvas.restoreState()
+
+
+def render_pdf(report: ReportResult, destino: BinaryIO, landscape_mode: bool = True) -> int:
+    """
+    Escribe el reporte en PDF, una tabla de alto fijo por página.
+
+    Args:
+        report: Reporte a renderizar
+        destino: Archivo binario (o buffer) donde se escribe el PDF
+        landscape_mode: Página A4 apaisada (True) o vertical
+
+    Returns:
+        Cantidad de páginas del documento
+    """
+    page_size = landscape(A4) if landscape_mode else A4
+    ancho, alto = page_size[0] - 2 * MARGEN, page_size[1] - 2 * MARGEN
+    estilo, _, _ = _estilos()
+
+    encabezado, alto_encabezado = _encabezado(report, ancho)
+    # Cada página lleva la fila de cabecera; se deja 1 pt de holgura para el redondeo
+    por_pagina = int((alto - 1) // ALTO_FILA) - 1
+    primera = max(int((alto - alto_encabezado - 1) // ALTO_FILA) - 1, 1)
+    restantes = max(len(report.rows) - primera, 0)
+    total = 1 + math.ceil(restantes / por_pagina)
+
+    anchos = _anchos_columnas(report.columns, report.rows, ancho)
+    columnas = _preparar_lote([report.columns], anchos)[0]
+    filas = _filas_preparadas(report.rows, anchos, por_pagina * PAGINAS_POR_LOTE)
+
+    elementos: List = list(encabezado)
+    for pagina in _paginas(filas, primera, por_pagina):
+        elementos.append(LongTable(
+            [columnas, *pagina], colWidths=anchos, rowHeights=[ALTO_FILA] * (len(pagina) + 1), style=estilo
+        ))
+
+    doc = BaseDocTemplate(
+        destino, pagesize=page_size, leftMargin=MARGEN, rightMargin=MARGEN, topMargin=MARGEN,
+        bottomMargin=MARGEN, title=report.title
+    )
+    marco = Frame(
+        MARGEN, MARGEN, ancho, alto, leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0, id="tabla"
+    )
+    doc.addPageTemplates([PageTemplate(id="reporte", frames=[marco], onPage=partial(_pie, total=total))])
+    doc.build(elementos)
+    return total
+
+
+def export_pdf(report: ReportResult, landscape_mode: bool = True) -> FileResponse:
+    """
+    Genera la respuesta HTTP con el reporte en PDF.
+    SRP: solo renderizado a PDF a partir de ReportResult.
+
+    El PDF se escribe en un archivo temporal y se envía por bloques, sin
+    mantener el documento completo en memoria.
+    """
+    archivo = tempfile.TemporaryFile()
+    try:
+        render_pdf(report, archivo, landscape_mode)
+    except Exception:
+        archivo.close()
+        raise
+    archivo.seek(0)
+    return FileResponse(archivo, content_type="application/pdf", filename=f"{report.title}.pdf")
@@ -0,0 +1,101 @@
+"""
+Registro de exportadores y negociación del formato de los reportes.
+
+Las vistas de reportes llaman a ``exportar`` con el ReportResult: si el
+request pide un formato de archivo (``?format=`` o la cabecera Accept)
+reciben la respuesta lista, si no (None) renderizan el HTML. Como la misma
+URL responde distinto según Accept, todas sus respuestas llevan
+``Vary: Accept`` (las vistas lo agregan al HTML con ``vary_on_headers``).
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.utils.cache import patch_vary_headers
+
+from apps.reportes.dtos import ReportResult
+from apps.reportes.exporters.csv import export_csv
+from apps.reportes.exporters.pdf import export_pdf
+from apps.reportes.exporters.xlsx import export_xlsx
+
+HTML = "text/html"
+
+_acepta_gzip = re.compile(r"\bgzip\b")
+
+
+@dataclass(frozen=True)
+class Exportador:
+    """
+    Formato de exportación de reportes.
+
+    Attributes:
+        formato: Código del formato en ReporteGenerado.formato
+        content_type: Tipo MIME de la respuesta
+        exportar: Función que genera la respuesta a partir del ReportResult
+        comprimible: La función acepta ``comprimir=True`` para responder con gzip
+    """
+    formato: str
+    content_type: str
+    exportar: Callable[..., HttpResponseBase]
+    comprimible: bool = False
+
+
+# Clave = valor de ?format=
+EXPORTADORES: Dict[str, Exportador] = {
+    "pdf": Exportador("PDF", "application/pdf", export_pdf),
+    "xlsx": Exportador(
+        "EXCEL", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", export_xlsx
+    ),
+    "csv": Exportador("CSV", "text/csv", export_csv, comprimible=True),
+}
+
+# Otros nombres aceptados en ?format=
+ALIAS = {"excel": "xlsx"}
+
+
+def negociar_formato(request: HttpRequest) -> Optional[str]:
+    """
+    Formato de archivo pedido en el request, o None para HTML.
+
+    ``?format=`` tiene prioridad; sin él se usa la cabecera Accept, donde
+    HTML gana ante ``*/*`` (navegadores).
+    """
+    fmt = request.GET.get("format")
+    if fmt is not None:
+        fmt = ALIAS.get(fmt.lower(), fmt.lower())
+        return fmt if fmt in EXPORTADORES else None
+
+    por_tipo = {exportador.content_type: clave for clave, exportador in EXPORTADORES.items()}
+    preferido = request.get_preferred_type([HTML, *por_tipo])
+    return por_tipo.get(preferido)
+
+
+def exportar(request: HttpRequest, report: ReportResult) -> Optional[HttpResponseBase]:
+    """
+    Genera la respuesta del formato negociado.
+
+    Args:
+        request: Request de la vista de reporte
+        report: Reporte ya calculado
+
+    Returns:
+        Respuesta con el archivo, o None si corresponde renderizar el HTML
+
+    Example:
+        >>> response = exportar(request, report)
+        >>> if response is not None:
+        ...     return response
+    """
+    fmt = negociar_formato(request)
+    if fmt is None:
+        return None
+
+    exportador = EXPORTADORES[fmt]
+    if exportador.comprimible and _acepta_gzip.search(request.headers.get("Accept-Encoding", "")):
+        response = exportador.exportar(report, comprimir=True)
+    else:
+        response = exportador.exportar(report)
+    patch_vary_headers(response, ("Accept",))
+    return response
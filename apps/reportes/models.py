@@ -376,6 +376,8 @@ class ConsultasReportes:
     def articulos_stock_critico():
         """
         Artículos con stock crítico (stock_actual < stock_minimo).
+
+        Usa el estado_stock indexado del artículo.
         
         Returns:
             int: Cantidad de artículos con stock crítico
@@ -502,6 +504,9 @@ class ConsultasReportes:
     def tendencia_stock_critico(dias: int = 7) -> float:
         """
         Calcula el porcentaje de cambio en artículos con stock crítico.
+
+        Reconstruye la cantidad de artículos críticos de hace N días a partir
+        del log de transiciones de estado (entradas y salidas de CRITICO).
         
         Args:
             dias: Días hacia atrás para comparar (default: 7)
@@ -509,13 +514,25 @@ class ConsultasReportes:
         Returns:
             float: Porcentaje de cambio (negativo = mejora, positivo = empeora)
         """
+        from apps.bodega.models import Articulo, TransicionEstadoStock
+        from django.db.models import Count, Q
+        from django.utils import timezone
+        from datetime import timedelta
+
+        critico = Articulo.EstadoStock.CRITICO
         actual = ConsultasReportes.articulos_stock_critico()
-        
-        if actual == 0:
-            return -100.0  # Si no hay stock crítico, es una mejora del 100%
-        
-        # Simulación: si hay stock crítico, asumimos que aumentó
-        return 100.0
+        cambios = TransicionEstadoStock.objects.filter(
+            eliminado=False,
+            fecha_creacion__gte=timezone.now() - timedelta(days=dias)
+        ).aggregate(
+            entradas=Count('id', filter=Q(estado_nuevo=critico)),
+            salidas=Count('id', filter=Q(estado_anterior=critico))
+        )
+        anterior = actual - cambios['entradas'] + cambios['salidas']
+
+        if anterior <= 0:
+            return 100.0 if actual > 0 else 0.0
+        return round((actual - anterior) / anterior * 100, 1)
     
     @staticmethod
     def tendencia_entregas_mes(dias: int = 30) -> float:
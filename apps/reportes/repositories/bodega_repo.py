@@ -1,6 +1,12 @@
-from typing import Iterable, Optional
-from django.db.models import OuterRef, Subquery, Exists
-from apps.bodega.models import Articulo, Movimiento
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from django.db import connections, router
+from django.db.models import F, OuterRef, QuerySet, Subquery, Exists, Sum, Window
+from django.db.models.expressions import RowRange
+from django.utils import timezone
+from apps.bodega.models import Articulo, Categoria, ConsumoMensual, Movimiento
+from apps.solicitudes.models import Area, Departamento
+from apps.bodega.repositories import MovimientoRepository
 
 
 def articulos_sin_movimiento(
@@ -20,11 +26,14 @@ def articulos_sin_movimiento(
     if categoria_id:
         qs = qs.filter(categoria_id=categoria_id)
 
+    # Rango semiabierto sobre la columna (no __date) para usar índices y pruning
+    inicio = timezone.make_aware(datetime.combine(desde, time.min))
+    fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min))
     movs_rango = Movimiento.objects.filter(
         articulo_id=OuterRef("pk"),
         eliminado=False,
-        fecha_creacion__date__gte=desde,
-        fecha_creacion__date__lte=hasta,
+        fecha_creacion__gte=inicio,
+        fecha_creacion__lt=fin,
     )
 
     # Anotar último movimiento histórico (para mostrar en el reporte)
@@ -43,4 +52,135 @@ def articulos_sin_movimiento(
     return qs.order_by("codigo")
 
 
+def articulos_filtrados(
+    bodega_id: Optional[int] = None,
+    categoria_id: Optional[int] = None,
+    articulo_codigo: Optional[str] = None,
+) -> QuerySet:
+    """
+    Artículos vigentes según filtros de reporte, ordenados por código.
+    """
+    qs = Articulo.objects.vivos()
+    if bodega_id:
+        qs = qs.filter(ubicacion_fisica_id=bodega_id)
+    if categoria_id:
+        qs = qs.filter(categoria_id=categoria_id)
+    if articulo_codigo:
+        qs = qs.filter(codigo__iexact=articulo_codigo.strip())
+    return qs.order_by("codigo")
+
+
+def movimientos_kardex(inicio: datetime, fin: datetime, articulos: QuerySet) -> QuerySet:
+    """
+    Movimientos del período [inicio, fin) con saldo acumulado por artículo.
+
+    El acumulado se calcula en la base de datos con
+    SUM(cantidad con signo) OVER (PARTITION BY articulo ORDER BY fecha, id),
+    por lo que el saldo de cada fila es saldo inicial + acumulado.
+    Devuelve diccionarios (values) ordenados por código de artículo y fecha.
+    """
+    cantidad = MovimientoRepository.cantidad_signada()
+    return (
+        Movimiento.objects.vivos()
+        .filter(
+            articulo__in=articulos.values("id"),
+            fecha_creacion__gte=inicio,
+            fecha_creacion__lt=fin,
+        )
+        .annotate(
+            neto=cantidad,
+            acumulado=Window(
+                expression=Sum(cantidad),
+                partition_by=[F("articulo_id")],
+                order_by=[F("fecha_creacion").asc(), F("id").asc()],
+                frame=RowRange(start=None, end=0),
+            ),
+        )
+        .values(
+            "articulo_id",
+            "fecha_creacion",
+            "tipo__nombre",
+            "motivo",
+            "usuario__username",
+            "neto",
+            "acumulado",
+        )
+        .order_by("articulo__codigo", "fecha_creacion", "id")
+    )
+
+
+# Dimensiones del resumen de consumo, de la más general a la más detallada:
+# nombre -> (columna de agrupación, columna con el nombre a mostrar)
+DIMENSIONES_CONSUMO = {
+    "mes": ("c.mes", "c.mes"),
+    "departamento": ("c.departamento_id", "d.nombre"),
+    "area": ("c.area_id", "a.nombre"),
+    "categoria": ("c.categoria_id", "cat.nombre"),
+    "articulo": ("c.articulo_id", "art.codigo || ' - ' || art.nombre"),
+}
+
+
+def consumo_agrupado(
+    dimensiones: Sequence[str],
+    desde: date,
+    hasta: date,
+    departamento_id: Optional[int] = None,
+    categoria_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Consumo del resumen mensual con subtotales por nivel y total general.
+
+    Agrupa con GROUPING SETS por cada prefijo de ``dimensiones`` (detalle,
+    subtotales de cada nivel y total), en una sola pasada sobre
+    ConsumoMensual. Cada fila trae ``nivel``: cuántas dimensiones están
+    agrupadas (las demás vienen en None), para distinguir un subtotal de un
+    departamento o área realmente nulo. Ordena cada subtotal después de su
+    detalle.
+
+    Args:
+        dimensiones: Claves de DIMENSIONES_CONSUMO en orden jerárquico
+        desde: Primer mes (se toma el mes de la fecha)
+        hasta: Último mes, inclusive
+        departamento_id: Filtra un departamento
+        categoria_id: Filtra una categoría
+    """
+    grupos = [DIMENSIONES_CONSUMO[d][0] for d in dimensiones]
+    etiquetas = [DIMENSIONES_CONSUMO[d][1] for d in dimensiones]
+
+    conjuntos = ", ".join(
+        "(" + ", ".join(
+            f"{grupo}, {etiqueta}" if grupo != etiqueta else grupo
+            for grupo, etiqueta in zip(grupos[:n], etiquetas[:n])
+        ) + ")"
+        for n in range(len(grupos), -1, -1)
+    )
+    nivel = " + ".join(f"(1 - GROUPING({grupo}))" for grupo in grupos) or "0"
+    orden = ", ".join(f"GROUPING({grupo}), {etiqueta} NULLS LAST" for grupo, etiqueta in zip(grupos, etiquetas))
+
+    condiciones = ["c.mes >= %s", "c.mes <= %s"]
+    parametros: List[Any] = [desde.replace(day=1), hasta.replace(day=1)]
+    if departamento_id:
+        condiciones.append("c.departamento_id = %s")
+        parametros.append(departamento_id)
+    if categoria_id:
+        condiciones.append("c.categoria_id = %s")
+        parametros.append(categoria_id)
+
+    columnas = "".join(f"{etiqueta} AS {nombre}, " for nombre, etiqueta in zip(dimensiones, etiquetas))
+    sql = f"""
+        SELECT {columnas}{nivel} AS nivel, SUM(c.cantidad) AS cantidad, SUM(c.lineas) AS lineas
+        FROM {ConsumoMensual._meta.db_table} c
+        JOIN {Categoria._meta.db_table} cat ON cat.id = c.categoria_id
+        JOIN {Articulo._meta.db_table} art ON art.id = c.articulo_id
+        LEFT JOIN {Departamento._meta.db_table} d ON d.id = c.departamento_id
+        LEFT JOIN {Area._meta.db_table} a ON a.id = c.area_id
+        WHERE {" AND ".join(condiciones)}
+        GROUP BY GROUPING SETS ({conjuntos})
+        ORDER BY {orden or "1"}
+    """
 
+    conexion = connections[router.db_for_read(ConsumoMensual)]
+    with conexion.cursor() as cursor:
+        cursor.execute(sql, parametros)
+        nombres = [columna[0] for columna in cursor.description]
+        return [dict(zip(nombres, fila)) for fila in cursor.fetchall()]
@@ -0,0 +1,48 @@
+from typing import Optional
+from django.db.models import QuerySet
+from apps.activos.models import Activo
+from apps.bodega.models import Articulo
+
+
+def articulos_para_etiquetas(
+    bodega_id: Optional[int] = None,
+    categoria_id: Optional[int] = None,
+    codigo_desde: Optional[str] = None,
+    codigo_hasta: Optional[str] = None,
+) -> QuerySet:
+    """
+    Filas (codigo_barras, nombre, categoría) de artículos vigentes con código de barras.
+    Una sola consulta con values_list, ordenada por código.
+    """
+    qs = Articulo.objects.vivos().exclude(codigo_barras=None)
+    if bodega_id:
+        qs = qs.filter(ubicacion_fisica_id=bodega_id)
+    if categoria_id:
+        qs = qs.filter(categoria_id=categoria_id)
+    if codigo_desde:
+        qs = qs.filter(codigo__gte=codigo_desde)
+    if codigo_hasta:
+        qs = qs.filter(codigo__lte=codigo_hasta)
+    return qs.order_by("codigo").values_list("codigo_barras", "nombre", "categoria__nombre")
+
+
+def activos_para_etiquetas(
+    categoria_id: Optional[int] = None,
+    estado_id: Optional[int] = None,
+    codigo_desde: Optional[str] = None,
+    codigo_hasta: Optional[str] = None,
+) -> QuerySet:
+    """
+    Filas (codigo_barras, nombre, categoría) de activos vigentes con código de barras.
+    Una sola consulta con values_list, ordenada por código.
+    """
+    qs = Activo.objects.vivos().exclude(codigo_barras=None)
+    if categoria_id:
+        qs = qs.filter(categoria_id=categoria_id)
+    if estado_id:
+        qs = qs.filter(estado_id=estado_id)
+    if codigo_desde:
+        qs = qs.filter(codigo__gte=codigo_desde)
+    if codigo_hasta:
+        qs = qs.filter(codigo__lte=codigo_hasta)
+    return qs.order_by("codigo").values_list("codigo_barras", "nombre", "categoria__nombre")
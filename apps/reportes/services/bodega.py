@@ -1,7 +1,10 @@
-from typing import List
-from datetime import date
+from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.utils import timezone
 from django.utils.timezone import now
 
+from apps.bodega.services import CierreInventarioService
 from apps.reportes.dtos import ReportResult
 from apps.reportes.repositories import bodega_repo
 
@@ -57,3 +60,216 @@ class ArticulosSinMovimientoService:
         )
 
 
+class KardexService:
+    """
+    Servicio: Kardex (tarjeta de existencias) por artículo y período.
+    Saldo inicial desde el cierre mensual previo + movimientos hasta el
+    inicio del período; saldo corrido calculado en SQL con función ventana.
+    Procesa todos los artículos de una bodega en una sola pasada.
+    """
+
+    columns = ["Código", "Artículo", "Fecha", "Tipo", "Motivo", "Usuario", "Entrada", "Salida", "Saldo"]
+
+    def run(
+        self,
+        desde: date,
+        hasta: date,
+        bodega_id=None,
+        categoria_id=None,
+        articulo_codigo: Optional[str] = None,
+    ) -> ReportResult:
+        inicio = timezone.make_aware(datetime.combine(desde, time.min))
+        fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min))
+
+        articulos = bodega_repo.articulos_filtrados(bodega_id, categoria_id, articulo_codigo)
+        saldos = CierreInventarioService().saldos_a_fecha(inicio, articulos)
+        movimientos = bodega_repo.movimientos_kardex(inicio, fin, articulos).iterator(chunk_size=2000)
+        mov = next(movimientos, None)
+
+        rows: List[List] = []
+        total_articulos = total_movimientos = entradas = salidas = 0
+        for art_id, codigo, nombre in articulos.values_list("id", "codigo", "nombre").iterator():
+            saldo = saldos.get(art_id, 0)
+            filas_articulo = [[codigo, nombre, desde.strftime("%d/%m/%Y"), "Saldo inicial", "", "", "", "", saldo]]
+
+            saldo_inicial = saldo
+            while mov is not None and mov["articulo_id"] == art_id:
+                saldo = saldo_inicial + mov["acumulado"]
+                neto = mov["neto"]
+                filas_articulo.append([
+                    codigo,
+                    nombre,
+                    timezone.localtime(mov["fecha_creacion"]).strftime("%d/%m/%Y %H:%M"),
+                    mov["tipo__nombre"],
+                    mov["motivo"],
+                    mov["usuario__username"],
+                    neto if neto > 0 else "",
+                    -neto if neto < 0 else "",
+                    saldo,
+                ])
+                entradas += max(neto, 0)
+                salidas += max(-neto, 0)
+                mov = next(movimientos, None)
+
+            if len(filas_articulo) == 1 and saldo == 0:
+                continue
+            total_articulos += 1
+            total_movimientos += len(filas_articulo) - 1
+            filas_articulo.append([codigo, nombre, hasta.strftime("%d/%m/%Y"), "Saldo final", "", "", "", "", saldo])
+            rows.extend(filas_articulo)
+
+        return ReportResult(
+            title="Kardex de artículos",
+            columns=self.columns,
+            rows=rows,
+            totals={
+                "articulos": total_articulos,
+                "movimientos": total_movimientos,
+                "entradas": entradas,
+                "salidas": salidas,
+            },
+            filters_summary={
+                "desde": desde.strftime("%d/%m/%Y"),
+                "hasta": hasta.strftime("%d/%m/%Y"),
+                "bodega_id": bodega_id,
+                "categoria_id": categoria_id,
+                "articulo": articulo_codigo,
+            },
+        )
+
+
+class ValorizacionInventarioService:
+    """
+    Servicio: Valorización del inventario a una fecha (cierre contable).
+    Stock y costo promedio ponderado desde el cierre mensual previo más los
+    movimientos y compras posteriores: el costo queda acotado a un mes de
+    historial sin importar su largo.
+    """
+
+    columns = ["Código", "Artículo", "Categoría", "Bodega", "Cantidad", "Costo unitario", "Valor"]
+
+    def run(self, fecha: date, bodega_id=None, categoria_id=None) -> ReportResult:
+        instante = timezone.make_aware(datetime.combine(fecha + timedelta(days=1), time.min))
+
+        articulos = bodega_repo.articulos_filtrados(bodega_id, categoria_id)
+        service = CierreInventarioService()
+        saldos = service.valorizar_a_fecha(instante, articulos)
+        cierre = service.repository.get_ultimo_hasta(instante)
+
+        rows: List[List] = []
+        cantidad_total = 0
+        valor_total = Decimal("0")
+        filas = articulos.values_list(
+            "id", "codigo", "nombre", "categoria__nombre", "ubicacion_fisica__nombre"
+        ).iterator()
+        for art_id, codigo, nombre, categoria, bodega in filas:
+            saldo = saldos.get(art_id)
+            if saldo is None or saldo.cantidad == 0:
+                continue
+            rows.append([
+                codigo,
+                nombre,
+                categoria or "",
+                bodega or "",
+                saldo.cantidad,
+                saldo.costo_unitario.quantize(Decimal("0.01")),
+                saldo.valor,
+            ])
+            cantidad_total += saldo.cantidad
+            valor_total += saldo.valor
+
+        return ReportResult(
+            title="Valorización de inventario",
+            columns=self.columns,
+            rows=rows,
+            totals={
+                "articulos": len(rows),
+                "cantidad": cantidad_total,
+                "valor": valor_total,
+            },
+            filters_summary={
+                "fecha": fecha.strftime("%d/%m/%Y"),
+                "bodega_id": bodega_id,
+                "categoria_id": categoria_id,
+                "cierre_base": cierre.periodo.strftime("%m/%Y") if cierre else "Sin cierre",
+            },
+        )
+
+
+class ConsumoDepartamentalService:
+    """
+    Servicio: Consumo por departamento, área, categoría y artículo.
+    Lee el resumen mensual ConsumoMensual (mantenido al registrar entregas)
+    en vez de las entregas; detalle, subtotales por nivel y total general
+    salen de una sola consulta con GROUPING SETS.
+    """
+
+    # Niveles de detalle, del más general al más fino
+    NIVELES = ["departamento", "area", "categoria", "articulo"]
+    ETIQUETAS = {
+        "mes": "Mes",
+        "departamento": "Departamento",
+        "area": "Área",
+        "categoria": "Categoría",
+        "articulo": "Artículo",
+    }
+    SIN_VALOR = {"departamento": "Sin departamento", "area": "Sin área"}
+
+    def run(
+        self,
+        desde: date,
+        hasta: date,
+        detalle: str = "categoria",
+        por_mes: bool = True,
+        departamento_id=None,
+        categoria_id=None,
+    ) -> ReportResult:
+        if detalle not in self.NIVELES:
+            detalle = "categoria"
+        dimensiones = (["mes"] if por_mes else []) + self.NIVELES[:self.NIVELES.index(detalle) + 1]
+
+        filas = bodega_repo.consumo_agrupado(
+            dimensiones, desde, hasta, departamento_id=departamento_id, categoria_id=categoria_id
+        )
+
+        rows: List[List] = []
+        totales = {"cantidad": 0, "lineas": 0}
+        for fila in filas:
+            nivel = fila["nivel"]
+            if nivel == 0:
+                # Total general (también llega sin datos, con sumas nulas)
+                totales = {"cantidad": fila["cantidad"] or 0, "lineas": fila["lineas"] or 0}
+                if not rows:
+                    break
+            rows.append(self._fila(dimensiones, fila, nivel))
+
+        return ReportResult(
+            title="Consumo por departamento",
+            columns=[self.ETIQUETAS[d] for d in dimensiones] + ["Cantidad", "Líneas"],
+            rows=rows,
+            totals=totales,
+            filters_summary={
+                "desde": desde.strftime("%m/%Y"),
+                "hasta": hasta.strftime("%m/%Y"),
+                "detalle": self.ETIQUETAS[detalle],
+                "por_mes": "Sí" if por_mes else "No",
+                "departamento_id": departamento_id,
+                "categoria_id": categoria_id,
+            },
+        )
+
+    def _fila(self, dimensiones: List[str], fila: dict, nivel: int) -> List:
+        """Fila del reporte; en los subtotales la primera columna agrupada dice 'Total'."""
+        celdas: List = []
+        for posicion, dimension in enumerate(dimensiones):
+            if posicion < nivel:
+                valor = fila[dimension]
+                if dimension == "mes":
+                    celdas.append(valor.strftime("%m/%Y"))
+                else:
+                    celdas.append(valor if valor is not None else self.SIN_VALOR.get(dimension, ""))
+            elif posicion == nivel:
+                celdas.append("Total general" if nivel == 0 else "Total")
+            else:
+                celdas.append("")
+        return celdas + [fila["cantidad"], fila["lineas"]]
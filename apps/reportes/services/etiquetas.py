@@ -0,0 +1,42 @@
+from typing import List, Optional
+
+from apps.reportes.exporters.etiquetas import Etiqueta
+from apps.reportes.repositories import etiquetas_repo
+
+
+class EtiquetasService:
+    """
+    Servicio: etiquetas de código de barras de artículos o activos.
+    SRP: arma la lista de etiquetas (con copias) desde repositories.
+    """
+
+    TIPOS = ("articulos", "activos")
+    MAX_ETIQUETAS = 20000
+
+    def run(
+        self,
+        tipo: str,
+        copias: int = 1,
+        bodega_id=None,
+        categoria_id=None,
+        estado_id=None,
+        codigo_desde: Optional[str] = None,
+        codigo_hasta: Optional[str] = None,
+    ) -> List[Etiqueta]:
+        if tipo == "activos":
+            filas = etiquetas_repo.activos_para_etiquetas(categoria_id, estado_id, codigo_desde, codigo_hasta)
+        else:
+            filas = etiquetas_repo.articulos_para_etiquetas(bodega_id, categoria_id, codigo_desde, codigo_hasta)
+
+        copias = max(1, copias)
+        limite = self.MAX_ETIQUETAS // copias
+        filas = list(filas[: limite + 1])
+        if len(filas) > limite:
+            raise ValueError(
+                f"La selección supera el máximo de {self.MAX_ETIQUETAS} etiquetas; acote los filtros."
+            )
+
+        etiquetas: List[Etiqueta] = []
+        for codigo_barras, nombre, categoria in filas:
+            etiquetas.extend([Etiqueta(codigo_barras, nombre, categoria or "")] * copias)
+        return etiquetas
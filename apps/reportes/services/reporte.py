@@ -7,6 +7,7 @@ sus filtros y configuracion. Sigue Clean Architecture estricta.
 from typing import Dict, Any, List, Optional
 from django.utils import timezone
 from datetime import datetime, timedelta
+from core.cache import cached_service
 
 
 class ReporteService:
@@ -56,6 +57,102 @@ class ReporteService:
             'url_name': 'reportes:articulos_sin_movimiento',
             'service_class': 'ArticulosSinMovimientoService'
         },
+        'kardex': {
+            'codigo': 'kardex',
+            'nombre': 'Kardex de Articulos',
+            'modulo': 'bodega',
+            'descripcion': 'Tarjeta de existencias por articulo: saldo inicial, entradas, salidas y saldo corrido',
+            'filtros': {
+                'desde': {
+                    'tipo': 'date',
+                    'label': 'Fecha de Inicio',
+                    'requerido': False,
+                    'default': None
+                },
+                'hasta': {
+                    'tipo': 'date',
+                    'label': 'Fecha de Termino',
+                    'requerido': False,
+                    'default': None
+                },
+                'bodega_id': {
+                    'tipo': 'select',
+                    'label': 'Bodega',
+                    'requerido': False,
+                    'opciones': 'bodegas'
+                },
+                'categoria_id': {
+                    'tipo': 'select',
+                    'label': 'Categoria',
+                    'requerido': False,
+                    'opciones': 'categorias'
+                }
+            },
+            'url_name': 'reportes:kardex',
+            'service_class': 'KardexService'
+        },
+        'valorizacion_inventario': {
+            'codigo': 'valorizacion_inventario',
+            'nombre': 'Valorizacion de Inventario',
+            'modulo': 'bodega',
+            'descripcion': 'Stock y valor (costo promedio ponderado) de cada articulo a una fecha de corte',
+            'filtros': {
+                'fecha': {
+                    'tipo': 'date',
+                    'label': 'Fecha de Corte',
+                    'requerido': False,
+                    'default': None
+                },
+                'bodega_id': {
+                    'tipo': 'select',
+                    'label': 'Bodega',
+                    'requerido': False,
+                    'opciones': 'bodegas'
+                },
+                'categoria_id': {
+                    'tipo': 'select',
+                    'label': 'Categoria',
+                    'requerido': False,
+                    'opciones': 'categorias'
+                }
+            },
+            'url_name': 'reportes:valorizacion_inventario',
+            'service_class': 'ValorizacionInventarioService'
+        },
+        'consumo_departamental': {
+            'codigo': 'consumo_departamental',
+            'nombre': 'Consumo por Departamento',
+            'modulo': 'bodega',
+            'descripcion': 'Articulos entregados por mes, departamento, area y categoria, con subtotales',
+            'filtros': {
+                'desde': {
+                    'tipo': 'date',
+                    'label': 'Desde (mes)',
+                    'requerido': False,
+                    'default': None
+                },
+                'hasta': {
+                    'tipo': 'date',
+                    'label': 'Hasta (mes)',
+                    'requerido': False,
+                    'default': None
+                },
+                'departamento_id': {
+                    'tipo': 'select',
+                    'label': 'Departamento',
+                    'requerido': False,
+                    'opciones': 'departamentos'
+                },
+                'categoria_id': {
+                    'tipo': 'select',
+                    'label': 'Categoria',
+                    'requerido': False,
+                    'opciones': 'categorias'
+                }
+            },
+            'url_name': 'reportes:consumo_departamental',
+            'service_class': 'ConsumoDepartamentalService'
+        },
         'oc_atrasadas_por_proveedor': {
             'codigo': 'oc_atrasadas_por_proveedor',
             'nombre': 'OC Atrasadas por Proveedor',
@@ -128,12 +225,52 @@ class ReporteService:
         return {}
 
     @staticmethod
+    @cached_service(
+        tags=['bodega.Bodega', 'bodega.Categoria', 'compras.Proveedor', 'solicitudes.Departamento'], ttl=3600
+    )
+    def catalogos_filtros() -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Catalogos de los formularios de filtros de reportes.
+
+        Cacheado hasta que cambie una bodega, categoria, proveedor o departamento.
+
+        Returns:
+            Dict con 'bodegas', 'categorias', 'proveedores' y 'departamentos' como listas de dicts
+        """
+        from apps.bodega.models import Bodega, Categoria
+        from apps.compras.models import Proveedor
+        from apps.solicitudes.models import Departamento
+
+        return {
+            'bodegas': list(
+                Bodega.objects.filter(eliminado=False, activo=True)
+                .order_by('codigo').values('id', 'codigo', 'nombre')
+            ),
+            'categorias': list(
+                Categoria.objects.filter(eliminado=False)
+                .order_by('codigo').values('id', 'codigo', 'nombre')
+            ),
+            'proveedores': list(
+                Proveedor.objects.filter(eliminado=False, activo=True)
+                .order_by('razon_social').values('id', 'rut', 'razon_social')
+            ),
+            'departamentos': list(
+                Departamento.objects.filter(eliminado=False, activo=True)
+                .order_by('codigo').values('id', 'codigo', 'nombre')
+            ),
+        }
+
+    @staticmethod
+    @cached_service(
+        tags=['bodega.Bodega', 'bodega.Categoria', 'compras.Proveedor', 'solicitudes.Departamento'], ttl=3600
+    )
     def obtener_opciones_para_filtro(filtro_tipo: str) -> List[Dict[str, Any]]:
         """
         Obtiene las opciones para un tipo de filtro (bodegas, categorias, etc.).
+        Cacheado hasta que cambie una bodega, categoria, proveedor o departamento.
         
         Args:
-            filtro_tipo: Tipo de opciones ('bodegas', 'categorias', 'proveedores')
+            filtro_tipo: Tipo de opciones ('bodegas', 'categorias', 'proveedores', 'departamentos')
             
         Returns:
             Lista de diccionarios con opciones
@@ -156,5 +293,11 @@ class ReporteService:
                 {'id': p.id, 'nombre': f'{p.rut} - {p.razon_social}'}
                 for p in Proveedor.objects.filter(eliminado=False, activo=True).order_by('razon_social')
             ]
+        elif filtro_tipo == 'departamentos':
+            from apps.solicitudes.models import Departamento
+            return [
+                {'id': d.id, 'nombre': f'{d.codigo} - {d.nombre}'}
+                for d in Departamento.objects.filter(eliminado=False, activo=True).order_by('codigo')
+            ]
         return []
 
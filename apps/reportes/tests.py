@@ -0,0 +1,146 @@
+"""
+Tests de los exportadores de reportes y de la negociación de formato.
+"""
+import gzip
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.bodega.models import Articulo, Bodega, Categoria
+from apps.reportes.dtos import ReportResult
+from apps.reportes.exporters import etiquetas as etiquetas_exporter
+from apps.reportes.exporters import exportar, negociar_formato
+from apps.reportes.exporters import pdf as pdf_exporter
+from apps.reportes.services.etiquetas import EtiquetasService
+
+
+class EtiquetasCodigoBarrasTest(TestCase):
+    """Tests de la hoja de etiquetas Code128 de artículos."""
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user('etiquetas', password='clave')
+        bodega = Bodega.objects.create(codigo='B7', nombre='Bodega', responsable=usuario)
+        categoria = Categoria.objects.create(codigo='C7', nombre='Categoría')
+        Articulo.objects.bulk_create([
+            Articulo(
+                codigo=f'AE{i:02d}', codigo_barras=f'COD-AE{i:02d}', nombre='Artículo',
+                categoria=categoria, ubicacion_fisica=bodega
+            )
+            for i in range(30)
+        ])
+
+    def test_hoja_usa_dibujos_en_cache(self):
+        """Cada código se dibuja una vez; la reimpresión toma los dibujos de la caché."""
+        etiquetas = EtiquetasService().run('articulos', copias=2)
+        self.assertEqual(len(etiquetas), 60)
+
+        cache.delete_many([etiquetas_exporter.CACHE_PREFIJO + e.codigo_barras for e in etiquetas])
+        pdf = etiquetas_exporter.render_etiquetas(etiquetas, etiquetas_exporter.FORMATOS['A4_3x8'])
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(len(cache.get_many([etiquetas_exporter.CACHE_PREFIJO + 'COD-AE00'])), 1)
+
+        with mock.patch.object(etiquetas_exporter, '_dibujar_lote') as dibujar:
+            dibujos = etiquetas_exporter.obtener_dibujos(e.codigo_barras for e in etiquetas)
+        dibujar.assert_not_called()
+        self.assertEqual(len(dibujos), 30)
+
+
+class ReportePdfPorPaginasTest(SimpleTestCase):
+    """Tests del exportador PDF de reportes con una tabla por página."""
+
+    def _reporte(self, filas):
+        return ReportResult(
+            title='Kardex',
+            columns=['Fecha', 'Artículo', 'Cantidad'],
+            rows=[
+                [date(2025, 1, 1), f'Artículo {i}\ncon salto' + ' largo' * (i % 60), Decimal(i)]
+                for i in range(filas)
+            ],
+            filters_summary={'Bodega': 'Central'},
+        )
+
+    def test_paginas_iguales_con_y_sin_pool(self):
+        """El pool de procesos prepara las mismas páginas que el proceso del request."""
+        report = self._reporte(1200)
+        serie = BytesIO()
+        paginas = pdf_exporter.render_pdf(report, serie)
+        self.assertTrue(serie.getvalue().startswith(b'%PDF'))
+        self.assertGreater(paginas, 1)
+        self.assertIn(b'/Count %d ' % paginas, serie.getvalue())
+
+        paralelo = BytesIO()
+        with override_settings(REPORTES_PDF_PROCESOS=2), mock.patch.object(pdf_exporter, 'UMBRAL_PROCESOS', 1), \
+                mock.patch.object(pdf_exporter, 'PAGINAS_POR_LOTE', 5):
+            self.assertEqual(pdf_exporter.render_pdf(report, paralelo), paginas)
+        self.assertIn(b'/Count %d ' % paginas, paralelo.getvalue())
+
+    def test_reporte_sin_filas_tiene_una_pagina(self):
+        """Sin filas se genera una página con la cabecera de la tabla."""
+        response = pdf_exporter.export_pdf(self._reporte(0))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'], 'inline; filename="Kardex.pdf"')
+        contenido = b''.join(response.streaming_content)
+        # Cierra solo el archivo: response.close() emite request_finished, que toca la base
+        response.file_to_stream.close()
+        self.assertTrue(contenido.startswith(b'%PDF'))
+        self.assertIn(b'/Count 1 ', contenido)
+
+
+class ExportadoresReporteTest(SimpleTestCase):
+    """Tests del exportador CSV y de la negociación de formato de los reportes."""
+
+    def setUp(self):
+        self.report = ReportResult(
+            title='Kardex',
+            columns=['Fecha', 'Artículo', 'Cantidad'],
+            rows=[[date(2025, 1, 1), f'Artículo; {i}', Decimal(i) if i % 2 else None] for i in range(2500)],
+        )
+
+    def test_csv_por_bloques_con_y_sin_gzip(self):
+        """El CSV se envía por bloques y con gzip llega el mismo contenido comprimido."""
+        request = RequestFactory().get('/', {'format': 'csv'})
+        response = exportar(request, self.report)
+        self.assertTrue(response.streaming)
+        contenido = b''.join(response.streaming_content)
+        lineas = contenido.decode('utf-8-sig').splitlines()
+        self.assertEqual(lineas[0], 'Fecha;Artículo;Cantidad')
+        self.assertEqual(lineas[1], '2025-01-01;"Artículo; 0";')
+        self.assertEqual(len(lineas), 2501)
+
+        request = RequestFactory().get('/', {'format': 'csv'}, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        response = exportar(request, self.report)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), contenido)
+        self.assertEqual(response['Vary'], 'Accept-Encoding, Accept')
+
+    def test_negociacion_de_formato(self):
+        """?format= tiene prioridad; sin él decide Accept y los navegadores reciben HTML."""
+        factory = RequestFactory()
+        self.assertEqual(negociar_formato(factory.get('/', {'format': 'excel'})), 'xlsx')
+        self.assertIsNone(negociar_formato(factory.get('/', {'format': 'html'})))
+        self.assertEqual(negociar_formato(factory.get('/', HTTP_ACCEPT='text/csv')), 'csv')
+        self.assertIsNone(negociar_formato(factory.get('/', HTTP_ACCEPT='text/html,*/*;q=0.8')))
+
+
+class NegociacionVistasReporteTest(TestCase):
+    """Tests de las cabeceras de las vistas de reporte con formato negociado."""
+
+    def test_html_y_archivo_varian_por_accept(self):
+        """La misma URL responde HTML o archivo según Accept: ambas respuestas llevan Vary: Accept."""
+        self.client.force_login(User.objects.create_user('vary', password='clave'))
+        url = reverse('reportes:oc_atrasadas_por_proveedor')
+
+        html = self.client.get(url, HTTP_ACCEPT='text/html')
+        archivo = self.client.get(url, HTTP_ACCEPT='text/csv')
+
+        self.assertEqual(html['Content-Type'], 'text/html; charset=utf-8')
+        self.assertTrue(archivo['Content-Type'].startswith('text/csv'))
+        for response in (html, archivo):
+            self.assertIn('Accept', [cabecera.strip() for cabecera in response['Vary'].split(',')])
@@ -16,6 +16,10 @@ urlpatterns = [
     path('generar/', views.seleccionar_reporte, name='seleccionar_reporte'),
     # Nuevos reportes (mantener para compatibilidad)
     path('bodega/articulos-sin-movimiento/', views.articulos_sin_movimiento, name='articulos_sin_movimiento'),
+    path('bodega/kardex/', views.kardex, name='kardex'),
+    path('bodega/valorizacion/', views.valorizacion_inventario, name='valorizacion_inventario'),
+    path('bodega/consumo-departamental/', views.consumo_departamental, name='consumo_departamental'),
+    path('etiquetas/', views.etiquetas_codigo_barras, name='etiquetas_codigo_barras'),
     path('compras/oc-atrasadas-proveedor/', views.oc_atrasadas_por_proveedor, name='oc_atrasadas_por_proveedor'),
     # Ruta con parametro de app (debe ir despues de las rutas especificas)
     path('<str:app>/', views.dashboard_reportes, name='dashboard_app'),
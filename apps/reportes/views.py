@@ -5,20 +5,24 @@ from django.utils import timezone
 from datetime import timedelta
 from datetime import datetime
 from django.http import HttpRequest, HttpResponse
+from django.views.decorators.vary import vary_on_headers
 from .models import TipoReporte, ReporteGenerado, MovimientoInventario
-from apps.activos.models import MovimientoActivo, Activo, Ubicacion
-from apps.bodega.models import Bodega, Categoria
-from apps.compras.models import Proveedor
+from apps.activos.models import MovimientoActivo, Activo, Ubicacion, CategoriaActivo, EstadoActivo
 
 # Servicios y exportadores
-from apps.reportes.services.bodega import ArticulosSinMovimientoService
+from apps.reportes.services.bodega import (
+    ArticulosSinMovimientoService, ConsumoDepartamentalService, KardexService, ValorizacionInventarioService
+)
 from apps.reportes.services.compras import OcAtrasadasPorProveedorService
+from apps.reportes.services.etiquetas import EtiquetasService
 from apps.reportes.services.reporte import ReporteService
-from apps.reportes.exporters.pdf import export_pdf
-from apps.reportes.exporters.xlsx import export_xlsx
+from apps.reportes.exporters import exportar
+from apps.reportes.exporters.etiquetas import FORMATOS, export_etiquetas
+from core.db_router import use_replica
 
 
 @login_required
+@use_replica
 def lista_reportes(request):
     """Vista para listar tipos de reportes disponibles"""
     tipos_reportes = TipoReporte.objects.filter(activo=True).order_by('modulo', 'codigo')
@@ -31,6 +35,7 @@ def lista_reportes(request):
 
 
 @login_required
+@use_replica
 def historial_reportes(request):
     """Vista para ver el historial de reportes generados"""
     reportes = ReporteGenerado.objects.select_related(
@@ -45,6 +50,7 @@ def historial_reportes(request):
 
 
 @login_required
+@use_replica
 def reporte_inventario_actual(request):
     """Vista para ver el reporte de ubicación actual de activos"""
     ubicaciones = Ubicacion.objects.select_related(
@@ -69,6 +75,7 @@ def reporte_inventario_actual(request):
 
 
 @login_required
+@use_replica
 def reporte_movimientos(request):
     """Vista para ver el reporte de movimientos de inventario"""
     # Por defecto, últimos 30 días
@@ -103,6 +110,7 @@ def reporte_movimientos(request):
 
 
 @login_required
+@use_replica
 def dashboard_reportes(request, app=None):
     """
     Dashboard de reportes con cards organizadas por app.
@@ -173,6 +181,7 @@ def dashboard_reportes(request, app=None):
 
 
 @login_required
+@use_replica
 def seleccionar_reporte(request, modulo=None):
     """
     Vista unificada para seleccionar y generar reportes de forma dinamica.
@@ -249,6 +258,31 @@ def seleccionar_reporte(request, modulo=None):
             
             service = ArticulosSinMovimientoService()
             report_data = service.run(desde, hasta, bodega_id=bodega_id, categoria_id=categoria_id)
+
+        elif reporte_codigo == 'kardex':
+            hoy = timezone.now().date()
+            desde_str = filtros_valores.get('desde')
+            hasta_str = filtros_valores.get('hasta')
+            desde = datetime.strptime(desde_str, "%Y-%m-%d").date() if desde_str else hoy.replace(day=1)
+            hasta = datetime.strptime(hasta_str, "%Y-%m-%d").date() if hasta_str else hoy
+
+            service = KardexService()
+            report_data = service.run(
+                desde, hasta,
+                bodega_id=filtros_valores.get('bodega_id'),
+                categoria_id=filtros_valores.get('categoria_id')
+            )
+
+        elif reporte_codigo == 'valorizacion_inventario':
+            fecha_str = filtros_valores.get('fecha')
+            fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date() if fecha_str else timezone.now().date()
+
+            service = ValorizacionInventarioService()
+            report_data = service.run(
+                fecha,
+                bodega_id=filtros_valores.get('bodega_id'),
+                categoria_id=filtros_valores.get('categoria_id')
+            )
             
         elif reporte_codigo == 'oc_atrasadas_por_proveedor':
             proveedor_id = filtros_valores.get('proveedor_id')
@@ -257,10 +291,11 @@ def seleccionar_reporte(request, modulo=None):
             service = OcAtrasadasPorProveedorService()
             report_data = service.run(proveedor_id=proveedor_id, bodega_id=bodega_id)
     
-    # Obtener opciones para filtros de tipo select
-    bodegas = Bodega.objects.filter(eliminado=False, activo=True).order_by("codigo")
-    categorias = Categoria.objects.filter(eliminado=False).order_by("codigo")
-    proveedores = Proveedor.objects.filter(eliminado=False, activo=True).order_by("razon_social")
+    # Obtener opciones para filtros de tipo select (cacheadas)
+    catalogos = ReporteService.catalogos_filtros()
+    bodegas = catalogos['bodegas']
+    categorias = catalogos['categorias']
+    proveedores = catalogos['proveedores']
     
     # Nombre del modulo para mostrar
     nombres_modulos = {
@@ -304,12 +339,13 @@ def seleccionar_reporte(request, modulo=None):
 
 
 @login_required
+@use_replica
+@vary_on_headers("Accept")
 def articulos_sin_movimiento(request: HttpRequest) -> HttpResponse:
     """
-    En pantalla/PDF/XLSX de artículos sin movimiento.
+    En pantalla/PDF/XLSX/CSV de artículos sin movimiento.
     Filtros: desde, hasta, bodega_id, categoria_id
     """
-    fmt = request.GET.get("format", "html")
     desde_str = request.GET.get("desde")
     hasta_str = request.GET.get("hasta")
     bodega_id = request.GET.get("bodega_id")
@@ -323,14 +359,14 @@ def articulos_sin_movimiento(request: HttpRequest) -> HttpResponse:
     service = ArticulosSinMovimientoService()
     report = service.run(desde, hasta, bodega_id=bodega_id, categoria_id=categoria_id)
 
-    if fmt == "pdf":
-        return export_pdf(report)
-    if fmt == "xlsx":
-        return export_xlsx(report)
+    response = exportar(request, report)
+    if response is not None:
+        return response
 
     # HTML con filtros
-    bodegas = Bodega.objects.filter(eliminado=False, activo=True).order_by("codigo")
-    categorias = Categoria.objects.filter(eliminado=False).order_by("codigo")
+    catalogos = ReporteService.catalogos_filtros()
+    bodegas = catalogos['bodegas']
+    categorias = catalogos['categorias']
     context = {
         "report": report,
         "bodegas": bodegas,
@@ -344,25 +380,153 @@ def articulos_sin_movimiento(request: HttpRequest) -> HttpResponse:
 
 
 @login_required
+@use_replica
+@vary_on_headers("Accept")
+def kardex(request: HttpRequest) -> HttpResponse:
+    """
+    En pantalla/PDF/XLSX/CSV del kardex (tarjeta de existencias) de artículos.
+    Filtros: desde, hasta, bodega_id, categoria_id, articulo (código)
+    """
+    desde_str = request.GET.get("desde")
+    hasta_str = request.GET.get("hasta")
+    bodega_id = request.GET.get("bodega_id")
+    categoria_id = request.GET.get("categoria_id")
+    articulo = request.GET.get("articulo", "").strip()
+
+    # Defaults: mes en curso
+    hoy = timezone.now().date()
+    desde = datetime.strptime(desde_str, "%Y-%m-%d").date() if desde_str else hoy.replace(day=1)
+    hasta = datetime.strptime(hasta_str, "%Y-%m-%d").date() if hasta_str else hoy
+
+    service = KardexService()
+    report = service.run(
+        desde, hasta, bodega_id=bodega_id, categoria_id=categoria_id, articulo_codigo=articulo or None
+    )
+
+    response = exportar(request, report)
+    if response is not None:
+        return response
+
+    catalogos = ReporteService.catalogos_filtros()
+    bodegas = catalogos['bodegas']
+    categorias = catalogos['categorias']
+    context = {
+        "report": report,
+        "bodegas": bodegas,
+        "categorias": categorias,
+        "desde": desde,
+        "hasta": hasta,
+        "bodega_id": bodega_id,
+        "categoria_id": categoria_id,
+        "articulo": articulo,
+    }
+    return render(request, "reportes/kardex.html", context)
+
+
+@login_required
+@use_replica
+@vary_on_headers("Accept")
+def valorizacion_inventario(request: HttpRequest) -> HttpResponse:
+    """
+    En pantalla/PDF/XLSX/CSV de la valorización del inventario a una fecha.
+    Filtros: fecha (fin del día), bodega_id, categoria_id
+    """
+    fecha_str = request.GET.get("fecha")
+    bodega_id = request.GET.get("bodega_id")
+    categoria_id = request.GET.get("categoria_id")
+
+    # Default: hoy
+    fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date() if fecha_str else timezone.now().date()
+
+    service = ValorizacionInventarioService()
+    report = service.run(fecha, bodega_id=bodega_id, categoria_id=categoria_id)
+
+    response = exportar(request, report)
+    if response is not None:
+        return response
+
+    catalogos = ReporteService.catalogos_filtros()
+    bodegas = catalogos['bodegas']
+    categorias = catalogos['categorias']
+    context = {
+        "report": report,
+        "bodegas": bodegas,
+        "categorias": categorias,
+        "fecha": fecha,
+        "bodega_id": bodega_id,
+        "categoria_id": categoria_id,
+    }
+    return render(request, "reportes/valorizacion_inventario.html", context)
+
+
+@login_required
+@use_replica
+@vary_on_headers("Accept")
+def consumo_departamental(request: HttpRequest) -> HttpResponse:
+    """
+    En pantalla/PDF/XLSX/CSV del consumo por departamento (resumen mensual).
+    Filtros: desde, hasta (meses), detalle (departamento/area/categoria/articulo),
+    por_mes, departamento_id, categoria_id
+    """
+    desde_str = request.GET.get("desde")
+    hasta_str = request.GET.get("hasta")
+    detalle = request.GET.get("detalle", "categoria")
+    por_mes = request.GET.get("por_mes", "1") == "1"
+    departamento_id = request.GET.get("departamento_id")
+    categoria_id = request.GET.get("categoria_id")
+
+    # Defaults: año en curso
+    hoy = timezone.now().date()
+    desde = datetime.strptime(desde_str, "%Y-%m-%d").date() if desde_str else hoy.replace(month=1, day=1)
+    hasta = datetime.strptime(hasta_str, "%Y-%m-%d").date() if hasta_str else hoy
+
+    service = ConsumoDepartamentalService()
+    report = service.run(
+        desde, hasta, detalle=detalle, por_mes=por_mes,
+        departamento_id=departamento_id, categoria_id=categoria_id
+    )
+
+    response = exportar(request, report)
+    if response is not None:
+        return response
+
+    catalogos = ReporteService.catalogos_filtros()
+    context = {
+        "report": report,
+        "departamentos": catalogos['departamentos'],
+        "categorias": catalogos['categorias'],
+        "niveles": [(nivel, ConsumoDepartamentalService.ETIQUETAS[nivel]) for nivel in service.NIVELES],
+        "desde": desde,
+        "hasta": hasta,
+        "detalle": detalle,
+        "por_mes": por_mes,
+        "departamento_id": departamento_id,
+        "categoria_id": categoria_id,
+    }
+    return render(request, "reportes/consumo_departamental.html", context)
+
+
+@login_required
+@use_replica
+@vary_on_headers("Accept")
 def oc_atrasadas_por_proveedor(request: HttpRequest) -> HttpResponse:
     """
-    En pantalla/PDF/XLSX de OC atrasadas por proveedor.
+    En pantalla/PDF/XLSX/CSV de OC atrasadas por proveedor.
     Filtros: proveedor_id, bodega_id
     """
-    fmt = request.GET.get("format", "html")
     proveedor_id = request.GET.get("proveedor_id")
     bodega_id = request.GET.get("bodega_id")
 
     service = OcAtrasadasPorProveedorService()
     report = service.run(proveedor_id=proveedor_id, bodega_id=bodega_id)
 
-    if fmt == "pdf":
-        return export_pdf(report)
-    if fmt == "xlsx":
-        return export_xlsx(report)
+    response = exportar(request, report)
+    if response is not None:
+        return response
 
-    proveedores = Proveedor.objects.filter(eliminado=False, activo=True).order_by("razon_social")
-    bodegas = Bodega.objects.filter(eliminado=False, activo=True).order_by("codigo")
+    catalogos = ReporteService.catalogos_filtros()
+    proveedores = catalogos['proveedores']
+    bodegas = catalogos['bodegas']
     context = {
         "report": report,
         "proveedores": proveedores,
@@ -373,10 +537,76 @@ def oc_atrasadas_por_proveedor(request: HttpRequest) -> HttpResponse:
     return render(request, "reportes/oc_atrasadas_por_proveedor.html", context)
 
 
+@login_required
+@use_replica
+def etiquetas_codigo_barras(request: HttpRequest) -> HttpResponse:
+    """
+    Hoja PDF de etiquetas Code128 de artículos o activos filtrados.
+    Filtros: tipo (articulos/activos), bodega_id, categoria_id, estado_id,
+    codigo_desde, codigo_hasta, copias, formato (ver FORMATOS)
+    """
+    tipo = request.GET.get("tipo", "articulos")
+    if tipo not in EtiquetasService.TIPOS:
+        tipo = "articulos"
+    formato = request.GET.get("formato", "A4_3x8")
+    if formato not in FORMATOS:
+        formato = "A4_3x8"
+    bodega_id = request.GET.get("bodega_id")
+    categoria_id = request.GET.get("categoria_id")
+    estado_id = request.GET.get("estado_id")
+    codigo_desde = request.GET.get("codigo_desde", "").strip()
+    codigo_hasta = request.GET.get("codigo_hasta", "").strip()
+    try:
+        copias = min(max(int(request.GET.get("copias", 1)), 1), 50)
+    except ValueError:
+        copias = 1
+
+    error = None
+    if request.GET.get("format") == "pdf":
+        try:
+            etiquetas = EtiquetasService().run(
+                tipo,
+                copias=copias,
+                bodega_id=bodega_id,
+                categoria_id=categoria_id,
+                estado_id=estado_id,
+                codigo_desde=codigo_desde or None,
+                codigo_hasta=codigo_hasta or None,
+            )
+        except ValueError as e:
+            error = str(e)
+        else:
+            titulo = f"Etiquetas {tipo} {timezone.localdate():%Y%m%d}"
+            return export_etiquetas(etiquetas, FORMATOS[formato], titulo)
+
+    catalogos = ReporteService.catalogos_filtros()
+    if tipo == "activos":
+        categorias = CategoriaActivo.objects.filter(eliminado=False).order_by("codigo")
+    else:
+        categorias = catalogos['categorias']
+    context = {
+        "tipo": tipo,
+        "formato": formato,
+        "formatos": FORMATOS,
+        "bodegas": catalogos['bodegas'],
+        "categorias": categorias,
+        "estados": EstadoActivo.objects.filter(eliminado=False).order_by("codigo"),
+        "bodega_id": bodega_id,
+        "categoria_id": categoria_id,
+        "estado_id": estado_id,
+        "codigo_desde": codigo_desde,
+        "codigo_hasta": codigo_hasta,
+        "copias": copias,
+        "error": error,
+    }
+    return render(request, "reportes/etiquetas_codigo_barras.html", context)
+
+
 # ==================== VISTA DE AUDITORÍA DE ACTIVIDADES ====================
 
 
 @login_required
+@use_replica
 def auditoria_actividades(request: HttpRequest) -> HttpResponse:
     """
     Vista dedicada para auditoría de actividades del sistema.
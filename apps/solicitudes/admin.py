@@ -158,7 +158,10 @@ class SolicitudAdmin(admin.ModelAdmin):
         'numero', 'solicitante__email', 'solicitante__username',
         'titulo_actividad', 'motivo'
     ]
-    readonly_fields = ['fecha_solicitud', 'fecha_creacion', 'fecha_actualizacion']
+    readonly_fields = [
+        'fecha_solicitud', 'lineas_total', 'lineas_completas', 'lineas_parciales',
+        'fecha_creacion', 'fecha_actualizacion'
+    ]
     autocomplete_fields = ['tipo_solicitud', 'estado', 'departamento', 'area']
     inlines = [DetalleSolicitudInline, HistorialSolicitudInline]
     date_hierarchy = 'fecha_solicitud'
@@ -186,7 +189,10 @@ class SolicitudAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Despacho', {
-            'fields': ('despachador', 'fecha_despacho', 'notas_despacho', 'bodega_origen'),
+            'fields': (
+                'despachador', 'fecha_despacho', 'notas_despacho', 'bodega_origen',
+                'lineas_total', 'lineas_completas', 'lineas_parciales'
+            ),
             'classes': ('collapse',)
         }),
         ('Observaciones', {
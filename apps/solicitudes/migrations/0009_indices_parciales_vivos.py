@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:46
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Índices creados con CONCURRENTLY para no bloquear escrituras en tablas grandes
+    atomic = False
+
+    dependencies = [
+        ('activos', '0005_indices_parciales_vivos'),
+        ('bodega', '0009_indices_parciales_vivos'),
+        ('solicitudes', '0008_rename_tba_solicit_modulo_3b1289_idx_tba_solicit_modulo_3b20d9_idx_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='detallesolicitud',
+            index=models.Index(condition=models.Q(('eliminado', False)), fields=['solicitud', 'id'], name='det_sol_vivo_idx'),
+        ),
+    ]
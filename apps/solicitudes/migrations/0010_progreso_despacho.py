@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0009_indices_parciales_vivos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitud',
+            name='lineas_completas',
+            field=models.IntegerField(default=0, editable=False, help_text='Líneas cuya cantidad aprobada fue despachada por completo', verbose_name='Líneas Completas'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='lineas_parciales',
+            field=models.IntegerField(default=0, editable=False, help_text='Líneas con despacho parcial', verbose_name='Líneas Parciales'),
+        ),
+        migrations.AddField(
+            model_name='solicitud',
+            name='lineas_total',
+            field=models.IntegerField(default=0, editable=False, help_text='Cantidad de líneas vigentes de la solicitud', verbose_name='Líneas'),
+        ),
+        # Avance inicial de las solicitudes existentes (misma regla que DetalleSolicitud.progreso)
+        migrations.RunSQL(
+            sql="""
+                UPDATE tba_solicitudes_solicitud s SET
+                    lineas_total = d.total,
+                    lineas_completas = d.completas,
+                    lineas_parciales = d.parciales
+                FROM (
+                    SELECT solicitud_id,
+                           count(*) AS total,
+                           count(*) FILTER (WHERE cantidad_despachada >= cantidad_aprobada) AS completas,
+                           count(*) FILTER (
+                               WHERE cantidad_despachada > 0 AND cantidad_despachada < cantidad_aprobada
+                           ) AS parciales
+                    FROM tba_solicitudes_detalle
+                    WHERE NOT eliminado
+                    GROUP BY solicitud_id
+                ) d
+                WHERE d.solicitud_id = s.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
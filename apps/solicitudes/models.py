@@ -2,7 +2,10 @@ from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
+from typing import Dict, Optional, Tuple
+
 from django.db import models
+from django.db.models import F
 
 from apps.activos.models import Activo
 from apps.bodega.models import Articulo, Bodega
@@ -291,8 +294,14 @@ class Solicitud(BaseModel):
         observaciones: Observaciones adicionales (opcional).
         notas_aprobacion: Notas del aprobador (opcional).
         notas_despacho: Notas del despachador (opcional).
+        lineas_total: Líneas vigentes (contador mantenido por DetalleSolicitud).
+        lineas_completas: Líneas con lo aprobado totalmente despachado.
+        lineas_parciales: Líneas con despacho iniciado pero incompleto.
     """
 
+    # Contadores de avance: solo se modifican con F() desde DetalleSolicitud
+    CAMPOS_PROGRESO = ('lineas_total', 'lineas_completas', 'lineas_parciales')
+
     TIPO_CHOICES = [
         ('ACTIVO', 'Solicitud de Activos/Bienes'),
         ('ARTICULO', 'Solicitud de Artículos'),
@@ -447,6 +456,26 @@ class Solicitud(BaseModel):
         help_text='Notas del despachador'
     )
 
+    # Avance de despacho (denormalizado)
+    lineas_total = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Líneas',
+        help_text='Cantidad de líneas vigentes de la solicitud'
+    )
+    lineas_completas = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Líneas Completas',
+        help_text='Líneas cuya cantidad aprobada fue despachada por completo'
+    )
+    lineas_parciales = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Líneas Parciales',
+        help_text='Líneas con despacho parcial'
+    )
+
     class Meta:
         db_table = 'tba_solicitudes_solicitud'
         verbose_name = 'Solicitud'
@@ -490,6 +519,37 @@ class Solicitud(BaseModel):
         """Representación en cadena de la solicitud."""
         return f"SOL-{self.numero} - {self.solicitante.email}"
 
+    def save(self, *args, **kwargs) -> None:
+        """
+        Guarda la solicitud sin sobrescribir los contadores de avance.
+
+        Los contadores lineas_* se actualizan con F() al guardar sus detalles,
+        por lo que una instancia en memoria puede tenerlos desactualizados.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.attname for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_PROGRESO
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def despacho_completo(self) -> bool:
+        """True si todas las líneas vigentes tienen lo aprobado despachado."""
+        return self.lineas_completas >= self.lineas_total
+
+    @property
+    def porcentaje_despacho(self) -> Optional[int]:
+        """
+        Porcentaje de líneas completamente despachadas.
+
+        Returns:
+            Entero 0-100, o None si la solicitud no está aprobada o no tiene líneas
+        """
+        if not self.fecha_aprobacion or not self.lineas_total:
+            return None
+        return round(100 * self.lineas_completas / self.lineas_total)
+
 
 class DetalleSolicitud(BaseModel):
     """
@@ -572,14 +632,88 @@ class DetalleSolicitud(BaseModel):
             models.Index(fields=['solicitud']),
             models.Index(fields=['articulo']),
             models.Index(fields=['activo']),
+            # Líneas vigentes de una solicitud en orden de captura
+            models.Index(
+                fields=['solicitud', 'id'],
+                name='det_sol_vivo_idx',
+                condition=models.Q(eliminado=False),
+            ),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Recuerda el avance con que se cargó la línea para calcular deltas al guardar."""
+        instancia = super().from_db(db, field_names, values)
+        campos = ('solicitud_id', 'cantidad_aprobada', 'cantidad_despachada', 'eliminado')
+        if all(campo in instancia.__dict__ for campo in campos):
+            instancia._progreso_guardado = (instancia.solicitud_id, instancia.progreso)
+        return instancia
+
     def __str__(self) -> str:
         """Representación en cadena del detalle."""
         producto = self.articulo or self.activo
         codigo = producto.codigo if producto else 'N/A'
         return f"{self.solicitud.numero} - {codigo} ({self.cantidad_solicitada})"
 
+    @property
+    def progreso(self) -> Tuple[int, int, int]:
+        """
+        Aporte de la línea a los contadores de avance de su solicitud.
+
+        Returns:
+            Tupla (total, completa, parcial) con valores 0 o 1
+        """
+        if self.eliminado:
+            return (0, 0, 0)
+        aprobada, despachada = self.cantidad_aprobada, self.cantidad_despachada
+        return (1, int(despachada >= aprobada), int(0 < despachada < aprobada))
+
+    def save(self, *args, **kwargs) -> None:
+        """Guarda la línea y aplica la variación de su avance a la solicitud."""
+        if self._state.adding:
+            anterior = (self.solicitud_id, (0, 0, 0))
+        elif hasattr(self, '_progreso_guardado'):
+            anterior = self._progreso_guardado
+        else:
+            guardada = DetalleSolicitud.objects.get(pk=self.pk)
+            anterior = (guardada.solicitud_id, guardada.progreso)
+        super().save(*args, **kwargs)
+        self._progreso_guardado = (self.solicitud_id, self.progreso)
+        self._aplicar_progreso(anterior, self._progreso_guardado)
+
+    def delete(self, *args, **kwargs):
+        """Elimina la línea descontándola de los contadores de su solicitud."""
+        anterior = getattr(self, '_progreso_guardado', (self.solicitud_id, self.progreso))
+        resultado = super().delete(*args, **kwargs)
+        self._aplicar_progreso(anterior, (anterior[0], (0, 0, 0)))
+        return resultado
+
+    @staticmethod
+    def _aplicar_progreso(
+        anterior: Tuple[int, Tuple[int, int, int]],
+        nuevo: Tuple[int, Tuple[int, int, int]]
+    ) -> None:
+        """
+        Actualiza los contadores de avance con F() según la variación de una línea.
+
+        Args:
+            anterior: (solicitud_id, progreso) antes del cambio
+            nuevo: (solicitud_id, progreso) después del cambio
+        """
+        deltas: Dict[int, list] = {}
+        for solicitud_id, progreso, signo in ((anterior[0], anterior[1], -1), (nuevo[0], nuevo[1], 1)):
+            acumulado = deltas.setdefault(solicitud_id, [0, 0, 0])
+            for i, valor in enumerate(progreso):
+                acumulado[i] += signo * valor
+
+        for solicitud_id, delta in deltas.items():
+            cambios = {
+                campo: F(campo) + valor
+                for campo, valor in zip(Solicitud.CAMPOS_PROGRESO, delta) if valor
+            }
+            if solicitud_id and cambios:
+                Solicitud.objects.filter(pk=solicitud_id).update(**cambios)
+
     def clean(self) -> None:
         """
         Validación personalizada del modelo.
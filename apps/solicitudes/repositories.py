@@ -4,8 +4,9 @@ Repository Pattern para el módulo de solicitudes.
 Separa la lógica de acceso a datos de la lógica de negocio,
 siguiendo el principio de Inversión de Dependencias (SOLID).
 """
-from typing import Optional
-from django.db.models import QuerySet
+from typing import Iterable, Optional
+from django.db.models import Count, F, FilteredRelation, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from .models import (
     Departamento, Area,
@@ -292,6 +293,81 @@ class SolicitudRepository:
             'aprobador', 'bodega_origen'
         ).order_by('-fecha_solicitud')
 
+    @staticmethod
+    def valores_con_detalles(solicitud_id: int, tipo: str) -> QuerySet:
+        """
+        Retorna la cabecera y las líneas de una solicitud en una sola consulta.
+
+        Cada fila contiene los campos de cabecera repetidos junto a los de una
+        línea (LEFT JOIN), de modo que una solicitud sin líneas retorna una
+        única fila con los campos ``linea__*`` en None, y una solicitud
+        inexistente no retorna filas. Las líneas de otro tipo de producto
+        traen ``linea__<producto>_id`` en None.
+
+        Args:
+            solicitud_id: ID de la solicitud
+            tipo: 'ARTICULO' o 'ACTIVO'
+
+        Returns:
+            QuerySet de diccionarios (``.values()``)
+        """
+        producto = 'articulo' if tipo == 'ARTICULO' else 'activo'
+        return Solicitud.objects.filter(
+            id=solicitud_id, tipo=tipo, eliminado=False
+        ).annotate(
+            linea=FilteredRelation(
+                'detalles', condition=Q(detalles__eliminado=False)
+            )
+        ).values(
+            'numero', 'motivo', 'bodega_origen_id',
+            'solicitante__username', 'solicitante__first_name', 'solicitante__last_name',
+            'departamento__nombre', 'area__nombre',
+            'linea__id', 'linea__cantidad_solicitada', 'linea__cantidad_aprobada',
+            'linea__cantidad_despachada', 'linea__observaciones',
+            f'linea__{producto}_id',
+            f'linea__{producto}__codigo',
+            f'linea__{producto}__nombre',
+            f'linea__{producto}__categoria__nombre',
+            *(
+                (
+                    'linea__articulo__stock_actual', 'linea__articulo__stock_reservado',
+                    'linea__articulo__unidad_medida__simbolo'
+                )
+                if producto == 'articulo' else ()
+            ),
+        ).order_by('linea__id')
+
+    @staticmethod
+    def recalcular_progreso(solicitudes: Optional[QuerySet] = None) -> int:
+        """
+        Reconstruye los contadores de avance desde los detalles vigentes.
+
+        Un único UPDATE con subconsultas agregadas por solicitud; se usa tras
+        cargas masivas (bulk_create) que no pasan por DetalleSolicitud.save().
+
+        Args:
+            solicitudes: QuerySet a recalcular (default: todas)
+
+        Returns:
+            Cantidad de solicitudes actualizadas
+        """
+        lineas = DetalleSolicitud.objects.vivos().filter(
+            solicitud=OuterRef('pk')
+        ).order_by().values('solicitud')
+
+        def contar(condicion: Q = Q()) -> Coalesce:
+            return Coalesce(Subquery(lineas.filter(condicion).annotate(n=Count('id')).values('n')), 0)
+
+        if solicitudes is None:
+            solicitudes = Solicitud.objects.all()
+        return solicitudes.update(
+            lineas_total=contar(),
+            lineas_completas=contar(Q(cantidad_despachada__gte=F('cantidad_aprobada'))),
+            lineas_parciales=contar(
+                Q(cantidad_despachada__gt=0, cantidad_despachada__lt=F('cantidad_aprobada'))
+            ),
+        )
+
     @staticmethod
     def exists_by_numero(numero: str, exclude_id: Optional[int] = None) -> bool:
         """Verifica si existe una solicitud con el número dado."""
@@ -325,9 +401,8 @@ class DetalleSolicitudRepository:
     @staticmethod
     def filter_by_solicitud(solicitud: Solicitud) -> QuerySet[DetalleSolicitud]:
         """Retorna detalles de una solicitud específica."""
-        return DetalleSolicitud.objects.filter(
-            solicitud=solicitud,
-            eliminado=False
+        return DetalleSolicitud.objects.vivos().filter(
+            solicitud=solicitud
         ).select_related('activo').order_by('id')
 
     @staticmethod
@@ -350,6 +425,32 @@ class DetalleSolicitudRepository:
             eliminado=False
         ).select_related('activo').order_by('id')
 
+    @staticmethod
+    def valores_por_solicitudes(solicitud_ids: Iterable[int]) -> QuerySet:
+        """
+        Retorna las líneas de varias solicitudes como diccionarios planos.
+
+        Resuelve en SQL los datos de solicitud, producto, unidad de medida y
+        categoría para evitar consultas por fila.
+
+        Args:
+            solicitud_ids: IDs de solicitudes
+
+        Returns:
+            QuerySet de diccionarios (``.values()``)
+        """
+        return DetalleSolicitud.objects.filter(
+            solicitud_id__in=solicitud_ids,
+            solicitud__eliminado=False,
+            eliminado=False
+        ).values(
+            'solicitud_id', 'solicitud__numero',
+            'cantidad_solicitada', 'cantidad_aprobada',
+            'articulo_id', 'articulo__codigo', 'articulo__nombre',
+            'articulo__unidad_medida__simbolo', 'articulo__categoria__nombre',
+            'activo_id', 'activo__codigo', 'activo__nombre', 'activo__categoria__nombre',
+        ).order_by('solicitud_id', 'id')
+
 
 # ==================== HISTORIAL SOLICITUD REPOSITORY ====================
 
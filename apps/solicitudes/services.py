@@ -24,6 +24,9 @@ from .repositories import (
     DetalleSolicitudRepository, HistorialSolicitudRepository
 )
 from apps.bodega.models import Bodega
+from apps.bodega.services import ReservaStockService
+from apps.notificaciones.models import TipoNotificacion
+from apps.notificaciones.services import NotificacionService
 from apps.activos.models import Activo
 
 
@@ -38,6 +41,8 @@ class SolicitudService:
         self.tipo_repo = TipoSolicitudRepository()
         self.detalle_repo = DetalleSolicitudRepository()
         self.historial_repo = HistorialSolicitudRepository()
+        self.reserva_service = ReservaStockService()
+        self.notificacion_service = NotificacionService()
 
     @transaction.atomic
     def crear_solicitud(
@@ -259,6 +264,14 @@ class SolicitudService:
             # Si no existe el estado APROBADA, solo guardar la información sin cambiar estado
             solicitud.save()
 
+        # Reservar lo aprobado (o ajustar la reserva si se reaprueba)
+        self.reserva_service.sincronizar_solicitud(solicitud, aprobador)
+
+        self._notificar_solicitante(
+            solicitud, TipoNotificacion.SOLICITUD_APROBADA,
+            f'Solicitud {solicitud.numero} aprobada', notas_aprobacion
+        )
+
         return solicitud
 
     @transaction.atomic
@@ -308,6 +321,13 @@ class SolicitudService:
             observaciones=f'Rechazada por {rechazador.get_full_name()}. Motivo: {motivo_rechazo}'
         )
 
+        self.reserva_service.sincronizar_solicitud(solicitud, rechazador, liberar=True)
+
+        self._notificar_solicitante(
+            solicitud, TipoNotificacion.SOLICITUD_RECHAZADA,
+            f'Solicitud {solicitud.numero} rechazada', f'Motivo: {motivo_rechazo}'
+        )
+
         return solicitud
 
     @transaction.atomic
@@ -382,8 +402,31 @@ class SolicitudService:
             observaciones=f'Despachada por {despachador.get_full_name()}. {notas_despacho}'
         )
 
+        self.reserva_service.sincronizar_solicitud(solicitud, despachador)
+
+        self._notificar_solicitante(
+            solicitud, TipoNotificacion.SOLICITUD_DESPACHADA,
+            f'Solicitud {solicitud.numero} despachada', notas_despacho
+        )
+
         return solicitud
 
+    def _notificar_solicitante(
+        self,
+        solicitud: Solicitud,
+        tipo: str,
+        titulo: str,
+        mensaje: str = ''
+    ) -> None:
+        """Publica en el outbox el cambio de la solicitud para su solicitante."""
+        self.notificacion_service.publicar(
+            tipo,
+            [solicitud.solicitante_id],
+            titulo,
+            mensaje or '',
+            url=self.notificacion_service.url('solicitudes:detalle_solicitud', solicitud.pk),
+        )
+
     @transaction.atomic
     def cancelar_solicitud(
         self,
@@ -431,6 +474,8 @@ class SolicitudService:
             observaciones=f'Cancelada por {usuario.get_full_name()}. Motivo: {motivo_cancelacion}'
         )
 
+        self.reserva_service.sincronizar_solicitud(solicitud, usuario, liberar=True)
+
         return solicitud
 
     @transaction.atomic
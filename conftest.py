@@ -0,0 +1,20 @@
+"""
+Configuración global de pytest.
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _enforce_query_budgets(settings):
+    """Hace fallar los tests cuando una vista excede su presupuesto de consultas."""
+    settings.QUERY_BUDGET_ENFORCE = True
+
+
+@pytest.fixture(autouse=True)
+def _limpiar_caches():
+    """Evita que resultados cacheados en un test se filtren al siguiente."""
+    from django.core.cache import caches
+
+    yield
+    for cache in caches.all():
+        cache.clear()
@@ -14,3 +14,27 @@ class BaseAdmin(admin.ModelAdmin):
             obj.created_by = request.user
         obj.updated_by = request.user
         super().save_model(request, obj, form, change)
+
+
+def instrumentacion_view(request):
+    """
+    Página de admin con las métricas SQL recientes por request.
+
+    Muestra el buffer circular de core.instrumentation (requiere
+    QUERY_INSTRUMENTATION_BUFFER_SIZE > 0), la tasa de aciertos de la
+    caché de services y el estado del pool de conexiones de este proceso.
+    """
+    from django.conf import settings
+    from django.shortcuts import render
+    from core.cache import estadisticas_cache
+    from core.instrumentation import estadisticas_pool, obtener_metricas_recientes
+
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Instrumentación SQL',
+        'metricas': obtener_metricas_recientes(),
+        'buffer_size': getattr(settings, 'QUERY_INSTRUMENTATION_BUFFER_SIZE', 0),
+        'estadisticas_cache': estadisticas_cache(),
+        'estadisticas_pool': estadisticas_pool(),
+    }
+    return render(request, 'admin/instrumentacion.html', context)
@@ -0,0 +1,281 @@
+"""
+Caché de resultados de services y repositories con invalidación por tags.
+
+``@cached_service(tags=[...], ttl=...)`` guarda el resultado de una función
+en la caché compartida (alias ``default``). Cada tag tiene una versión que
+forma parte de la clave; al cambiar la versión las entradas anteriores
+dejan de leerse y expiran solas. Los tags con forma ``app_label.Modelo``
+se invalidan automáticamente con ``post_save``/``post_delete`` del modelo;
+cualquier otro tag se invalida con ``invalidar_tags``.
+
+Las actualizaciones masivas (``QuerySet.update``, ``bulk_create``) no
+emiten señales: las funciones que dependen de datos escritos así deben
+usar un ``ttl`` corto o invalidar explícitamente.
+
+Los aciertos y fallos se cuentan por función (``estadisticas_cache``) y por
+request (``medir_aciertos``, usado por core.instrumentation).
+
+Configuración (settings):
+    CACHES['default']: Caché compartida entre procesos (Redis si se define
+        CACHE_REDIS_URL; si no, memoria local del proceso)
+    CACHES['local']: Memoria local del proceso para datos calientes
+    SERVICE_CACHE_ENABLED: Desactiva el decorador sin tocar el código
+    SERVICE_CACHE_LOCAL_MAX_TTL: Tope de ttl cuando la caché es memoria del
+        proceso: las invalidaciones no llegan a los demás workers, así que sus
+        entradas solo pueden quedar desactualizadas hasta ese tope
+
+Example:
+    >>> @cached_service(tags=['bodega.Categoria'], ttl=600)
+    ... def opciones_categorias(): ...
+"""
+import functools
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+PREFIJO_CLAVE = 'svc:'
+PREFIJO_TAG = 'svc:tag:'
+
+# Valor guardado en lugar de None para distinguirlo de un fallo de caché
+_NINGUNO = '__svc_none__'
+
+_lock = threading.Lock()
+_estadisticas: Dict[str, 'EstadisticaCache'] = {}
+_tags_conectados = set()
+_aciertos_request: ContextVar[Optional['EstadisticaCache']] = ContextVar('aciertos_request', default=None)
+
+
+@dataclass
+class EstadisticaCache:
+    """Aciertos y fallos acumulados."""
+    aciertos: int = 0
+    fallos: int = 0
+
+    @property
+    def total(self) -> int:
+        """Lecturas totales."""
+        return self.aciertos + self.fallos
+
+    @property
+    def tasa_aciertos(self) -> float:
+        """Proporción de lecturas servidas desde la caché (0 a 1)."""
+        return self.aciertos / self.total if self.total else 0.0
+
+
+def _registrar(nombre: str, acierto: bool) -> None:
+    """Suma un acierto o fallo a la función y al request en curso."""
+    with _lock:
+        estadistica = _estadisticas.setdefault(nombre, EstadisticaCache())
+        if acierto:
+            estadistica.aciertos += 1
+        else:
+            estadistica.fallos += 1
+    del_request = _aciertos_request.get()
+    if del_request is not None:
+        if acierto:
+            del_request.aciertos += 1
+        else:
+            del_request.fallos += 1
+
+
+def estadisticas_cache() -> Dict[str, EstadisticaCache]:
+    """
+    Aciertos y fallos por función desde el inicio del proceso.
+
+    Returns:
+        Dict {nombre calificado de la función: EstadisticaCache}
+    """
+    with _lock:
+        return {
+            nombre: EstadisticaCache(e.aciertos, e.fallos)
+            for nombre, e in sorted(_estadisticas.items())
+        }
+
+
+def limpiar_estadisticas() -> None:
+    """Reinicia los contadores de aciertos."""
+    with _lock:
+        _estadisticas.clear()
+
+
+@contextmanager
+def medir_aciertos() -> Iterator[EstadisticaCache]:
+    """
+    Cuenta los aciertos y fallos ocurridos dentro del bloque.
+
+    Example:
+        >>> with medir_aciertos() as medicion:
+        ...     response = get_response(request)
+        >>> medicion.aciertos
+    """
+    medicion = EstadisticaCache()
+    token = _aciertos_request.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _aciertos_request.reset(token)
+
+
+# ==================== TAGS ====================
+
+def _cache(alias: str = 'default'):
+    return caches[alias]
+
+
+def es_cache_local(alias: str = 'default') -> bool:
+    """Indica si la caché del alias vive en la memoria de cada proceso."""
+    return isinstance(caches[alias], LocMemCache)
+
+
+def _ttl_efectivo(ttl: int, alias: str) -> int:
+    """Limita el ttl en cachés por proceso, donde la invalidación no es global."""
+    if es_cache_local(alias):
+        return min(ttl, getattr(settings, 'SERVICE_CACHE_LOCAL_MAX_TTL', 30))
+    return ttl
+
+
+def _versiones(tags: Iterable[str]) -> Dict[str, int]:
+    """Versión actual de cada tag (se inicializa la que falte)."""
+    tags = list(tags)
+    if not tags:
+        return {}
+    cache = _cache()
+    claves = {PREFIJO_TAG + tag: tag for tag in tags}
+    encontradas = cache.get_many(claves)
+    versiones = {claves[clave]: version for clave, version in encontradas.items()}
+    for clave, tag in claves.items():
+        if tag not in versiones:
+            # add() respeta la versión que otro proceso haya creado entretanto
+            cache.add(clave, time.time_ns(), None)
+            versiones[tag] = cache.get(clave)
+    return versiones
+
+
+def invalidar_tags(*tags: str) -> None:
+    """
+    Invalida todas las entradas que dependen de los tags indicados.
+
+    Args:
+        *tags: Tags a invalidar
+    """
+    if tags:
+        _cache().set_many({PREFIJO_TAG + tag: time.time_ns() for tag in tags}, None)
+
+
+def _invalidar_por_senal(sender, **kwargs) -> None:
+    """Invalida el tag del modelo ahora y de nuevo al confirmar la transacción."""
+    tag = sender._meta.label
+    invalidar_tags(tag)
+    # Segunda invalidación: descarta lo que otro request haya cacheado con
+    # los datos previos al commit
+    transaction.on_commit(lambda: invalidar_tags(tag))
+
+
+def _conectar_tag(tag: str) -> None:
+    """Conecta las señales de guardado y borrado si el tag es un modelo."""
+    if '.' not in tag:
+        return
+    with _lock:
+        if tag in _tags_conectados:
+            return
+        _tags_conectados.add(tag)
+    # Con sender en texto Django conecta cuando el modelo esté registrado
+    post_save.connect(_invalidar_por_senal, sender=tag, weak=False, dispatch_uid=f'core.cache:save:{tag}')
+    post_delete.connect(_invalidar_por_senal, sender=tag, weak=False, dispatch_uid=f'core.cache:delete:{tag}')
+
+
+# ==================== CLAVES ====================
+
+def _normalizar(valor: Any) -> Any:
+    """
+    Representación estable de un argumento para la clave.
+
+    Las instancias de modelo se identifican por (modelo, pk). Los objetos
+    sin representación estable (p. ej. la instancia del service en un
+    método) se identifican solo por su tipo.
+    """
+    if valor is None or isinstance(valor, (str, int, float, bool)):
+        return valor
+    if isinstance(valor, models.Model):
+        return [valor._meta.label, valor.pk]
+    if isinstance(valor, (date, datetime, Decimal)):
+        return str(valor)
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        elementos = [_normalizar(v) for v in valor]
+        return sorted(elementos, key=repr) if isinstance(valor, (set, frozenset)) else elementos
+    if isinstance(valor, dict):
+        return {str(k): _normalizar(v) for k, v in sorted(valor.items(), key=lambda i: str(i[0]))}
+    if isinstance(valor, models.QuerySet):
+        raise TypeError('cached_service no acepta QuerySets como argumento')
+    return f'<{type(valor).__qualname__}>'
+
+
+def _clave(nombre: str, versiones: Dict[str, int], args: tuple, kwargs: dict) -> str:
+    """Clave de caché para una llamada concreta."""
+    firma = json.dumps(
+        [_normalizar(args), _normalizar(kwargs), sorted(versiones.items())],
+        separators=(',', ':')
+    )
+    return f'{PREFIJO_CLAVE}{nombre}:{hashlib.md5(firma.encode(), usedforsecurity=False).hexdigest()}'
+
+
+# ==================== DECORADOR ====================
+
+def cached_service(tags: Iterable[str] = (), ttl: int = 300, alias: str = 'default') -> Callable:
+    """
+    Cachea el resultado de una función de service o repository.
+
+    El resultado debe ser serializable con pickle (listas, dicts, valores);
+    no se deben cachear QuerySets perezosos.
+
+    Args:
+        tags: Tags de los que depende el resultado. ``app_label.Modelo`` se
+            invalida solo al guardar o borrar instancias de ese modelo.
+        ttl: Segundos de vida de cada entrada (con tope en cachés por proceso)
+        alias: Alias de CACHES donde guardar los resultados
+
+    Returns:
+        Decorador. La función decorada expone ``invalidar()`` (invalida sus
+        tags) y ``sin_cache`` (la función original).
+    """
+    tags = tuple(tags)
+    for tag in tags:
+        _conectar_tag(tag)
+
+    def decorator(func: Callable) -> Callable:
+        nombre = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not getattr(settings, 'SERVICE_CACHE_ENABLED', True):
+                return func(*args, **kwargs)
+
+            cache = _cache(alias)
+            clave = _clave(nombre, _versiones(tags), args, kwargs)
+            valor = cache.get(clave)
+            if valor is not None:
+                _registrar(nombre, True)
+                return None if isinstance(valor, str) and valor == _NINGUNO else valor
+
+            _registrar(nombre, False)
+            valor = func(*args, **kwargs)
+            cache.set(clave, _NINGUNO if valor is None else valor, _ttl_efectivo(ttl, alias))
+            return valor
+
+        wrapper.invalidar = lambda: invalidar_tags(*tags)
+        wrapper.sin_cache = func
+        return wrapper
+    return decorator
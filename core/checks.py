@@ -0,0 +1,51 @@
+"""
+System checks de la configuración compartida entre workers.
+
+La réplica de lectura (core/db_router.py) y la caché de services
+(core/cache.py) guardan estado en CACHES['default']: las marcas de
+escritura reciente y las versiones de los tags. Si esa caché es memoria del
+proceso, un worker no ve lo que marcó o invalidó otro.
+
+Se registran al cargar la app pages (apps/pages/apps.py).
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from core.cache import es_cache_local
+
+
+@register(Tags.caches)
+def verificar_cache_replica(app_configs, **kwargs):
+    """
+    Con la réplica activa la caché por defecto debe ser compartida.
+
+    En DEBUG (un solo proceso con runserver) basta con una advertencia.
+    """
+    if not getattr(settings, 'DB_REPLICA_ENABLED', False) or not es_cache_local():
+        return []
+    nivel = Warning if settings.DEBUG else Error
+    return [nivel(
+        'DB_REPLICA_ENABLED requiere una caché compartida entre workers.',
+        hint=(
+            'Defina CACHE_REDIS_URL: con memoria local, la marca de escritura reciente '
+            '(marcar_escritura) no llega a los demás workers y el usuario puede leer '
+            'de la réplica datos anteriores a su propia escritura.'
+        ),
+        id='core.E001' if nivel is Error else 'core.W001',
+    )]
+
+
+@register(Tags.caches, deploy=True)
+def verificar_cache_services(app_configs, **kwargs):
+    """En producción la caché de services sin Redis invalida solo en el proceso que escribe."""
+    if not getattr(settings, 'SERVICE_CACHE_ENABLED', True) or not es_cache_local():
+        return []
+    return [Warning(
+        'La caché de services usa memoria local del proceso.',
+        hint=(
+            'Defina CACHE_REDIS_URL para compartir las invalidaciones entre workers; mientras '
+            'tanto cada entrada dura como máximo SERVICE_CACHE_LOCAL_MAX_TTL '
+            f'({getattr(settings, "SERVICE_CACHE_LOCAL_MAX_TTL", 30)} s).'
+        ),
+        id='core.W002',
+    )]
@@ -0,0 +1,219 @@
+"""
+Enrutamiento de lecturas de reportería a la réplica de solo lectura.
+
+Las lecturas solo van a la réplica dentro de ``use_replica`` (decorador o
+context manager), que marcan las cargas de solo lectura: reportes,
+exportaciones, auditoría y dashboard. El resto del sistema, y toda
+escritura, sigue en la base principal.
+
+Para tolerar el retraso de replicación las lecturas vuelven a la principal:
+    - dentro de una transacción abierta en la base principal;
+    - en requests que escriben (POST, PUT, PATCH, DELETE);
+    - durante DB_REPLICA_LAG_SECONDS después de que el mismo usuario
+      escribió (ReplicaMiddleware guarda la marca en la caché ``default``;
+      con caché en memoria local la marca solo la ve el proceso que la
+      escribió, por eso en producción conviene CACHE_REDIS_URL).
+
+Configuración (settings):
+    DB_REPLICA_ENABLED: Activa el enrutamiento
+    DB_REPLICA_ALIAS: Alias de DATABASES de la réplica
+    DB_REPLICA_LAG_SECONDS: Segundos de lectura en la principal tras escribir
+
+Example:
+    >>> @use_replica
+    ... def obtener_metricas(): ...
+    >>> with use_replica():
+    ...     filas = list(Movimiento.objects.vivos().values(...))
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+CACHE_ESCRITURA = 'db:escritura:{}'
+
+_METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_leer_replica: ContextVar[bool] = ContextVar('leer_replica', default=False)
+_fijado_primaria: ContextVar[bool] = ContextVar('fijado_primaria', default=False)
+
+
+def replica_habilitada() -> bool:
+    """Indica si el enrutamiento a la réplica está activo."""
+    return getattr(settings, 'DB_REPLICA_ENABLED', False) and alias_replica() in connections
+
+
+def alias_replica() -> str:
+    """Alias de DATABASES de la réplica."""
+    return getattr(settings, 'DB_REPLICA_ALIAS', 'replica')
+
+
+@contextmanager
+def _usar_replica() -> Iterator[None]:
+    """
+    Context manager y decorador de use_replica (reentrante).
+
+    El token queda en una variable local: como decorador, cada llamada crea
+    su propio context manager y los hilos que llaman a la misma función
+    decorada no comparten estado.
+    """
+    token = _leer_replica.set(True)
+    try:
+        yield
+    finally:
+        _leer_replica.reset(token)
+
+
+def use_replica(func: Optional[Callable] = None):
+    """
+    Envía a la réplica las lecturas ejecutadas dentro del bloque o función.
+
+    Se usa como ``transaction.atomic``: ``@use_replica``, ``@use_replica()``
+    o ``with use_replica():``. Sin DB_REPLICA_ENABLED no tiene efecto.
+
+    Args:
+        func: Función a decorar (uso sin paréntesis)
+
+    Returns:
+        Función decorada o context manager
+    """
+    if callable(func):
+        return _usar_replica()(func)
+    return _usar_replica()
+
+
+@contextmanager
+def fijar_primaria() -> Iterator[None]:
+    """Fuerza las lecturas del bloque a la base principal, aun dentro de use_replica."""
+    token = _fijado_primaria.set(True)
+    try:
+        yield
+    finally:
+        _fijado_primaria.reset(token)
+
+
+def lee_de_replica() -> bool:
+    """Indica si las lecturas del contexto actual deben ir a la réplica."""
+    if not _leer_replica.get() or _fijado_primaria.get() or not replica_habilitada():
+        return False
+    # Dentro de una transacción la réplica no ve lo que esta ya escribió
+    return not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+def marcar_escritura(usuario_id: int) -> None:
+    """Fija las lecturas del usuario a la principal durante el retraso tolerado."""
+    segundos = getattr(settings, 'DB_REPLICA_LAG_SECONDS', 5)
+    if segundos > 0:
+        cache.set(CACHE_ESCRITURA.format(usuario_id), True, segundos)
+
+
+def escribio_recientemente(usuario_id: int) -> bool:
+    """Indica si el usuario escribió dentro del retraso tolerado."""
+    return bool(cache.get(CACHE_ESCRITURA.format(usuario_id)))
+
+
+async def amarcar_escritura(usuario_id: int) -> None:
+    """Variante asíncrona de marcar_escritura."""
+    segundos = getattr(settings, 'DB_REPLICA_LAG_SECONDS', 5)
+    if segundos > 0:
+        await cache.aset(CACHE_ESCRITURA.format(usuario_id), True, segundos)
+
+
+async def aescribio_recientemente(usuario_id: int) -> bool:
+    """Variante asíncrona de escribio_recientemente."""
+    return bool(await cache.aget(CACHE_ESCRITURA.format(usuario_id)))
+
+
+class ReplicaRouter:
+    """
+    Router de DATABASES: lecturas marcadas con use_replica a la réplica,
+    escrituras siempre a la base principal.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        """Réplica dentro de use_replica; si no, decide Django."""
+        return alias_replica() if lee_de_replica() else None
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        """Las instancias leídas de la réplica se guardan en la principal."""
+        instancia = hints.get('instance')
+        if instancia is not None and instancia._state.db == alias_replica():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        """Principal y réplica tienen los mismos datos: se permiten relaciones cruzadas."""
+        mismas = {DEFAULT_DB_ALIAS, alias_replica()}
+        if obj1._state.db in mismas and obj2._state.db in mismas:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        """La réplica recibe el esquema por replicación, nunca por migrate."""
+        if db == alias_replica():
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Middleware que fija a la base principal las lecturas de requests que
+    escriben y de usuarios que escribieron hace menos de
+    DB_REPLICA_LAG_SECONDS. Va después de AuthenticationMiddleware.
+
+    Bajo ASGI atiende en modo asíncrono: el usuario se obtiene con
+    ``request.auser()`` y la marca de escritura se lee y guarda con la API
+    asíncrona de la caché.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_habilitada():
+            return self.get_response(request)
+
+        usuario = getattr(request, 'user', None)
+        usuario_id = usuario.pk if usuario is not None and usuario.is_authenticated else None
+        escribe = request.method not in _METODOS_SEGUROS
+
+        if escribe or (usuario_id and escribio_recientemente(usuario_id)):
+            with fijar_primaria():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if escribe and usuario_id:
+            marcar_escritura(usuario_id)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Variante asíncrona de __call__."""
+        if not replica_habilitada():
+            return await self.get_response(request)
+
+        usuario = await request.auser() if hasattr(request, 'auser') else None
+        usuario_id = usuario.pk if usuario is not None and usuario.is_authenticated else None
+        escribe = request.method not in _METODOS_SEGUROS
+
+        if escribe or (usuario_id and await aescribio_recientemente(usuario_id)):
+            with fijar_primaria():
+                response = await self.get_response(request)
+        else:
+            response = await self.get_response(request)
+
+        if escribe and usuario_id:
+            await amarcar_escritura(usuario_id)
+        return response
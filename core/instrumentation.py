@@ -0,0 +1,419 @@
+"""
+Instrumentación de consultas SQL y latencia por request.
+
+Registra por cada request la cantidad de consultas, el tiempo total en base
+de datos, las consultas duplicadas (huellas repetidas, típico de N+1) y el
+tiempo total de respuesta, junto con los aciertos y fallos de la caché de
+services (core.cache). Los resultados se exponen en la cabecera
+``Server-Timing``, en ``response.query_metrics`` y, opcionalmente, en un
+buffer circular en memoria visible desde el admin, junto con las
+estadísticas del pool de conexiones del proceso (``estadisticas_pool``).
+
+Las vistas pueden declarar un presupuesto de consultas con
+``@query_budget(n)`` (vistas función) o el atributo ``query_budget`` (CBV).
+Con ``QUERY_BUDGET_ENFORCE = True`` (activado en la suite de tests) exceder
+el presupuesto lanza ``QueryBudgetExceeded``.
+
+Configuración (settings):
+    QUERY_INSTRUMENTATION_ENABLED: Activa la medición y Server-Timing
+    QUERY_INSTRUMENTATION_BUFFER_SIZE: Tamaño del buffer (0 = desactivado)
+    QUERY_BUDGET_ENFORCE: Lanza excepción al exceder un presupuesto
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from core.cache import EstadisticaCache, medir_aciertos
+
+logger = logging.getLogger(__name__)
+
+# Colapsa listas de placeholders (IN (%s, %s, ...)) para que cambie la huella
+# solo por la forma de la consulta y no por la cantidad de parámetros
+_PLACEHOLDERS_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+
+_buffer_lock = threading.Lock()
+_buffer: deque = deque(maxlen=1)
+
+# Colector del request en curso, para sumar consultas de hilos auxiliares
+_colector_request: ContextVar[Optional['_QueryCollector']] = ContextVar('colector_request', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """La vista ejecutó más consultas que su presupuesto declarado."""
+
+
+@dataclass
+class QueryMetrics:
+    """
+    Métricas SQL y de latencia de un request.
+
+    Attributes:
+        metodo: Método HTTP
+        ruta: Ruta solicitada
+        vista: Nombre calificado de la vista resuelta
+        consultas: Cantidad de consultas ejecutadas
+        db_ms: Tiempo total en base de datos (ms)
+        total_ms: Tiempo total del request (ms)
+        duplicadas: Huella -> (repeticiones, SQL de ejemplo) con más de 1 ejecución
+        presupuesto: Presupuesto de consultas declarado por la vista
+        cache_aciertos: Lecturas servidas por @cached_service
+        cache_fallos: Lecturas de @cached_service que fueron a la base de datos
+        fecha: Momento de registro
+    """
+    metodo: str = ''
+    ruta: str = ''
+    vista: str = ''
+    consultas: int = 0
+    db_ms: float = 0.0
+    total_ms: float = 0.0
+    duplicadas: Dict[str, tuple] = field(default_factory=dict)
+    presupuesto: Optional[int] = None
+    cache_aciertos: int = 0
+    cache_fallos: int = 0
+    fecha: Any = None
+
+    @property
+    def consultas_duplicadas(self) -> int:
+        """Cantidad de ejecuciones redundantes (repeticiones - 1 por huella)."""
+        return sum(veces - 1 for veces, _ in self.duplicadas.values())
+
+    @property
+    def excede_presupuesto(self) -> bool:
+        """Indica si se superó el presupuesto declarado."""
+        return self.presupuesto is not None and self.consultas > self.presupuesto
+
+    def server_timing(self) -> str:
+        """Valor para la cabecera Server-Timing."""
+        return (
+            f'db;dur={self.db_ms:.1f};desc="{self.consultas} consultas", '
+            f'dup;desc="{self.consultas_duplicadas} duplicadas", '
+            f'cache;desc="{self.cache_aciertos} aciertos {self.cache_fallos} fallos", '
+            f'total;dur={self.total_ms:.1f}'
+        )
+
+
+@dataclass
+class EstadisticaPool:
+    """
+    Estado y contadores del pool de conexiones de un alias (por proceso).
+
+    Attributes:
+        alias: Alias de DATABASES
+        minimo: Conexiones mínimas configuradas
+        maximo: Conexiones máximas configuradas
+        tamano: Conexiones abiertas actualmente
+        disponibles: Conexiones libres en el pool
+        esperando: Requests esperando una conexión en este momento
+        checkouts: Conexiones entregadas desde que arrancó el proceso
+        esperas: Checkouts que tuvieron que esperar una conexión libre
+        espera_ms: Tiempo total esperado por esos checkouts
+        timeouts: Checkouts que agotaron DB_POOL_TIMEOUT
+        conexiones_creadas: Conexiones físicas abiertas por el pool
+        conexiones_descartadas: Conexiones que no pasaron la verificación o se perdieron
+    """
+    alias: str
+    minimo: int = 0
+    maximo: int = 0
+    tamano: int = 0
+    disponibles: int = 0
+    esperando: int = 0
+    checkouts: int = 0
+    esperas: int = 0
+    espera_ms: int = 0
+    timeouts: int = 0
+    conexiones_creadas: int = 0
+    conexiones_descartadas: int = 0
+
+    @property
+    def espera_promedio_ms(self) -> float:
+        """Espera promedio de los checkouts que esperaron."""
+        return self.espera_ms / self.esperas if self.esperas else 0.0
+
+
+def estadisticas_pool() -> List[EstadisticaPool]:
+    """
+    Estadísticas de los pools de conexiones abiertos en este proceso.
+
+    Solo incluye alias con ``OPTIONS['pool']`` (DB_POOL_ENABLED) cuyo
+    pool ya fue creado; no abre conexiones.
+
+    Returns:
+        Lista de EstadisticaPool (vacía sin pools)
+    """
+    resultado = []
+    for alias in connections:
+        if not connections.settings[alias].get('OPTIONS', {}).get('pool'):
+            continue
+        pools = getattr(connections[alias], '_connection_pools', {})
+        pool = pools.get(alias)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        resultado.append(EstadisticaPool(
+            alias=alias,
+            minimo=stats.get('pool_min', 0),
+            maximo=stats.get('pool_max', 0),
+            tamano=stats.get('pool_size', 0),
+            disponibles=stats.get('pool_available', 0),
+            esperando=stats.get('requests_waiting', 0),
+            checkouts=stats.get('requests_num', 0),
+            esperas=stats.get('requests_queued', 0),
+            espera_ms=stats.get('requests_wait_ms', 0),
+            timeouts=stats.get('requests_errors', 0),
+            conexiones_creadas=stats.get('connections_num', 0),
+            conexiones_descartadas=stats.get('returns_bad', 0) + stats.get('connections_lost', 0),
+        ))
+    return resultado
+
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Calcula la huella de una consulta SQL parametrizada.
+
+    Args:
+        sql: SQL con placeholders (sin parámetros interpolados)
+
+    Returns:
+        str: Hash corto que identifica la forma de la consulta
+    """
+    normalizado = _PLACEHOLDERS_RE.sub('(%s)', ' '.join(sql.split()))
+    return hashlib.md5(normalizado.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+class _QueryCollector:
+    """execute_wrapper que acumula tiempo y huellas de cada consulta."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.db_seconds = 0.0
+        self.huellas: Counter = Counter()
+        self.ejemplos: Dict[str, str] = {}
+        # Varios hilos pueden registrar consultas del mismo request
+        self._lock = threading.Lock()
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: Dict) -> Any:
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            huella = fingerprint_sql(sql)
+            with self._lock:
+                self.db_seconds += duracion
+                self.consultas += 1
+                self.huellas[huella] += 1
+                self.ejemplos.setdefault(huella, sql[:300])
+
+    def duplicadas(self) -> Dict[str, tuple]:
+        return {
+            huella: (veces, self.ejemplos[huella])
+            for huella, veces in self.huellas.most_common()
+            if veces > 1
+        }
+
+
+@contextmanager
+def instrumentar_hilo() -> Iterator[None]:
+    """
+    Suma a las métricas del request las consultas ejecutadas en otro hilo.
+
+    Las conexiones son por hilo, así que las tareas que un request lanza en
+    hilos auxiliares (core.utils.asincrono) deben entrar a este bloque para
+    contar en su presupuesto. Sin request instrumentado no hace nada.
+    """
+    colector = _colector_request.get()
+    if colector is None:
+        yield
+        return
+    with _instalar_colector(colector):
+        yield
+
+
+def _instalar_colector(colector: '_QueryCollector') -> ExitStack:
+    """
+    Instala el colector en las conexiones del hilo actual.
+
+    Returns:
+        ExitStack que lo retira al cerrarse (debe cerrarse en el mismo hilo)
+    """
+    stack = ExitStack()
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(colector))
+    return stack
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declara el presupuesto de consultas SQL de una vista función.
+
+    Para vistas basadas en clases usar el atributo ``query_budget``.
+
+    Args:
+        max_queries: Cantidad máxima de consultas permitidas por request
+
+    Returns:
+        Decorador que anota la vista con su presupuesto
+
+    Example:
+        >>> @query_budget(5)
+        ... def mi_vista(request): ...
+    """
+    def decorator(view_func: Callable) -> Callable:
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def obtener_metricas_recientes() -> List[QueryMetrics]:
+    """
+    Retorna las métricas del buffer circular, más recientes primero.
+
+    Returns:
+        Lista de QueryMetrics (vacía si el buffer está desactivado)
+    """
+    with _buffer_lock:
+        return list(reversed(_buffer))
+
+
+def limpiar_metricas() -> None:
+    """Vacía el buffer circular de métricas."""
+    with _buffer_lock:
+        _buffer.clear()
+
+
+def _registrar_en_buffer(metricas: QueryMetrics, tamano: int) -> None:
+    global _buffer
+    with _buffer_lock:
+        if _buffer.maxlen != tamano:
+            _buffer = deque(_buffer, maxlen=tamano)
+        _buffer.append(metricas)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Middleware que mide consultas SQL y latencia de cada request.
+
+    Se ubica junto a CurrentUserMiddleware para incluir las consultas de
+    sesión y usuario. No hace nada si la instrumentación y la verificación
+    de presupuestos están desactivadas.
+
+    Bajo ASGI atiende en modo asíncrono (ver __acall__).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _habilitado() -> bool:
+        return bool(
+            getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', False)
+            or getattr(settings, 'QUERY_BUDGET_ENFORCE', False)
+        )
+
+    @staticmethod
+    @contextmanager
+    def _medir(collector: '_QueryCollector') -> Iterator[EstadisticaCache]:
+        """Publica el colector del request y cuenta sus aciertos de caché."""
+        token = _colector_request.set(collector)
+        try:
+            with medir_aciertos() as cache:
+                yield cache
+        finally:
+            _colector_request.reset(token)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._habilitado():
+            return self.get_response(request)
+
+        collector = _QueryCollector()
+        inicio = time.perf_counter()
+        with self._medir(collector) as cache, _instalar_colector(collector):
+            response = self.get_response(request)
+        return self._registrar(request, response, collector, cache, inicio)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Variante asíncrona de __call__.
+
+        Las conexiones son por hilo: el colector se instala y se retira en
+        el hilo sync del request, donde corren las consultas de la vista.
+        """
+        if not self._habilitado():
+            return await self.get_response(request)
+
+        collector = _QueryCollector()
+        inicio = time.perf_counter()
+        with self._medir(collector) as cache:
+            conexiones = await sync_to_async(_instalar_colector)(collector)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(conexiones.close)()
+        return self._registrar(request, response, collector, cache, inicio)
+
+    def _registrar(self, request, response, collector, cache, inicio: float) -> HttpResponse:
+        """Arma las métricas del request, las publica y verifica el presupuesto."""
+        habilitado = getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', False)
+        enforce = getattr(settings, 'QUERY_BUDGET_ENFORCE', False)
+        match = getattr(request, 'resolver_match', None)
+        metricas = QueryMetrics(
+            metodo=request.method,
+            ruta=request.path,
+            vista=match._func_path if match else '',
+            consultas=collector.consultas,
+            db_ms=collector.db_seconds * 1000,
+            total_ms=(time.perf_counter() - inicio) * 1000,
+            duplicadas=collector.duplicadas(),
+            presupuesto=getattr(request, '_query_budget', None),
+            cache_aciertos=cache.aciertos,
+            cache_fallos=cache.fallos,
+            fecha=timezone.now(),
+        )
+        response.query_metrics = metricas
+
+        if habilitado:
+            response['Server-Timing'] = metricas.server_timing()
+            tamano = getattr(settings, 'QUERY_INSTRUMENTATION_BUFFER_SIZE', 0)
+            if tamano:
+                _registrar_en_buffer(metricas, tamano)
+
+        if metricas.excede_presupuesto:
+            mensaje = (
+                f'{metricas.vista} ejecutó {metricas.consultas} consultas '
+                f'(presupuesto {metricas.presupuesto}, '
+                f'{metricas.consultas_duplicadas} duplicadas)'
+            )
+            if enforce:
+                raise QueryBudgetExceeded(mensaje)
+            logger.warning(mensaje)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Toma el presupuesto declarado por la vista resuelta."""
+        view_class = getattr(view_func, 'view_class', None)
+        budget = getattr(view_class, 'query_budget', None) if view_class else None
+        if budget is None:
+            budget = getattr(view_func, 'query_budget', None)
+        request._query_budget = budget
+        return None
@@ -12,6 +12,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMix
 from django.db import transaction
 from django.db.models import QuerySet
 from django.http import HttpRequest, HttpResponse
+from core.db_router import use_replica
 from core.utils import registrar_log_auditoria
 
 
@@ -117,6 +118,32 @@ class AtomicTransactionMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
+class ReplicaReadMixin:
+    """
+    Mixin para vistas de solo lectura que pueden leer de la réplica.
+
+    Renderiza la respuesta dentro de use_replica para que los QuerySets
+    perezosos evaluados en el template también lean de la réplica.
+    """
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """
+        Ejecuta el dispatch y el renderizado dentro de use_replica.
+
+        Args:
+            request: HttpRequest de Django
+            *args: Argumentos posicionales
+            **kwargs: Argumentos nombrados
+
+        Returns:
+            HttpResponse: Respuesta HTTP ya renderizada
+        """
+        with use_replica():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        return response
+
+
 class SoftDeleteMixin:
     """
     Mixin para implementar soft delete en lugar de eliminación física.
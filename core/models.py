@@ -4,6 +4,39 @@ from django.conf import settings
 # Create your models here.
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    QuerySet con filtros de borrado lógico para modelos que heredan de BaseModel.
+
+    Centraliza el predicado ``eliminado=False`` (y ``activo=True``) para que
+    coincida con los índices parciales ``WHERE eliminado = false`` de las
+    tablas de alto volumen.
+    """
+
+    def vivos(self) -> 'SoftDeleteQuerySet':
+        """Registros no eliminados."""
+        return self.filter(eliminado=False)
+
+    def activos(self) -> 'SoftDeleteQuerySet':
+        """
+        Registros no eliminados y activos.
+
+        Algunos modelos redefinen ``activo`` como ForeignKey a Activo; en ese
+        caso solo se aplica el filtro de no eliminados.
+        """
+        queryset = self.vivos()
+        if isinstance(self.model._meta.get_field('activo'), models.BooleanField):
+            queryset = queryset.filter(activo=True)
+        return queryset
+
+    def eliminados(self) -> 'SoftDeleteQuerySet':
+        """Registros marcados como eliminados."""
+        return self.filter(eliminado=True)
+
+
+SoftDeleteManager = models.Manager.from_queryset(SoftDeleteQuerySet)
+
+
 class BaseModel(models.Model):
     """
     Modelo base para auditoría - todos los modelos heredan de esta clase
@@ -13,6 +46,7 @@ class BaseModel(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación", help_text="Fecha y hora de creación del registro")
     fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización", help_text="Fecha y hora de última actualización")
 
+    objects = SoftDeleteManager()
+
     class Meta:
         abstract = True
-
@@ -0,0 +1,403 @@
+"""
+Particionamiento anual de tablas de historial (PostgreSQL).
+
+Las tablas de movimientos crecen sin límite. Este módulo convierte una tabla
+plana en una tabla particionada por rango de ``fecha_creacion`` (una
+partición por año más una partición DEFAULT) y administra su ciclo de vida:
+crear las particiones de los años siguientes, desacoplar años cerrados y
+archivarlos en CSV comprimido (gzip), o restaurarlos desde el archivo.
+
+Consideraciones:
+    - La clave primaria física pasa a ser (id, fecha_creacion), requisito de
+      PostgreSQL. Django sigue tratando ``id`` como PK; los ids los asigna la
+      misma secuencia, por lo que siguen siendo únicos.
+    - Ninguna tabla puede tener FK hacia una tabla particionada sin incluir la
+      fecha; hoy ninguna referencia a Movimiento ni a MovimientoActivo.
+    - CREATE INDEX CONCURRENTLY no está soportado sobre tablas particionadas:
+      migraciones futuras sobre estas tablas deben usar AddIndex normal.
+    - Las consultas solo se benefician del pruning si filtran por
+      ``fecha_creacion`` con un rango directo (no ``fecha_creacion__date``).
+
+Uso típico (ver comando gestionar_historial):
+    convertir_a_particionada(Movimiento)
+    asegurar_particiones(Movimiento, anios_adelante=1)
+    archivar_anio(Movimiento, 2023, Path('archivo_historial'))
+"""
+import gzip
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+from django.db import connection, models, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+
+from apps.activos.models import MovimientoActivo
+from apps.bodega.models import Movimiento
+
+COLUMNA_PARTICION = 'fecha_creacion'
+
+# Tablas de historial administradas: alias -> modelo
+TABLAS_HISTORIAL: Dict[str, Type[models.Model]] = {
+    'movimientos': Movimiento,
+    'movimientos_activos': MovimientoActivo,
+}
+
+
+class ParticionError(Exception):
+    """Operación de particionamiento no válida para el estado de la tabla."""
+
+
+@dataclass
+class Particion:
+    """
+    Partición de una tabla de historial.
+
+    Attributes:
+        nombre: Nombre físico de la partición
+        anio: Año que cubre (None para la partición DEFAULT)
+        filas: Filas estimadas según las estadísticas de PostgreSQL
+        bytes: Tamaño total en disco (tabla + índices)
+    """
+    nombre: str
+    anio: Optional[int]
+    filas: int
+    bytes: int
+
+
+def _q(nombre: str) -> str:
+    return connection.ops.quote_name(nombre)
+
+
+def _tabla(modelo: Type[models.Model]) -> str:
+    return modelo._meta.db_table
+
+
+def nombre_particion(tabla: str, anio: Optional[int]) -> str:
+    """Nombre de la partición de un año (o DEFAULT si anio es None)."""
+    return f'{tabla}_default' if anio is None else f'{tabla}_y{anio}'
+
+
+def limites_anio(anio: int) -> tuple:
+    """
+    Límites [inicio, fin) de un año en la zona horaria del proyecto.
+
+    Returns:
+        Tupla (inicio, fin) como texto ISO con offset
+    """
+    tz = timezone.get_default_timezone()
+    return (
+        datetime(anio, 1, 1, tzinfo=tz).isoformat(),
+        datetime(anio + 1, 1, 1, tzinfo=tz).isoformat(),
+    )
+
+
+def _anio_local(fecha: datetime) -> int:
+    return timezone.localtime(fecha, timezone.get_default_timezone()).year
+
+
+def _verificar_postgres() -> None:
+    if connection.vendor != 'postgresql':
+        raise ParticionError('El particionamiento solo está soportado en PostgreSQL.')
+
+
+def esta_particionada(modelo: Type[models.Model]) -> bool:
+    """Indica si la tabla del modelo es una tabla particionada."""
+    _verificar_postgres()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind = 'p' FROM pg_class c "
+            "WHERE c.oid = to_regclass(%s)",
+            [_tabla(modelo)]
+        )
+        fila = cursor.fetchone()
+    return bool(fila and fila[0])
+
+
+def listar_particiones(modelo: Type[models.Model]) -> List[Particion]:
+    """
+    Lista las particiones adjuntas a la tabla del modelo.
+
+    Returns:
+        Particiones ordenadas por año (DEFAULT al final)
+    """
+    tabla = _tabla(modelo)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, GREATEST(c.reltuples, 0)::bigint, pg_total_relation_size(c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [tabla]
+        )
+        filas = cursor.fetchall()
+
+    particiones = []
+    for nombre, estimado, tamano in filas:
+        sufijo = nombre[len(tabla) + 2:] if nombre.startswith(f'{tabla}_y') else ''
+        anio = int(sufijo) if sufijo.isdigit() else None
+        particiones.append(Particion(nombre=nombre, anio=anio, filas=estimado, bytes=tamano))
+    return sorted(particiones, key=lambda p: (p.anio is None, p.anio or 0))
+
+
+def rango_anios(modelo: Type[models.Model], anios_adelante: int) -> range:
+    """Años desde el dato más antiguo hasta el año actual + anios_adelante."""
+    actual = _anio_local(timezone.now())
+    minimo = modelo._base_manager.aggregate(m=models.Min(COLUMNA_PARTICION))['m']
+    desde = _anio_local(minimo) if minimo else actual
+    return range(min(desde, actual), actual + anios_adelante + 1)
+
+
+def _copiar_a_archivo(cursor, sql: str, salida) -> None:
+    """Ejecuta un COPY ... TO STDOUT escribiendo en ``salida`` (psycopg 3 o psycopg2)."""
+    if is_psycopg3:
+        with cursor.copy(sql) as copia:
+            for bloque in copia:
+                salida.write(bloque)
+    else:
+        cursor.copy_expert(sql, salida)
+
+
+def _copiar_desde_archivo(cursor, sql: str, entrada, tamano_bloque: int = 1 << 16) -> None:
+    """Ejecuta un COPY ... FROM STDIN leyendo desde ``entrada`` (psycopg 3 o psycopg2)."""
+    if is_psycopg3:
+        with cursor.copy(sql) as copia:
+            while bloque := entrada.read(tamano_bloque):
+                copia.write(bloque)
+    else:
+        cursor.copy_expert(sql, entrada)
+
+
+def _crear_particion(cursor, tabla: str, anio: int) -> None:
+    inicio, fin = limites_anio(anio)
+    cursor.execute(
+        f'CREATE TABLE {_q(nombre_particion(tabla, anio))} PARTITION OF {_q(tabla)} '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        [inicio, fin]
+    )
+
+
+@transaction.atomic
+def convertir_a_particionada(modelo: Type[models.Model], anios_adelante: int = 1) -> List[Particion]:
+    """
+    Convierte la tabla plana del modelo en una tabla particionada por año.
+
+    Copia todas las filas a la nueva estructura y recrea índices (incluidos
+    los parciales), claves foráneas y la secuencia de ids. Bloquea la tabla
+    durante la copia: ejecutar en una ventana de mantenimiento.
+
+    Args:
+        modelo: Modelo de historial (Movimiento o MovimientoActivo)
+        anios_adelante: Particiones a crear por adelantado tras el año actual
+
+    Returns:
+        Particiones creadas
+
+    Raises:
+        ParticionError: Si la tabla ya está particionada o tiene índices únicos
+    """
+    if esta_particionada(modelo):
+        raise ParticionError(f'{_tabla(modelo)} ya está particionada.')
+
+    tabla = _tabla(modelo)
+    plana = f'{tabla}_plana'
+    secuencia = f'{tabla}_id_seq'
+    anios = rango_anios(modelo, anios_adelante)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {_q(tabla)} IN ACCESS EXCLUSIVE MODE')
+
+        # Definiciones a recrear (se leen antes de renombrar la tabla)
+        cursor.execute(
+            "SELECT pg_get_indexdef(i.indexrelid), i.indisunique FROM pg_index i "
+            "WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+            [tabla]
+        )
+        indices = cursor.fetchall()
+        if any(unico for _, unico in indices):
+            raise ParticionError(
+                f'{tabla} tiene índices únicos que no incluyen {COLUMNA_PARTICION}.'
+            )
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [tabla]
+        )
+        foraneas = cursor.fetchall()
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {_q(tabla)}')
+        max_id = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {_q(tabla)} RENAME TO {_q(plana)}')
+        cursor.execute(
+            f'CREATE TABLE {_q(tabla)} (LIKE {_q(plana)} INCLUDING DEFAULTS '
+            f'INCLUDING CONSTRAINTS INCLUDING STORAGE) '
+            f'PARTITION BY RANGE ({_q(COLUMNA_PARTICION)})'
+        )
+        for anio in anios:
+            _crear_particion(cursor, tabla, anio)
+        cursor.execute(
+            f'CREATE TABLE {_q(nombre_particion(tabla, None))} PARTITION OF {_q(tabla)} DEFAULT'
+        )
+
+        cursor.execute(f'INSERT INTO {_q(tabla)} SELECT * FROM {_q(plana)}')
+        cursor.execute(f'DROP TABLE {_q(plana)}')
+
+        # Con la tabla plana eliminada quedan libres los nombres de índices y secuencia
+        cursor.execute(
+            f'ALTER TABLE {_q(tabla)} ADD PRIMARY KEY (id, {_q(COLUMNA_PARTICION)})'
+        )
+        for definicion, _ in indices:
+            cursor.execute(definicion)
+        for nombre, definicion in foraneas:
+            cursor.execute(f'ALTER TABLE {_q(tabla)} ADD CONSTRAINT {_q(nombre)} {definicion}')
+
+        cursor.execute(f'CREATE SEQUENCE {_q(secuencia)} AS bigint OWNED BY {_q(tabla)}.id')
+        cursor.execute('SELECT setval(%s, %s, %s)', [secuencia, max(max_id, 1), max_id > 0])
+        cursor.execute(
+            f"ALTER TABLE {_q(tabla)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)",
+            [secuencia]
+        )
+        cursor.execute(f'ANALYZE {_q(tabla)}')
+
+    return listar_particiones(modelo)
+
+
+@transaction.atomic
+def asegurar_particiones(modelo: Type[models.Model], anios_adelante: int = 1) -> List[str]:
+    """
+    Crea las particiones faltantes hasta el año actual + anios_adelante.
+
+    Si la partición DEFAULT ya recibió filas de un año nuevo, se mueven a la
+    partición creada (PostgreSQL no permite crearla con filas en DEFAULT).
+
+    Args:
+        modelo: Modelo de historial particionado
+        anios_adelante: Años a cubrir por adelantado
+
+    Returns:
+        Nombres de las particiones creadas
+    """
+    _exigir_particionada(modelo)
+    tabla = _tabla(modelo)
+    default = nombre_particion(tabla, None)
+    existentes = {p.anio for p in listar_particiones(modelo)}
+    actual = _anio_local(timezone.now())
+
+    creadas = []
+    with connection.cursor() as cursor:
+        for anio in range(actual, actual + anios_adelante + 1):
+            if anio in existentes:
+                continue
+            inicio, fin = limites_anio(anio)
+            filtro = f'{_q(COLUMNA_PARTICION)} >= %s AND {_q(COLUMNA_PARTICION)} < %s'
+            cursor.execute(f'ALTER TABLE {_q(tabla)} DETACH PARTITION {_q(default)}')
+            _crear_particion(cursor, tabla, anio)
+            cursor.execute(
+                f'INSERT INTO {_q(tabla)} SELECT * FROM {_q(default)} WHERE {filtro}',
+                [inicio, fin]
+            )
+            cursor.execute(f'DELETE FROM {_q(default)} WHERE {filtro}', [inicio, fin])
+            cursor.execute(f'ALTER TABLE {_q(tabla)} ATTACH PARTITION {_q(default)} DEFAULT')
+            creadas.append(nombre_particion(tabla, anio))
+    return creadas
+
+
+def _exigir_particionada(modelo: Type[models.Model]) -> None:
+    if not esta_particionada(modelo):
+        raise ParticionError(
+            f'{_tabla(modelo)} no está particionada; ejecutar primero la conversión.'
+        )
+
+
+def _exigir_anio_cerrado(anio: int) -> None:
+    if anio >= _anio_local(timezone.now()):
+        raise ParticionError(f'El año {anio} no está cerrado; solo se archivan años anteriores.')
+
+
+@transaction.atomic
+def desacoplar_anio(modelo: Type[models.Model], anio: int) -> str:
+    """
+    Desacopla la partición de un año cerrado.
+
+    La tabla queda como tabla independiente (consultable directamente) y
+    deja de participar en las consultas del modelo.
+
+    Returns:
+        Nombre de la tabla desacoplada
+    """
+    _exigir_particionada(modelo)
+    _exigir_anio_cerrado(anio)
+    tabla = _tabla(modelo)
+    particion = nombre_particion(tabla, anio)
+    if anio not in {p.anio for p in listar_particiones(modelo)}:
+        raise ParticionError(f'No existe la partición {particion}.')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {_q(tabla)} DETACH PARTITION {_q(particion)}')
+    return particion
+
+
+def ruta_archivo(destino: Path, tabla: str, anio: int) -> Path:
+    """Ruta del archivo comprimido de un año archivado."""
+    return Path(destino) / f'{tabla}_{anio}.csv.gz'
+
+
+@transaction.atomic
+def archivar_anio(modelo: Type[models.Model], anio: int, destino: Path) -> Path:
+    """
+    Archiva un año cerrado en CSV comprimido y elimina su partición.
+
+    Desacopla la partición, la exporta con COPY a ``<tabla>_<anio>.csv.gz``
+    y la elimina. Si la exportación falla, la transacción se revierte y la
+    partición vuelve a quedar adjunta.
+
+    Args:
+        modelo: Modelo de historial particionado
+        anio: Año cerrado a archivar
+        destino: Directorio donde se guarda el archivo
+
+    Returns:
+        Ruta del archivo generado
+    """
+    particion = desacoplar_anio(modelo, anio)
+    archivo = ruta_archivo(destino, _tabla(modelo), anio)
+    if archivo.exists():
+        raise ParticionError(f'Ya existe el archivo {archivo}; no se sobrescribe.')
+    archivo.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        with connection.cursor() as cursor, gzip.open(archivo, 'wb') as salida:
+            _copiar_a_archivo(
+                cursor, f'COPY {_q(particion)} TO STDOUT WITH (FORMAT csv, HEADER)', salida
+            )
+            cursor.execute(f'DROP TABLE {_q(particion)}')
+    except Exception:
+        archivo.unlink(missing_ok=True)
+        raise
+    return archivo
+
+
+@transaction.atomic
+def restaurar_anio(modelo: Type[models.Model], anio: int, destino: Path) -> int:
+    """
+    Restaura un año archivado: recrea su partición y carga el CSV.
+
+    Returns:
+        Cantidad de filas restauradas
+    """
+    _exigir_particionada(modelo)
+    tabla = _tabla(modelo)
+    archivo = ruta_archivo(destino, tabla, anio)
+    if not archivo.exists():
+        raise ParticionError(f'No existe el archivo {archivo}.')
+    if anio in {p.anio for p in listar_particiones(modelo)}:
+        raise ParticionError(f'La partición {nombre_particion(tabla, anio)} ya existe.')
+
+    with connection.cursor() as cursor, gzip.open(archivo, 'rb') as entrada:
+        _crear_particion(cursor, tabla, anio)
+        _copiar_desde_archivo(
+            cursor,
+            f'COPY {_q(nombre_particion(tabla, anio))} FROM STDIN WITH (FORMAT csv, HEADER)',
+            entrada
+        )
+        return cursor.rowcount
@@ -71,12 +71,34 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.instrumentation.QueryInstrumentationMiddleware',
+    'core.db_router.ReplicaMiddleware',
     'apps.accounts.middleware.CurrentUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Instrumentación SQL por request (ver core/instrumentation.py)
+QUERY_INSTRUMENTATION_ENABLED = env.bool('QUERY_INSTRUMENTATION_ENABLED', default=DEBUG)
+QUERY_INSTRUMENTATION_BUFFER_SIZE = env.int('QUERY_INSTRUMENTATION_BUFFER_SIZE', default=0)
+QUERY_BUDGET_ENFORCE = env.bool('QUERY_BUDGET_ENFORCE', default=False)
+
+# Sirve las variantes asíncronas de los endpoints JSON y del dashboard (despliegue ASGI/uvicorn)
+ASYNC_VIEWS_ENABLED = env.bool('ASYNC_VIEWS_ENABLED', default=False)
+
+# Procesos para dibujar etiquetas de código de barras (ver apps/reportes/exporters/etiquetas.py)
+ETIQUETAS_PROCESOS = env.int('ETIQUETAS_PROCESOS', default=1)
+
+# Procesos para preparar las páginas de reportes PDF grandes (ver apps/reportes/exporters/pdf.py)
+REPORTES_PDF_PROCESOS = env.int('REPORTES_PDF_PROCESOS', default=1)
+
+# Activos sobre los que una baja masiva se encola para procesar_bajas_masivas
+BAJAS_MASIVAS_UMBRAL = env.int('BAJAS_MASIVAS_UMBRAL', default=1000)
+
+# URL pública del sistema para los enlaces de los correos de notificaciones
+NOTIFICACIONES_URL_BASE = env('NOTIFICACIONES_URL_BASE', default='')
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -121,6 +143,70 @@ DATABASES = {
     },
 }
 
+# Conexiones a PostgreSQL. Con DB_POOL_ENABLED cada worker mantiene un pool
+# psycopg 3 (requiere psycopg[pool]); si no, las conexiones persisten
+# DB_CONN_MAX_AGE segundos. En ambos casos se verifican antes de reutilizarse.
+# DB_POOL_MAX_SIZE es por proceso: con gunicorn conviene igualarlo a --threads.
+DB_POOL_ENABLED = env.bool('DB_POOL_ENABLED', default=False)
+if DB_POOL_ENABLED:
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+        'max_size': env.int('DB_POOL_MAX_SIZE', default=env.int('WEB_CONCURRENCY_THREADS', default=4)),
+        'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+        'max_idle': env.float('DB_POOL_MAX_IDLE', default=300.0),
+        'max_lifetime': env.float('DB_POOL_MAX_LIFETIME', default=1800.0),
+        'check': ConnectionPool.check_connection,
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Réplica de solo lectura para reportes y dashboard (ver core/db_router.py).
+# Sin POSTGRES_REPLICA_HOST el alias apunta a la base principal, lo que permite
+# probar el enrutamiento en local con dos alias; en tests es espejo de 'default'.
+POSTGRES_REPLICA_HOST = env('POSTGRES_REPLICA_HOST', default='')
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'OPTIONS': {**DATABASES['default']['OPTIONS']},
+    'HOST': POSTGRES_REPLICA_HOST or DATABASES['default']['HOST'],
+    'PORT': env('POSTGRES_REPLICA_PORT', default=DATABASES['default']['PORT']),
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+DB_REPLICA_ENABLED = env.bool('DB_REPLICA_ENABLED', default=bool(POSTGRES_REPLICA_HOST))
+DB_REPLICA_ALIAS = 'replica'
+DB_REPLICA_LAG_SECONDS = env.int('DB_REPLICA_LAG_SECONDS', default=5)
+
+# Caché: 'default' es compartida entre procesos (Redis si se define CACHE_REDIS_URL,
+# requiere el extra "redis" de pyproject.toml) y 'local' es memoria del proceso (ver core/cache.py)
+CACHE_REDIS_URL = env('CACHE_REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+        'KEY_PREFIX': 'inventario',
+        'TIMEOUT': 300,
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'inventario-default',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'inventario-local',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+SERVICE_CACHE_ENABLED = env.bool('SERVICE_CACHE_ENABLED', default=True)
+# Sin Redis cada worker tiene su propia caché y no ve las invalidaciones de los
+# demás: el ttl de @cached_service se limita a este tope (ver core/checks.py)
+SERVICE_CACHE_LOCAL_MAX_TTL = env.int('SERVICE_CACHE_LOCAL_MAX_TTL', default=30)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
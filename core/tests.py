@@ -0,0 +1,457 @@
+"""
+Tests de la instrumentación SQL por request (core.instrumentation), de la
+caché de services (core.cache), del enrutamiento a la réplica
+(core.db_router), de las consultas en paralelo de las vistas asíncronas
+(core.utils.asincrono), de los filtros de borrado lógico y del
+particionamiento de historial.
+"""
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.activos.models import Activo, CategoriaActivo, EstadoActivo
+from apps.bodega.models import Articulo, Bodega, Categoria, Movimiento, Operacion, TipoMovimiento
+from apps.pages.services import DashboardService
+from apps.solicitudes.models import DetalleSolicitud
+from core import particiones
+from core.cache import cached_service, estadisticas_cache, invalidar_tags, limpiar_estadisticas
+from core.checks import verificar_cache_replica
+from core.db_router import ReplicaMiddleware, ReplicaRouter, fijar_primaria, use_replica
+from core.instrumentation import (
+    QueryBudgetExceeded,
+    QueryInstrumentationMiddleware,
+    fingerprint_sql,
+    limpiar_metricas,
+    obtener_metricas_recientes,
+    query_budget,
+)
+from core.utils.asincrono import consultas_en_paralelo
+
+
+def _vista_con_consultas(n):
+    """Crea una vista que ejecuta n veces la misma consulta con distinto parámetro."""
+    def vista(request):
+        for i in range(n):
+            list(User.objects.filter(id=i))
+        return HttpResponse('ok')
+    return vista
+
+
+class QueryInstrumentationMiddlewareTest(TestCase):
+    """Tests del middleware de instrumentación."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        limpiar_metricas()
+
+    def _ejecutar(self, vista, budget=None):
+        middleware = QueryInstrumentationMiddleware(vista)
+        request = self.factory.get('/prueba/')
+        if budget is not None:
+            vista = query_budget(budget)(vista)
+        middleware.process_view(request, vista, (), {})
+        return middleware(request)
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+    def test_registra_consultas_y_server_timing(self):
+        """Debe contar consultas y emitir la cabecera Server-Timing."""
+        response = self._ejecutar(_vista_con_consultas(3))
+
+        self.assertEqual(response.query_metrics.consultas, 3)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('3 consultas', response['Server-Timing'])
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+    async def test_middleware_asincrono(self):
+        """Con una vista asíncrona cuenta las consultas ejecutadas en el hilo sync."""
+        vista_sync = _vista_con_consultas(2)
+
+        async def vista(request):
+            return await sync_to_async(vista_sync)(request)
+
+        middleware = QueryInstrumentationMiddleware(vista)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = await middleware(self.factory.get('/prueba/'))
+
+        self.assertEqual(response.query_metrics.consultas, 2)
+        self.assertIn('2 consultas', response['Server-Timing'])
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+    def test_detecta_consultas_duplicadas(self):
+        """Consultas con la misma forma deben compartir huella (N+1)."""
+        metricas = self._ejecutar(_vista_con_consultas(4)).query_metrics
+
+        self.assertEqual(len(metricas.duplicadas), 1)
+        self.assertEqual(metricas.consultas_duplicadas, 3)
+
+    def test_huella_ignora_cantidad_de_parametros_in(self):
+        """IN con distinta cantidad de placeholders debe tener la misma huella."""
+        self.assertEqual(
+            fingerprint_sql('SELECT 1 FROM t WHERE id IN (%s, %s)'),
+            fingerprint_sql('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+        )
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=False, QUERY_BUDGET_ENFORCE=True)
+    def test_presupuesto_excedido_lanza_excepcion(self):
+        """Exceder el presupuesto con QUERY_BUDGET_ENFORCE debe fallar."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self._ejecutar(_vista_con_consultas(3), budget=2)
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_BUDGET_ENFORCE=False)
+    def test_presupuesto_excedido_sin_enforce_solo_registra(self):
+        """Sin QUERY_BUDGET_ENFORCE solo se registra una advertencia."""
+        with self.assertLogs('core.instrumentation', level='WARNING'):
+            response = self._ejecutar(_vista_con_consultas(3), budget=2)
+
+        self.assertTrue(response.query_metrics.excede_presupuesto)
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_INSTRUMENTATION_BUFFER_SIZE=2)
+    def test_buffer_circular_conserva_ultimos_requests(self):
+        """El buffer debe conservar solo los últimos N requests."""
+        for n in (1, 2, 3):
+            self._ejecutar(_vista_con_consultas(n))
+
+        metricas = obtener_metricas_recientes()
+        self.assertEqual([m.consultas for m in metricas], [3, 2])
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class QueryBudgetVistasTest(TestCase):
+    """Verifica los presupuestos declarados por vistas reales."""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin_qb', 'qb@test.cl', 'clave')
+        self.client.force_login(self.user)
+
+    def test_lista_activos_dentro_de_presupuesto(self):
+        """La cantidad de consultas no debe crecer con la cantidad de activos."""
+        categoria = CategoriaActivo.objects.create(codigo='CAT', nombre='Categoría')
+        estado = EstadoActivo.objects.create(codigo='EST', nombre='Estado')
+        Activo.objects.bulk_create([
+            Activo(codigo=f'ACT-{i}', nombre=f'Activo {i}', categoria=categoria, estado=estado)
+            for i in range(30)
+        ])
+
+        response = self.client.get(reverse('activos:lista_activos'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(response.query_metrics.consultas, response.query_metrics.presupuesto)
+
+
+@cached_service(tags=['bodega.Categoria'], ttl=60)
+def _nombres_categorias(prefijo=''):
+    """Función cacheada de prueba."""
+    return [c.nombre for c in Categoria.objects.filter(codigo__startswith=prefijo).order_by('codigo')]
+
+
+@cached_service(tags=['prueba'], ttl=60)
+def _sin_resultado():
+    """Función cacheada que retorna None."""
+    list(User.objects.filter(id=0))
+    return None
+
+
+class CachedServiceTest(TestCase):
+    """Tests de @cached_service y su invalidación por tags."""
+
+    def setUp(self):
+        cache.clear()
+        limpiar_estadisticas()
+        Categoria.objects.create(codigo='CC1', nombre='Uno')
+
+    def test_segunda_llamada_no_consulta(self):
+        """La segunda llamada con los mismos argumentos se sirve desde la caché."""
+        self.assertEqual(_nombres_categorias('CC'), ['Uno'])
+        with self.assertNumQueries(0):
+            self.assertEqual(_nombres_categorias('CC'), ['Uno'])
+        with self.assertNumQueries(1):
+            _nombres_categorias('X')
+
+        estadistica = estadisticas_cache()[f'{__name__}._nombres_categorias']
+        self.assertEqual((estadistica.aciertos, estadistica.fallos), (1, 2))
+
+    def test_post_save_invalida_el_tag_del_modelo(self):
+        """Guardar o borrar una instancia del modelo invalida las entradas del tag."""
+        _nombres_categorias('CC')
+        categoria = Categoria.objects.create(codigo='CC2', nombre='Dos')
+        self.assertEqual(_nombres_categorias('CC'), ['Uno', 'Dos'])
+
+        categoria.delete()
+        self.assertEqual(_nombres_categorias('CC'), ['Uno'])
+
+    def test_none_se_cachea_e_invalidar_tags(self):
+        """None también se cachea y invalidar_tags fuerza recalcular."""
+        with self.assertNumQueries(1):
+            self.assertIsNone(_sin_resultado())
+            self.assertIsNone(_sin_resultado())
+
+        invalidar_tags('prueba')
+        with self.assertNumQueries(1):
+            _sin_resultado()
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True)
+    def test_instrumentacion_cuenta_aciertos_del_request(self):
+        """El middleware expone aciertos y fallos de la caché del request."""
+        def vista(request):
+            _nombres_categorias('CC')
+            _nombres_categorias('CC')
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/prueba/')
+        response = QueryInstrumentationMiddleware(vista)(request)
+
+        self.assertEqual((response.query_metrics.cache_aciertos, response.query_metrics.cache_fallos), (1, 1))
+        self.assertIn('1 aciertos 1 fallos', response['Server-Timing'])
+
+    @override_settings(SERVICE_CACHE_LOCAL_MAX_TTL=7)
+    def test_cache_local_limita_el_ttl(self):
+        """Con memoria local cada entrada vive a lo más SERVICE_CACHE_LOCAL_MAX_TTL."""
+        with mock.patch.object(LocMemCache, 'set', autospec=True) as guardar:
+            _nombres_categorias('CC')
+
+        self.assertEqual(guardar.call_args.args[-1], 7)
+
+
+class CacheChecksTest(SimpleTestCase):
+    """Tests de los system checks sobre la caché compartida."""
+
+    @override_settings(DB_REPLICA_ENABLED=True, DEBUG=False)
+    def test_replica_sin_cache_compartida_es_error(self):
+        """La réplica con caché en memoria local no pasa el check."""
+        self.assertEqual([e.id for e in verificar_cache_replica(None)], ['core.E001'])
+
+    @override_settings(DB_REPLICA_ENABLED=False)
+    def test_sin_replica_no_hay_error(self):
+        """Sin réplica la caché local es aceptable."""
+        self.assertEqual(verificar_cache_replica(None), [])
+
+
+@override_settings(DB_REPLICA_ENABLED=True, DB_REPLICA_ALIAS='replica', DB_REPLICA_LAG_SECONDS=30)
+class ReplicaRouterTest(SimpleTestCase):
+    """Tests del router de réplica y de la fijación a la principal tras escribir."""
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+
+    def _vista_que_lee(self, destinos):
+        """Vista que registra a qué alias irían sus lecturas de reportería."""
+        @use_replica
+        def vista(request):
+            destinos.append(self.router.db_for_read(Articulo))
+            return HttpResponse('ok')
+        return vista
+
+    def test_solo_lecturas_marcadas_van_a_la_replica(self):
+        """Fuera de use_replica decide Django; dentro, la réplica."""
+        self.assertIsNone(self.router.db_for_read(Articulo))
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Articulo), 'replica')
+            with use_replica():
+                self.assertEqual(self.router.db_for_read(Articulo), 'replica')
+            self.assertEqual(self.router.db_for_read(Articulo), 'replica')
+            with fijar_primaria():
+                self.assertIsNone(self.router.db_for_read(Articulo))
+        self.assertIsNone(self.router.db_for_read(Articulo))
+
+        with override_settings(DB_REPLICA_ENABLED=False), use_replica():
+            self.assertIsNone(self.router.db_for_read(Articulo))
+
+    def test_decorador_en_hilos_concurrentes(self):
+        """Dos hilos dentro de la misma función decorada no comparten el token del contexto."""
+        dentro_primero, dentro_segundo, salio_primero = (threading.Event() for _ in range(3))
+        destinos, errores = [], []
+
+        @use_replica
+        def leer(primero):
+            # El primero en entrar sale antes de que salga el segundo
+            if primero:
+                dentro_primero.set()
+                dentro_segundo.wait(5)
+            else:
+                dentro_segundo.set()
+                salio_primero.wait(5)
+            destinos.append(self.router.db_for_read(Articulo))
+
+        def ejecutar(primero):
+            if not primero:
+                dentro_primero.wait(5)
+            try:
+                leer(primero)
+                destinos.append(self.router.db_for_read(Articulo))
+            except ValueError as exc:
+                errores.append(exc)
+            finally:
+                if primero:
+                    salio_primero.set()
+
+        hilos = [threading.Thread(target=ejecutar, args=(primero,)) for primero in (True, False)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.assertEqual(destinos, ['replica', None, 'replica', None])
+
+    def test_escrituras_siempre_en_la_principal(self):
+        """Una instancia leída de la réplica se guarda en la principal."""
+        categoria = Categoria(codigo='R1', nombre='Réplica')
+        categoria._state.db = 'replica'
+
+        self.assertEqual(self.router.db_for_write(Categoria, instance=categoria), 'default')
+        self.assertFalse(self.router.allow_migrate('replica', 'bodega'))
+        self.assertIsNone(self.router.allow_migrate('default', 'bodega'))
+
+    def test_usuario_que_escribio_lee_de_la_principal(self):
+        """Tras un POST, las lecturas del mismo usuario vuelven a la principal por el retraso tolerado."""
+        destinos = []
+        middleware = ReplicaMiddleware(self._vista_que_lee(destinos))
+        factory = RequestFactory()
+
+        def request(metodo, usuario_id):
+            req = getattr(factory, metodo)('/reportes/')
+            req.user = User(pk=usuario_id)
+            return req
+
+        middleware(request('get', 1))
+        middleware(request('post', 1))
+        middleware(request('get', 1))
+        middleware(request('get', 2))
+
+        self.assertEqual(destinos, ['replica', None, None, 'replica'])
+
+    async def test_middleware_asincrono(self):
+        """Bajo ASGI el middleware atiende en modo asíncrono con la misma fijación."""
+        destinos = []
+
+        async def vista(request):
+            with use_replica():
+                destinos.append(self.router.db_for_read(Articulo))
+            return HttpResponse('ok')
+
+        middleware = ReplicaMiddleware(vista)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = RequestFactory()
+
+        def request(metodo, usuario_id):
+            req = getattr(factory, metodo)('/reportes/')
+
+            async def auser():
+                return User(pk=usuario_id)
+            req.auser = auser
+            return req
+
+        await middleware(request('get', 1))
+        await middleware(request('post', 1))
+        await middleware(request('get', 1))
+        await middleware(request('get', 2))
+
+        self.assertEqual(destinos, ['replica', None, None, 'replica'])
+
+
+class ConsultasEnParaleloTest(TestCase):
+    """Tests de consultas_en_paralelo y del dashboard asíncrono."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin_async', 'async@test.cl', 'clave')
+        Categoria.objects.create(codigo='CA', nombre='Async')
+
+    async def test_resultados_por_nombre(self):
+        """Cada resultado queda asociado al nombre de su tarea."""
+        resultados = await consultas_en_paralelo({
+            'categorias': lambda: Categoria.objects.count(),
+            'usuarios': lambda: User.objects.filter(username='admin_async').count(),
+        })
+        self.assertEqual(resultados, {'categorias': 1, 'usuarios': 1})
+
+    async def test_dashboard_asincrono_igual_al_sincrono(self):
+        """Las tarjetas consultadas con gather arman el mismo contexto que en serie."""
+        sincrono = await sync_to_async(DashboardService.obtener_contexto)()
+        asincrono = await DashboardService.aobtener_contexto()
+        self.assertEqual(asincrono, sincrono)
+        self.assertEqual(asincrono['total_articulos'], 0)
+
+
+class SoftDeleteQuerySetTest(TestCase):
+    """Tests de los filtros de borrado lógico de BaseModel."""
+
+    def setUp(self):
+        Categoria.objects.create(codigo='C1', nombre='Vigente')
+        Categoria.objects.create(codigo='C2', nombre='Inactiva', activo=False)
+        Categoria.objects.create(codigo='C3', nombre='Eliminada', eliminado=True)
+
+    def test_vivos_y_activos(self):
+        """vivos() excluye eliminados; activos() además excluye inactivos."""
+        self.assertEqual(Categoria.objects.vivos().count(), 2)
+        self.assertEqual(Categoria.objects.activos().count(), 1)
+        self.assertEqual(Categoria.objects.eliminados().count(), 1)
+
+    def test_activos_con_campo_activo_redefinido_como_fk(self):
+        """En modelos donde 'activo' es FK solo se filtra por no eliminados."""
+        self.assertEqual(
+            str(DetalleSolicitud.objects.activos().query),
+            str(DetalleSolicitud.objects.vivos().query),
+        )
+
+
+class HistorialParticionadoTest(TestCase):
+    """Conversión, archivado y restauración del historial por año."""
+
+    def setUp(self):
+        usuario = User.objects.create_user('historial', password='clave')
+        bodega = Bodega.objects.create(codigo='BH', nombre='Bodega', responsable=usuario)
+        articulo = Articulo.objects.create(
+            codigo='AH', nombre='Artículo', categoria=Categoria.objects.create(codigo='CH', nombre='Cat'),
+            ubicacion_fisica=bodega
+        )
+        self.nuevo = lambda: Movimiento.objects.create(
+            articulo=articulo, tipo=TipoMovimiento.objects.get_or_create(codigo='TH', nombre='Tipo')[0],
+            operacion=Operacion.objects.get_or_create(codigo='EH', nombre='Entrada', tipo='ENTRADA')[0],
+            cantidad=1, usuario=usuario, motivo='Test', stock_antes=0, stock_despues=1
+        )
+        for _ in range(3):
+            self.nuevo()
+        self.anio_cerrado = timezone.localtime().year - 2
+        Movimiento.objects.filter(pk=Movimiento.objects.first().pk).update(
+            fecha_creacion=timezone.now().replace(year=self.anio_cerrado)
+        )
+        # Las FK diferidas pendientes impiden ALTER TABLE dentro de la transacción del test
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+    def test_convertir_archivar_y_restaurar(self):
+        """La tabla particionada debe seguir funcionando con el ORM y archivar años cerrados."""
+        particiones.convertir_a_particionada(Movimiento)
+
+        self.assertTrue(particiones.esta_particionada(Movimiento))
+        self.assertEqual(Movimiento.objects.count(), 3)
+        self.assertGreater(self.nuevo().pk, Movimiento.objects.order_by('pk').first().pk)
+
+        with tempfile.TemporaryDirectory() as destino:
+            archivo = particiones.archivar_anio(Movimiento, self.anio_cerrado, Path(destino))
+            self.assertTrue(archivo.exists())
+            self.assertEqual(Movimiento.objects.count(), 3)
+
+            self.assertEqual(particiones.restaurar_anio(Movimiento, self.anio_cerrado, Path(destino)), 1)
+            self.assertEqual(Movimiento.objects.count(), 4)
+
+    def test_no_archiva_anio_en_curso(self):
+        """Solo se pueden archivar años cerrados."""
+        particiones.convertir_a_particionada(Movimiento)
+
+        with self.assertRaises(particiones.ParticionError):
+            particiones.desacoplar_anio(Movimiento, timezone.localtime().year)
@@ -7,21 +7,24 @@ from django.contrib.auth.decorators import login_required
 from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import render
+from core.admin import instrumentacion_view
 
 # Importar vistas desde apps.pages (buenas prácticas de Django)
 from apps.pages.views import (
     MyPasswordChangeView,
     MyPasswordSetView,
     dashboard_view,
+    dashboard_async_view,
     dashboard_analytics_view,
     dashboard_crypto_view,
 )
 
 urlpatterns = [
+    path('admin/instrumentacion/', admin.site.admin_view(instrumentacion_view), name='admin_instrumentacion'),
     path('admin/', admin.site.urls),
     
     # dashboard
-    path('', view=dashboard_view, name='dashboard'),
+    path('', view=dashboard_async_view if settings.ASYNC_VIEWS_ENABLED else dashboard_view, name='dashboard'),
     path('dashboard_analytics', view=dashboard_analytics_view, name='dashboard_analytics'),
     path('dashboard_crypto', view=dashboard_crypto_view, name='dashboard_crypto'),
 
@@ -36,6 +39,7 @@ urlpatterns = [
     path('reportes/', include('apps.reportes.urls')),
     path('bajas-inventario/', include('apps.bajas_inventario.urls')),
     path('gestores/', include('apps.inventario.urls')),
+    path('notificaciones/', include('apps.notificaciones.urls')),
 
     # Gestión de usuarios y permisos
     path('usuarios/', include('apps.accounts.urls')),
@@ -4,7 +4,7 @@ Estas funciones son reutilizadas en diferentes apps.
 """
 
 from .logging import registrar_log_auditoria
-from .http import get_client_ip
+from .http import get_client_ip, json_response_con_etag
 from .business import (
     format_rut,
     validar_rut,
@@ -15,6 +15,7 @@ from .business import (
 __all__ = [
     'registrar_log_auditoria',
     'get_client_ip',
+    'json_response_con_etag',
     'format_rut',
     'validar_rut',
     'truncar_texto',
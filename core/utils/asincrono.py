@@ -0,0 +1,65 @@
+"""
+Utilidades para vistas asíncronas.
+
+El ORM asíncrono de Django ejecuta cada consulta en el hilo sync del
+request, por lo que varias consultas con ``asyncio.gather`` igual corren una
+tras otra. ``consultas_en_paralelo`` ejecuta funciones sync independientes
+en hilos propios, cada uno con su conexión (conviene DB_POOL_ENABLED para
+no pagar una conexión nueva por tarea).
+"""
+import asyncio
+from typing import Any, Callable, Dict
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+from core.instrumentation import instrumentar_hilo
+
+
+def _en_hilo_propio(funcion: Callable[[], Any]) -> Callable[[], Any]:
+    """Envuelve una tarea para un hilo auxiliar: instrumentación y cierre de conexiones."""
+    def ejecutar():
+        try:
+            with instrumentar_hilo():
+                return funcion()
+        finally:
+            # Respeta CONN_MAX_AGE: con pool devuelve la conexión, si no la
+            # conserva para la próxima tarea del mismo hilo
+            close_old_connections()
+    return ejecutar
+
+
+def _en_transaccion() -> bool:
+    """Indica si la conexión del hilo actual tiene una transacción abierta."""
+    return connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+async def consultas_en_paralelo(tareas: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Ejecuta funciones sync independientes de forma concurrente.
+
+    Dentro de una transacción abierta las tareas se ejecutan en serie en la
+    conexión del request, porque otras conexiones no verían lo escrito.
+
+    Args:
+        tareas: Dict {nombre: función sin argumentos}
+
+    Returns:
+        Dict {nombre: resultado de la función}
+
+    Example:
+        >>> resultados = await consultas_en_paralelo({
+        ...     'articulos': lambda: Articulo.objects.vivos().count(),
+        ...     'bodegas': lambda: Bodega.objects.vivos().count(),
+        ... })
+    """
+    # Se consulta en el hilo sync del request, que es el dueño de su conexión
+    en_transaccion = await sync_to_async(_en_transaccion)()
+    if en_transaccion:
+        return {nombre: await sync_to_async(funcion)() for nombre, funcion in tareas.items()}
+
+    resultados = await asyncio.gather(*(
+        sync_to_async(_en_hilo_propio(funcion), thread_sensitive=False)()
+        for funcion in tareas.values()
+    ))
+    return dict(zip(tareas, resultados))
@@ -1,8 +1,11 @@
 """
 Utilidades HTTP centralizadas.
 """
-from typing import Optional
-from django.http import HttpRequest
+import hashlib
+from typing import Any, Dict, Optional
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 
 
 def get_client_ip(request: HttpRequest) -> Optional[str]:
@@ -35,3 +38,30 @@ def get_client_ip(request: HttpRequest) -> Optional[str]:
 
     # Si no hay proxy, usar REMOTE_ADDR
     return request.META.get('REMOTE_ADDR')
+
+
+def json_response_con_etag(request: HttpRequest, data: Dict[str, Any], **kwargs) -> HttpResponse:
+    """
+    Construye un JsonResponse con cabecera ETag y soporte de revalidación.
+
+    El ETag se calcula sobre el cuerpo serializado, por lo que dos respuestas
+    con el mismo contenido comparten ETag. Si el cliente envía
+    If-None-Match con un valor coincidente se retorna 304 sin cuerpo.
+
+    Args:
+        request: Objeto HttpRequest de Django
+        data: Diccionario serializable a JSON
+        **kwargs: Argumentos adicionales para JsonResponse (ej: status)
+
+    Returns:
+        HttpResponse: JsonResponse con ETag, o 304 Not Modified
+    """
+    response = JsonResponse(data, **kwargs)
+    if response.status_code != 200:
+        return response
+
+    etag = quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+    response['ETag'] = etag
+    # Los pickers deben revalidar siempre antes de reutilizar la copia local
+    response['Cache-Control'] = 'private, no-cache'
+    return get_conditional_response(request, etag=etag, response=response)
@@ -0,0 +1,34 @@
+/**
+ * Badge de notificaciones no leídas.
+ *
+ * Consulta periódicamente el contador; el navegador revalida con el ETag
+ * (If-None-Match) y el servidor responde 304 mientras nada cambie.
+ */
+
+document.addEventListener('DOMContentLoaded', function() {
+    const dropdown = document.getElementById('notificationDropdown');
+    const url = dropdown?.dataset.contadorUrl;
+    if (!url) return;
+
+    const INTERVALO = 60 * 1000; // Consultar cada minuto
+    const badge = document.getElementById('notificacionesBadge');
+
+    function mostrar(noLeidas) {
+        document.querySelectorAll('.notification-badge').forEach(function(elemento) {
+            elemento.textContent = noLeidas > 99 ? '99+' : noLeidas;
+        });
+        if (badge) badge.classList.toggle('d-none', noLeidas === 0);
+    }
+
+    function consultar() {
+        if (document.hidden) return;
+        fetch(url, { cache: 'no-cache', credentials: 'same-origin' })
+            .then(function(respuesta) { return respuesta.ok ? respuesta.json() : null; })
+            .then(function(datos) { if (datos) mostrar(datos.no_leidas); })
+            .catch(function() {});
+    }
+
+    consultar();
+    setInterval(consultar, INTERVALO);
+    document.addEventListener('visibilitychange', consultar);
+});